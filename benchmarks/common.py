@@ -0,0 +1,96 @@
+"""
+::
+
+  File:    benchmarks/common.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This module has the code that the benchmarks in this dir share: making them import the app's source code, keeping the app's files & logs out of the way, summarizing the samples that they take, and writing their reports.
+
+It's not a benchmark itself. The benchmarks import it as ``common``, which works because python puts the dir of the script that it runs (ie this dir) first in sys.path.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import json, logging, os, sys, tempfile
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+BENCHMARKS_DIR = os.path.dirname( os.path.abspath( __file__ ) )
+SRC_DIR = os.path.join( BENCHMARKS_DIR, '..', 'src' )
+PACKAGE_DIR = os.path.join( SRC_DIR, 'packages', 'buskill' )
+FAKE_USB1_DIR = os.path.join( BENCHMARKS_DIR, 'fake_usb1' )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# makes the benchmark import the app's source code instead of anything
+# installed. If 'standalone', the modules of the buskill package are imported
+# directly (eg `import netlink_lin`), so that they don't need the rest of the
+# package (or its dependencies). If 'fake_usb1', `import usb1` imports the fake
+# one in fake_usb1/
+def use_source( standalone=False, fake_usb1=False ):
+
+	if standalone:
+		sys.path.insert( 0, PACKAGE_DIR )
+	else:
+		sys.path.insert( 0, SRC_DIR )
+
+	if fake_usb1:
+		sys.path.insert( 0, FAKE_USB1_DIR )
+
+# creates and returns a temporary dir, and sets-up logging to a file in it (the
+# app expects that to be set-up already). If 'home', it's also made the user's
+# home dir, so that the app writes its config and data there
+def make_tmp_dir( home=False ):
+
+	tmp_dir = tempfile.mkdtemp( prefix='buskill_benchmark_' )
+
+	if home:
+		os.environ['HOME'] = tmp_dir
+		os.makedirs( os.path.join( tmp_dir, '.local', 'share' ) )
+
+	logging.basicConfig(
+	 filename = os.path.join( tmp_dir, 'buskill.log' ),
+	 level = logging.WARNING
+	)
+
+	return tmp_dir
+
+# returns a dict of the given 'percentiles' (and, if 'include_max', the
+# maximum) of 'samples' (in seconds), multiplied by 'scale' (ie in ms by
+# default). Returns None if there are no samples
+def get_percentiles( samples, percentiles=[ 50, 90, 99 ], scale=1000, include_max=False ):
+
+	if len(samples) == 0:
+		return None
+
+	samples = sorted( samples )
+	result = {
+	 'p' +str(percentile): round( samples[ min( len(samples)-1, int( len(samples)*percentile/100 ) ) ]*scale, 3 )
+	 for percentile in percentiles
+	}
+
+	if include_max:
+		result['max'] = round( samples[-1]*scale, 3 )
+
+	return result
+
+# writes 'report' as JSON to the file 'output' or, if it's None, to stdout
+def write_report( report, output=None ):
+
+	report = json.dumps( report, indent=1 )
+	if output:
+		with open( output, 'w' ) as fd:
+			fd.write( report + '\n' )
+	else:
+		print( report )
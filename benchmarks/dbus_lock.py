@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/dbus_lock.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark measures how long the lock-screen trigger takes to ask the desktop environment to lock the screen over D-Bus (see ``packages/buskill/dbus_lin.py``), compared to forking a command like ``xdg-screensaver lock``.
+
+It starts a private ``dbus-daemon`` with a mock screensaver service that just records the calls to its ``Lock()`` method, points BusKill at it, and executes the (compiled) lock-screen trigger. It reports (as JSON) the latency percentiles of the D-Bus lock and of forking a trivial command, and exits non-zero if the mock service didn't receive a ``Lock()`` call for every time that it was asked to lock the screen. This only works on Linux, and it needs ``dbus-daemon``.
+
+Usage::
+
+  python3 benchmarks/dbus_lock.py --iterations 200
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, os, platform, shutil, subprocess, sys, threading
+import time
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# owns 'name' on the bus at 'address' and replies to every call to its Lock()
+# method. 'locks' is a list to which the time of every call is appended
+def mock_screensaver( dbus_lin, address, name, locks, ready ):
+
+	connection = dbus_lin.Connection( address )
+	connection.request_name( name )
+	ready.set()
+
+	while True:
+		try:
+			message = connection.receive()
+		except Exception as e:
+			# the dbus-daemon was stopped
+			return
+
+		if message.type != dbus_lin.METHOD_CALL:
+			continue
+
+		if message.fields.get( 'member' ) == 'Lock':
+			locks.append( time.monotonic() )
+			connection.reply( message )
+		else:
+			connection.reply_error( message, 'org.freedesktop.DBus.Error.UnknownMethod' )
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Measure the latency of locking the screen over D-Bus"
+	)
+	parser.add_argument( '--iterations', type=int, default=200 )
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	if shutil.which( 'dbus-daemon' ) == None:
+		print( "This benchmark needs dbus-daemon" )
+		return 1
+
+	# the app writes its config and logs to the user's home dir; keep them out
+	# of the way. The app also expects logging to a file to be set-up already
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	daemon = subprocess.Popen(
+	 [ 'dbus-daemon', '--session', '--nofork', '--print-address=1' ],
+	 stdout = subprocess.PIPE, stderr = subprocess.DEVNULL, text = True
+	)
+	address = daemon.stdout.readline().strip()
+
+	# use only our private bus, and make sure that no lock commands are found
+	os.environ['DBUS_SESSION_BUS_ADDRESS'] = address
+	os.environ['DBUS_SYSTEM_BUS_ADDRESS'] = 'unix:path=' + os.path.join( tmp_dir, 'no_system_bus' )
+	os.environ['PATH'] = tmp_dir
+	os.environ['XDG_CURRENT_DESKTOP'] = 'GNOME'
+
+	locks = list()
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+		try:
+			import packages.buskill
+			from packages.buskill import dbus_lin
+
+			ready = threading.Event()
+			mock = threading.Thread(
+			 target = mock_screensaver,
+			 args = ( dbus_lin, address, 'org.gnome.ScreenSaver', locks, ready ),
+			 daemon = True
+			)
+			mock.start()
+			ready.wait( 5 )
+
+			bk = packages.buskill.BusKill()
+			bk.set_trigger( 'lock-screen' )
+
+			compile_start_time = time.monotonic()
+			plan = bk.compile_trigger_plan()
+			compile_duration = time.monotonic() - compile_start_time
+
+			# the whole trigger, including its logging and recording what worked
+			trigger_samples = list()
+			for iteration in range( args.iterations ):
+				start_time = time.monotonic()
+				bk.TRIGGER_FUNCTION()
+				trigger_samples.append( time.monotonic() - start_time )
+
+			# just the D-Bus round trip
+			dbus_samples = list()
+			for iteration in range( args.iterations ):
+				start_time = time.monotonic()
+				bk.trigger_bus.call( 'org.gnome.ScreenSaver.Lock' )
+				dbus_samples.append( time.monotonic() - start_time )
+
+			# for comparison, the cost of forking the most trivial shell script
+			# there is. `xdg-screensaver` is a much bigger one
+			fork_samples = list()
+			for iteration in range( args.iterations ):
+				start_time = time.monotonic()
+				subprocess.run( [ '/bin/sh', '-c', ':' ] )
+				fork_samples.append( time.monotonic() - start_time )
+
+			bk.close()
+
+		finally:
+			daemon.kill()
+			daemon.wait()
+
+		# the mock service exits when it loses its connection
+		mock.join( 5 )
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'iterations': args.iterations,
+	 'plan': plan.to_dict()['steps'],
+	 'compile_ms': round( compile_duration*1000, 3 ),
+	 'trigger_ms': common.get_percentiles( trigger_samples ),
+	 'dbus_round_trip_ms': common.get_percentiles( dbus_samples ),
+	 'fork_sh_ms': common.get_percentiles( fork_samples ),
+	 'locks_received': len(locks),
+	 'passed': len(locks) == 2*args.iterations,
+	}
+
+	common.write_report( report, args.output )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/event_storm.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark stress-tests how the BusKill app handles a storm of USB removal events, like the burst that libusb delivers when a hub or dock is unplugged. It arms BusKill with a fake ``usb1`` module (see ``fake_usb1/usb1.py``), injects thousands of removal events per second, and checks that the trigger was executed exactly once for each time that BusKill was armed (see ``packages/buskill/arm_epoch.py``).
+
+It reports (as JSON) how many events were injected, how many times the trigger was executed, and how long it took the usb_handler to get through the storm. It exits non-zero if the trigger was executed more or less than once per arm. This only works on Linux.
+
+Usage::
+
+  python3 benchmarks/event_storm.py --events 10000 --rate 5000
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, multiprocessing, os, platform, sys, time
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+import usb1
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# injects 'count' removal events at (about) 'rate' events per second
+def inject_storm( count, rate ):
+
+	interval = 1 / rate
+	start_time = time.monotonic()
+
+	for index in range( count ):
+
+		# sleep only once we're ahead of schedule, so that short bursts are
+		# injected back-to-back
+		delay = start_time + index*interval - time.monotonic()
+		if delay > 0.001:
+			time.sleep( delay )
+
+		usb1.fake_removal( index )
+
+	return time.monotonic() - start_time
+
+# arms BusKill, injects a storm of removal events, and disarms again. Returns
+# a dict of the results
+def run_storm( bk, trigger_count, events, rate ):
+
+	before = trigger_count.value
+	duplicates_before = bk.duplicate_trigger_count
+
+	bk.toggle()
+	inject_duration = inject_storm( events, rate )
+
+	# handle messages until the usb_handler has gotten through the whole storm
+	# (ie until its hotplug callback has been called for the last event) and
+	# there are no more messages
+	deadline = time.monotonic() + 30
+	while time.monotonic() < deadline:
+		message = bk.get_usb_handler_message( 0.2 )
+		if message != None:
+			bk.handle_usb_handler_message( message )
+		elif usb1.CALLBACK_TIMES[ (events-1) % usb1.MAX_EVENTS ] != 0:
+			break
+
+	first_callback = usb1.CALLBACK_TIMES[0]
+	last_callback = usb1.CALLBACK_TIMES[ (events-1) % usb1.MAX_EVENTS ]
+
+	bk.toggle()
+
+	# reset the callback times for the next storm
+	for index in range( min( events, usb1.MAX_EVENTS ) ):
+		usb1.CALLBACK_TIMES[index] = 0
+
+	result = {
+	 'events': events,
+	 'target_rate': rate,
+	 'inject_duration_ms': round( inject_duration*1000, 3 ),
+	 'triggers': trigger_count.value - before,
+	 'duplicate_trigger_messages': bk.duplicate_trigger_count - duplicates_before,
+	 'handled_all_events': last_callback != 0,
+	}
+	if last_callback != 0:
+		result['handler_duration_ms'] = round( (last_callback - first_callback)*1000, 3 )
+		result['handler_rate'] = round( events / max( last_callback - first_callback, 1e-9 ) )
+
+	return result
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Stress-test BusKill with a storm of fake USB removal events"
+	)
+	parser.add_argument( '--events', type=int, default=10000 )
+	parser.add_argument( '--rate', type=int, default=5000, help="events per second" )
+	parser.add_argument( '--storms', type=int, default=3, help="how many times to arm" )
+	parser.add_argument( '--trigger-in-listener', action='store_true' )
+	parser.add_argument( '--arm-in-thread', action='store_true' )
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	# the app writes its config and logs to the user's home dir; keep them out
+	# of the way. The app also expects logging to a file to be set-up already
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	# counts trigger executions, which may happen in the usb_handler child
+	trigger_count = multiprocessing.RawValue( 'i', 0 )
+	def trigger():
+		trigger_count.value += 1
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+
+		import packages.buskill
+
+		bk = packages.buskill.BusKill()
+		bk.set_trigger( 'lock-screen' )
+		bk.set_trigger_device( '' )
+		bk.set_hotplug_backend( 'libusb' )
+		bk.TRIGGER_FUNCTION = trigger
+		bk.RUN_TRIGGER_IN_LISTENER = args.trigger_in_listener
+		bk.ARM_IN_THREAD = args.arm_in_thread
+		bk.PERSISTENT_USB_HANDLER = False
+		bk.LEAN_USB_HANDLER = False
+
+		storms = [
+		 run_storm( bk, trigger_count, args.events, args.rate )
+		 for storm in range( args.storms )
+		]
+
+		bk.close()
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'trigger_in_listener': args.trigger_in_listener,
+	 'arm_in_thread': args.arm_in_thread,
+	 'storms': storms,
+	 'passed': all( storm['triggers'] == 1 for storm in storms ),
+	}
+
+	common.write_report( report, args.output )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
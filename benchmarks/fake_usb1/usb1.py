@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/fake_usb1/usb1.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is a fake of the small part of python-libusb1's ``usb1`` module that the BusKill app uses. It lets the benchmarks drive BusKill's real arming path (``toggle()`` -> ``armNix()`` -> ``hotplugCallbackNix()``) on a machine without a USB device to unplug.
+
+Removal events are injected by writing a device's key to a pipe with ``fake_removal()``. The pipe is created when this module is imported, so it's shared with the usb_handler child process as long as it's forked (ie on Linux).
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import os, time, select, multiprocessing
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+__version__ = 'fake'
+
+CAP_HAS_HOTPLUG = 0x0001
+HOTPLUG_EVENT_DEVICE_ARRIVED = 0x01
+HOTPLUG_EVENT_DEVICE_LEFT = 0x02
+HOTPLUG_ENUMERATE = 0x01
+HOTPLUG_MATCH_ANY = -1
+
+# the devices that are "connected" as (bus, port numbers, vendor id, product id)
+DEVICES = [ (1, (2,), 0x1a86, 0x7523) ]
+
+# removal events are written to this pipe by fake_removal() and read by the
+# USBContext in the usb_handler child process
+EVENT_READER, EVENT_WRITER = os.pipe()
+
+# the time at which the last removal's hotplug callback was called, in the
+# usb_handler child process. It's in shared memory so the benchmark can read it
+MAX_EVENTS = 65536
+CALLBACK_TIMES = multiprocessing.RawArray( 'd', MAX_EVENTS )
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+class USBDevice:
+
+	def __init__( self, key ):
+		self.key = key
+
+	def getBusNumber( self ):
+		return self.key[0]
+
+	def getPortNumberList( self ):
+		return list( self.key[1] )
+
+	def getVendorID( self ):
+		return self.key[2]
+
+	def getProductID( self ):
+		return self.key[3]
+
+	def getSerialNumber( self ):
+		return 'FAKE' + str(self.key[0])
+
+	def getManufacturer( self ):
+		return 'Fake'
+
+	def getProduct( self ):
+		return 'BusKill'
+
+class USBContext:
+
+	def __init__( self ):
+		self.callbacks = dict()
+
+	def __enter__( self ):
+		return self
+
+	def __exit__( self, *args ):
+		pass
+
+	def open( self ):
+		return self
+
+	def close( self ):
+		pass
+
+	def hasCapability( self, capability ):
+		return True
+
+	def getDeviceIterator( self, skip_on_error=False ):
+		return iter( [ USBDevice(key) for key in DEVICES ] )
+
+	def hotplugRegisterCallback( self, callback, **kwargs ):
+		handle = len( self.callbacks ) + 1
+		self.callbacks[handle] = callback
+		return handle
+
+	def hotplugDeregisterCallback( self, handle ):
+		del self.callbacks[handle]
+
+	def getPollFDList( self ):
+		return [ (EVENT_READER, select.POLLIN) ]
+
+	def setPollFDNotifiers( self, added_cb=None, removed_cb=None ):
+		pass
+
+	def getNextTimeout( self ):
+		return None
+
+	# reads every pending removal and calls the callbacks for each
+	def handleEventsTimeout( self, tv=0 ):
+
+		if not select.select( [EVENT_READER], [], [], tv )[0]:
+			return
+
+		data = os.read( EVENT_READER, 65536 )
+		for line in data.split( b'\n' ):
+			if not line:
+				continue
+
+			(index, bus, ports, vid, pid) = line.decode('ascii').split(' ')
+			key = ( int(bus), tuple( [int(port) for port in ports.split('.')] ), int(vid), int(pid) )
+
+			CALLBACK_TIMES[ int(index) % MAX_EVENTS ] = time.monotonic()
+			for callback in list( self.callbacks.values() ):
+				callback( self, USBDevice(key), HOTPLUG_EVENT_DEVICE_LEFT )
+
+	def handleEvents( self ):
+		self.handleEventsTimeout( None )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# injects the removal of the device with the given key. 'index' identifies
+# this event in CALLBACK_TIMES
+def fake_removal( index, key=None ):
+
+	if key == None:
+		key = DEVICES[0]
+
+	(bus, ports, vid, pid) = key
+	line = ' '.join( [
+	 str(index), str(bus), '.'.join( [str(port) for port in ports] ), str(vid), str(pid)
+	] ) + '\n'
+	os.write( EVENT_WRITER, line.encode('ascii') )
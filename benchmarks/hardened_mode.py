@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/hardened_mode.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark measures how much hardened mode (see ``packages/buskill/hardening.py``) helps the trigger when the machine is under heavy load.
+
+Like the ``stress`` tool, it starts ``--cpu-hogs`` processes that spin on the CPU (by default, two per CPU) and ``--memory-hogs`` processes that repeatedly allocate, dirty, and free ``--memory-mb`` MiB each. Then it executes a trigger plan with the trigger executor (see ``benchmarks/trigger_executor.py``), first without and then with hardened mode, and reports (as JSON) the latency percentiles of the time from asking the executor to execute the trigger until it started the command, and of the whole trigger, along with what hardened mode actually got. Run it as root (or with CAP_IPC_LOCK, CAP_SYS_NICE & CAP_SYS_RESOURCE) to get all of hardened mode. It exits non-zero if any execution failed. This only works on Linux.
+
+Usage::
+
+  sudo python3 benchmarks/hardened_mode.py --iterations 200
+  sudo python3 benchmarks/hardened_mode.py --memory-hogs 4 --memory-mb 1024
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, multiprocessing, os, platform, shutil, sys, time
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+def hog_cpu():
+
+	while True:
+		pass
+
+def hog_memory( size ):
+
+	page_count = len( range( 0, size, 4096 ) )
+	while True:
+		data = bytearray( size )
+		data[::4096] = b'\1' * page_count
+		del data
+
+# executes 'plan' 'iterations' times with a trigger executor and returns a
+# tuple of the samples of the time until it started the command, the samples
+# of the whole trigger, the executor's hardening report, and the failure count
+def measure( plan, iterations, interval, hardened ):
+
+	from packages.buskill import trigger_executor
+
+	executor = trigger_executor.TriggerExecutor( plan, hardened=hardened )
+	executor.start()
+
+	start_latency_samples = list()
+	trigger_samples = list()
+	failures = 0
+	for iteration in range( iterations ):
+		time.sleep( interval )
+		start_time = time.monotonic()
+		if not executor.execute():
+			failures += 1
+		trigger_samples.append( time.monotonic() - start_time )
+		start_latency_samples.append( executor.start_latency )
+
+	executor.stop()
+
+	return (start_latency_samples, trigger_samples, executor.hardening, failures)
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Measure the trigger's latency under load with and without hardened mode"
+	)
+	parser.add_argument( '--iterations', type=int, default=200 )
+	parser.add_argument(
+	 '--interval', type=float, default=0.05,
+	 help="seconds to wait between iterations, like the idle time before a real trigger"
+	)
+	parser.add_argument(
+	 '--cpu-hogs', type=int, default=2*os.cpu_count(),
+	 help="how many processes spin on the CPU (default: two per CPU)"
+	)
+	parser.add_argument(
+	 '--memory-hogs', type=int, default=1,
+	 help="how many processes allocate, dirty, and free memory"
+	)
+	parser.add_argument(
+	 '--memory-mb', type=int, default=256,
+	 help="how many MiB each memory hog allocates at a time"
+	)
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	parser.add_argument(
+	 '--command', nargs=argparse.REMAINDER, default=[ 'true' ],
+	 help="the command that the trigger executes (default: true)"
+	)
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	argv = list( args.command )
+	argv[0] = shutil.which( argv[0] )
+	if argv[0] == None:
+		print( "Unable to find " +str(args.command[0]) )
+		return 1
+
+	# the app writes its config and logs to the user's home dir; keep them out
+	# of the way. The app also expects logging to a file to be set-up already
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	context = multiprocessing.get_context( 'fork' )
+	hogs = [
+	 context.Process( target=hog_cpu, daemon=True )
+	 for hog in range( args.cpu_hogs )
+	] + [
+	 context.Process( target=hog_memory, args=( args.memory_mb*1024*1024, ), daemon=True )
+	 for hog in range( args.memory_hogs )
+	]
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	results = dict()
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+		from packages.buskill import trigger_plan
+
+		plan = trigger_plan.TriggerPlan(
+		 'lock-screen',
+		 [ [ trigger_plan.Strategy( os.path.basename( argv[0] ), argv, False ) ] ],
+		 None
+		)
+
+		for hog in hogs:
+			hog.start()
+
+		try:
+			# give the load a moment to build up
+			time.sleep( 1 )
+
+			for hardened in [ False, True ]:
+				results[hardened] = measure(
+				 plan, args.iterations, args.interval, hardened
+				)
+
+		finally:
+			for hog in hogs:
+				hog.terminate()
+				hog.join()
+
+	failures = sum( [ result[3] for result in results.values() ] )
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'cpu_count': os.cpu_count(),
+	 'euid': os.geteuid(),
+	 'iterations': args.iterations,
+	 'command': argv,
+	 'cpu_hogs': args.cpu_hogs,
+	 'memory_hogs': args.memory_hogs,
+	 'memory_mb': args.memory_mb,
+	 'normal_write_to_start_ms': common.get_percentiles( results[False][0], include_max=True ),
+	 'normal_trigger_ms': common.get_percentiles( results[False][1], include_max=True ),
+	 'hardened_write_to_start_ms': common.get_percentiles( results[True][0], include_max=True ),
+	 'hardened_trigger_ms': common.get_percentiles( results[True][1], include_max=True ),
+	 'hardening': {
+	  feature: ( 'ok' if got == True else got )
+	  for feature, got in results[True][2].items()
+	 },
+	 'failures': failures,
+	 'passed': failures == 0,
+	}
+
+	common.write_report( report, args.output )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/idle_wakeups.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark measures how much an already-running BusKill app costs while it's sitting idle (eg armed with its window minimized). It samples the app's CPU time and context switches from /proc for a while, and reports (as JSON) the CPU usage and the number of wakeups per second.
+
+Every thread of the process (and, with --children, of its child processes, like the usb_handler) is counted. A thread that sleeps and wakes-up again makes one voluntary context switch, so the voluntary context switches per second is a good estimate of how often the app wakes-up.
+
+Start the GUI, arm it, minimize it, and then run this against its pid. This only works on Linux.
+
+Usage::
+
+  python3 benchmarks/idle_wakeups.py --pid 1234 --seconds 60 --children
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, os, platform, sys, time
+
+import common
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns the pids of 'pid' and (if 'children') all of its descendants
+def get_pids( pid, children ):
+
+	pids = [ pid ]
+	if not children:
+		return pids
+
+	for task in os.listdir( '/proc/' +str(pid)+ '/task' ):
+		try:
+			with open( '/proc/' +str(pid)+ '/task/' +str(task)+ '/children' ) as fd:
+				for child in fd.read().split():
+					pids += get_pids( int(child), children )
+		except OSError:
+			# the thread exited while we were looking at it
+			pass
+
+	return pids
+
+# returns a tuple of the CPU seconds and the (voluntary, involuntary) context
+# switches of every thread of the process 'pid'
+def sample_process( pid ):
+
+	ticks = os.sysconf( 'SC_CLK_TCK' )
+	cpu = 0
+	voluntary = 0
+	involuntary = 0
+
+	for task in os.listdir( '/proc/' +str(pid)+ '/task' ):
+		task_dir = '/proc/' +str(pid)+ '/task/' +str(task)
+
+		try:
+			with open( task_dir + '/stat' ) as fd:
+				# the process name may contain spaces, so split after it
+				fields = fd.read().rsplit( ')', 1 )[1].split()
+			cpu += ( int(fields[11]) + int(fields[12]) ) / ticks
+
+			with open( task_dir + '/status' ) as fd:
+				for line in fd:
+					if line.startswith( 'voluntary_ctxt_switches:' ):
+						voluntary += int( line.split()[1] )
+					elif line.startswith( 'nonvoluntary_ctxt_switches:' ):
+						involuntary += int( line.split()[1] )
+
+		except OSError:
+			# the thread exited while we were looking at it
+			pass
+
+	return cpu, voluntary, involuntary
+
+# returns a dict of the summed samples of every process in 'pids', keyed by
+# pid, so that processes that come or go during the measurement are skipped
+def sample( pids ):
+
+	samples = dict()
+	for pid in pids:
+		try:
+			samples[pid] = sample_process( pid )
+		except OSError:
+			pass
+
+	return samples
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Measure the idle CPU usage and wakeups of a running BusKill app"
+	)
+	parser.add_argument( '--pid', type=int, required=True )
+	parser.add_argument( '--seconds', type=float, default=60 )
+	parser.add_argument( '--children', action='store_true', help="include child processes" )
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	pids = get_pids( args.pid, args.children )
+
+	start_time = time.monotonic()
+	before = sample( pids )
+	time.sleep( args.seconds )
+	after = sample( pids )
+	duration = time.monotonic() - start_time
+
+	cpu = 0
+	voluntary = 0
+	involuntary = 0
+	for pid in set( before.keys() ) & set( after.keys() ):
+		cpu += after[pid][0] - before[pid][0]
+		voluntary += after[pid][1] - before[pid][1]
+		involuntary += after[pid][2] - before[pid][2]
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'pids': sorted( set( before.keys() ) & set( after.keys() ) ),
+	 'seconds': round( duration, 3 ),
+	 'cpu_percent': round( 100 * cpu / duration, 3 ),
+	 'wakeups_per_second': round( voluntary / duration, 3 ),
+	 'involuntary_switches_per_second': round( involuntary / duration, 3 ),
+	}
+
+	common.write_report( report, args.output )
+
+	return 0
+
+if __name__ == '__main__':
+	sys.exit( main() )
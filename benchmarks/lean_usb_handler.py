@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/lean_usb_handler.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark checks that the lean usb_handler (see ``packages/buskill/usb_listener.py``) stays within its budget of memory and import time.
+
+It starts the lean usb_handler the way the app does (``start_lean_usb_handler()``) with each of the given hotplug backends, asks it for its status, and stops it again. It reports (as JSON) the largest RSS (in KiB) and import time (in ms) of each backend, and exits non-zero if any of them is over ``usb_listener.RSS_BUDGET_KIB`` or ``usb_listener.IMPORT_TIME_BUDGET_MS``. The 'libusb' backend imports the real ``usb1``, so it's only measured if python-libusb1 is installed. This only works on Linux.
+
+Usage::
+
+  python3 benchmarks/lean_usb_handler.py --iterations 10
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, os, platform, shutil, sys
+
+import common
+
+# use the app's source code instead of anything installed
+common.use_source()
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# starts and stops the lean usb_handler 'iterations' times and returns a dict
+# of the largest RSS & import time that it reported
+def measure( bk, hotplug_backend, iterations ):
+
+	bk.hotplug_backend = hotplug_backend
+
+	rss_kib = list()
+	import_ms = list()
+	for iteration in range( iterations ):
+
+		bk.start_lean_usb_handler()
+		try:
+			status = bk.get_usb_handler_status()
+		finally:
+			bk.stop_persistent_usb_handler()
+
+		rss_kib.append( int( status['rss_kib'] ) )
+		import_ms.append( float( status['import_ms'] ) )
+
+	return {
+	 'max_rss_kib': max( rss_kib ),
+	 'max_import_ms': max( import_ms ),
+	}
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Check that the lean usb_handler is within its memory & import time budget"
+	)
+	parser.add_argument( '--iterations', type=int, default=10 )
+	parser.add_argument(
+	 '--backends', default='netlink,sysfs,libusb',
+	 help="comma-separated list of 'netlink', 'sysfs' and/or 'libusb'"
+	)
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	backends = args.backends.split( ',' )
+	if 'libusb' in backends:
+		try:
+			import usb1
+		except ImportError:
+			backends.remove( 'libusb' )
+
+	# the app writes its config and logs to the user's home dir; keep them out
+	# of the way. The app also expects logging to a file to be set-up already
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	results = dict()
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+
+		import packages.buskill
+		from packages.buskill import usb_listener
+
+		bk = packages.buskill.BusKill()
+
+		# we're not main.py, but we want the app's usb_listener.py script
+		bk.EXECUTED_AS_SCRIPT = True
+		bk.HARDENED_MODE = False
+
+		for hotplug_backend in backends:
+			results[hotplug_backend] = measure( bk, hotplug_backend, args.iterations )
+
+		bk.close()
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'iterations': args.iterations,
+	 'rss_budget_kib': usb_listener.RSS_BUDGET_KIB,
+	 'import_time_budget_ms': usb_listener.IMPORT_TIME_BUDGET_MS,
+	}
+	report.update( results )
+	report['passed'] = all( [
+	 result['max_rss_kib'] <= usb_listener.RSS_BUDGET_KIB
+	 and result['max_import_ms'] <= usb_listener.IMPORT_TIME_BUDGET_MS
+	 for result in results.values()
+	] )
+
+	common.write_report( report, args.output )
+
+	shutil.rmtree( tmp_dir, ignore_errors=True )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/lock_verification.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark checks that verifying the lock-screen trigger (see ``packages/buskill/lock_state_lin.py``) catches a lock strategy that "succeeds" without locking the screen, and measures what that costs.
+
+It starts a private ``dbus-daemon`` with a mock GNOME screensaver and a mock Cinnamon screensaver. Both answer ``Lock()`` and ``GetActive()``, and a screensaver that works becomes active (and emits ``ActiveChanged``) ``--lock-delay-ms`` ms after it's asked to lock. It then executes the (compiled) lock-screen trigger in three scenarios:
+
+ * 'working': GNOME's screensaver works,
+ * 'lying': GNOME's screensaver replies to ``Lock()`` without locking anything (like ``xdg-screensaver`` in Cinnamon), and only Cinnamon's works, and
+ * 'fading': both work, but take ``--fade-ms`` ms to become active (like GNOME's and KDE's, which fade the screen out first),
+
+each without and with verification. It reports (as JSON) how often the session ended up locked, how often the trigger said that it succeeded, how long the trigger took, and how long each verification took. It exits non-zero if a verified trigger ever left the session unlocked or said that it failed, or if the 'lying' scenario cost more than twice ``lock_state_lin.VERIFY_TIMEOUT`` (p99). Expect verifying the 'working' scenario to cost about ``--lock-delay-ms``, since it's woken by the signal, and the 'lying' one about ``lock_state_lin.VERIFY_TIMEOUT``. This only works on Linux, and it needs ``dbus-daemon``.
+
+Usage::
+
+  python3 benchmarks/lock_verification.py --iterations 20
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, os, platform, shutil, subprocess, sys, threading
+import time
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+SCREENSAVERS = {
+ 'org.gnome.ScreenSaver': 'org.gnome.ScreenSaver',
+ 'org.cinnamon.ScreenSaver': 'org.cinnamon.ScreenSaver',
+}
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# owns the names of SCREENSAVERS on the bus at 'address' and answers their
+# Lock() and GetActive() methods. 'state' is a dict whose 'working' is the set
+# of the screensavers whose Lock() works, whose 'active' is True once one of
+# them has locked, and whose 'lock_delay' is how long (in seconds) that takes
+def mock_screensavers( dbus_lin, address, state, ready ):
+
+	connection = dbus_lin.Connection( address )
+	for name in SCREENSAVERS:
+		connection.request_name( name )
+	ready.set()
+
+	# the timer's thread and ours both send on the connection
+	send_lock = threading.Lock()
+
+	def activate( name ):
+		if state['active']:
+			return
+		state['active'] = True
+		with send_lock:
+			connection.emit(
+			 '/' + name.replace( '.', '/' ), SCREENSAVERS[name], 'ActiveChanged',
+			 'b', ( True, )
+			)
+
+	while True:
+		try:
+			message = connection.receive()
+		except Exception as e:
+			# the dbus-daemon was stopped
+			return
+
+		if message.type != dbus_lin.METHOD_CALL:
+			continue
+
+		member = message.fields.get( 'member' )
+		destination = message.fields.get( 'destination' )
+		with send_lock:
+			if member == 'Lock':
+				if destination in state['working']:
+					threading.Timer( state['lock_delay'], activate, ( destination, ) ).start()
+				connection.reply( message )
+			elif member == 'GetActive':
+				connection.reply( message, 'b', ( state['active'], ) )
+			else:
+				connection.reply_error( message, 'org.freedesktop.DBus.Error.UnknownMethod' )
+
+# executes the trigger 'iterations' times and returns a dict describing what
+# happened
+def measure( bk, state, iterations, verify ):
+
+	bk.VERIFY_LOCK_SCREEN = verify
+	bk.lock_verifier = None
+
+	locked = 0
+	succeeded = 0
+	trigger_samples = list()
+	verify_samples = list()
+	for iteration in range( iterations ):
+		state['active'] = False
+
+		start_time = time.monotonic()
+		# this is what bk.TRIGGER_FUNCTION() does, but it also tells us whether
+		# the trigger succeeded
+		if bk.trigger_lockscreen_lin():
+			succeeded += 1
+		trigger_samples.append( time.monotonic() - start_time )
+
+		# give a screensaver that was asked to lock the time to do it
+		time.sleep( state['lock_delay'] + 0.05 )
+		if state['active']:
+			locked += 1
+
+		if bk.lock_verifier != None:
+			verify_samples += [ latency/1000 for (name, latency, result) in bk.lock_verifier.results ]
+
+	return {
+	 'locked': locked,
+	 'succeeded': succeeded,
+	 'trigger_ms': common.get_percentiles( trigger_samples ),
+	 'verify_ms': common.get_percentiles( verify_samples ),
+	}
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Check that verifying the lock-screen trigger catches a strategy that doesn't lock"
+	)
+	parser.add_argument( '--iterations', type=int, default=20 )
+	parser.add_argument(
+	 '--lock-delay-ms', type=int, default=20,
+	 help="how long a working screensaver takes to lock after it's asked to"
+	)
+	parser.add_argument(
+	 '--fade-ms', type=int, default=800,
+	 help="how long a working screensaver takes to lock in the 'fading' scenario"
+	)
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	if shutil.which( 'dbus-daemon' ) == None:
+		print( "This benchmark needs dbus-daemon" )
+		return 1
+
+	# the app writes its config and logs to the user's home dir; keep them out
+	# of the way. The app also expects logging to a file to be set-up already
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	daemon = subprocess.Popen(
+	 [ 'dbus-daemon', '--session', '--nofork', '--print-address=1' ],
+	 stdout = subprocess.PIPE, stderr = subprocess.DEVNULL, text = True
+	)
+	address = daemon.stdout.readline().strip()
+
+	# use only our private bus, and make sure that no lock commands are found
+	os.environ['DBUS_SESSION_BUS_ADDRESS'] = address
+	os.environ['DBUS_SYSTEM_BUS_ADDRESS'] = 'unix:path=' + os.path.join( tmp_dir, 'no_system_bus' )
+	os.environ['PATH'] = tmp_dir
+	os.environ['XDG_CURRENT_DESKTOP'] = 'X-Cinnamon'
+
+	state = {
+	 'working': set(), 'active': False, 'lock_delay': args.lock_delay_ms/1000
+	}
+
+	results = dict()
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+		try:
+			import packages.buskill
+			from packages.buskill import dbus_lin, lock_state_lin
+
+			ready = threading.Event()
+			mock = threading.Thread(
+			 target = mock_screensavers, args = ( dbus_lin, address, state, ready ),
+			 daemon = True
+			)
+			mock.start()
+			ready.wait( 5 )
+
+			bk = packages.buskill.BusKill()
+			bk.set_trigger( 'lock-screen' )
+			bk.LOCK_ESCALATION_TRIGGER = ''
+
+			# don't let what worked in one scenario reorder the plan of the next
+			bk.DATA_DIR = None
+			plan = bk.compile_trigger_plan()
+
+			for (scenario, working, lock_delay_ms) in [
+			 ( 'working', [ 'org.gnome.ScreenSaver', 'org.cinnamon.ScreenSaver' ], args.lock_delay_ms ),
+			 ( 'lying', [ 'org.cinnamon.ScreenSaver' ], args.lock_delay_ms ),
+			 ( 'fading', [ 'org.gnome.ScreenSaver', 'org.cinnamon.ScreenSaver' ], args.fade_ms ),
+			]:
+				state['working'] = set( working )
+				state['lock_delay'] = lock_delay_ms/1000
+				for verify in [ False, True ]:
+					results[ scenario+ ( '_verified' if verify else '_unverified' ) ] = measure(
+					 bk, state, args.iterations, verify
+					)
+
+			bk.close()
+
+		finally:
+			daemon.kill()
+			daemon.wait()
+
+		# the mock service exits when it loses its connection
+		mock.join( 5 )
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'iterations': args.iterations,
+	 'lock_delay_ms': args.lock_delay_ms,
+	 'fade_ms': args.fade_ms,
+	 'verify_timeout_ms': lock_state_lin.VERIFY_TIMEOUT*1000,
+	 'plan': plan.to_dict()['steps'],
+	}
+	report.update( results )
+	report['passed'] = all( [
+	 result['locked'] == args.iterations and result['succeeded'] == args.iterations
+	 for (name, result) in results.items() if name.endswith( '_verified' )
+	] ) and results['lying_verified']['trigger_ms']['p99'] <= lock_state_lin.VERIFY_TIMEOUT*2000
+
+	common.write_report( report, args.output )
+
+	shutil.rmtree( tmp_dir, ignore_errors=True )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/netlink_uevents.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark checks that the 'netlink' hotplug backend (see ``packages/buskill/netlink_lin.py``) picks the removal of a usb device out of the kernel's uevents (and nothing else), and measures how long that takes.
+
+Instead of a real NETLINK_KOBJECT_UEVENT socket, it sends crafted uevent datagrams through a ``socket.socketpair()``. They include the removal of a usb device, the addition of one, the removal of its interface and of a root hub, udev's re-broadcasts, and malformed datagrams (truncated, missing fields, bad PRODUCT, empty, and a short datagram received into a buffer that still holds a longer removal). Each datagram is fed once through ``receive_uevent()`` and once through ``listen()``, which must also return as soon as its 'stop' pipe becomes readable.
+
+It also checks that removals aren't lost when the socket overflows: it points a ``DeviceTracker`` at a temporary dir tree that looks like /sys/bus/usb/devices, sends it the addition of a device, removes some devices' dirs without sending their uevents, and then makes ``recv_into()`` fail with ENOBUFS. The callback must be called for exactly the devices that were removed.
+
+It then sends ``--iterations`` of an ignored uevent and of a removal, and reports (as JSON) the p50 and p99 time (in microseconds) that ``receive_uevent()`` took for each. It exits non-zero if the callback wasn't called for exactly the removals (including the ones lost to the overflow), with the right device. This only works on Linux.
+
+Usage::
+
+  python3 benchmarks/netlink_uevents.py --iterations 10000
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, errno, os, platform, shutil, socket, sys
+import threading, time
+
+import common
+
+# use the app's source code instead of anything installed. netlink_lin.py
+# doesn't need the rest of the buskill package (or its dependencies)
+common.use_source( standalone=True )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+DEVPATH = '/devices/pci0000:00/0000:00:14.0/usb1/1-2'
+
+# how long to wait for listen() to call the callback or to stop
+LISTEN_TIMEOUT = 5
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns a uevent datagram as the kernel formats it: a 'ACTION@DEVPATH'
+# header followed by 'KEY=value' fields, each terminated by a null byte
+def make_uevent( action, devpath, fields ):
+
+	datagram = action +'@'+ devpath + '\0'
+	datagram += 'ACTION=' +action+ '\0'
+	datagram += 'DEVPATH=' +devpath+ '\0'
+	for key, value in fields:
+		datagram += key +'='+ value + '\0'
+
+	return datagram.encode( 'utf-8' )
+
+# returns a list of (name, datagram, expected device key) tuples, where the
+# expected device key is None if the callback must not be called
+def get_cases():
+
+	usb_device = [
+	 ( 'SUBSYSTEM', 'usb' ), ( 'DEVTYPE', 'usb_device' ),
+	 ( 'PRODUCT', '1a86/7523/264' ), ( 'BUSNUM', '001' ), ( 'DEVNUM', '005' ),
+	 ( 'SEQNUM', '4242' ),
+	]
+	removal = make_uevent( 'remove', DEVPATH, usb_device )
+
+	return [
+	 ( 'removal', removal, (1, (2,), 0x1a86, 0x7523) ),
+	 ( 'removal_behind_hub',
+	  make_uevent( 'remove', DEVPATH+ '/1-2.4', usb_device ),
+	  (1, (2, 4), 0x1a86, 0x7523)
+	 ),
+	 ( 'addition', make_uevent( 'add', DEVPATH, usb_device ), None ),
+	 ( 'interface_removal',
+	  make_uevent( 'remove', DEVPATH+ '/1-2:1.0', [
+	   ( 'SUBSYSTEM', 'usb' ), ( 'DEVTYPE', 'usb_interface' ),
+	   ( 'PRODUCT', '1a86/7523/264' ),
+	  ] ),
+	  None
+	 ),
+	 ( 'tty_removal',
+	  make_uevent( 'remove', DEVPATH+ '/1-2:1.0/ttyUSB0/tty/ttyUSB0', [
+	   ( 'SUBSYSTEM', 'tty' ),
+	  ] ),
+	  None
+	 ),
+	 # udev re-broadcasts uevents with its own binary header. We listen to the
+	 # kernel's group, so we should never get these, but they mustn't match
+	 ( 'udev_rebroadcast', b'libudev\0\xfe\xed\xca\xfe' + removal, None ),
+	 ( 'truncated', removal[ 0:removal.find(b'DEVTYPE=')+10 ], None ),
+	 ( 'missing_devtype',
+	  make_uevent( 'remove', DEVPATH, [
+	   ( 'SUBSYSTEM', 'usb' ), ( 'PRODUCT', '1a86/7523/264' ),
+	  ] ),
+	  None
+	 ),
+	 ( 'empty', b'', None ),
+	 # receive_uevent() reuses its buffer, so this short datagram lands on top
+	 # of the (longer) removal before it
+	 ( 'stale_buffer', b'remove@', None ),
+	 # these are usb device removals, so the callback is called, but we can't
+	 # tell which device was removed from them
+	 ( 'bad_product',
+	  make_uevent( 'remove', DEVPATH, [
+	   ( 'SUBSYSTEM', 'usb' ), ( 'DEVTYPE', 'usb_device' ),
+	   ( 'PRODUCT', 'zz/7523/264' ),
+	  ] ),
+	  'unknown'
+	 ),
+	 ( 'root_hub_removal',
+	  make_uevent( 'remove', '/devices/pci0000:00/0000:00:14.0/usb1', [
+	   ( 'SUBSYSTEM', 'usb' ), ( 'DEVTYPE', 'usb_device' ),
+	   ( 'PRODUCT', '1d6b/2/610' ),
+	  ] ),
+	  'unknown'
+	 ),
+	]
+
+# returns what the device key of the parsed 'fields' is expected to be
+# compared to
+def get_device_key( netlink_lin, fields ):
+
+	key = netlink_lin.get_usb_device_key( fields )
+	if key == None:
+		return 'unknown'
+
+	return key
+
+# feeds each case through receive_uevent() and returns a list of the names of
+# the cases that didn't do what they should have
+def check_receive_uevent( netlink_lin, cases ):
+
+	failures = list()
+
+	sender, receiver = socket.socketpair( socket.AF_UNIX, socket.SOCK_DGRAM )
+	buffer = bytearray( netlink_lin.UEVENT_BUFFER_SIZE )
+
+	for (name, datagram, expected) in cases:
+
+		calls = list()
+		sender.send( datagram )
+		netlink_lin.receive_uevent( receiver, buffer, calls.append )
+
+		if expected == None:
+			if len(calls) != 0:
+				failures.append( name )
+		elif len(calls) != 1 or get_device_key( netlink_lin, calls[0] ) != expected:
+			failures.append( name )
+
+	sender.close()
+	receiver.close()
+
+	return failures
+
+# feeds all of the cases through listen() (in a thread) and returns a list of
+# the names of the cases that didn't do what they should have. listen() must
+# also return as soon as its 'stop' pipe becomes readable
+def check_listen( netlink_lin, cases ):
+
+	failures = list()
+
+	sender, receiver = socket.socketpair( socket.AF_UNIX, socket.SOCK_DGRAM )
+	stop_reader, stop_writer = os.pipe()
+
+	calls = list()
+	called = threading.Condition()
+	def callback( fields ):
+		with called:
+			calls.append( fields )
+			called.notify()
+
+	listener = threading.Thread(
+	 target = netlink_lin.listen, args = ( receiver, callback, stop_reader ),
+	 daemon = True
+	)
+	listener.start()
+
+	for (name, datagram, expected) in cases:
+		sender.send( datagram )
+
+	# the callback is called for the removals in the order they were sent
+	expected_keys = [ expected for (name, datagram, expected) in cases if expected != None ]
+	with called:
+		called.wait_for(
+		 lambda: len(calls) >= len(expected_keys), LISTEN_TIMEOUT
+		)
+	if [ get_device_key( netlink_lin, fields ) for fields in calls ] != expected_keys:
+		failures.append( 'listen' )
+
+	os.write( stop_writer, b'\0' )
+	listener.join( LISTEN_TIMEOUT )
+	if listener.is_alive():
+		failures.append( 'listen_stop' )
+
+	sender.close()
+	receiver.close()
+	os.close( stop_reader )
+	os.close( stop_writer )
+
+	return failures
+
+# stands-in for the uevent socket: it raises ENOBUFS (like the kernel does
+# after it dropped some of our uevents) on the next recv_into() after
+# overflow() is called, and otherwise receives from 'sock'
+class OverflowingSocket:
+
+	def __init__( self, sock ):
+		self.sock = sock
+		self.overflowed = False
+
+	def overflow( self ):
+		self.overflowed = True
+
+	def recv_into( self, buffer ):
+
+		if self.overflowed:
+			self.overflowed = False
+			raise OSError( errno.ENOBUFS, os.strerror( errno.ENOBUFS ) )
+
+		return self.sock.recv_into( buffer )
+
+# creates the dir of a usb device called 'name' in the fake sysfs tree
+def add_device( sysfs_path, name, vid, pid ):
+
+	path = os.path.join( sysfs_path, name )
+	os.makedirs( path )
+	for (attribute, value) in [ ( 'idVendor', vid ), ( 'idProduct', pid ) ]:
+		with open( os.path.join( path, attribute ), 'w' ) as fd:
+			fd.write( value + '\n' )
+
+# checks that the removals that we lose when the socket overflows are still
+# passed to the callback, and returns a list of the names of the checks that
+# failed
+def check_overflow( netlink_lin, cases, tmp_dir ):
+
+	failures = list()
+
+	sysfs_path = os.path.join( tmp_dir, 'devices' )
+	os.makedirs( sysfs_path )
+	add_device( sysfs_path, 'usb1', '1d6b', '0002' )
+	add_device( sysfs_path, '1-1', '046d', 'c52b' )
+	add_device( sysfs_path, '1-3', '1a86', '7523' )
+
+	sender, receiver = socket.socketpair( socket.AF_UNIX, socket.SOCK_DGRAM )
+	sock = OverflowingSocket( receiver )
+	buffer = bytearray( netlink_lin.UEVENT_BUFFER_SIZE )
+	tracker = netlink_lin.DeviceTracker( sysfs_path )
+	calls = list()
+
+	# the tracker learns about the devices that are added after it was created
+	(name, addition, expected) = cases[2]
+	add_device( sysfs_path, '1-2', '1a86', '7523' )
+	sender.send( addition )
+	netlink_lin.receive_uevent( sock, buffer, calls.append, tracker )
+
+	# two devices are removed, but their uevents are lost
+	shutil.rmtree( os.path.join( sysfs_path, '1-2' ) )
+	shutil.rmtree( os.path.join( sysfs_path, '1-3' ) )
+	sock.overflow()
+	netlink_lin.receive_uevent( sock, buffer, calls.append, tracker )
+
+	keys = sorted( [ get_device_key( netlink_lin, fields ) for fields in calls ] )
+	if keys != [ (1, (2,), 0x1a86, 0x7523), (1, (3,), 0x1a86, 0x7523) ]:
+		failures.append( 'overflow' )
+
+	# we can't tell what was removed if sysfs is gone, so everything was
+	calls.clear()
+	shutil.rmtree( sysfs_path )
+	sock.overflow()
+	netlink_lin.receive_uevent( sock, buffer, calls.append, tracker )
+
+	keys = [ get_device_key( netlink_lin, fields ) for fields in calls ]
+	if keys != [ (1, (1,), 0x046d, 0xc52b) ]:
+		failures.append( 'overflow_without_sysfs' )
+
+	sender.close()
+	receiver.close()
+
+	return failures
+
+# returns how long receive_uevent() took for each of 'iterations' datagrams
+def measure( netlink_lin, datagram, iterations ):
+
+	sender, receiver = socket.socketpair( socket.AF_UNIX, socket.SOCK_DGRAM )
+	buffer = bytearray( netlink_lin.UEVENT_BUFFER_SIZE )
+
+	calls = list()
+	samples = list()
+	for iteration in range( iterations ):
+		sender.send( datagram )
+
+		start_time = time.perf_counter()
+		netlink_lin.receive_uevent( receiver, buffer, calls.append )
+		samples.append( time.perf_counter() - start_time )
+
+	sender.close()
+	receiver.close()
+
+	return common.get_percentiles( samples, percentiles=[ 50, 99 ], scale=1000000 )
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Check and measure how the 'netlink' hotplug backend handles uevents"
+	)
+	parser.add_argument( '--iterations', type=int, default=10000 )
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	# netlink_lin logs; keep it out of the way
+	tmp_dir = common.make_tmp_dir()
+
+	# netlink_lin prints what it logs; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+
+		import netlink_lin
+
+		cases = get_cases()
+		failures = check_receive_uevent( netlink_lin, cases )
+		failures += check_listen( netlink_lin, cases )
+		failures += check_overflow( netlink_lin, cases, tmp_dir )
+
+		(name, removal, expected) = cases[0]
+		(name, addition, expected) = cases[2]
+		results = {
+		 'ignored_us': measure( netlink_lin, addition, args.iterations ),
+		 'removal_us': measure( netlink_lin, removal, args.iterations ),
+		}
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'iterations': args.iterations,
+	 'cases': [ name for (name, datagram, expected) in cases ],
+	 'failures': failures,
+	}
+	report.update( results )
+	report['passed'] = len(failures) == 0
+
+	common.write_report( report, args.output )
+
+	shutil.rmtree( tmp_dir, ignore_errors=True )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/pinned_trigger.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark checks that pinning the trigger's files in RAM (see ``packages/buskill/pin_lin.py``) lets the trigger execute after the drive that they're on disappears.
+
+It puts the trigger's command (by default, a copy of ``true``) on a small ext4 image that's loop-mounted, like an app running from a USB drive. It then simulates pulling that drive just before the trigger is executed: it truncates the image (so every read from the loop device fails) and drops the page cache. It does that twice, once without and once with pinning, and it reports (as JSON) whether the trigger succeeded, how long it took, and how long pinning took. It exits non-zero if the pinned trigger failed.
+
+It needs root (to mount the image and drop the page cache) and ``mkfs.ext4``. This only works on Linux.
+
+Usage::
+
+  sudo python3 benchmarks/pinned_trigger.py
+  sudo python3 benchmarks/pinned_trigger.py --command sh -c :
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, os, platform, shutil, subprocess, sys, time
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+def drop_caches():
+
+	os.sync()
+	with open( '/proc/sys/vm/drop_caches', 'w' ) as fd:
+		fd.write( '3' )
+
+# creates an image in 'tmp_dir' with a copy of the binary 'argv[0]' on it and
+# mounts it. Returns a tuple of the image's path, the mount point, and the
+# argv with the copy's path
+def make_image( tmp_dir, name, argv ):
+
+	image = os.path.join( tmp_dir, name+ '.img' )
+	mount_point = os.path.join( tmp_dir, name )
+	os.mkdir( mount_point )
+
+	size = os.path.getsize( argv[0] ) + 4*1024*1024
+	with open( image, 'wb' ) as fd:
+		fd.truncate( size )
+
+	subprocess.run( [ 'mkfs.ext4', '-q', image ], check=True )
+	subprocess.run( [ 'mount', '-o', 'loop', image, mount_point ], check=True )
+
+	binary = os.path.join( mount_point, os.path.basename( argv[0] ) )
+	shutil.copy2( argv[0], binary )
+
+	return (image, mount_point, [ binary ] + argv[1:])
+
+# executes 'plan' after pulling the image out from under it (after pinning it
+# first, if 'pin' is True). Returns a dict describing what happened
+def measure( tmp_dir, name, argv, pin ):
+
+	from packages.buskill import pin_lin, trigger_plan
+
+	(image, mount_point, argv) = make_image( tmp_dir, name, argv )
+	result = dict()
+	pinner = None
+	try:
+		plan = trigger_plan.TriggerPlan(
+		 'lock-screen',
+		 [ [ trigger_plan.Strategy( os.path.basename( argv[0] ), argv, False ) ] ],
+		 None
+		)
+
+		# this is what arming does
+		drop_caches()
+		start_time = time.monotonic()
+		files = pin_lin.get_trigger_path_files( plan.get_commands(), [] )
+		removable = pin_lin.get_removable_files( files )
+		if pin:
+			pinner = pin_lin.Pinner()
+			pinned = pinner.pin( files )
+			result['pin_ms'] = round( (time.monotonic()-start_time)*1000, 3 )
+			result['pinned_files'] = len(files)
+			result['locked_kib'] = pinner.locked_bytes//1024
+			result['unlocked_files'] = [ path for path, got in pinned.items() if got != True ]
+		result['removable_files'] = removable
+
+		# pull the drive
+		with open( image, 'wb' ) as fd:
+			fd.truncate( 0 )
+		drop_caches()
+
+		start_time = time.monotonic()
+		result['succeeded'] = trigger_plan.execute_plan( plan )
+		result['trigger_ms'] = round( (time.monotonic()-start_time)*1000, 3 )
+
+	finally:
+		if pinner != None:
+			pinner.release()
+
+		# the filesystem is broken now, so detach it lazily
+		subprocess.run( [ 'umount', '-l', mount_point ] )
+
+	return result
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Check that a pinned trigger survives the removal of the drive that it's on"
+	)
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	parser.add_argument(
+	 '--command', nargs=argparse.REMAINDER, default=[ 'true' ],
+	 help="the command that the trigger executes (default: true)"
+	)
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	if os.geteuid() != 0 or shutil.which( 'mkfs.ext4' ) == None:
+		print( "This benchmark needs root and mkfs.ext4" )
+		return 1
+
+	argv = list( args.command )
+	argv[0] = shutil.which( argv[0] )
+	if argv[0] == None:
+		print( "Unable to find " +str(args.command[0]) )
+		return 1
+
+	# the app writes its config and logs to the user's home dir; keep them out
+	# of the way. The app also expects logging to a file to be set-up already
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+		unpinned = measure( tmp_dir, 'unpinned', argv, False )
+		pinned = measure( tmp_dir, 'pinned', argv, True )
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'command': argv,
+	 'unpinned': unpinned,
+	 'pinned': pinned,
+	 'passed': pinned['succeeded'],
+	}
+
+	common.write_report( report, args.output )
+
+	shutil.rmtree( tmp_dir, ignore_errors=True )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/sysfs_removals.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark checks that the 'sysfs' hotplug backend (see ``packages/buskill/sysfs_lin.py``) notices the removal of usb devices, and measures how long that takes.
+
+It points the backend at a temporary dir tree that looks like /sys/bus/usb/devices and runs ``sysfs_lin.listen()`` on it in a thread. Then it repeatedly creates a device's dir (with 'idVendor', 'idProduct' and 'serial' files) and removes it again. It also creates and removes dirs that aren't usb devices (a root hub, an interface, and a device whose ids can't be parsed), which must be ignored.
+
+Unlike the real sysfs, the temporary dir does generate inotify events, so the backend's inotify is turned off (unless ``--inotify`` is given) to measure what happens on a real system. It reports (as JSON) the p50, p99 and max time (in ms) from a device's dir being removed to the callback being called. Since the backend polls, expect that to be up to ``sysfs_lin.RESCAN_INTERVAL`` seconds. It exits non-zero if the callback wasn't called for exactly the removed devices, with the right device, or if any removal took longer than twice RESCAN_INTERVAL to be noticed. This only works on Linux.
+
+Usage::
+
+  python3 benchmarks/sysfs_removals.py --iterations 50
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, os, platform, shutil, sys, threading, time
+
+import common
+
+# use the app's source code instead of anything installed. sysfs_lin.py
+# doesn't need the rest of the buskill package (or its dependencies)
+common.use_source( standalone=True )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# the dirs that aren't usb devices, and must be ignored
+IGNORED_DEVICES = [
+ ( 'usb1', '1d6b', '0002' ),
+ ( '1-3:1.0', '1a86', '7523' ),
+ ( '1-4', 'zzzz', '7523' ),
+]
+
+# how long to wait for the callback after a removal
+REMOVAL_TIMEOUT = 5
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# creates the dir of a usb device called 'name' in the fake sysfs tree
+def add_device( sysfs_path, name, vid, pid ):
+
+	path = os.path.join( sysfs_path, name )
+	os.makedirs( path )
+	for (attribute, value) in [
+	 ( 'idVendor', vid ), ( 'idProduct', pid ), ( 'serial', 'A5061' ),
+	]:
+		with open( os.path.join( path, attribute ), 'w' ) as fd:
+			fd.write( value + '\n' )
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Check and measure how the 'sysfs' hotplug backend notices removals"
+	)
+	parser.add_argument( '--iterations', type=int, default=50 )
+	parser.add_argument(
+	 '--inotify', action='store_true',
+	 help="let the backend wake-up on inotify events, which the real sysfs doesn't generate"
+	)
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	# sysfs_lin logs; keep it out of the way
+	tmp_dir = common.make_tmp_dir()
+	sysfs_path = os.path.join( tmp_dir, 'devices' )
+	os.makedirs( sysfs_path )
+
+	failures = list()
+	samples = list()
+
+	# sysfs_lin prints what it logs; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+
+		import sysfs_lin, netlink_lin
+
+		for (name, vid, pid) in IGNORED_DEVICES:
+			add_device( sysfs_path, name, vid, pid )
+
+		# a device that stays connected the whole time
+		add_device( sysfs_path, '2-1', '046d', 'c52b' )
+
+		calls = list()
+		called = threading.Condition()
+		def callback( fields ):
+			with called:
+				calls.append( ( time.monotonic(), fields ) )
+				called.notify()
+
+		watcher = sysfs_lin.SysfsWatcher( sysfs_path, use_inotify=args.inotify )
+		inotify = watcher.fileno() != None
+		stop_reader, stop_writer = os.pipe()
+		listener = threading.Thread(
+		 target = sysfs_lin.listen, args = ( watcher, callback, stop_reader ),
+		 daemon = True
+		)
+		listener.start()
+
+		for iteration in range( args.iterations ):
+
+			# alternate between a device plugged into the root hub and one behind
+			# another hub
+			if iteration % 2 == 0:
+				(name, key) = ( '1-2', (1, (2,), 0x1a86, 0x7523) )
+			else:
+				(name, key) = ( '1-2.4', (1, (2, 4), 0x1a86, 0x7523) )
+
+			add_device( sysfs_path, name, '1a86', '7523' )
+
+			# give the watcher the time to see that it was added
+			time.sleep( sysfs_lin.RESCAN_INTERVAL * 1.5 )
+
+			# and remove the dirs that must be ignored along with it
+			for (ignored, vid, pid) in IGNORED_DEVICES:
+				shutil.rmtree( os.path.join( sysfs_path, ignored ) )
+
+			with called:
+				calls.clear()
+				removal_time = time.monotonic()
+				shutil.rmtree( os.path.join( sysfs_path, name ) )
+				called.wait_for( lambda: len(calls) > 0, REMOVAL_TIMEOUT )
+
+			# catch any extra calls for the dirs that must be ignored
+			time.sleep( sysfs_lin.RESCAN_INTERVAL * 1.5 )
+
+			with called:
+				if len(calls) != 1 or netlink_lin.get_usb_device_key( calls[0][1] ) != key:
+					failures.append( name )
+				else:
+					samples.append( calls[0][0] - removal_time )
+
+			for (ignored, vid, pid) in IGNORED_DEVICES:
+				add_device( sysfs_path, ignored, vid, pid )
+
+		os.write( stop_writer, b'\0' )
+		listener.join( REMOVAL_TIMEOUT )
+		if listener.is_alive():
+			failures.append( 'listen_stop' )
+
+		watcher.close()
+		os.close( stop_reader )
+		os.close( stop_writer )
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'iterations': args.iterations,
+	 'rescan_interval_ms': sysfs_lin.RESCAN_INTERVAL*1000,
+	 'inotify': inotify,
+	 'removal_ms': common.get_percentiles( samples, percentiles=[ 50, 99 ], include_max=True ),
+	 'failures': failures,
+	}
+	report['passed'] = len(failures) == 0 and all( [
+	 sample <= sysfs_lin.RESCAN_INTERVAL*2 for sample in samples
+	] )
+
+	common.write_report( report, args.output )
+
+	shutil.rmtree( tmp_dir, ignore_errors=True )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/trigger_executor.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark compares executing a trigger plan with the trigger executor (see ``packages/buskill/trigger_executor.py``) to executing it directly with the chain of ``subprocess.run()`` calls that ``triggerLin()`` uses without it.
+
+The executor re-forks its children after every execution, so we wait ``--interval`` seconds between iterations (which, for a real trigger, is the time that BusKill was armed). The plan has one step with one command (by default ``/bin/true``; use ``--command`` to try a real one, like a harmless script). It reports (as JSON) the latency percentiles of the whole trigger both ways, and of the time from asking the executor to execute the trigger until it started the command. It exits non-zero if any execution failed. This only works on Linux.
+
+Usage::
+
+  python3 benchmarks/trigger_executor.py --iterations 200
+  python3 benchmarks/trigger_executor.py --command /bin/sh -c :
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, os, platform, shutil, sys, time
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Compare executing a trigger with and without the trigger executor"
+	)
+	parser.add_argument( '--iterations', type=int, default=200 )
+	parser.add_argument(
+	 '--interval', type=float, default=0.05,
+	 help="seconds to wait between iterations, like the idle time before a real trigger"
+	)
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	parser.add_argument(
+	 '--command', nargs=argparse.REMAINDER, default=[ 'true' ],
+	 help="the command that the trigger executes (default: true)"
+	)
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	argv = list( args.command )
+	argv[0] = shutil.which( argv[0] )
+	if argv[0] == None:
+		print( "Unable to find " +str(args.command[0]) )
+		return 1
+
+	# the app writes its config and logs to the user's home dir; keep them out
+	# of the way. The app also expects logging to a file to be set-up already
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+		from packages.buskill import trigger_plan, trigger_executor
+
+		plan = trigger_plan.TriggerPlan(
+		 'lock-screen',
+		 [ [ trigger_plan.Strategy( os.path.basename( argv[0] ), argv, False ) ] ],
+		 None
+		)
+		failures = 0
+
+		# what triggerLin() does without the executor
+		direct_samples = list()
+		for iteration in range( args.iterations ):
+			time.sleep( args.interval )
+			start_time = time.monotonic()
+			if not trigger_plan.execute_plan( plan ):
+				failures += 1
+			direct_samples.append( time.monotonic() - start_time )
+
+		executor = trigger_executor.TriggerExecutor( plan )
+		start_time = time.monotonic()
+		executor.start()
+		executor_start_duration = time.monotonic() - start_time
+
+		executor_samples = list()
+		start_latency_samples = list()
+		for iteration in range( args.iterations ):
+			time.sleep( args.interval )
+			start_time = time.monotonic()
+			if not executor.execute():
+				failures += 1
+			executor_samples.append( time.monotonic() - start_time )
+			start_latency_samples.append( executor.start_latency )
+
+		executor.stop()
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'iterations': args.iterations,
+	 'command': argv,
+	 'direct_trigger_ms': common.get_percentiles( direct_samples ),
+	 'executor_startup_ms': round( executor_start_duration*1000, 3 ),
+	 'executor_trigger_ms': common.get_percentiles( executor_samples ),
+	 'executor_write_to_start_ms': common.get_percentiles( start_latency_samples ),
+	 'failures': failures,
+	 'passed': failures == 0,
+	}
+
+	common.write_report( report, args.output )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
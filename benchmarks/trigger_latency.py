@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/trigger_latency.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark measures how long it takes the BusKill app to get from a USB removal event to the end of the trigger's execution. It drives the app's real arming path (``toggle()`` -> ``armNix()`` -> ``hotplugCallbackNix()`` -> queue -> ``wait_usb_handler()`` -> ``TRIGGER_FUNCTION``) with a fake ``usb1`` module (see ``fake_usb1/usb1.py``) and a trigger that just executes a no-op command.
+
+It reports the p50, p99 and max latency (in ms) of each stage:
+
+ * arm                    ``toggle()`` to arm
+ * callback_to_queue      hotplug callback to the removal being sent to the parent
+ * queue_to_dispatch      removal sent to the trigger function being called
+ * dispatch_to_exit       trigger function called to its command exiting
+ * total                  hotplug callback to the trigger's command exiting
+ * disarm                 ``toggle()`` to disarm
+
+Each scenario is run once idle and once with a synthetic CPU & memory load in the background. The results are printed as JSON so they can be compared between releases. This only works on Linux.
+
+Usage::
+
+  python3 benchmarks/trigger_latency.py --iterations 200 --output results.json
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, math, multiprocessing, os, platform, subprocess
+import sys, time
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+import usb1
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+STAGES = [
+ 'arm', 'callback_to_queue', 'queue_to_dispatch', 'dispatch_to_exit', 'total',
+ 'disarm'
+]
+
+# how long to wait for a single removal to make it through to the trigger
+EVENT_TIMEOUT = 5
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns the p'th percentile of 'values' using the nearest-rank method
+def percentile( values, p ):
+
+	values = sorted( values )
+	return values[ max( 0, math.ceil( p / 100 * len(values) ) - 1 ) ]
+
+# returns the p50, p99 and max of a list of durations (in seconds) in ms
+def summarize( durations ):
+
+	if not durations:
+		return None
+
+	return {
+	 'p50_ms': round( percentile( durations, 50 ) * 1000, 3 ),
+	 'p99_ms': round( percentile( durations, 99 ) * 1000, 3 ),
+	 'max_ms': round( max( durations ) * 1000, 3 ),
+	 'samples': len( durations ),
+	}
+
+# keeps one cpu busy forever
+def burn_cpu():
+
+	while True:
+		pass
+
+# keeps writing to 'size_mb' of memory forever, so the benchmark has to
+# compete for memory bandwidth and cache
+def burn_memory( size_mb ):
+
+	buffer = bytearray( size_mb * 1024 * 1024 )
+	value = 0
+	while True:
+		value = (value + 1) % 256
+		for offset in range( 0, len(buffer), 4096 ):
+			buffer[offset] = value
+
+# starts the background load and returns its processes
+def start_load( memory_mb ):
+
+	processes = [
+	 multiprocessing.Process( target=burn_cpu, daemon=True )
+	 for cpu in range( os.cpu_count() or 1 )
+	]
+	processes.append(
+	 multiprocessing.Process( target=burn_memory, args=(memory_mb,), daemon=True )
+	)
+
+	for process in processes:
+		process.start()
+
+	# give the load a moment to ramp-up
+	time.sleep( 1 )
+
+	return processes
+
+def stop_load( processes ):
+
+	for process in processes:
+		process.kill()
+		process.join()
+
+# runs 'iterations' removals through BusKill and returns the durations (in
+# seconds) of each stage
+def run_scenario( bk, iterations, trigger_command ):
+
+	# these are written by the trigger function, which may be executed in the
+	# usb_handler child process
+	current_index = multiprocessing.RawValue( 'i', 0 )
+	dispatch_times = multiprocessing.RawArray( 'd', iterations )
+	exit_times = multiprocessing.RawArray( 'd', iterations )
+
+	def trigger():
+		index = current_index.value
+		dispatch_times[index] = time.monotonic()
+		subprocess.run( trigger_command )
+		exit_times[index] = time.monotonic()
+
+	bk.TRIGGER_FUNCTION = trigger
+
+	durations = { stage: list() for stage in STAGES }
+	timeouts = 0
+
+	for index in range( iterations ):
+
+		current_index.value = index
+
+		start_time = time.monotonic()
+		bk.toggle()
+		durations['arm'].append( time.monotonic() - start_time )
+
+		usb1.fake_removal( index )
+
+		# wait for the removal to make it all the way through to the trigger
+		message = None
+		deadline = time.monotonic() + EVENT_TIMEOUT
+		while message == None and time.monotonic() < deadline:
+			message = bk.get_usb_handler_message( deadline - time.monotonic() )
+
+		if message == None:
+			timeouts += 1
+		else:
+			bk.handle_usb_handler_message( message )
+
+			(name, event_time, epoch) = message[0:3]
+			callback_time = usb1.CALLBACK_TIMES[ index % usb1.MAX_EVENTS ]
+
+			durations['callback_to_queue'].append( event_time - callback_time )
+			durations['queue_to_dispatch'].append( dispatch_times[index] - event_time )
+			durations['dispatch_to_exit'].append( exit_times[index] - dispatch_times[index] )
+			durations['total'].append( exit_times[index] - callback_time )
+
+		start_time = time.monotonic()
+		bk.toggle()
+		durations['disarm'].append( time.monotonic() - start_time )
+
+	return durations, timeouts
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Measure BusKill's trigger latency with a fake USB device"
+	)
+	parser.add_argument( '--iterations', type=int, default=200 )
+	parser.add_argument(
+	 '--scenarios', default='idle,loaded',
+	 help="comma-separated list of 'idle' and/or 'loaded'"
+	)
+	parser.add_argument(
+	 '--memory-mb', type=int, default=256,
+	 help="size of the memory that the 'loaded' scenario keeps writing to"
+	)
+	parser.add_argument(
+	 '--trigger-command', default='true',
+	 help="the (no-op) command that the trigger executes"
+	)
+	parser.add_argument( '--trigger-in-listener', action='store_true' )
+	parser.add_argument( '--arm-in-thread', action='store_true' )
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if not platform.system().upper().startswith( 'LINUX' ):
+		print( "This benchmark only works on Linux" )
+		return 1
+
+	# the app writes its config and logs to the user's home dir; keep them out
+	# of the way. The app also expects logging to a file to be set-up already
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+
+		import packages.buskill
+		from buskill_version import BUSKILL_VERSION
+
+		bk = packages.buskill.BusKill()
+		bk.set_trigger( 'lock-screen' )
+		bk.set_trigger_device( '' )
+		bk.set_hotplug_backend( 'libusb' )
+		bk.RUN_TRIGGER_IN_LISTENER = args.trigger_in_listener
+		bk.ARM_IN_THREAD = args.arm_in_thread
+		bk.PERSISTENT_USB_HANDLER = False
+		bk.LEAN_USB_HANDLER = False
+
+		results = dict()
+		for scenario in args.scenarios.split( ',' ):
+
+			load = list()
+			if scenario == 'loaded':
+				load = start_load( args.memory_mb )
+
+			try:
+				durations, timeouts = run_scenario(
+				 bk, args.iterations, args.trigger_command.split(' ')
+				)
+			finally:
+				stop_load( load )
+
+			results[scenario] = {
+			 stage: summarize( durations[stage] ) for stage in STAGES
+			}
+			results[scenario]['timeouts'] = timeouts
+
+		bk.close()
+
+	report = {
+	 'buskill_version': BUSKILL_VERSION,
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'cpu_count': os.cpu_count(),
+	 'iterations': args.iterations,
+	 'trigger_in_listener': args.trigger_in_listener,
+	 'arm_in_thread': args.arm_in_thread,
+	 'trigger_command': args.trigger_command,
+	 'scenarios': results,
+	}
+
+	common.write_report( report, args.output )
+
+	return 0
+
+if __name__ == '__main__':
+	sys.exit( main() )
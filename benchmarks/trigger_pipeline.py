@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/trigger_pipeline.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark measures how much executing the steps of a trigger pipeline (see ``packages/buskill/trigger_pipeline.py``) at the same time saves over executing them one after another.
+
+It defines a pipeline like a real "secure the machine" pipeline: ``--parallel`` independent steps (like locking the screen, unmounting a volume, and dropping the ssh-agent's keys) that each take ``--step-ms`` ms, followed by a final step (like powering off) that's after all of them. Every step is a ``sleep`` command. It executes the pipeline ``--iterations`` times and reports (as JSON) how long it took, how long its steps took in total (ie how long executing them serially would take), and the critical path. It exits non-zero if any execution failed or took longer than the critical path plus ``--slack-ms``.
+
+Usage::
+
+  python3 benchmarks/trigger_pipeline.py
+  python3 benchmarks/trigger_pipeline.py --parallel 3 --step-ms 500
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, os, platform, shutil, sys
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# writes a config file with the pipeline 'benchmark' to 'conf_file'
+def write_config( conf_file, parallel, step_ms ):
+
+	seconds = str( step_ms/1000 )
+	names = [ 'step' +str(step) for step in range( parallel ) ]
+	lines = [ '[pipeline:benchmark]' ]
+	for name in names:
+		lines.append( name+ ' = command sleep ' +seconds )
+	lines.append( 'final = command sleep ' +seconds )
+	lines.append( 'final.after = ' +' '.join( names ) )
+
+	with open( conf_file, 'w' ) as fd:
+		fd.write( '\n'.join( lines ) + '\n' )
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Measure how much executing a trigger pipeline's steps at the same time saves"
+	)
+	parser.add_argument( '--iterations', type=int, default=5 )
+	parser.add_argument(
+	 '--parallel', type=int, default=3,
+	 help="how many independent steps come before the final step"
+	)
+	parser.add_argument( '--step-ms', type=int, default=200 )
+	parser.add_argument(
+	 '--slack-ms', type=int, default=100,
+	 help="how much longer than the critical path an execution may take"
+	)
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	if shutil.which( 'sleep' ) == None:
+		print( "This benchmark needs the sleep command" )
+		return 1
+
+	# the app writes its logs to the user's home dir; keep them out of the way
+	tmp_dir = common.make_tmp_dir( home=True )
+
+	conf_file = os.path.join( tmp_dir, 'config.ini' )
+	write_config( conf_file, args.parallel, args.step_ms )
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	reports = list()
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+		from packages.buskill import trigger_pipeline, trigger_plan
+
+		pipeline = trigger_pipeline.load_pipeline(
+		 conf_file, 'pipeline:benchmark', []
+		)
+		env = trigger_plan.get_command_env()
+
+		def run_step( step, timeout ):
+			strategy = trigger_plan.Strategy( step.name, step.argument, False )
+			return trigger_plan.run_command( strategy, env, timeout, list() )
+
+		for iteration in range( args.iterations ):
+			reports.append( trigger_pipeline.execute_pipeline( pipeline, run_step ) )
+
+	critical_path_ms = 2*args.step_ms
+	failures = [
+	 report for report in reports if not report['succeeded']
+	 or report['total_ms'] > critical_path_ms + args.slack_ms
+	]
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'iterations': args.iterations,
+	 'parallel': args.parallel,
+	 'step_ms': args.step_ms,
+	 'critical_path': reports[-1]['critical_path'],
+	 'critical_path_ms': critical_path_ms,
+	 'total_ms': [ report['total_ms'] for report in reports ],
+	 'serial_ms': [ report['sum_ms'] for report in reports ],
+	 'failures': len(failures),
+	 'passed': len(failures) == 0,
+	}
+
+	common.write_report( report, args.output )
+
+	shutil.rmtree( tmp_dir, ignore_errors=True )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
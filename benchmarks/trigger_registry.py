@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    benchmarks/trigger_registry.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This benchmark checks that discovering the triggers (see ``packages/buskill/trigger_registry.py``) doesn't pay for the code of the trigger plugins, and that only the selected plugin is imported when it's loaded.
+
+It creates a triggers dir with ``--plugins`` plugins, each of which takes ``--import-ms`` ms to import (like a plugin with heavy dependencies). It then reports (as JSON) how long discovering them took, how long loading one of them took, and how many plugins were imported. It exits non-zero if discovering imported any plugin or loading imported more than one.
+
+Usage::
+
+  python3 benchmarks/trigger_registry.py
+  python3 benchmarks/trigger_registry.py --plugins 50 --import-ms 100
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import argparse, contextlib, json, os, platform, shutil, sys, time
+
+import common
+
+# use the fake usb1 and the app's source code instead of anything installed
+common.use_source( fake_usb1=True )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# writes 'count' plugins and their manifest to 'triggers_dir'. Each plugin
+# takes 'import_ms' ms to import and records that it was imported in the
+# environment variable 'BUSKILL_BENCHMARK_IMPORTED'
+def write_plugins( triggers_dir, count, import_ms ):
+
+	os.makedirs( triggers_dir )
+	entries = list()
+	for plugin in range( count ):
+		name = 'plugin' +str(plugin)
+		with open( os.path.join( triggers_dir, name+ '.py' ), 'w' ) as fd:
+			fd.write(
+			 "import os, time\n"
+			 "os.environ['BUSKILL_BENCHMARK_IMPORTED'] = os.environ.get( 'BUSKILL_BENCHMARK_IMPORTED', '' ) + '" +name+ " '\n"
+			 "time.sleep( " +str( import_ms/1000 )+ " )\n"
+			 "def execute( bk ):\n"
+			 "\treturn True\n"
+			)
+		entries.append( { 'name': name, 'module': name+ '.py', 'description': name } )
+
+	with open( os.path.join( triggers_dir, 'manifest.json' ), 'w' ) as fd:
+		json.dump( { 'triggers': entries }, fd )
+
+def get_imported():
+
+	return os.environ.get( 'BUSKILL_BENCHMARK_IMPORTED', '' ).split()
+
+def main():
+
+	parser = argparse.ArgumentParser(
+	 description = "Check that discovering triggers doesn't import their plugins"
+	)
+	parser.add_argument( '--plugins', type=int, default=20 )
+	parser.add_argument( '--import-ms', type=int, default=50 )
+	parser.add_argument( '--output', help="write the JSON here instead of stdout" )
+	args = parser.parse_args()
+
+	tmp_dir = common.make_tmp_dir()
+
+	triggers_dir = os.path.join( tmp_dir, 'triggers' )
+	write_plugins( triggers_dir, args.plugins, args.import_ms )
+
+	# the app prints a lot to stdout; keep it out of our JSON
+	with open( os.devnull, 'w' ) as devnull, contextlib.redirect_stdout( devnull ):
+		from packages.buskill import trigger_registry
+
+		builtin_dir = os.path.join( common.PACKAGE_DIR, 'triggers' )
+		start_time = time.monotonic()
+		triggers = trigger_registry.discover( builtin_dir, [ triggers_dir ] )
+		discover_ms = round( (time.monotonic()-start_time)*1000, 3 )
+		imported_by_discover = get_imported()
+
+		start_time = time.monotonic()
+		plugin = trigger_registry.load_plugin( triggers['plugin0'] )
+		load_ms = round( (time.monotonic()-start_time)*1000, 3 )
+		imported_by_load = get_imported()
+
+	report = {
+	 'python_version': platform.python_version(),
+	 'platform': platform.platform(),
+	 'plugins': args.plugins,
+	 'import_ms': args.import_ms,
+	 'eager_import_ms': args.plugins*args.import_ms,
+	 'discovered': len(triggers),
+	 'discover_ms': discover_ms,
+	 'imported_by_discover': len(imported_by_discover),
+	 'load_ms': load_ms,
+	 'imported_by_load': len(imported_by_load),
+	 'passed': len(imported_by_discover) == 0 and imported_by_load == [ 'plugin0' ] \
+	  and plugin.execute( None ),
+	}
+
+	common.write_report( report, args.output )
+
+	shutil.rmtree( tmp_dir, ignore_errors=True )
+
+	if report['passed']:
+		return 0
+	return 1
+
+if __name__ == '__main__':
+	sys.exit( main() )
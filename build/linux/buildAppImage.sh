@@ -457,6 +457,15 @@ cp "LICENSE" "${docsDir}/"
 cp "CHANGELOG" "${docsDir}/"
 cp "KEYS" "${docsDir}/"
 
+# root_child/
+# BusKill only executes the root child as root once it's been installed (as
+# root) outside of the AppImage
+rootChildDir="dist/${ARCHIVE_DIR}/root_child"
+mkdir -p "${rootChildDir}"
+
+cp "src/packages/buskill/root_child_lin.py" "${rootChildDir}/"
+cp "build/linux/install_root_child.sh" "${rootChildDir}/"
+
 ###############
 # OUTPUT INFO #
 ###############
@@ -0,0 +1,56 @@
+#!/bin/bash
+set -e
+################################################################################
+# File:    linux/install_root_child.sh
+# Purpose: Installs BusKill's root child (root_child_lin.py) so that BusKill
+#          can shutdown the machine when logind won't let the user do it.
+#
+#          BusKill executes the root child as root (with pkexec or sudo), so it
+#          refuses to execute any root child that isn't owned by root:root with
+#          mode 0500 in a dir that only root can write to. The copy inside the
+#          AppImage (or the git repo) can't be used, because it's owned by the
+#          user. This script must be executed as root, from either the root of
+#          the github dir or the dir of a release.
+#
+#          To let BusKill spawn the root child without asking for a password,
+#          you can also install a polkit rule that allows the
+#          'org.freedesktop.policykit.exec' action for the program
+#          '/usr/local/libexec/buskill/root_child_lin.py' (and nothing else).
+#
+# Authors: Michael Altfield <michael@buskill.in>
+# Created: 2026-10-18
+# Updated: 2026-10-18
+# Version: 0.1
+################################################################################
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# this must match ROOT_CHILD_LIN_PATH in src/packages/buskill/__init__.py
+INSTALL_DIR='/usr/local/libexec/buskill'
+
+################################################################################
+#                                 MAIN BODY                                    #
+################################################################################
+
+if [[ `id -u` -ne 0 ]]; then
+	echo "ERROR: This script must be executed as root"
+	exit 1
+fi
+
+# find the root child that we're installing
+if [ -e "`pwd`/src/packages/buskill/root_child_lin.py" ]; then
+	ROOT_CHILD="`pwd`/src/packages/buskill/root_child_lin.py"
+elif [ -e "`pwd`/root_child/root_child_lin.py" ]; then
+	ROOT_CHILD="`pwd`/root_child/root_child_lin.py"
+else
+	echo "ERROR: Unable to find root_child_lin.py"
+	exit 1
+fi
+
+install -d -o root -g root -m 0755 "${INSTALL_DIR}"
+install -o root -g root -m 0500 "${ROOT_CHILD}" "${INSTALL_DIR}/root_child_lin.py"
+
+echo "INFO: Installed ${INSTALL_DIR}/root_child_lin.py"
+exit 0
@@ -350,7 +350,20 @@ root_child_mac = Analysis(['../src/packages/buskill/root_child_mac.py'],
              cipher=block_cipher,
              noarchive=False)
 
-MERGE( (a, 'a', 'a'), (root_child_mac, 'root_child_mac', 'root_child_mac') )
+usb_listener = Analysis(['../src/packages/buskill/usb_listener.py'],
+             pathex=['../src/packages/buskill/'],
+             binaries=[],
+             datas=[],
+             hiddenimports=[],
+             hookspath=[],
+             runtime_hooks=[],
+             excludes=['pydoc'],
+             win_no_prefer_redirects=False,
+             win_private_assemblies=False,
+             cipher=block_cipher,
+             noarchive=False)
+
+MERGE( (a, 'a', 'a'), (root_child_mac, 'root_child_mac', 'root_child_mac'), (usb_listener, 'usb_listener', 'usb_listener') )
 
 pyz = PYZ(a.pure, a.zipped_data,
              cipher=block_cipher)
@@ -378,6 +391,19 @@ root_child_mac_exe = EXE(root_child_mac_pyz,
           upx=True,
           console=False )
 
+usb_listener_pyz = PYZ( usb_listener.pure, usb_listener.zipped_data,
+             cipher=block_cipher)
+usb_listener_exe = EXE(usb_listener_pyz,
+          usb_listener.scripts,
+          [],
+          exclude_binaries=True,
+          name='usb_listener',
+          debug=False,
+          bootloader_ignore_signals=False,
+          strip=False,
+          upx=True,
+          console=False )
+
 coll = COLLECT(exe, Tree('../src/'),
                a.binaries,
                a.zipfiles,
@@ -386,6 +412,10 @@ coll = COLLECT(exe, Tree('../src/'),
                root_child_mac.binaries,
                root_child_mac.zipfiles,
                root_child_mac.datas,
+               usb_listener_exe,
+               usb_listener.binaries,
+               usb_listener.zipfiles,
+               usb_listener.datas,
                strip=False,
                upx=True,
                upx_exclude=[],
@@ -20,7 +20,7 @@ For more info, see: https://buskill.in/
 import packages.buskill
 from buskill_version import BUSKILL_VERSION
 
-import argparse, sys, platform, time
+import argparse, sys, platform
 
 import logging
 logger = logging.getLogger( __name__ )
@@ -38,16 +38,27 @@ logger = logging.getLogger( __name__ )
 # blocking function that waits for the usb_handler to return a trigger event
 def trigger_wait( forever ):
 
-	# listen for the trigger event from the child process
+	# listen for the trigger event from the child process. This sleeps until
+	# the child actually sends us a message (or dies), so the armed CLI doesn't
+	# wake up at all until there's something to do
 	while True:
 
-		result = bk.check_usb_handler(None)
+		result = bk.wait_usb_handler()
 		if result != None:
 
 			if not forever:
 				break
 
-		time.sleep(0.01)
+		elif not bk.usb_handler.is_alive():
+
+			# the child process exited and there's nothing left on the queue. If
+			# we're still armed, the watchdog restarts it; wait for that
+			if bk.wait_usb_handler_replaced( bk.usb_handler ) != None:
+				continue
+
+			msg = "ERROR: The usb_handler child process exited unexpectedly"
+			print( msg ); logger.error( msg )
+			break
 
 	# wait until the asynchronous child process (that executes our
 	# trigger) exits
@@ -80,6 +91,12 @@ def BusKillCLI( buskill_object ):
 	 action="store_true"
 	)
 
+	parser.add_argument(
+	 "--list-devices",
+	 help="List all connected USB devices that can be chosen with --device.",
+	 action="store_true"
+	)
+
 	parser.add_argument(
 	 "-v", "--verbose",
 	 help="increase output verbosity",
@@ -90,7 +107,12 @@ def BusKillCLI( buskill_object ):
 	 "-t", "--trigger",
 	 help="Choose trigger to execute. See --list-triggers for all possible values.",
 	 metavar='',
-	 choices=['l','lock-screen','s','soft-shutdown'],
+	)
+
+	parser.add_argument(
+	 "-d", "--device",
+	 help="Only execute the trigger when this USB device (eg your BusKill cable) is removed. See --list-devices for all possible values.",
+	 metavar='',
 	)
 
 	parser.add_argument(
@@ -99,6 +121,24 @@ def BusKillCLI( buskill_object ):
 	 action="store_true"
 	)
 
+	parser.add_argument(
+	 "--hotplug-backend",
+	 help="Choose how to listen for USB hotplug events. One of 'libusb' (default) or, on Linux, 'netlink' or 'sysfs'.",
+	 metavar='',
+	)
+
+	parser.add_argument(
+	 "--trigger-in-listener",
+	 help="Execute the trigger directly inside the process that listens for USB events, rather than in the main process",
+	 action="store_true"
+	)
+
+	parser.add_argument(
+	 "--arm-in-thread",
+	 help="Listen for USB events in a thread rather than in a separate process",
+	 action="store_true"
+	)
+
 	parser.add_argument(
 	 "-a", "--arm",
 	 help="Arms BusKill",
@@ -114,9 +154,16 @@ def BusKillCLI( buskill_object ):
 	# process command-line arguments
 	args = parser.parse_args()
 
-	# standardize trigger name
-	if args.trigger == 'l': args.trigger = 'lock-screen'
-	if args.trigger == 's': args.trigger = 'soft-shutdown'
+	# standardize trigger name (eg 'l' is short for 'lock-screen'). The short
+	# names are defined by the triggers' manifests
+	if args.trigger != None:
+		args.trigger = packages.buskill.trigger_registry.resolve( bk.triggers, args.trigger )
+
+	# trigger pipelines are defined in the config file, so they're validated
+	# when the trigger is set
+	if args.trigger != None and args.trigger not in bk.SUPPORTED_TRIGGERS \
+	 and not args.trigger.startswith( 'pipeline:' ):
+		parser.error( "argument -t/--trigger: invalid choice: '" +str(args.trigger)+ "' (see --list-triggers)" )
 
 	#############
 	# MAIN BODY #
@@ -145,9 +192,24 @@ def BusKillCLI( buskill_object ):
 		print( "" )
 		print( "Supported triggers include:" )
 		for trigger in bk.SUPPORTED_TRIGGERS:
-			print( "\t" +str(trigger))
+			print( "\t" +str(trigger)+ "\t" +str(bk.triggers[trigger].description))
+		for pipeline in bk.list_trigger_pipelines():
+			print( "\tpipeline:" +str(pipeline))
 		sys.exit(1)
 
+	# did the user ask us to just list all connected usb devices?
+	if args.list_devices:
+		try:
+			devices = bk.list_usb_devices()
+		except Exception as e:
+			sys.exit(1)
+
+		print( "" )
+		print( "Connected USB devices include:" )
+		for device_id, description in devices:
+			print( "\t" +str(device_id)+ "\t" +str(description) )
+		sys.exit(0)
+
 	# did the user ask us to do a software upgrade?
 	if args.upgrade:
 
@@ -179,9 +241,9 @@ def BusKillCLI( buskill_object ):
 			print()
 
 			if confirm.upper() in ["Y", "YES"]:
-				bk.simulate_hotplug_removal()
-
-				trigger_wait( False )
+				# there's no need to spawn a usb_handler child process to listen
+				# for an event that we're just going to fake; execute it here & now
+				bk.simulate_hotplug_removal( in_process=True )
 
 			else:
 				msg = "INFO: User chose not to execute trigger now. Exiting."
@@ -201,11 +263,35 @@ def BusKillCLI( buskill_object ):
 	try:
 		if args.trigger != None:
 			bk.set_trigger( args.trigger )
-	except RuntimeWarning as e:
+	except Exception as e:
 		msg = "ERROR: Unable to set the trigger to '" +str(args.trigger)+ "'\n\t" +str(e)
 		print( msg ); logger.error( msg )
 		sys.exit(1)
 
+	# attempt to set the device whose removal executes the trigger
+	try:
+		if args.device != None:
+			bk.set_trigger_device( args.device )
+	except Exception as e:
+		msg = "ERROR: Unable to set the device to '" +str(args.device)+ "'\n\t" +str(e)
+		print( msg ); logger.error( msg )
+		sys.exit(1)
+
+	# attempt to set the mechanism used to listen for usb hotplug events
+	try:
+		if args.hotplug_backend != None:
+			bk.set_hotplug_backend( args.hotplug_backend )
+	except Exception as e:
+		msg = "ERROR: Unable to set the hotplug backend to '" +str(args.hotplug_backend)+ "'\n\t" +str(e)
+		print( msg ); logger.error( msg )
+		sys.exit(1)
+
+	if args.trigger_in_listener:
+		bk.RUN_TRIGGER_IN_LISTENER = True
+
+	if args.arm_in_thread:
+		bk.ARM_IN_THREAD = True
+
 	if args.arm:
 		bk.toggle()
 		trigger_wait( True )
@@ -98,6 +98,18 @@ class MainWindow(Screen):
 	actionbar = ObjectProperty(None)
 
 	dialog = None
+	usb_handler_waiter = None
+	usb_handler_waiter_target = None
+	upgrade_waiter = None
+	upgrade_cancelled = False
+
+	# the watchdog status that arrived while the window was hidden, which we
+	# show as soon as the window is restored
+	pending_watchdog_status = None
+
+	# True if a message from the usb_handler arrived while the window was
+	# hidden, so the UI has to catch-up when it's restored
+	pending_usb_handler_message = False
 
 	def __init__(self, **kwargs):
 
@@ -119,6 +131,10 @@ class MainWindow(Screen):
 		# add_widget()
 		self.bk = self.root_app.bk
 
+		# let us know (from the watchdog's thread) if the usb_handler dies or is
+		# restarted while armed, so we can update the UI immediately
+		self.bk.usb_handler_watchdog_callback = self.usb_handler_watchdog_event
+
 	# called to close the app
 	def close( self, *args ):
 		sys.exit(0)
@@ -129,7 +145,32 @@ class MainWindow(Screen):
 
 	def toggle_buskill(self):
 
-		self.bk.toggle()
+		try:
+			self.bk.toggle()
+
+		except Exception as e:
+			# if arming failed (eg because the user told us to refuse to arm when
+			# the trigger depends on removable media), alert the user
+
+			# close the dialog if it's already opened
+			if self.dialog != None:
+				self.dialog.dismiss()
+
+			# open a new dialog that tells the user the error that occurred
+			self.dialog = DialogConfirmation(
+			 title = '[font=mdicons][size=30]\ue002[/size][/font] Unable to Arm',
+			 body = str(e),
+			 button = "",
+			 continue_function=None
+			)
+			self.dialog.b_cancel.text = "OK"
+			self.dialog.open()
+
+		self.update_armed_state()
+
+	# updates the UI to match whether or not BusKill is armed. 'watchdog_status'
+	# is the bk.get_watchdog_status() dict of the last watchdog event, if any
+	def update_armed_state( self, watchdog_status=None ):
 
 		if self.bk.is_armed:
 			self.toggle_btn.text = 'Disarm'
@@ -137,20 +178,41 @@ class MainWindow(Screen):
 			self.status.text += "with '" +str(self.bk.trigger)+ "' trigger."
 			self.toggle_btn.background_color = self.color_red
 
+			if watchdog_status != None and watchdog_status['state'] in ['dead', 'restarting']:
+				self.status.text = "BusKill's USB listener died!\n"
+				self.status.text += "Restarting it..."
+
 			# set the actionview of every actionbar of every screen to red
 			for screen in self.manager.screens:
 				for child in screen.actionbar.children:
 					if type(child) == ActionView:
 						child.background_color = self.color_red
 
-			# check for messages from the usb_handler child process
-			Clock.schedule_interval( self.bk.check_usb_handler, 0.01 )
+			# wait for messages from the usb_handler child process in a
+			# background thread that sleeps until a message actually arrives, so
+			# the kivy main loop isn't woken-up 100 times per second while armed.
+			# A persistent usb_handler outlives disarming, so its waiter thread
+			# may already be running
+			if self.usb_handler_waiter == None \
+			 or not self.usb_handler_waiter.is_alive() \
+			 or self.usb_handler_waiter_target is not self.bk.usb_handler:
+				self.usb_handler_waiter_target = self.bk.usb_handler
+				self.usb_handler_waiter = threading.Thread(
+				 target = self.wait_usb_handler,
+				 args = ( self.bk.usb_handler, ),
+				 daemon = True
+				)
+				self.usb_handler_waiter.start()
 
 		else:
 			self.toggle_btn.text = 'Arm'
 			self.status.text = "BusKill is disarmed.\n"
 			self.toggle_btn.background_color = self.color_primary
 
+			if watchdog_status != None and watchdog_status['state'] == 'failed':
+				self.status.text = "BusKill is disarmed because\n"
+				self.status.text += "its USB listener kept dying."
+
 			# set the actionview of every actionbar of every screen back to the
 			# app's primary color
 			for screen in self.manager.screens:
@@ -158,8 +220,83 @@ class MainWindow(Screen):
 					if type(child) == ActionView:
 						child.background_color = self.color_primary
 
-			# stop checking for messages from the usb_handler child process
-			Clock.unschedule( self.bk.check_usb_handler )
+			# note that there's no need to stop the usb_handler_waiter thread; it
+			# exits on its own as soon as the usb_handler child process dies (and a
+			# disarmed persistent usb_handler doesn't send any messages)
+
+	# this is executed in a background thread while BusKill is armed. It blocks
+	# until the usb_handler child process sends us a message, and then acts on
+	# it right here. Executing the trigger doesn't touch the UI, and kivy's main
+	# loop is paused while the window is minimized (see BusKillApp.on_pause()),
+	# so the trigger mustn't wait for it. Anything that does touch the UI is
+	# handed back to kivy's main thread with Clock.schedule_once()
+	def wait_usb_handler( self, usb_handler ):
+
+		while True:
+
+			queue_message = self.bk.get_usb_handler_message(
+			 usb_handler = usb_handler
+			)
+
+			if queue_message == None:
+				# we woke up without a message; was it because the child died?
+				if not usb_handler.is_alive():
+
+					# if it died while armed, then the watchdog replaces it; follow
+					# the new usb_handler
+					usb_handler = self.bk.wait_usb_handler_replaced( usb_handler )
+					if usb_handler == None:
+						# the child process exited because BusKill was disarmed
+						break
+					self.usb_handler_waiter_target = usb_handler
+
+				continue
+
+			self.bk.handle_usb_handler_message( queue_message )
+
+			Clock.schedule_once( self.show_usb_handler_message )
+
+	# called on kivy's main thread after a message from the usb_handler was
+	# handled (see wait_usb_handler())
+	def show_usb_handler_message( self, dt ):
+
+		# don't touch the canvas while nobody can see it
+		if self.root_app.idle_mode:
+			self.pending_usb_handler_message = True
+			return
+
+		self.update_armed_state()
+
+	# called by the bk object's watchdog (in its thread) when the usb_handler
+	# dies or is restarted while armed
+	def usb_handler_watchdog_event( self, watchdog_status ):
+
+		Clock.schedule_once(
+		 lambda dt: self.show_watchdog_status( watchdog_status )
+		)
+
+	def show_watchdog_status( self, watchdog_status ):
+
+		# don't touch the canvas while nobody can see it; we'll catch-up when
+		# the window is restored (see BusKillApp.exit_idle_mode())
+		if self.root_app.idle_mode:
+			self.pending_watchdog_status = watchdog_status
+			return
+
+		self.update_armed_state( watchdog_status )
+
+	# called when the window is restored after being hidden or minimized
+	def on_window_restored( self ):
+
+		if self.pending_watchdog_status != None:
+			watchdog_status = self.pending_watchdog_status
+			self.pending_watchdog_status = None
+			self.pending_usb_handler_message = False
+			self.update_armed_state( watchdog_status )
+
+		if self.pending_usb_handler_message:
+			self.pending_usb_handler_message = False
+			self.update_armed_state()
 
 	def switchToScreen( self, screen ):
 		self.manager.current = screen
@@ -287,32 +424,55 @@ class MainWindow(Screen):
 
 		# Call the upgrade_bg() function which executes the upgrade() function in
 		# an asynchronous process so it doesn't block the UI
+		self.upgrade_cancelled = False
 		self.bk.upgrade_bg()
 
-		# Register the upgrade3_tick() function as a callback to be executed
-		# every second, and we'll use that to update the UI with a status
-		# message from the upgrade() process and check to see if it the upgrade
-		# finished running
-		Clock.schedule_interval(self.upgrade3_tick, 1)
+		# wait for status updates from the upgrade() process in a background
+		# thread, which hands them off to upgrade3_tick() in kivy's main thread.
+		# Unlike polling every second, this doesn't wake-up the app at all
+		# while there's no news
+		self.upgrade_waiter = threading.Thread(
+		 target = self.wait_upgrade,
+		 daemon = True
+		)
+		self.upgrade_waiter.start()
 
 	# cancel the upgrade()
 	def upgrade_cancel( self ):
 
-		Clock.unschedule( self.upgrade3_tick )
+		self.upgrade_cancelled = True
 		print( self.bk.upgrade_bg_terminate() )
 
-	# this is the callback function that will be executed every one second
-	# while buskill's upgrade() method is running
+	# this is executed in a background thread while the upgrade() process is
+	# running. It blocks until the process updates its status or exits
+	def wait_upgrade( self ):
+
+		while True:
+
+			finished = self.bk.wait_upgrade()
+			Clock.schedule_once( self.upgrade3_tick )
+
+			if finished:
+				break
+
+	# this is the callback function that will be executed every time that
+	# buskill's upgrade() method updates its status or finishes
 	def upgrade3_tick( self, dt ):
 		print( "called upgrade3_tick()" )
 
+		# the user cancelled the upgrade before this was called
+		if self.upgrade_cancelled:
+			return
+
 		# update the dialog
 		self.dialog.l_body.text = self.bk.get_upgrade_status()
 
 		# did the upgrade process finish?
 		if self.bk.upgrade_is_finished():
 			# the call to upgrade() finished.
-			Clock.unschedule( self.upgrade3_tick )
+
+			# ignore any (stale) status updates that are still queued
+			self.upgrade_cancelled = True
 
 			try:
 				self.upgrade_result = self.bk.get_upgrade_result()
@@ -798,8 +958,18 @@ class BusKillSettingsScreen(Screen):
 
 			# create a new Kivy SettingsPanel using Config (our buskill.ini config
 			# file) and a set of options to be drawn in the GUI as defined-by
-			# the 'settings_buskill.json' file
-			s.add_json_panel( 'buskill', Config, os.path.join(self.bk.SRC_DIR, 'packages', 'buskill', 'settings_buskill.json') )
+			# the 'settings_buskill.json' file. The options for the trigger come
+			# from the triggers' manifests (see trigger_registry.py)
+			with open( os.path.join(self.bk.SRC_DIR, 'packages', 'buskill', 'settings_buskill.json') ) as fd:
+				settings = json.load( fd )
+			for setting in settings:
+				if setting.get( 'key' ) == 'trigger':
+					triggers = [ self.bk.triggers[name] for name in self.bk.SUPPORTED_TRIGGERS ]
+					setting['options'] = [ trigger.name for trigger in triggers ]
+					setting['options_long'] = [ trigger.description for trigger in triggers ]
+					setting['confirmation'] = [ trigger.confirmation for trigger in triggers ]
+					setting['options_icons'] = [ trigger.icon for trigger in triggers ]
+			s.add_json_panel( 'buskill', Config, data=json.dumps( settings ) )
 
 			# our BusKillSettingsWithNoMenu object's first child is an "interface"
 			# the add_json_panel() call above auto-pouplated that interface with
@@ -939,8 +1109,12 @@ class BusKillSettingsScreen(Screen):
 
 			# is BusKill currently armed?
 			if self.bk.is_armed == True:
-				# buskill is currently armed; rearming is required to apply the change
-				rearm_required = True
+
+				# if the usb_handler is persistent, we can just tell it about the new
+				# trigger without disarming. Otherwise, rearming is required to apply
+				# the change
+				if not self.bk.retarget():
+					rearm_required = True
 
 		# is it necessary to disarm and arm BusKill in order to apply the user's
 		# changes to BusKill's settings?
@@ -1089,6 +1263,9 @@ class BusKillApp(App):
 		# other objects for doing Buskill stuff
 		self.bk = bk
 
+		# True while the window is hidden or minimized
+		self.idle_mode = False
+
 		self._app_settings = None
 		self._app_window = None
 		super(App, self).__init__(**kwargs)
@@ -1125,6 +1302,53 @@ class BusKillApp(App):
 	def close( self, *args ):
 		self.bk.close()
 
+	# called when the window is hidden or minimized. There's nothing to see, so
+	# we stop making changes to the canvas, and kivy doesn't redraw a canvas
+	# that hasn't changed. When it's minimized, kivy also pauses its main loop
+	# (see on_pause()). Nothing that we schedule on its clock has to be fast,
+	# since the usb_handler's messages are handled in their own thread (see
+	# MainWindow.wait_usb_handler())
+	def enter_idle_mode( self, *args ):
+
+		if self.idle_mode:
+			return
+
+		msg = "DEBUG: Window hidden; entering idle mode"
+		print( msg ); logger.debug( msg )
+
+		self.idle_mode = True
+
+	# called when the window is shown or restored again
+	def exit_idle_mode( self, *args ):
+
+		if not self.idle_mode:
+			return
+
+		msg = "DEBUG: Window restored; leaving idle mode"
+		print( msg ); logger.debug( msg )
+
+		self.idle_mode = False
+
+		# catch-up on any changes to the UI that we skipped while hidden
+		for screen in self.manager.screens:
+			if hasattr( screen, 'on_window_restored' ):
+				screen.on_window_restored()
+
+	# called by kivy when the window is minimized (see 'pause_on_minimize' in
+	# build_config()). Returning True makes kivy pause its main loop (no frames,
+	# no clock ticks) until the window is restored; returning False would make
+	# it stop the app
+	def on_pause( self ):
+
+		self.enter_idle_mode()
+		return True
+
+	# called by kivy when the window is restored after on_pause(). Kivy doesn't
+	# dispatch the window's on_restore in that case
+	def on_resume( self ):
+
+		self.exit_idle_mode()
+
 	def build_config(self, config):
 
 		Config.read( self.bk.CONF_FILE )
@@ -1132,6 +1356,7 @@ class BusKillApp(App):
 		 'trigger': 'lock-screen',
 		})	
 		Config.set('kivy', 'exit_on_escape', '0')
+		Config.set('kivy', 'pause_on_minimize', '1')
 		Config.set('input', 'mouse', 'mouse,multitouch_on_demand')
 		Config.write()
 
@@ -1148,6 +1373,14 @@ class BusKillApp(App):
 			# yes, this platform is supported; show the main window
 			Window.bind( on_request_close = self.close )
 
+			# don't spend CPU drawing frames that nobody can see
+			Window.bind(
+			 on_minimize = self.enter_idle_mode,
+			 on_hide = self.enter_idle_mode,
+			 on_restore = self.exit_idle_mode,
+			 on_show = self.exit_idle_mode,
+			)
+
 			# create all the Screens we need for our app
 			screens = [
 			 MainWindow(name='main'),
@@ -18,9 +18,12 @@ For more info, see: https://buskill.in/
 #                                   IMPORTS                                    #
 ################################################################################
 
-import platform, multiprocessing, traceback, subprocess
+import platform, multiprocessing, threading, traceback, subprocess, socket
 import urllib.request, re, json, certifi, sys, os, math, shutil, tempfile, random, gnupg, configparser
-import os.path
+import os.path, time, struct
+import multiprocessing.connection
+from . import arm_epoch, event_ring, hardening, trigger_plan, trigger_executor
+from . import trigger_pipeline, trigger_registry
 from buskill_version import BUSKILL_VERSION
 from distutils.version import LooseVersion
 from hashlib import sha256
@@ -32,6 +35,11 @@ logger = logging.getLogger( __name__ )
 CURRENT_PLATFORM = platform.system().upper()
 if CURRENT_PLATFORM.startswith( 'LINUX' ):
 	import usb1
+	from . import netlink_lin, sysfs_lin
+	from . import usb_listener
+
+	# dbus_lin, pin_lin and lock_state_lin are only imported when the trigger
+	# (or the user's settings) need them, like the trigger plugins are
 	msg = "usb1.__version__:|" +str(usb1.__version__)+ "|"
 	print( msg ); logger.debug( msg )
 
@@ -42,6 +50,7 @@ if CURRENT_PLATFORM.startswith( 'WIN' ):
 if CURRENT_PLATFORM.startswith( 'DARWIN' ):
 	import usb1, ctypes, ctypes.util
 	from ctypes import byref
+	from . import usb_listener
 	msg = "usb1.__version__:|" +str(usb1.__version__)+ "|"
 	print( msg ); logger.debug( msg )
 
@@ -65,6 +74,16 @@ random.shuffle(UPGRADE_MIRRORS)
 RELEASE_KEY_FINGERPRINT = 'E0AFFF57DC00FBE0563587614AE21E1936CE786A'
 RELEASE_KEY_SUB_FINGERPRINT = '798DC1101F3DEC428ADE124D68B8BCB0C5023905'
 
+# if the usb_handler dies while armed, the watchdog restarts it after waiting
+# WATCHDOG_BACKOFF_MIN seconds, doubling each consecutive time (up to
+# WATCHDOG_BACKOFF_MAX). It gives up (and disarms) after WATCHDOG_MAX_RESTARTS
+# consecutive failures. A usb_handler that ran for at least
+# WATCHDOG_HEALTHY_AFTER seconds before dying resets the count
+WATCHDOG_BACKOFF_MIN = 0.1
+WATCHDOG_BACKOFF_MAX = 30
+WATCHDOG_MAX_RESTARTS = 10
+WATCHDOG_HEALTHY_AFTER = 60
+
 #####################
 # WINDOWS CONSTANTS #
 #####################
@@ -178,7 +197,7 @@ if CURRENT_PLATFORM.startswith( 'WIN' ):
 				msg = "DEBUG: Determined USB hotplug event to be a removal"
 				print( msg ); logger.debug( msg )
 
-				self.bk.usb_handler_queue.put( 'trigger' )
+				self.bk.usb_removal()
 	
 				msg = "hwnd:|" +str(hwnd)+ "|"
 				print( msg ); logger.debug( msg )
@@ -219,10 +238,71 @@ class BusKill:
 		self.OS_NAME_SHORT = None
 		self.ERR_PLATFORM_NOT_SUPPORTED = None
 		self.ARM_FUNCTION = None
+		self.ARM_FUNCTION_IS_CANCELLABLE = False
 		self.DISARM_FUNCTION = None
 		self.TRIGGER_FUNCTION = None
 		self.SIMULATE_HOTPLUG_REMOVAL = False
 
+		# if True, the trigger is executed directly inside the usb_handler child
+		# process as soon as the removal event is detected (instead of sending a
+		# message up to this process and waiting for us to execute it). If None,
+		# then it's set from the config file when arming
+		self.RUN_TRIGGER_IN_LISTENER = None
+		self.trigger_in_usb_handler = False
+
+		# if True, the usb_handler listens for usb events in a thread in this
+		# process rather than in a child process, which makes arming & disarming
+		# much cheaper. This requires an arm function that can be stopped cleanly.
+		# If None, then it's set from the config file when arming
+		self.ARM_IN_THREAD = None
+
+		# if True, the usb_handler is a single long-lived child process that's
+		# started once and then armed & disarmed by sending it commands over
+		# 'usb_handler_control'. If None, then it's set from the config file
+		# when arming
+		self.PERSISTENT_USB_HANDLER = None
+		self.usb_handler_control = None
+		self.usb_handler_armed = False
+
+		# if True, the persistent usb_handler is the small usb_listener.py script,
+		# started fresh instead of forked from this (much bigger) process. It
+		# sends us removal events over 'usb_handler_events' instead of the ring
+		self.LEAN_USB_HANDLER = None
+		self.usb_handler_events = None
+
+		# the trigger fires at most once per arm epoch (see arm_epoch.py). The
+		# usb_handler drops duplicate removals, and we also remember the last
+		# epoch for which we executed the trigger in case any slip through
+		self.arm_epoch = arm_epoch.ArmEpoch()
+		self.triggered_epoch = None
+		self.duplicate_trigger_count = 0
+
+		# the watchdog is a thread that notices (without polling) if the
+		# usb_handler dies while armed, and then restarts it. If FAILSAFE_TRIGGER
+		# is True, it also executes the trigger when that happens. If None, then
+		# it's set from the config file when arming
+		self.FAILSAFE_TRIGGER = None
+		self.toggle_lock = threading.RLock()
+		self.usb_handler_watchdog = None
+		self.usb_handler_watchdog_wake = None
+		self.usb_handler_watchdog_wake_reader = None
+		self.usb_handler_start_time = None
+		self.usb_handler_replaced = threading.Condition()
+
+		# called (from the watchdog's thread) with get_watchdog_status() whenever
+		# the watchdog detects that the usb_handler died or restarts it
+		self.usb_handler_watchdog_callback = None
+
+		self.usb_handler_watchdog_status = {
+		 'state': 'stopped',
+		 'deaths': 0,
+		 'restarts': 0,
+		 'consecutive_failures': 0,
+		 'last_exit_reason': None,
+		 'last_detection_ms': None,
+		 'last_restart_ms': None,
+		}
+
 		self.EXECUTED_AS_SCRIPT = None
 		self.LOG_FILE_PATH = logger.root.handlers[0].baseFilename
 		self.EXE_PATH = None
@@ -241,17 +321,121 @@ class BusKill:
 		# stores the process object for a child process running as root, if needed
 		self.root_child = None
 
+		# on linux, the root child is spawned in this thread (see
+		# prepare_root_child()), and only one is ever spawned at a time
+		self.root_child_spawner = None
+		self.root_child_lock = threading.Lock()
+
+		# the linux root child is executed as root, so it must be installed
+		# root:root 0500 outside of anything that the user can write to (see
+		# build/linux/install_root_child.sh)
+		self.ROOT_CHILD_LIN_PATH = '/usr/local/libexec/buskill/root_child_lin.py'
+
+		# how long (in seconds) we wait for the linux root child to start (which
+		# includes the user typing their password). Replies to commands are
+		# subject to the trigger's deadline (trigger_plan.STRATEGY_TIMEOUT)
+		self.ROOT_CHILD_SPAWN_TIMEOUT = 120
+
+		# if True, the linux root child only pretends to execute commands (see
+		# root_child_lin.py). This is for testing
+		self.ROOT_CHILD_DRY_RUN = False
+
 		self.is_armed = None
 		self.usb_handler = None
-		self.usb_handler_queue = None
+
+		# the usb_handler tells us about removal events through this ring buffer
+		# in shared memory (see event_ring.py)
+		self.usb_handler_ring = None
+		self.usb_handler_stop = None
 		self.upgrade_status_msg = None
 		self.upgrade_result = None
+
+		# the background upgrade() process sends a byte down this pipe every time
+		# it updates its status, so the UI can sleep until there's news
+		self.upgrade_status_reader = None
+		self.upgrade_status_writer = None
 		self.trigger = None
 
-		self.SUPPORTED_TRIGGERS = ['lock-screen', 'soft-shutdown']
-		self.trigger_softshutdown_lin_shutdown_path = None
-		self.trigger_softshutdown_lin_poweroff_path = None
-		self.trigger_softshutdown_lin_systemctl_path = None
+		# the usb device (eg the BusKill cable) whose removal executes the
+		# trigger, as a string formatted like 'BUS-PORTS:VID:PID' or 'VID:PID'.
+		# An empty string means that the removal of *any* usb device executes
+		# the trigger. If None, then it's set from the config file when arming
+		self.trigger_device = None
+
+		# dict of the usb devices whose removal executes the trigger, keyed by
+		# (bus, port numbers, vendor id, product id). This is built by the arming
+		# function, and None means that any usb device's removal counts
+		self.usb_device_index = None
+
+		# the triggers that we know about, keyed by name (see
+		# trigger_registry.py), and the names of the ones that this platform
+		# supports. They're discovered once we know where our data dir is
+		self.triggers = dict()
+		self.SUPPORTED_TRIGGERS = list()
+
+		# the plugins of the triggers that we've loaded, keyed by trigger name.
+		# A plugin is only loaded when we arm with its trigger (or execute it)
+		self.trigger_plugins = dict()
+
+		# the mechanism that the usb_handler child process uses to listen for
+		# usb hotplug events. If None, then it's set from the config file when
+		# arming
+		self.SUPPORTED_HOTPLUG_BACKENDS = []
+		self.hotplug_backend = None
+
+		# some containers and sandboxes give us a libusb without hotplug
+		# support. If so, then on linux we fall back to watching sysfs. This is
+		# None until we've checked
+		self.LIBUSB_HAS_HOTPLUG = None
+
+		# the trigger compiled into the exact commands that execute it (see
+		# trigger_plan.py). This is compiled when we arm
+		self.trigger_plan = None
+
+		# if the trigger is a pipeline (see trigger_pipeline.py), then this is
+		# its definition, which is loaded when the trigger is set. On linux, the
+		# plans of the built-in triggers that it executes are compiled when we
+		# arm, and kept here keyed by trigger
+		self.trigger_pipeline = None
+		self.trigger_pipeline_plans = dict()
+
+		# the D-Bus connections used by the triggers (eg to lock the screen).
+		# They're opened when we arm, so that the trigger is just one round trip
+		self.trigger_bus = None
+
+		# if True, then on linux we start a process when we arm that's ready to
+		# execute the trigger plan as soon as we ask it to (see
+		# trigger_executor.py). If None, then it's set from the config file when
+		# arming
+		self.TRIGGER_EXECUTOR = None
+		self.trigger_executor = None
+
+		# if True, then the usb_handler and the trigger executor lock their memory
+		# and raise their priority (as far as they're permitted to) so that the
+		# trigger is fast even when the machine is under heavy load (see
+		# hardening.py). If None, then it's set from the config file when arming
+		self.HARDENED_MODE = None
+
+		# if True, then on linux we pin every file that the trigger needs (eg the
+		# binaries that it executes and their libraries) in RAM when we arm, so
+		# that the trigger doesn't depend on the (often removable) drive that
+		# they're on (see pin_lin.py). If REFUSE_REMOVABLE_TRIGGER_PATH is True,
+		# then we refuse to arm if any of them are on removable media and aren't
+		# pinned. If None, then they're set from the config file when arming
+		self.PIN_TRIGGER_PATH = None
+		self.REFUSE_REMOVABLE_TRIGGER_PATH = None
+		self.trigger_path_pinner = None
+
+		# if True, then on linux we check that the session is actually locked
+		# after each strategy of the lock-screen trigger, and try the next one
+		# right away if it isn't (see lock_state_lin.py). It's on by default. If
+		# LOCK_ESCALATION_TRIGGER is set (eg to 'soft-shutdown'), then that
+		# trigger is executed if the lock-screen trigger fails. If None, then
+		# they're set from the config file when arming
+		self.VERIFY_LOCK_SCREEN = None
+		self.LOCK_ESCALATION_TRIGGER = None
+		self.escalation_plan = None
+		self.lock_verifier = None
 
 		# documentation links
 		if BUSKILL_VERSION['VERSION'] == '':
@@ -310,6 +494,7 @@ class BusKill:
 			self.OS_NAME_SHORT = 'lin'
 			self.ARM_FUNCTION = self.armNix
 			self.TRIGGER_FUNCTION = self.triggerLin
+			self.SUPPORTED_HOTPLUG_BACKENDS = ['libusb', 'netlink', 'sysfs']
 
 			# on Linux, the buskill AppImage is directly inside the APP_DIR
 			self.APP_DIR = self.EXE_DIR
@@ -323,6 +508,7 @@ class BusKill:
 			self.OS_NAME_SHORT = 'win'
 			self.ARM_FUNCTION = self.armWin
 			self.TRIGGER_FUNCTION = self.triggerWin
+			self.SUPPORTED_HOTPLUG_BACKENDS = ['win32']
 
 			# on Windows, the buskill binary is 1 dir below the APP_DIR
 			self.APP_DIR = self.EXE_PATH.split( os.sep )[0:-2]
@@ -338,6 +524,7 @@ class BusKill:
 			self.KERNEL_VERSION = str(platform.release()).split('.')[0]
 			self.ARM_FUNCTION = self.armNix
 			self.TRIGGER_FUNCTION = self.triggerMac
+			self.SUPPORTED_HOTPLUG_BACKENDS = ['libusb']
 
 			# on MacOS, the binary is 2 dirs below the .app dir
 			self.APP_DIR = self.EXE_PATH.split( os.sep )[0:-3]
@@ -427,6 +614,10 @@ class BusKill:
 		msg = "DEBUG: CONF_FILE:|" +str(self.CONF_FILE)+  "|\n"
 		print( msg ); logger.debug( msg )
 
+		# find out which triggers are available. This only reads their
+		# manifests; it doesn't import any of their code
+		self.discover_triggers()
+
 
 		# handle conditions where this version was already upgraded by a newer
 		# version or if this is a version that upgraded an older version
@@ -449,7 +640,14 @@ class BusKill:
 		# remove instances of multiprocessing.Process() because they're not
 		# pickleable
 		unpickleable = [
-		 'upgrade_process', 'usb_handler', 'root_child'
+		 'upgrade_process', 'usb_handler', 'usb_handler_stop',
+		 'usb_handler_control', 'usb_handler_events', 'root_child',
+		 'root_child_spawner', 'root_child_lock',
+		 'toggle_lock', 'usb_handler_watchdog', 'usb_handler_watchdog_wake',
+		 'usb_handler_watchdog_wake_reader', 'usb_handler_replaced',
+		 'usb_handler_watchdog_callback', 'upgrade_status_reader', 'trigger_bus',
+		 'trigger_executor', 'trigger_path_pinner', 'trigger_plugins',
+		 'lock_verifier'
 		]
 		for instance_field in unpickleable:
 			if instance_field in state:
@@ -467,6 +665,13 @@ class BusKill:
 		# do what we can as fast as we can; don't get stuck by errors
 		try:
 
+			# ask the usb_handler to stop cleanly, if it can. This is the only way
+			# to stop it if it's a thread
+			if self.usb_handler_stop != None:
+				self.usb_handler_stop.send_bytes( b'disarm' )
+			if self.usb_handler_control != None:
+				self.usb_handler_control.send_bytes( b'exit' )
+
 			# if we don't kill this child process on exit, the UI will freeze
 			try:
 				self.usb_handler.kill()
@@ -492,6 +697,27 @@ class BusKill:
 		except:
 			pass
 
+		try:
+			if self.trigger_bus != None:
+				self.trigger_bus.close()
+		except:
+			pass
+
+		try:
+			self.stop_trigger_executor()
+		except:
+			pass
+
+		try:
+			self.unpin_trigger_path()
+		except:
+			pass
+
+		try:
+			self.stop_root_child()
+		except:
+			pass
+
 		try:
 			# delete cache dir
 			self.wipeCache()
@@ -511,47 +737,31 @@ class BusKill:
 		msg = "DEBUG: Attempting to set 'trigger' set to '" +str(trigger)+ "'"
 		print( msg ); logger.debug( msg )
 
-		if trigger not in self.SUPPORTED_TRIGGERS:
+		# pipelines are defined in the config file. This throws an exception if
+		# the pipeline is invalid
+		pipeline = None
+		if trigger_pipeline.is_pipeline( trigger ):
+			pipeline = trigger_pipeline.load_pipeline(
+			 self.CONF_FILE, trigger, self.SUPPORTED_TRIGGERS
+			)
+
+		elif trigger not in self.SUPPORTED_TRIGGERS:
 			msg = "WARNING: Attempting to set trigger to invalid value (" +str(trigger)+ ")"
 			print( msg ); logger.debug( msg )
 			raise Exception( msg )
 
 		self.trigger = trigger
+		self.trigger_pipeline = pipeline
+		self.trigger_pipeline_plans = dict()
 
 		# check sanity of the soft shutdown trigger
-		if trigger == 'soft-shutdown':
+		if 'soft-shutdown' in self.get_executed_triggers():
 
 			if self.OS_NAME_SHORT == 'lin':
 
-				# list of paths where binaries like 'shutdown' could be
-				bin_paths = [
-				 os.sep+'sbin',
-				 os.sep+'usr'+os.sep+'sbin',
-				 os.sep+'bin',
-				 os.sep+'usr'+os.sep+'bin'
-				]
-
-				for path in bin_paths:
-
-					# shutdown
-					shutdown_path = path + os.sep + 'shutdown'
-					if os.path.exists( shutdown_path ):
-						self.trigger_softshutdown_lin_shutdown_path = shutdown_path
-
-					# poweroff
-					poweroff_path = path + os.sep + 'poweroff'
-					if os.path.exists( poweroff_path ):
-						self.trigger_softshutdown_lin_poweroff_path = poweroff_path
-
-					# systemctl
-					systemctl_path = path + os.sep + 'systemctl'
-					if os.path.exists( systemctl_path ):
-						self.trigger_softshutdown_lin_systemctl_path = systemctl_path
-
-				# were we able to find at least one of their paths?
-				if self.trigger_softshutdown_lin_shutdown_path == None and \
-				 self.trigger_softshutdown_lin_poweroff_path == None and \
-				 self.trigger_softshutdown_lin_systemctl_path == None:
+				# were we able to find at least one of the soft shutdown binaries?
+				plan = trigger_plan.build_plan( 'soft-shutdown' )
+				if len( plan.steps ) == 0:
 					# we couldn't figure any of the paths; don't continue with this trigger
 					msg = "ERROR: Unable to find paths to soft shutdown binaries"
 					print( msg ); logger.error( msg )
@@ -561,16 +771,7 @@ class BusKill:
 				#  * https://unix.stackexchange.com/questions/719465/cross-platform-way-to-determine-if-the-current-user-has-privlige-to-shutdown-the
 				#  * https://stackoverflow.com/questions/73923097/best-practice-way-to-run-a-python-program-that-needs-root-privliges-for-subset-o
 
-				msg = "DEBUG: shutdown binary path:|" \
-				 +str(self.trigger_softshutdown_lin_shutdown_path)+ "|"
-				print( msg ); logger.debug( msg )
-
-				msg = "DEBUG: poweroff binary path:|" \
-				 +str(self.trigger_softshutdown_lin_poweroff_path)+ "|"
-				print( msg ); logger.debug( msg )
-
-				msg = "DEBUG: systemctl binary path:|" \
-				 +str(self.trigger_softshutdown_lin_systemctl_path)+ "|"
+				msg = "DEBUG: soft shutdown commands:|" +str( plan.get_commands() )+ "|"
 				print( msg ); logger.debug( msg )
 
 			#elif self.OS_NAME_SHORT == 'win':
@@ -582,6 +783,11 @@ class BusKill:
 				self.spawn_root_child()
 
 		self.trigger = trigger
+
+		# the plan for the old trigger is no good anymore
+		if self.trigger_plan != None and self.trigger_plan.trigger != trigger:
+			self.trigger_plan = None
+
 		msg = "INFO: BusKill 'trigger' set to '" +str(self.trigger)+ "'"
 		print( msg ); logger.info( msg )
 
@@ -589,6 +795,482 @@ class BusKill:
 
 		return str(self.trigger)
 
+	# discovers the built-in triggers and the trigger plugins in the triggers
+	# dir of this package, the triggers dir in our DATA_DIR, and the entry
+	# points of the installed python packages (see trigger_registry.py)
+	def discover_triggers(self):
+
+		# the built-in triggers are described by the manifest next to this file,
+		# which isn't always under SRC_DIR (eg when we're imported by a script)
+		builtin_dir = os.path.join(
+		 os.path.dirname( os.path.abspath( __file__ ) ), 'triggers'
+		)
+		self.triggers = trigger_registry.discover(
+		 builtin_dir, [ self.get_user_triggers_dir() ]
+		)
+
+		self.SUPPORTED_TRIGGERS = [
+		 trigger.name for trigger in self.triggers.values()
+		 if self.OS_NAME_SHORT in trigger.platforms
+		]
+
+		msg = "DEBUG: SUPPORTED_TRIGGERS:|" +str(self.SUPPORTED_TRIGGERS)+ "|"
+		print( msg ); logger.debug( msg )
+
+	# returns the dir in which the user can put their own trigger plugins
+	def get_user_triggers_dir(self):
+
+		return os.path.join( self.DATA_DIR, 'triggers' )
+
+	# returns True if 'trigger' is implemented by a plugin (rather than being
+	# one of our built-in triggers)
+	def is_trigger_plugin(self, trigger):
+
+		return trigger in self.triggers and self.triggers[trigger].is_plugin()
+
+	# imports the plugins of the current trigger (or of the triggers of the
+	# current pipeline) and lets them prepare to be executed. This is called
+	# when we arm, and it throws an exception if any of them can't be loaded
+	def load_trigger_plugins(self):
+
+		for trigger in sorted( self.get_executed_triggers() ):
+			if self.is_trigger_plugin( trigger ):
+				self.load_trigger_plugin( trigger )
+
+	def load_trigger_plugin(self, trigger):
+
+		plugin = self.trigger_plugins.get( trigger )
+		if plugin == None:
+			try:
+				plugin = trigger_registry.load_plugin( self.triggers[trigger] )
+			except Exception as e:
+				msg = "ERROR: Unable to load the '" +str(trigger)+ "' trigger\n\t" +str(e)
+				print( msg ); logger.error( msg )
+				raise Exception( msg )
+
+			self.trigger_plugins[trigger] = plugin
+
+		if hasattr( plugin, 'prepare' ):
+			plugin.prepare( self )
+
+		return plugin
+
+	# executes the trigger plugin 'trigger'. Returns True if it succeeded
+	def execute_trigger_plugin(self, trigger):
+
+		msg = "DEBUG: BusKill '" +str(trigger)+ "' trigger executing now"
+		print( msg ); logger.debug( msg )
+
+		# this is only slow if we didn't arm first (eg `--run-trigger`)
+		plugin = self.trigger_plugins.get( trigger )
+		if plugin == None:
+			plugin = self.load_trigger_plugin( trigger )
+
+		return plugin.execute( self ) != False
+
+	# returns the set of the triggers (eg 'lock-screen') that the current
+	# trigger executes. That's more than one if it's a pipeline
+	def get_executed_triggers(self):
+
+		if self.trigger_pipeline != None:
+			triggers = self.trigger_pipeline.get_triggers()
+		else:
+			triggers = set( [ self.trigger ] )
+
+		# on linux, the lock-screen trigger may escalate to another trigger
+		if self.OS_NAME_SHORT == 'lin' and 'lock-screen' in triggers \
+		 and self.LOCK_ESCALATION_TRIGGER:
+			triggers.add( self.LOCK_ESCALATION_TRIGGER )
+
+		return triggers
+
+	# sets the trigger that's executed if the lock-screen trigger fails to lock
+	# the screen. An empty string means that there isn't one
+	def set_lock_escalation_trigger(self, trigger):
+
+		msg = "DEBUG: Attempting to set 'lock_escalation_trigger' to '" +str(trigger)+ "'"
+		print( msg ); logger.debug( msg )
+
+		if trigger != '' and ( trigger not in self.SUPPORTED_TRIGGERS or trigger == 'lock-screen' ):
+			msg = "WARNING: Attempting to set lock_escalation_trigger to invalid value (" +str(trigger)+ ")"
+			print( msg ); logger.debug( msg )
+			raise Exception( msg )
+
+		self.LOCK_ESCALATION_TRIGGER = trigger
+
+		msg = "INFO: BusKill 'lock_escalation_trigger' set to '" +str(self.LOCK_ESCALATION_TRIGGER)+ "'"
+		print( msg ); logger.info( msg )
+
+	# returns the names of the trigger pipelines that are defined in the config
+	# file (see trigger_pipeline.py)
+	def list_trigger_pipelines(self):
+
+		return trigger_pipeline.list_pipelines( self.CONF_FILE )
+
+	# returns the trigger as a list of steps, where each step is a list of
+	# alternative commands that are tried in order until one of them succeeds.
+	# This lets a process that doesn't have this object (eg usb_listener.py)
+	# execute the trigger. Returns None if the trigger can't be expressed this
+	# way on this platform
+	def get_trigger_commands(self):
+
+		plan = self.get_trigger_plan()
+		if plan == None:
+			return None
+
+		return plan.get_commands()
+
+	# returns the path to the file in which compiled trigger plans are cached,
+	# or None if we don't have a DATA_DIR to put it in
+	def get_trigger_plan_cache_path(self):
+
+		if self.DATA_DIR == None or self.DATA_DIR == '':
+			return None
+
+		return os.path.join( self.DATA_DIR, trigger_plan.CACHE_FILENAME )
+
+	# compiles the current trigger into a plan (see trigger_plan.py) so that
+	# executing it doesn't have to look for anything. This is called when we arm
+	def compile_trigger_plan(self):
+
+		self.compile_escalation_plan()
+
+		if self.OS_NAME_SHORT == 'lin' and self.trigger_pipeline != None:
+			self.trigger_plan = None
+			self.compile_trigger_pipeline_plans()
+			return None
+
+		if self.OS_NAME_SHORT != 'lin' or self.trigger not in trigger_plan.LINUX_TRIGGERS:
+			self.trigger_plan = None
+			return None
+
+		compile_start_time = time.monotonic()
+
+		# (re)connect to D-Bus and find out which of the services that can
+		# execute the trigger are running (and will let us)
+		bus_names = self.prepare_trigger_bus()
+
+		self.trigger_plan = trigger_plan.compile_plan(
+		 self.trigger, self.get_trigger_plan_cache_path(), bus_names
+		)
+
+		msg = "DEBUG: Compiled the '" +str(self.trigger)+ "' trigger plan in " +str( round((time.monotonic()-compile_start_time)*1000, 3) )+ " ms:|" +str( self.trigger_plan.get_commands() )+ "|"
+		print( msg ); logger.debug( msg )
+
+		return self.trigger_plan
+
+	# compiles the plan of the trigger that the lock-screen trigger escalates to
+	# (if it's one of our built-in triggers), so that escalating doesn't have to
+	# look for anything
+	def compile_escalation_plan(self):
+
+		self.escalation_plan = None
+
+		trigger = self.LOCK_ESCALATION_TRIGGER
+		if self.OS_NAME_SHORT != 'lin' or 'lock-screen' not in self.get_executed_triggers() \
+		 or trigger not in trigger_plan.LINUX_TRIGGERS:
+			return
+
+		self.escalation_plan = trigger_plan.compile_plan(
+		 trigger, self.get_trigger_plan_cache_path(), self.prepare_trigger_bus()
+		)
+
+		msg = "DEBUG: Compiled the '" +str(trigger)+ "' escalation plan:|" +str( self.escalation_plan.get_commands() )+ "|"
+		print( msg ); logger.debug( msg )
+
+	# compiles the plans of the built-in triggers that the current pipeline
+	# executes, like compile_trigger_plan() does for a built-in trigger
+	def compile_trigger_pipeline_plans(self):
+
+		bus_names = self.prepare_trigger_bus()
+
+		self.trigger_pipeline_plans = dict()
+		for trigger in sorted( self.trigger_pipeline.get_triggers() ):
+			if trigger not in trigger_plan.LINUX_TRIGGERS:
+				continue
+
+			self.trigger_pipeline_plans[trigger] = trigger_plan.compile_plan(
+			 trigger, self.get_trigger_plan_cache_path(), bus_names
+			)
+
+		msg = "DEBUG: Compiled the plans of the '" +str(self.trigger)+ "' trigger pipeline:|" +str( { trigger: plan.get_commands() for trigger, plan in self.trigger_pipeline_plans.items() } )+ "|"
+		print( msg ); logger.debug( msg )
+
+	# opens our D-Bus connections (if they aren't open already) and returns the
+	# set of names on the buses
+	def prepare_trigger_bus(self):
+
+		if self.trigger_bus == None:
+			from . import dbus_lin
+			self.trigger_bus = dbus_lin.TriggerBus()
+
+		names = self.trigger_bus.prepare()
+
+		# open the connections on which we watch whether the screen gets locked
+		# (and import what verifies it) now, rather than when the trigger is
+		# executed
+		if self.VERIFY_LOCK_SCREEN == True \
+		 and 'lock-screen' in self.get_executed_triggers():
+			from . import lock_state_lin
+			self.trigger_bus.get_lock_state_bus()
+
+		return names
+
+	# called in a forked child process (eg the usb_handler) that inherited our
+	# D-Bus connections. Their sockets are shared with the parent, so if both
+	# processes used them, their messages and replies would be interleaved on
+	# one stream. This closes the child's copies and, if 'reconnect' is True,
+	# opens new connections of its own
+	def reconnect_trigger_bus(self, reconnect=True):
+
+		if self.trigger_bus != None:
+			self.trigger_bus.close()
+		self.trigger_bus = None
+
+		if reconnect:
+			self.prepare_trigger_bus()
+
+	# starts a trigger executor for the current trigger plan (if the user wants
+	# one), stopping any that was started for an older plan
+	def start_trigger_executor(self):
+
+		self.stop_trigger_executor()
+
+		if not self.TRIGGER_EXECUTOR or self.trigger_plan == None:
+			return
+
+		executor = trigger_executor.TriggerExecutor(
+		 self.trigger_plan, self.get_trigger_plan_cache_path(),
+		 hardened = self.HARDENED_MODE,
+		 verify = self.VERIFY_LOCK_SCREEN == True
+		)
+		try:
+			executor.start()
+			self.trigger_executor = executor
+		except Exception as e:
+			msg = "WARNING: Unable to start the trigger executor (" +str(e)+ "). The trigger will be executed without it."
+			print( msg ); logger.warning( msg )
+
+	def stop_trigger_executor(self):
+
+		if self.trigger_executor != None:
+			self.trigger_executor.stop()
+			self.trigger_executor = None
+
+	# on linux, pins every file that the current trigger needs in RAM (if the
+	# user wants us to) and checks which of them are on removable media. Raises
+	# an exception if the user wants us to refuse to arm when any of those
+	# aren't pinned
+	def pin_trigger_path(self):
+
+		self.unpin_trigger_path()
+
+		if not self.PIN_TRIGGER_PATH and not self.REFUSE_REMOVABLE_TRIGGER_PATH:
+			return
+
+		if self.OS_NAME_SHORT != 'lin':
+			msg = "WARNING: Pinning the trigger's files in RAM is not supported on your platform"
+			print( msg ); logger.warning( msg )
+			return
+
+		pin_start_time = time.monotonic()
+		from . import pin_lin
+
+		commands = list()
+		if self.trigger_plan != None:
+			commands = self.trigger_plan.get_commands()
+		if self.trigger_pipeline != None:
+			commands = self.trigger_pipeline.get_commands()
+			for plan in self.trigger_pipeline_plans.values():
+				commands += plan.get_commands()
+		if self.escalation_plan != None:
+			commands += self.escalation_plan.get_commands()
+		files = pin_lin.get_trigger_path_files(
+		 commands, [ self.SRC_DIR, self.get_user_triggers_dir() ]
+		)
+
+		pinned = dict()
+		if self.PIN_TRIGGER_PATH:
+			self.trigger_path_pinner = pin_lin.Pinner()
+			pinned = self.trigger_path_pinner.pin( files )
+
+			msg = "INFO: Pinned the " +str(len(files))+ " files that the '" +str(self.trigger)+ "' trigger needs in RAM (" +str( self.trigger_path_pinner.locked_bytes//1024 )+ " of " +str( self.trigger_path_pinner.mapped_bytes//1024 )+ " KiB locked) in " +str( round((time.monotonic()-pin_start_time)*1000, 3) )+ " ms"
+			print( msg ); logger.info( msg )
+
+			unlocked = [ path+ ' (' +str(result)+ ')' for path, result in pinned.items() if result != True ]
+			if len(unlocked) > 0:
+				msg = "DEBUG: Unable to lock these files in RAM:|" +str(unlocked)+ "|"
+				print( msg ); logger.debug( msg )
+
+		at_risk = [
+		 path+ ' (' +str(reason)+ ')'
+		 for path, reason in pin_lin.get_removable_files( files ).items()
+		 if pinned.get( path ) != True
+		]
+		if len(at_risk) == 0:
+			return
+
+		msg = "The '" +str(self.trigger)+ "' trigger needs these files, which are on removable media and aren't pinned in RAM:\n\n" +'\n'.join( at_risk )
+		if self.REFUSE_REMOVABLE_TRIGGER_PATH:
+			self.unpin_trigger_path()
+			msg = "ERROR: " +msg+ "\n\nRefusing to arm."
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		msg = "WARNING: " +msg
+		print( msg ); logger.warning( msg )
+
+	def unpin_trigger_path(self):
+
+		if self.trigger_path_pinner != None:
+			self.trigger_path_pinner.release()
+			self.trigger_path_pinner = None
+
+	# returns the compiled plan for the current trigger, compiling it first if
+	# it hasn't been compiled yet (eg if the trigger is executed without arming)
+	def get_trigger_plan(self):
+
+		if self.trigger_pipeline != None:
+			return None
+
+		if self.trigger_plan == None or self.trigger_plan.trigger != self.trigger:
+			return self.compile_trigger_plan()
+
+		return self.trigger_plan
+
+	# function to set the usb device whose removal executes the trigger (and to
+	# check sanity)
+	def set_trigger_device(self, device_id):
+
+		msg = "DEBUG: Attempting to set 'trigger_device' to '" +str(device_id)+ "'"
+		print( msg ); logger.debug( msg )
+
+		if device_id == None or device_id == '':
+			self.trigger_device = ''
+			msg = "INFO: BusKill will execute the trigger on the removal of any USB device"
+			print( msg ); logger.info( msg )
+			return
+
+		# this throws an exception if the device_id is invalid
+		self.parse_usb_device_id( device_id )
+
+		self.trigger_device = device_id
+		msg = "INFO: BusKill 'trigger_device' set to '" +str(self.trigger_device)+ "'"
+		print( msg ); logger.info( msg )
+
+	def get_trigger_device(self):
+
+		return str(self.trigger_device)
+
+	# function to set the mechanism used to listen for usb hotplug events (and to
+	# check sanity)
+	def set_hotplug_backend(self, hotplug_backend):
+
+		msg = "DEBUG: Attempting to set 'hotplug_backend' to '" +str(hotplug_backend)+ "'"
+		print( msg ); logger.debug( msg )
+
+		if hotplug_backend not in self.SUPPORTED_HOTPLUG_BACKENDS:
+			msg = "WARNING: Attempting to set hotplug_backend to invalid value (" +str(hotplug_backend)+ ")"
+			print( msg ); logger.debug( msg )
+			raise Exception( msg )
+
+		self.hotplug_backend = hotplug_backend
+
+		if hotplug_backend == 'netlink':
+			self.ARM_FUNCTION = self.armNetlink
+			self.ARM_FUNCTION_IS_CANCELLABLE = True
+		elif hotplug_backend == 'libusb':
+			self.ARM_FUNCTION = self.armNix
+			self.ARM_FUNCTION_IS_CANCELLABLE = True
+		elif hotplug_backend == 'sysfs':
+			self.ARM_FUNCTION = self.armSysfs
+			self.ARM_FUNCTION_IS_CANCELLABLE = True
+
+		msg = "INFO: BusKill 'hotplug_backend' set to '" +str(self.hotplug_backend)+ "'"
+		print( msg ); logger.info( msg )
+
+	def get_hotplug_backend(self):
+
+		return str(self.hotplug_backend)
+
+	# returns the tuple that we use to identify a usb1.USBDevice, which is
+	# (bus, port numbers, vendor id, product id). Note that we can't include the
+	# device's serial number because that can't be read after it's removed
+	def get_usb_device_key( self, device ):
+
+		return (
+		 device.getBusNumber(),
+		 tuple( device.getPortNumberList() ),
+		 device.getVendorID(),
+		 device.getProductID()
+		)
+
+	# converts a usb device key into a string formatted like 'BUS-PORTS:VID:PID'
+	# (eg '1-2.3:1a86:7523'). The 'BUS-PORTS' part is the same as the name of
+	# the device's dir in /sys/bus/usb/devices/ on Linux
+	def get_usb_device_id( self, key ):
+
+		(bus, ports, vid, pid) = key
+		return str(bus)+ '-' +'.'.join( [str(port) for port in ports] )+ ':' \
+		 +format(vid, '04x')+ ':' +format(pid, '04x')
+
+	# converts a string formatted like 'BUS-PORTS:VID:PID' or 'VID:PID' into a
+	# tuple of (bus, port numbers, vendor id, product id). The bus and ports
+	# are None if the string didn't specify them
+	def parse_usb_device_id( self, device_id ):
+
+		match = re.match(
+		 "^(?:([0-9]+)-([0-9]+(?:\\.[0-9]+)*):)?([0-9a-fA-F]{4}):([0-9a-fA-F]{4})$",
+		 str(device_id)
+		)
+		if not match:
+			msg = "WARNING: Invalid USB device (" +str(device_id)+ "). Expected 'BUS-PORTS:VID:PID' or 'VID:PID'"
+			print( msg ); logger.debug( msg )
+			raise Exception( msg )
+
+		(bus, ports, vid, pid) = match.groups()
+		if bus != None:
+			bus = int(bus)
+			ports = tuple( [int(port) for port in ports.split('.')] )
+
+		return ( bus, ports, int(vid, 16), int(pid, 16) )
+
+	# returns a list of (device_id, description) tuples for every usb device
+	# that's currently connected, so the user can choose their BusKill cable
+	def list_usb_devices( self ):
+
+		if self.OS_NAME_SHORT not in ['lin','mac']:
+			msg = "ERROR: Listing USB devices is not supported on your platform"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		devices = list()
+		with usb1.USBContext() as context:
+			for device in context.getDeviceIterator( skip_on_error=True ):
+
+				key = self.get_usb_device_key( device )
+
+				# skip root hubs; they're not something that can be unplugged
+				if key[1] == ():
+					continue
+
+				# reading these strings requires opening the device, which we
+				# may not have permission to do
+				description = list()
+				for get_string in [ device.getManufacturer, device.getProduct ]:
+					try:
+						string = get_string()
+						if string:
+							description.append( string )
+					except Exception as e:
+						pass
+
+				devices.append(
+				 ( self.get_usb_device_id( key ), ' '.join( description ) )
+				)
+
+		return devices
+
 	# launches a root child process
 	def spawn_root_child(self):
 		msg = "DEBUG: Called spawn_root_child()"
@@ -610,8 +1292,10 @@ class BusKill:
 		#  * https://github.com/BusKill/buskill-app/issues/14#issuecomment-1272449172
 
 		if self.OS_NAME_SHORT == 'lin':
-			msg = "ERROR: root_child_lin.py not yet implemented"
-			print( msg ); logger.error( msg )
+
+			# only one thread may spawn the root child at a time
+			with self.root_child_lock:
+				return self.spawn_root_child_lin()
 
 		elif self.OS_NAME_SHORT == 'win':
 			msg = "ERROR: root_child_win.py not yet implemented"
@@ -656,39 +1340,7 @@ class BusKill:
 				msg = "DEBUG: root_child_path:|" +str(root_child_path)+ "|"
 				print( msg ); logger.debug( msg )
 
-				# SANITY CHECKS
-
-				mode = oct(os.stat(root_child_path).st_mode)[-4:]
-				owner = os.stat(root_child_path).st_uid
-				group = os.stat(root_child_path).st_gid
-
-				# verify the mode of the file is exactly 0500 (octal)
-				if mode != '0500':
-					msg = 'ERROR: Permissions on root_child are not 0500. Refusing to spawn script as root!'
-					print( msg ); logger.error( msg )
-					return False
-
-				# unfortunaetly we can't package a .dmg with a file owned by root, so on
-				# first run, we expect that the root child script will be owned by the
-				# user that executed the BusKill app
-				# https://github.com/BusKill/buskill-app/issues/14#issuecomment-1279975783
-
-				# verify the file is owned by user = root (or current user)
-				if owner != 0 and owner != os.getuid():
-					msg = 'ERROR: root_child is not owned by root nor your user. Refusing to spawn script as root!'
-					print( msg ); logger.error( msg )
-					return False
-
-				# verify the file is owned by group = root (or current group)
-				if group != 0 and group != os.getgid():
-					msg = 'ERROR: root_child is not owned by gid=0 nor your group. Refusing to spawn script as root!'
-					print( msg ); logger.error( msg )
-					return False
-
-				# verify the "file" isn't actually a symlink
-				if os.path.islink( root_child_path ):
-					msg = 'ERROR: root_child is a link. Refusing to spawn script as root!'
-					print( msg ); logger.error( msg )
+				if not self.is_root_child_path_safe( root_child_path ):
 					return False
 
 				# import some C libraries for interacting via ctypes with the MacOS API
@@ -749,39 +1401,309 @@ class BusKill:
 
 				return True
 
-	# this basically just re-implmenets python's readline().strip() but in C
-	def read_from_root_child_mac(self):
+	# launches the linux root child process, unless it's already running. This
+	# blocks until the root child is ready, which includes the time it takes the
+	# user to type their password, so it's called in its own thread (see
+	# prepare_root_child())
+	def spawn_root_child_lin(self):
 
-		libc = ctypes.cdll.LoadLibrary(ctypes.util.find_library("c"))
+		# is the root child process already started (and still running)?
+		if self.root_child != None and self.root_child['process'].poll() == None:
+			return True
+		self.root_child = None
 
-		# get the output from the child process character-by-character until we hit a new line
-		buf = ctypes.create_string_buffer(1)
-		result = ''
-		for x in range(1,100):
+		msg = "DEBUG: No root_child detected. Attempting to spawn one."
+		print( msg ); logger.debug( msg )
 
-			# read one byte from the child process' communication PIPE and store it to the buffer
-			libc.fread( byref(buf), 1, 1, self.root_child['io'] )
-    
-			# decode the byte stored to the buffer as ascii
-			char = buf.raw[:1].decode('ascii')
+		# we never execute the copy of the root child that ships with the app.
+		# It's owned by the user (so anything running as the user could change
+		# what we execute as root), and in the AppImage it's on a FUSE mount that
+		# root usually can't even read
+		root_child_path = self.ROOT_CHILD_LIN_PATH
 
-			# is the character a newline?
-			if char == "\n":
-				# the character is a newline; stop reading
-				break
-			else:
-				# the character is not a newline; append it to the string and continue reading
-				result += char
+		msg = "DEBUG: root_child_path:|" +str(root_child_path)+ "|"
+		print( msg ); logger.debug( msg )
 
-		return result
+		if not os.path.exists( root_child_path ):
+			msg = "ERROR: The root child isn't installed at '" +str(root_child_path)+ "'. To let BusKill shutdown your computer without asking for your password, install it (as root) with build/linux/install_root_child.sh"
+			print( msg ); logger.error( msg )
+			return False
 
-	def handle_upgrades(self):
+		if not self.is_root_child_path_safe( root_child_path ):
+			return False
 
-		# check to see if we're currently running a new version that is being
-		# executed for the first time after replacing an old version
-		if os.path.isfile( os.path.join( self.EXE_DIR, 'upgraded_from.py' ) ):
-			from upgraded_from import UPGRADED_FROM
-			if os.path.isdir( UPGRADED_FROM['APP_DIR'] ):
+		# the root child is executed directly (its shebang runs it with the
+		# system's python in isolated mode), so that a polkit rule can allow
+		# exactly this program and nothing else. It always writes its log to its
+		# own fixed path
+		exe = [ root_child_path ]
+		if self.ROOT_CHILD_DRY_RUN:
+			exe.append( '--dry-run' )
+
+		# To spawn a child process as root in Linux, we use pkexec, which asks
+		# polkit (and therefore the user, unless a polkit rule says otherwise)
+		# for permission. If there's no pkexec, we try sudo
+		if os.geteuid() != 0:
+			if shutil.which( 'pkexec' ) != None:
+				exe = [ shutil.which( 'pkexec' ) ] + exe
+			elif shutil.which( 'sudo' ) != None:
+				exe = [ shutil.which( 'sudo' ), '--' ] + exe
+			else:
+				msg = 'ERROR: Unable to find pkexec or sudo. Refusing to spawn root_child!'
+				print( msg ); logger.error( msg )
+				return False
+
+		msg = "INFO: You have requested BusKill to do something that requires elevated privliges on your platform. If you'd like to proceed, please authorize BusKill to preform actions as Administrator. Your system may prompt you for your password to proceed."
+		print( msg ); logger.info( msg )
+
+		msg = "DEBUG: Attempting to spawn root child (" +str(exe)+ ")"
+		print( msg ); logger.debug( msg )
+
+		try:
+			process = subprocess.Popen(
+			 exe, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+			)
+		except Exception as e:
+			msg = 'ERROR: root_child spawn attempt failed. ' +str(e)
+			print( msg ); logger.error( msg )
+			return False
+
+		# the root child tells us when it's ready. This includes the time it
+		# takes the user to type their password. We only use it once it is
+		try:
+			reply = self.read_from_root_child_lin( process, self.ROOT_CHILD_SPAWN_TIMEOUT )
+		except Exception as e:
+			reply = str(e)
+
+		if not reply.startswith( 'ready ' ):
+			msg = 'ERROR: root_child didn\'t start (' +str(reply)+ '). Was the authorization cancelled?'
+			print( msg ); logger.error( msg )
+			self.stop_root_child_process( process )
+			return False
+
+		self.root_child = { 'process': process }
+
+		msg = "DEBUG: Root child spawned successfully! (" +str(reply)+ ")"
+		print( msg ); logger.debug( msg )
+
+		return True
+
+	# returns True if the root child at 'root_child_path' passes the sanity
+	# checks that make it (more) safe to execute as root
+	def is_root_child_path_safe(self, root_child_path):
+
+		mode = oct(os.stat(root_child_path).st_mode)[-4:]
+		owner = os.stat(root_child_path).st_uid
+		group = os.stat(root_child_path).st_gid
+
+		# verify the mode of the file is exactly 0500 (octal)
+		if mode != '0500':
+			msg = 'ERROR: Permissions on root_child are not 0500. Refusing to spawn script as root!'
+			print( msg ); logger.error( msg )
+			return False
+
+		# on linux, the root child is installed by root (see spawn_root_child_lin()),
+		# so anything else means that it could have been changed by any process
+		# running as the user
+		if self.OS_NAME_SHORT == 'lin':
+
+			if owner != 0 or group != 0:
+				msg = 'ERROR: root_child is not owned by root:root. Refusing to spawn script as root!'
+				print( msg ); logger.error( msg )
+				return False
+
+			# nor may anyone but root be able to replace it
+			path = os.path.dirname( root_child_path )
+			while True:
+				path_stat = os.stat( path )
+				if path_stat.st_uid != 0 or path_stat.st_mode & 0o022:
+					msg = "ERROR: The root_child's dir '" +str(path)+ "' is not owned by root or is writeable by others. Refusing to spawn script as root!"
+					print( msg ); logger.error( msg )
+					return False
+
+				if os.path.dirname( path ) == path:
+					break
+				path = os.path.dirname( path )
+
+		# unfortunaetly we can't package a .dmg with a file owned by root, so on
+		# first run, we expect that the root child script will be owned by the
+		# user that executed the BusKill app
+		# https://github.com/BusKill/buskill-app/issues/14#issuecomment-1279975783
+
+		# verify the file is owned by user = root (or current user)
+		if owner != 0 and owner != os.getuid():
+			msg = 'ERROR: root_child is not owned by root nor your user. Refusing to spawn script as root!'
+			print( msg ); logger.error( msg )
+			return False
+
+		# verify the file is owned by group = root (or current group)
+		if group != 0 and group != os.getgid():
+			msg = 'ERROR: root_child is not owned by gid=0 nor your group. Refusing to spawn script as root!'
+			print( msg ); logger.error( msg )
+			return False
+
+		# verify the "file" isn't actually a symlink
+		if os.path.islink( root_child_path ):
+			msg = 'ERROR: root_child is a link. Refusing to spawn script as root!'
+			print( msg ); logger.error( msg )
+			return False
+
+		return True
+
+	# returns the next reply from the linux root child 'process', which is a
+	# 4-byte big-endian length followed by that many bytes of ascii. Raises an
+	# Exception if there's no reply within 'timeout' seconds
+	def read_from_root_child_lin(self, process, timeout):
+
+		stdout = process.stdout
+		deadline = time.monotonic() + timeout
+
+		data = b''
+		length = None
+		while length == None or len(data) < 4 + length:
+
+			remaining = deadline - time.monotonic()
+			if remaining <= 0 or len( multiprocessing.connection.wait( [stdout], remaining ) ) == 0:
+				msg = "ERROR: Timed-out waiting for a reply from the root child"
+				print( msg ); logger.error( msg )
+				raise Exception( msg )
+
+			chunk = os.read( stdout.fileno(), 4096 )
+			if chunk == b'':
+				msg = "ERROR: The root child exited"
+				print( msg ); logger.error( msg )
+				raise Exception( msg )
+			data += chunk
+
+			if length == None and len(data) >= 4:
+				length = struct.unpack( '>I', data[:4] )[0]
+
+		return data[4:4+length].decode( 'ascii', errors='replace' )
+
+	# sends 'command' to the linux root child and returns its reply. The root
+	# child is given as long as any other strategy of a trigger
+	def send_root_child_command_lin(self, command, timeout=trigger_plan.STRATEGY_TIMEOUT):
+
+		process = self.root_child['process']
+		payload = command.encode( 'ascii' )
+
+		try:
+			process.stdin.write( struct.pack( '>I', len(payload) ) + payload )
+			process.stdin.flush()
+
+			return self.read_from_root_child_lin( process, timeout )
+
+		except Exception as e:
+			# either it's dead or its reply may still come (and it'd be mistaken
+			# for the reply to our next command), so this root child is no good to
+			# us anymore
+			self.stop_root_child()
+			raise
+
+	# asks the linux root child to exit by closing its stdin. We probably don't
+	# have permission to kill it
+	def stop_root_child(self):
+
+		if self.OS_NAME_SHORT != 'lin' or self.root_child == None:
+			return
+
+		process = self.root_child['process']
+		self.root_child = None
+		self.stop_root_child_process( process )
+
+	def stop_root_child_process(self, process):
+
+		try:
+			process.stdin.close()
+			process.wait( 1 )
+		except Exception as e:
+			msg = "DEBUG: Unable to stop the root child (" +str(e)+ ")"
+			print( msg ); logger.debug( msg )
+
+	# on linux, we start the root child when we arm if the trigger needs root
+	# privileges, so that the user isn't asked for them when the trigger is
+	# executed (and it doesn't have to wait for the escalation)
+	def prepare_root_child(self):
+
+		if not self.needs_root_child():
+			return
+
+		if self.root_child != None and self.root_child['process'].poll() == None:
+			return
+
+		if self.root_child_spawner != None and self.root_child_spawner.is_alive():
+			return
+
+		# spawning it may wait (for up to ROOT_CHILD_SPAWN_TIMEOUT seconds) for
+		# the user to type their password, which must not block arming (or the
+		# GUI). Until it's ready, the trigger is executed without it
+		self.root_child_spawner = threading.Thread(
+		 target = self.spawn_root_child,
+		 daemon = True
+		)
+		self.root_child_spawner.start()
+
+	# returns True if the current trigger is executed with the help of a root
+	# child process
+	def needs_root_child(self):
+
+		# on MacOS, the root child is spawned when the trigger is set
+		if self.OS_NAME_SHORT == 'mac':
+			return self.root_child != None
+
+		if self.OS_NAME_SHORT != 'lin' or 'soft-shutdown' not in self.get_executed_triggers():
+			return False
+
+		if os.geteuid() == 0:
+			return False
+
+		# the only D-Bus method of the soft-shutdown plan is logind's PowerOff,
+		# which is only in the plan if logind says we may call it
+		plan = self.trigger_plan
+		if self.trigger_pipeline != None:
+			plan = self.trigger_pipeline_plans.get( 'soft-shutdown' )
+		if plan == None or plan.trigger != 'soft-shutdown':
+			plan = self.escalation_plan
+		if plan != None and plan.uses_dbus():
+			msg = "DEBUG: logind lets us power off; not spawning a root child"
+			print( msg ); logger.debug( msg )
+			return False
+
+		return True
+
+	# this basically just re-implmenets python's readline().strip() but in C
+	def read_from_root_child_mac(self):
+
+		libc = ctypes.cdll.LoadLibrary(ctypes.util.find_library("c"))
+
+		# get the output from the child process character-by-character until we hit a new line
+		buf = ctypes.create_string_buffer(1)
+		result = ''
+		for x in range(1,100):
+
+			# read one byte from the child process' communication PIPE and store it to the buffer
+			libc.fread( byref(buf), 1, 1, self.root_child['io'] )
+    
+			# decode the byte stored to the buffer as ascii
+			char = buf.raw[:1].decode('ascii')
+
+			# is the character a newline?
+			if char == "\n":
+				# the character is a newline; stop reading
+				break
+			else:
+				# the character is not a newline; append it to the string and continue reading
+				result += char
+
+		return result
+
+	def handle_upgrades(self):
+
+		# check to see if we're currently running a new version that is being
+		# executed for the first time after replacing an old version
+		if os.path.isfile( os.path.join( self.EXE_DIR, 'upgraded_from.py' ) ):
+			from upgraded_from import UPGRADED_FROM
+			if os.path.isdir( UPGRADED_FROM['APP_DIR'] ):
 
 				msg = "DEBUG: Detected first-run of new version. Deleting old version."
 				msg += "\n\t" +str(UPGRADED_FROM)+ "\n"
@@ -908,164 +1830,1546 @@ class BusKill:
 
 		self.GNUPGHOME = os.path.join( self.CACHE_DIR, '.gnupg' )
 
-	def toggle(self):
+	# reads the settings that apply to arming (eg the trigger and the hotplug
+	# backend) from the config file, unless they've already been set
+	def load_arm_settings(self):
+
+		self.config = configparser.ConfigParser()
+		self.config.read( self.CONF_FILE )
 
 		# has the trigger been set yet?
 		if self.trigger == None:
 			# no trigger has been set yet; let's set it to the default
 
 			# set the default trigger to what's defined in the config file
-			self.config = configparser.ConfigParser()
-			self.config.read( self.CONF_FILE )
 			if self.config.has_option('buskill', 'trigger'):
 				trigger = self.config.get('buskill', 'trigger')
 			else:
 				trigger = 'lock-screen'
 			self.set_trigger( trigger )
 
-		if self.is_armed:
-			msg = "DEBUG: attempting to disarm BusKill"
-			print( msg ); logger.debug( msg )
+		# has the user chosen which usb device executes the trigger yet?
+		if self.trigger_device == None:
+			if self.config.has_option('buskill', 'device'):
+				self.set_trigger_device( self.config.get('buskill', 'device') )
+			else:
+				self.set_trigger_device( '' )
+
+		# has the user chosen how to listen for usb hotplug events yet?
+		if self.hotplug_backend == None:
+			if self.config.has_option('buskill', 'hotplug_backend'):
+				self.set_hotplug_backend( self.config.get('buskill', 'hotplug_backend') )
+			else:
+				self.set_hotplug_backend( self.SUPPORTED_HOTPLUG_BACKENDS[0] )
+
+		# has the user chosen where the trigger should be executed yet?
+		if self.RUN_TRIGGER_IN_LISTENER == None:
+			if self.config.has_option('buskill', 'run_trigger_in_listener'):
+				self.RUN_TRIGGER_IN_LISTENER = self.config.getboolean(
+				 'buskill', 'run_trigger_in_listener'
+				)
+			else:
+				self.RUN_TRIGGER_IN_LISTENER = False
+
+		# has the user chosen whether to listen for usb events in a thread yet?
+		if self.ARM_IN_THREAD == None:
+			if self.config.has_option('buskill', 'arm_in_thread'):
+				self.ARM_IN_THREAD = self.config.getboolean(
+				 'buskill', 'arm_in_thread'
+				)
+			else:
+				self.ARM_IN_THREAD = False
+
+		# has the user chosen whether to keep the usb_handler running between
+		# arming and disarming yet?
+		if self.PERSISTENT_USB_HANDLER == None:
+			if self.config.has_option('buskill', 'persistent_listener'):
+				self.PERSISTENT_USB_HANDLER = self.config.getboolean(
+				 'buskill', 'persistent_listener'
+				)
+			else:
+				self.PERSISTENT_USB_HANDLER = False
+
+		# has the user chosen whether to use the lean usb_listener.py script as
+		# the persistent usb_handler yet?
+		if self.LEAN_USB_HANDLER == None:
+			if self.config.has_option('buskill', 'lean_listener'):
+				self.LEAN_USB_HANDLER = self.config.getboolean(
+				 'buskill', 'lean_listener'
+				)
+			else:
+				self.LEAN_USB_HANDLER = False
+
+		# only our MacOS build has a frozen usb_listener binary. Builds without
+		# one (like our Windows build) can't execute usb_listener.py either, since
+		# sys.executable is BusKill itself, so they use the forked usb_handler
+		if self.LEAN_USB_HANDLER and self.get_lean_usb_handler_exe() == None:
+			msg = "WARNING: The lean usb_handler isn't available in this build of BusKill. Falling back to the persistent usb_handler."
+			print( msg ); logger.warning( msg )
+			self.LEAN_USB_HANDLER = False
+
+		# has the user chosen whether to execute the trigger if the usb_handler
+		# dies while armed yet?
+		if self.FAILSAFE_TRIGGER == None:
+			if self.config.has_option('buskill', 'failsafe_trigger'):
+				self.FAILSAFE_TRIGGER = self.config.getboolean(
+				 'buskill', 'failsafe_trigger'
+				)
+			else:
+				self.FAILSAFE_TRIGGER = False
+
+		# has the user chosen whether to start a trigger executor when arming yet?
+		if self.TRIGGER_EXECUTOR == None:
+			if self.config.has_option('buskill', 'trigger_executor'):
+				self.TRIGGER_EXECUTOR = self.config.getboolean(
+				 'buskill', 'trigger_executor'
+				)
+			else:
+				self.TRIGGER_EXECUTOR = False
+
+		# has the user chosen whether to harden the usb_handler and the trigger
+		# executor yet?
+		if self.HARDENED_MODE == None:
+			if self.config.has_option('buskill', 'hardened_mode'):
+				self.HARDENED_MODE = self.config.getboolean(
+				 'buskill', 'hardened_mode'
+				)
+			else:
+				self.HARDENED_MODE = False
+
+		# has the user chosen whether to pin the trigger's files in RAM yet?
+		if self.PIN_TRIGGER_PATH == None:
+			if self.config.has_option('buskill', 'pin_trigger_path'):
+				self.PIN_TRIGGER_PATH = self.config.getboolean(
+				 'buskill', 'pin_trigger_path'
+				)
+			else:
+				self.PIN_TRIGGER_PATH = False
+
+		# has the user chosen whether to refuse to arm when the trigger depends on
+		# removable media yet?
+		if self.REFUSE_REMOVABLE_TRIGGER_PATH == None:
+			if self.config.has_option('buskill', 'refuse_removable_trigger_path'):
+				self.REFUSE_REMOVABLE_TRIGGER_PATH = self.config.getboolean(
+				 'buskill', 'refuse_removable_trigger_path'
+				)
+			else:
+				self.REFUSE_REMOVABLE_TRIGGER_PATH = False
+
+		# has the user chosen whether to verify that the lock-screen trigger
+		# actually locked the screen yet?
+		if self.VERIFY_LOCK_SCREEN == None:
+			if self.config.has_option('buskill', 'verify_lock_screen'):
+				self.VERIFY_LOCK_SCREEN = self.config.getboolean(
+				 'buskill', 'verify_lock_screen'
+				)
+			else:
+				self.VERIFY_LOCK_SCREEN = True
+
+		# has the user chosen a trigger to execute if the screen doesn't lock yet?
+		if self.LOCK_ESCALATION_TRIGGER == None:
+			if self.config.has_option('buskill', 'lock_escalation_trigger'):
+				self.set_lock_escalation_trigger(
+				 self.config.get('buskill', 'lock_escalation_trigger')
+				)
+			else:
+				self.LOCK_ESCALATION_TRIGGER = ''
+
+	# does all the work of finding out how to execute the current trigger, so
+	# that it's ready to go when the cable is removed. This is called when we
+	# arm and when the trigger is changed while we're armed
+	def prepare_trigger(self):
+
+		self.load_trigger_plugins()
+		self.compile_trigger_plan()
+		self.pin_trigger_path()
+		self.start_trigger_executor()
+		self.prepare_root_child()
+
+	# applies a change to the trigger (see set_trigger()) while we're armed with
+	# a persistent usb_handler, without disarming. Returns False if we'd have to
+	# disarm & arm again instead
+	def retarget(self):
+
+		with self.toggle_lock:
+
+			if not self.is_armed or self.usb_handler_control == None:
+				return False
+
+			self.prepare_trigger()
+			self.retarget_usb_handler()
+
+		msg = "INFO: BusKill is armed with the '" +str(self.trigger)+ "' trigger"
+		print( msg ); logger.info( msg )
+
+		return True
+
+	def toggle(self):
+
+		# the watchdog may re-arm from its own thread, so only one toggle at a time
+		with self.toggle_lock:
+
+			self.load_arm_settings()
+
+			toggle_start_time = time.monotonic()
+
+			if self.is_armed and self.usb_handler_control != None:
+				msg = "DEBUG: attempting to disarm BusKill's persistent usb_handler"
+				print( msg ); logger.debug( msg )
+
+				# we set this first so the watchdog knows not to restart the
+				# usb_handler if it exits
+				self.is_armed = False
+
+				# the persistent usb_handler stays running; we just tell it to stop
+				# listening for removal events
+				try:
+					self.send_usb_handler_command( 'disarm' )
+				except Exception as e:
+					# if it's not responding, then it's no good to us anymore anyway
+					self.stop_persistent_usb_handler()
+
+				self.stop_trigger_executor()
+				self.unpin_trigger_path()
+				self.arm_epoch.disarm()
+				msg = "INFO: BusKill is disarmed."
+				print( msg ); logger.info( msg )
+
+				msg = "DEBUG: Disarming took " +str( round((time.monotonic()-toggle_start_time)*1000, 3) )+ " ms"
+				print( msg ); logger.debug( msg )
+
+			elif self.is_armed:
+				msg = "DEBUG: attempting to disarm BusKill"
+				print( msg ); logger.debug( msg )
+
+				# we set this first so the watchdog knows not to restart the
+				# usb_handler when we stop it
+				self.is_armed = False
+
+				# if the arm function can be stopped cleanly, then ask it to stop and
+				# give it a moment to do so
+				if self.usb_handler_stop != None:
+					try:
+						self.usb_handler_stop.send_bytes( b'disarm' )
+						self.usb_handler.join( 1 )
+					except:
+						pass
+					self.usb_handler_stop = None
+
+				# otherwise, disarm just means to terminate the child process in which
+				# the arm function was spawned. this works on all platforms (but not
+				# for threads, which can't be killed)
+				try:
+					if self.usb_handler.is_alive():
+						self.usb_handler.kill()
+					self.usb_handler.join()
+				except:
+					pass
+
+				self.stop_trigger_executor()
+				self.unpin_trigger_path()
+				self.arm_epoch.disarm()
+				msg = "INFO: BusKill is disarmed."
+				print( msg ); logger.info( msg )
+
+				msg = "DEBUG: Disarming took " +str( round((time.monotonic()-toggle_start_time)*1000, 3) )+ " ms"
+				print( msg ); logger.debug( msg )
+
+			else:
+				msg = "DEBUG: attempting to arm BusKill via " +str(self.ARM_FUNCTION)+ "() with the '" +str(self.trigger)+ "' trigger"
+				print( msg ); logger.debug( msg )
+
+				# do all the work of finding out how to execute the trigger now, so
+				# the usb_handler gets a copy of the plan and doesn't have to do it
+				# when the cable is removed
+				self.prepare_trigger()
+
+				self.start_usb_handler()
+
+				msg = "INFO: BusKill is armed. Listening for removal event.\n"
+				msg+= "INFO: To disarm the CLI, exit with ^C or close this terminal"
+				print( msg ); logger.info( msg )
+
+				msg = "DEBUG: Arming took " +str( round((time.monotonic()-toggle_start_time)*1000, 3) )+ " ms"
+				print( msg ); logger.debug( msg )
+
+	# starts listening for removal events with a new arm epoch (in a new
+	# usb_handler, or in the persistent one) and starts watching it. The trigger
+	# must have been prepared already (see prepare_trigger()). This is the part
+	# of arming that the watchdog repeats when the usb_handler dies
+	def start_usb_handler(self):
+
+		# start a new arm epoch. The usb_handler gets a copy of it (or, if it's
+		# persistent, its number) so that it fires the trigger at most once
+		self.arm_epoch.arm()
+
+		# create a ring buffer so that the child can communicate up to the
+		# parent
+		if self.usb_handler_ring == None:
+			self.usb_handler_ring = event_ring.EventRing()
+
+		persistent = self.PERSISTENT_USB_HANDLER or self.LEAN_USB_HANDLER
+		if persistent and self.ARM_FUNCTION_IS_CANCELLABLE:
+
+			# (re)start the persistent usb_handler if it isn't already running
+			# and responsive
+			if self.usb_handler_control == None:
+				self.start_persistent_usb_handler()
+			else:
+				try:
+					self.ping_usb_handler()
+				except Exception as e:
+					self.stop_persistent_usb_handler()
+					self.start_persistent_usb_handler()
+
+			# make sure it has the current trigger and tell it to start
+			# listening for removal events
+			self.retarget_usb_handler()
+
+			self.is_armed = True
+			self.start_usb_handler_watchdog()
+			return
+
+		elif persistent:
+			msg = "WARNING: Unable to use a persistent usb_handler with the '" +str(self.hotplug_backend)+ "' hotplug backend. Falling back to a new child process."
+			print( msg ); logger.warning( msg )
+
+		# should the child execute the trigger itself?
+		self.trigger_in_usb_handler = self.can_trigger_in_usb_handler()
+
+		# if the arm function supports it, give it a pipe on which we can ask
+		# it to exit cleanly when we disarm
+		kwargs = dict()
+		if self.ARM_FUNCTION_IS_CANCELLABLE:
+			stop_reader, self.usb_handler_stop = multiprocessing.Pipe( duplex=False )
+			kwargs['stop_conn'] = stop_reader
+
+		if self.ARM_IN_THREAD and self.ARM_FUNCTION_IS_CANCELLABLE:
+			# launch an asynchronous thread in this process that'll loop and
+			# listen for usb events
+			if self.HARDENED_MODE:
+				msg = "WARNING: Hardened mode can only raise the priority of the usb_handler thread when 'arm_in_thread' is set. Its memory won't be locked, and the OOM killer won't spare it; listen in a child process for that."
+				print( msg ); logger.warning( msg )
+
+			self.usb_handler = self.Thread(
+			 target = self.ARM_FUNCTION,
+			 kwargs = kwargs,
+			 hardened = self.HARDENED_MODE
+			)
+
+		else:
+			if self.ARM_IN_THREAD:
+				msg = "WARNING: Unable to listen for usb events in a thread with the '" +str(self.hotplug_backend)+ "' hotplug backend. Falling back to a child process."
+				print( msg ); logger.warning( msg )
+
+			# launch an asynchronous child process that'll loop and listen for
+			# usb events
+			self.usb_handler = self.Process(
+			 target = self.listenInChild,
+			 kwargs = kwargs,
+			 hardened = self.HARDENED_MODE
+			)
+
+		self.usb_handler.start()
+
+		self.is_armed = True
+		self.start_usb_handler_watchdog()
+
+	###############################
+	# USB_HANDLER WATCHDOG        #
+	###############################
+
+	# starts the watchdog thread if it isn't already running, and tells it that
+	# there's a new usb_handler to watch
+	def start_usb_handler_watchdog( self ):
+
+		self.usb_handler_start_time = time.monotonic()
+		if self.usb_handler_watchdog_status['state'] != 'restarting':
+			self.usb_handler_watchdog_status['state'] = 'running'
+
+		# wake-up anyone that's waiting for a new usb_handler
+		with self.usb_handler_replaced:
+			self.usb_handler_replaced.notify_all()
+
+		if self.usb_handler_watchdog != None and self.usb_handler_watchdog.is_alive():
+			self.usb_handler_watchdog_wake.send_bytes( b'wake' )
+			return
+
+		self.usb_handler_watchdog_wake_reader, self.usb_handler_watchdog_wake = \
+		 multiprocessing.Pipe( duplex=False )
+
+		self.usb_handler_watchdog = threading.Thread(
+		 target = self.watch_usb_handler,
+		 daemon = True
+		)
+		self.usb_handler_watchdog.start()
+
+	# this runs in the watchdog thread for as long as the app is running. It
+	# sleeps until either the usb_handler exits (its sentinel or, for a Process,
+	# its exception pipe becomes ready) or we're told to watch a new usb_handler
+	def watch_usb_handler( self ):
+
+		wake_reader = self.usb_handler_watchdog_wake_reader
+
+		# the last usb_handler that we saw exit. Its sentinel stays ready forever,
+		# so we must stop waiting on it
+		exited = None
+
+		while True:
+
+			usb_handler = self.usb_handler
+			waitables = [ wake_reader ]
+			if usb_handler != None and usb_handler is not exited:
+				waitables.append( usb_handler.sentinel )
+				if getattr( usb_handler, 'exception_pipe', None ) != None:
+					waitables.append( usb_handler.exception_pipe )
+
+			ready = multiprocessing.connection.wait( waitables )
+			detection_time = time.monotonic()
+
+			if wake_reader in ready:
+				while wake_reader.poll():
+					wake_reader.recv_bytes()
+				continue
+
+			exited = usb_handler
+
+			# let anyone waiting on this usb_handler know that it's gone
+			with self.usb_handler_replaced:
+				self.usb_handler_replaced.notify_all()
+
+			# was this expected (eg because we disarmed)?
+			if not self.is_armed or usb_handler is not self.usb_handler \
+			 or self.SIMULATE_HOTPLUG_REMOVAL:
+				msg = "DEBUG: usb_handler exited while disarmed"
+				print( msg ); logger.debug( msg )
+				continue
+
+			self.handle_usb_handler_death( usb_handler, detection_time )
+
+	# called by the watchdog when the usb_handler died while we were armed
+	def handle_usb_handler_death( self, usb_handler, detection_time ):
+
+		status = self.usb_handler_watchdog_status
+		status['state'] = 'dead'
+		status['deaths'] += 1
+
+		reason = 'exited'
+		try:
+			if usb_handler.exception:
+				reason = str( usb_handler.exception[0] )
+			else:
+				# the sentinel is ready, so this doesn't actually block
+				usb_handler.join( 1 )
+				if getattr( usb_handler, 'exitcode', None ) != None:
+					reason = 'exit code ' +str(usb_handler.exitcode)
+		except Exception as e:
+			pass
+		status['last_exit_reason'] = reason
+
+		# how long did it take us to notice? We only know when it exited if it
+		# exited cleanly enough to tell us
+		status['last_detection_ms'] = None
+		if getattr( usb_handler, 'exit_time', None ) != None:
+			status['last_detection_ms'] = round( (detection_time - usb_handler.exit_time)*1000, 3 )
+
+		msg = "ERROR: The usb_handler died while BusKill was armed (" +str(reason)+ "). Detected after " +str(status['last_detection_ms'])+ " ms"
+		print( msg ); logger.error( msg )
+
+		if self.usb_handler_watchdog_callback != None:
+			self.usb_handler_watchdog_callback( self.get_watchdog_status() )
+
+		# if the user would rather lose their session than be unprotected, then
+		# execute the trigger (but only once per arm epoch)
+		if self.FAILSAFE_TRIGGER and self.triggered_epoch != self.arm_epoch.number:
+			msg = "WARNING: Executing fail-safe trigger because the usb_handler died"
+			print( msg ); logger.warning( msg )
+
+			self.triggered_epoch = self.arm_epoch.number
+			self.execute_trigger()
+
+		self.restart_usb_handler( usb_handler, detection_time )
+
+	# re-arms BusKill with a new usb_handler after the old one died, waiting
+	# longer each consecutive time. Gives-up (and disarms) if it keeps dying
+	def restart_usb_handler( self, dead_usb_handler, detection_time ):
+
+		status = self.usb_handler_watchdog_status
+
+		# a usb_handler that ran for a while before dying isn't a crash loop
+		if self.usb_handler_start_time != None \
+		 and detection_time - self.usb_handler_start_time > WATCHDOG_HEALTHY_AFTER:
+			status['consecutive_failures'] = 0
+
+		while True:
+
+			status['consecutive_failures'] += 1
+			if status['consecutive_failures'] > WATCHDOG_MAX_RESTARTS:
+				msg = "ERROR: The usb_handler died " +str(WATCHDOG_MAX_RESTARTS)+ " times in a row. Giving up; BusKill is disarmed!"
+				print( msg ); logger.error( msg )
+
+				with self.toggle_lock:
+					if self.usb_handler is dead_usb_handler:
+						self.is_armed = False
+						self.arm_epoch.disarm()
+				status['state'] = 'failed'
+				break
+
+			delay = min(
+			 WATCHDOG_BACKOFF_MIN * 2**(status['consecutive_failures']-1),
+			 WATCHDOG_BACKOFF_MAX
+			)
+			status['state'] = 'restarting'
+			msg = "INFO: Restarting the usb_handler in " +str(delay)+ " seconds"
+			print( msg ); logger.info( msg )
+			time.sleep( delay )
+
+			with self.toggle_lock:
+
+				# did the user disarm (or re-arm) while we were waiting?
+				if not self.is_armed or self.usb_handler is not dead_usb_handler:
+					return
+
+				restart_start_time = time.monotonic()
+				try:
+					# the trigger that was prepared when we armed (its plan, executor,
+					# pinned files and root child) is still good, so we only start a
+					# new usb_handler
+					self.start_usb_handler()
+				except Exception as e:
+					msg = "ERROR: Unable to restart the usb_handler (" +str(e)+ ")"
+					print( msg ); logger.error( msg )
+					self.is_armed = True
+					continue
+
+				status['restarts'] += 1
+				status['last_restart_ms'] = round( (time.monotonic()-restart_start_time)*1000, 3 )
+				status['state'] = 'running'
+
+			msg = "INFO: Restarted the usb_handler in " +str(status['last_restart_ms'])+ " ms"
+			print( msg ); logger.info( msg )
+			break
+
+		with self.usb_handler_replaced:
+			self.usb_handler_replaced.notify_all()
+
+		if self.usb_handler_watchdog_callback != None:
+			self.usb_handler_watchdog_callback( self.get_watchdog_status() )
+
+	# returns a copy of the watchdog's status. 'state' is one of 'stopped',
+	# 'running', 'dead', 'restarting' or 'failed'
+	def get_watchdog_status( self ):
+
+		status = dict( self.usb_handler_watchdog_status )
+		status['armed'] = self.is_armed
+		status['usb_handler_alive'] = False
+		if self.usb_handler != None:
+			status['usb_handler_alive'] = self.usb_handler.is_alive()
+
+		return status
+
+	# blocks until the given (dead) usb_handler has been replaced by the
+	# watchdog, and then returns the new one. Returns None if BusKill was
+	# disarmed instead
+	def wait_usb_handler_replaced( self, usb_handler, timeout=None ):
+
+		with self.usb_handler_replaced:
+			self.usb_handler_replaced.wait_for(
+			 lambda: not self.is_armed or self.usb_handler is not usb_handler,
+			 timeout
+			)
+
+		if not self.is_armed or self.usb_handler is usb_handler:
+			return None
+
+		return self.usb_handler
+
+	###############################
+	# PERSISTENT USB_HANDLER      #
+	###############################
+
+	# The persistent usb_handler is a child process that's started once and kept
+	# running (with its hotplug backend already set-up) for as long as the app
+	# is running. We control it by sending it commands over a pipe. Each command
+	# and each reply is one ascii message, framed by multiprocessing's
+	# send_bytes() & recv_bytes(). Commands are:
+	#
+	#  * 'arm <0|1> <epoch>' start listening for removal events. The first
+	#                        argument says if the trigger should be executed in
+	#                        the child. The second is the number of the new arm
+	#                        epoch (see arm_epoch.py)
+	#  * 'disarm'            stop listening for removal events
+	#  * 'set-trigger <name>' change the trigger
+	#  * 'status'            get the child's state
+	#  * 'ping'              check that the child is alive and responsive
+	#  * 'harden'            apply hardened mode (see hardening.py) to the child,
+	#                        and reply with what it got
+	#  * 'exit'              exit the child process
+	#
+	# Replies start with 'ok' or 'error', optionally followed by a space & info
+
+	# starts the persistent usb_handler child process
+	def start_persistent_usb_handler( self ):
+
+		if self.LEAN_USB_HANDLER:
+			return self.start_lean_usb_handler()
+
+		msg = "DEBUG: Starting persistent usb_handler"
+		print( msg ); logger.debug( msg )
+
+		self.usb_handler_control, control_conn = multiprocessing.Pipe()
+
+		self.usb_handler = self.Process(
+		 target = self.listenPersistent,
+		 kwargs = { 'control_conn': control_conn }
+		)
+		self.usb_handler.start()
+
+		# close our copy of the child's end of the pipe so that we get an
+		# EOFError (instead of blocking) if the child dies
+		control_conn.close()
+
+		self.harden_usb_handler()
+
+	# starts the usb_listener.py script as the persistent usb_handler. It takes
+	# the same commands as listenPersistent(), but it sends removal events over
+	# its own pipe because it can't use our shared memory ring buffer
+	def start_lean_usb_handler( self ):
+
+		msg = "DEBUG: Starting lean usb_handler"
+		print( msg ); logger.debug( msg )
+
+		exe = self.get_lean_usb_handler_exe()
+
+		control_parent, control_child = socket.socketpair()
+		events_reader, events_writer = os.pipe()
+
+		exe += [
+		 self.hotplug_backend,
+		 str(control_child.fileno()),
+		 str(events_writer),
+		 self.LOG_FILE_PATH
+		]
+		msg = "DEBUG: Executing " +str(exe)
+		print( msg ); logger.debug( msg )
+
+		self.usb_handler = self.Subprocess(
+		 exe, pass_fds = ( control_child.fileno(), events_writer )
+		)
+
+		# close our copies of the child's ends so that we get an EOFError (instead
+		# of blocking) if the child dies
+		control_child.close()
+		os.close( events_writer )
+
+		self.usb_handler_control = multiprocessing.connection.Connection(
+		 control_parent.detach()
+		)
+		self.usb_handler_events = multiprocessing.connection.Connection(
+		 events_reader, writable=False
+		)
+
+		# the whole point of the lean usb_handler is to be small; let's make sure
+		status = self.get_usb_handler_status()
+		msg = "DEBUG: Lean usb_handler uses " +str(status['rss_kib'])+ " KiB RSS and took " +str(status['import_ms'])+ " ms to import"
+		print( msg ); logger.debug( msg )
+
+		if int(status['rss_kib']) > usb_listener.RSS_BUDGET_KIB \
+		 or float(status['import_ms']) > usb_listener.IMPORT_TIME_BUDGET_MS:
+			msg = "WARNING: Lean usb_handler is over its budget of " +str(usb_listener.RSS_BUDGET_KIB)+ " KiB RSS and " +str(usb_listener.IMPORT_TIME_BUDGET_MS)+ " ms import time"
+			print( msg ); logger.warning( msg )
+
+		# we measure it first, because locking its memory changes its RSS
+		self.harden_usb_handler()
+
+	# returns the command that executes the lean usb_handler, or None if this
+	# build of BusKill doesn't have one
+	def get_lean_usb_handler_exe( self ):
+
+		# was BusKill called as a binary or a script?
+		if self.EXECUTED_AS_SCRIPT == False:
+			# this execution was a binary
+			usb_listener_path = self.SRC_DIR +os.sep+ 'usb_listener'
+			if not os.path.isfile( usb_listener_path ):
+				return None
+
+			return [ usb_listener_path ]
+
+		else:
+			# this execution was a script (including our Linux AppImage, which
+			# executes main.py with its own python)
+			return [
+			 sys.executable,
+			 self.SRC_DIR +os.sep+ 'packages' +os.sep+ 'buskill' +os.sep+ 'usb_listener.py'
+			]
+
+	# asks the persistent usb_handler to apply hardened mode (if the user wants
+	# it) and logs what it got. The usb_handler works without it, so failing
+	# to harden it isn't fatal
+	def harden_usb_handler( self ):
+
+		if not self.HARDENED_MODE:
+			return
+
+		try:
+			# locking the memory of a big process can take a moment
+			reply = self.send_usb_handler_command( 'harden', timeout=5 )
+			msg = "INFO: The persistent usb_handler is hardened: " +str(reply[3:])
+			print( msg ); logger.info( msg )
+		except Exception as e:
+			msg = "WARNING: Unable to harden the persistent usb_handler (" +str(e)+ ")"
+			print( msg ); logger.warning( msg )
+
+	# stops the persistent usb_handler child process, if it's running
+	def stop_persistent_usb_handler( self ):
+
+		if self.usb_handler_control == None:
+			return
+
+		msg = "DEBUG: Stopping persistent usb_handler"
+		print( msg ); logger.debug( msg )
+
+		try:
+			self.send_usb_handler_command( 'exit' )
+			self.usb_handler.join( 1 )
+		except Exception as e:
+			pass
+
+		try:
+			if self.usb_handler.is_alive():
+				self.usb_handler.kill()
+			self.usb_handler.join()
+		except Exception as e:
+			pass
+
+		self.usb_handler_control.close()
+		self.usb_handler_control = None
+
+		if self.usb_handler_events != None:
+			self.usb_handler_events.close()
+			self.usb_handler_events = None
+
+	# sends one command to the persistent usb_handler child process and returns
+	# its reply. Raises an exception if the child doesn't reply in time or if it
+	# replies with an error
+	def send_usb_handler_command( self, command, timeout=1 ):
+
+		if self.usb_handler_control == None:
+			msg = "ERROR: The persistent usb_handler is not running"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		try:
+			self.usb_handler_control.send_bytes( command.encode('ascii') )
+
+			if not self.usb_handler_control.poll( timeout ):
+				raise TimeoutError( "no reply within " +str(timeout)+ " seconds" )
+
+			reply = self.usb_handler_control.recv_bytes().decode('ascii')
+
+		except (OSError, EOFError) as e:
+			msg = "ERROR: Unable to send '" +str(command)+ "' to the persistent usb_handler (" +str(e)+ ")"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		if not reply.startswith( 'ok' ):
+			msg = "ERROR: The persistent usb_handler replied to '" +str(command)+ "' with '" +str(reply)+ "'"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		return reply
+
+	# returns the number of seconds that it took the persistent usb_handler child
+	# process to respond to a ping. Raises an exception if it's not responsive
+	def ping_usb_handler( self ):
+
+		start_time = time.monotonic()
+		self.send_usb_handler_command( 'ping' )
+		return time.monotonic() - start_time
+
+	# returns the state of the persistent usb_handler child process as a dict
+	def get_usb_handler_status( self ):
+
+		reply = self.send_usb_handler_command( 'status' )
+
+		status = dict()
+		for field in reply.split(' ')[1:]:
+			(key, value) = field.split( '=', 1 )
+			status[key] = value
+
+		return status
+
+	# sends the current trigger to the persistent usb_handler and (re)arms it.
+	# The trigger must have been prepared already (see retarget())
+	def retarget_usb_handler( self ):
+
+		self.trigger_in_usb_handler = self.can_trigger_in_usb_handler()
+
+		self.send_usb_handler_command( 'set-trigger ' +str(self.trigger) )
+
+		# the usb_handler was started before the plan was compiled
+		if self.usb_handler_events == None and self.trigger_plan != None:
+			self.send_usb_handler_command(
+			 'set-trigger-plan ' +json.dumps( self.trigger_plan.to_dict() )
+			)
+
+		# the lean usb_handler doesn't have our trigger functions or libusb
+		# device list, so we also send it everything it needs to know about them
+		if self.usb_handler_events != None:
+
+			commands = self.get_trigger_commands()
+			if commands != None:
+				self.send_usb_handler_command(
+				 'set-trigger-commands ' +json.dumps( commands )
+				)
+
+			self.send_usb_handler_command( 'set-device ' +json.dumps( self.get_usb_device_match() ) )
+
+		if self.trigger_in_usb_handler:
+			self.send_usb_handler_command( 'arm 1 ' +str(self.arm_epoch.number) )
+		else:
+			self.send_usb_handler_command( 'arm 0 ' +str(self.arm_epoch.number) )
+
+	# returns True if the usb_handler child should execute the trigger itself
+	# (see RUN_TRIGGER_IN_LISTENER). If the user wants it to, but it can't, then
+	# this logs why and returns False, so the trigger is executed by this process
+	def can_trigger_in_usb_handler( self ):
+
+		if not self.RUN_TRIGGER_IN_LISTENER:
+			return False
+
+		# the root child's pipe can't be shared with the usb_handler child process,
+		# so triggers that depend on it have to be executed by this process
+		if self.needs_root_child():
+			msg = "WARNING: The '" +str(self.trigger)+ "' trigger can't be executed inside the usb_handler child process on this platform. Falling back to executing it in the parent process."
+			print( msg ); logger.warning( msg )
+			return False
+
+		# nor can a trigger that may escalate, since the child may not have the
+		# current escalation settings
+		if 'lock-screen' in self.get_executed_triggers() and self.LOCK_ESCALATION_TRIGGER:
+			msg = "WARNING: The '" +str(self.trigger)+ "' trigger may escalate to the '" +str(self.LOCK_ESCALATION_TRIGGER)+ "' trigger, so it can't be executed inside the usb_handler child process. Falling back to executing it in the parent process."
+			print( msg ); logger.warning( msg )
+			return False
+
+		# the lean usb_handler can only execute triggers that are just commands
+		if self.LEAN_USB_HANDLER and self.ARM_FUNCTION_IS_CANCELLABLE \
+		 and self.get_trigger_commands() == None:
+			msg = "WARNING: The '" +str(self.trigger)+ "' trigger can't be executed inside the lean usb_handler. Falling back to executing it in the parent process."
+			print( msg ); logger.warning( msg )
+			return False
+
+		msg = "DEBUG: The '" +str(self.trigger)+ "' trigger will be executed inside the usb_handler child process"
+		print( msg ); logger.debug( msg )
+
+		return True
+
+	# returns a dict describing which usb devices the lean usb_handler should
+	# listen for. 'keys' is a list of the keys of the matching devices that are
+	# connected now (see build_usb_device_index()) and 'vid_pid' is their vendor
+	# & product ids. Both are None if the removal of any device should trigger
+	def get_usb_device_match( self ):
+
+		if not self.trigger_device:
+			return { 'keys': None, 'vid_pid': None }
+
+		(bus, ports, vid, pid) = self.parse_usb_device_id( self.trigger_device )
+
+		if self.hotplug_backend in ['netlink', 'sysfs']:
+			index = self.build_usb_device_index( netlink_lin.list_usb_devices() )
+		else:
+			with usb1.USBContext() as context:
+				index = self.build_usb_device_index(
+				 ( self.get_usb_device_key( device ), None )
+				 for device in context.getDeviceIterator( skip_on_error=True )
+				)
+
+		keys = None
+		if index != None:
+			keys = [ list(key) for key in index.keys() ]
+
+		return { 'keys': keys, 'vid_pid': [vid, pid] }
+
+	# this is the target of a (non-persistent) usb_handler child process. It
+	# got a copy of our D-Bus connections when it was forked, which it must not
+	# share with us; it opens its own only if it'll execute the trigger
+	def listenInChild( self, **kwargs ):
+
+		if self.trigger_bus != None:
+			self.reconnect_trigger_bus( reconnect = self.trigger_in_usb_handler )
+
+		return self.ARM_FUNCTION( **kwargs )
+
+	# this is the target of the persistent usb_handler child process
+	def listenPersistent( self, control_conn ):
+
+		msg = "DEBUG: Persistent usb_handler started with '" +str(self.hotplug_backend)+ "' hotplug backend"
+		print( msg ); logger.debug( msg )
+
+		# we open our own D-Bus connections when we get a plan that needs them
+		if self.trigger_bus != None:
+			self.reconnect_trigger_bus( reconnect=False )
+
+		if self.hotplug_backend == 'libusb' and self.OS_NAME_SHORT == 'lin' \
+		 and not self.libusb_has_hotplug():
+			msg = "WARNING: libusb is missing hotplug support; falling back to the 'sysfs' hotplug backend"
+			print( msg ); logger.warning( msg )
+
+			# note this only changes the backend in this child process
+			self.hotplug_backend = 'sysfs'
+
+		if self.hotplug_backend == 'libusb':
+
+			with usb1.USBContext() as context:
+
+				if not context.hasCapability(usb1.CAP_HAS_HOTPLUG):
+					msg = 'ERROR: Hotplug support is missing'
+					print( msg ); logger.error( msg )
+					return msg
+
+				return self.persistent_usb_handler_loop( control_conn, context )
+
+		return self.persistent_usb_handler_loop( control_conn )
+
+	# the main loop of the persistent usb_handler. If 'context' is given, then
+	# it's a libusb context. Otherwise, we use the netlink or sysfs backend
+	def persistent_usb_handler_loop( self, control_conn, context=None ):
+
+		self.usb_handler_armed = False
+		hotplug_handle = None
+		sock = None
+		tracker = None
+		watcher = None
+
+		try:
+			while True:
+
+				# if we're armed, sleep until a usb event or a command arrives. The
+				# event handlers return as soon as control_conn becomes readable
+				if self.usb_handler_armed:
+					if context != None:
+						self.handle_usb_events_until_stopped( context, control_conn )
+					elif watcher != None:
+						sysfs_lin.listen( watcher, self.hotplugCallbackNetlink, control_conn )
+					else:
+						netlink_lin.listen(
+						 sock, self.hotplugCallbackNetlink, control_conn, tracker
+						)
+
+				# get the command from the parent. If we're disarmed, this blocks
+				# until one arrives
+				command = control_conn.recv_bytes().decode('ascii')
+				(command, _, argument) = command.partition(' ')
+				reply = 'ok'
+
+				if command == 'arm':
+					(in_usb_handler, epoch) = argument.split(' ')
+					self.trigger_in_usb_handler = (in_usb_handler == '1')
+
+					if not self.usb_handler_armed:
+						self.arm_epoch.arm( int(epoch) )
+						if context != None:
+							self.usb_device_index = self.build_usb_device_index(
+							 ( self.get_usb_device_key( device ), device.getSerialNumber )
+							 for device in context.getDeviceIterator( skip_on_error=True )
+							)
+							hotplug_handle = self.register_hotplug_callback( context )
+						elif self.hotplug_backend == 'sysfs':
+							watcher = sysfs_lin.SysfsWatcher()
+							self.usb_device_index = self.build_usb_device_index(
+							 watcher.list_usb_devices()
+							)
+						else:
+							sock = netlink_lin.open_uevent_socket()
+							tracker = netlink_lin.DeviceTracker()
+							self.usb_device_index = self.build_usb_device_index(
+							 tracker.list_usb_devices()
+							)
+						self.usb_handler_armed = True
+
+				elif command == 'disarm':
+					if self.usb_handler_armed:
+						self.log_arm_epoch_stats()
+						self.arm_epoch.disarm()
+						if context != None:
+							context.hotplugDeregisterCallback( hotplug_handle )
+						elif watcher != None:
+							watcher.close()
+							watcher = None
+						else:
+							# we close the socket (rather than just not reading it) so
+							# that stale events don't pile-up in it while disarmed
+							sock.close()
+							tracker = None
+						self.usb_handler_armed = False
+
+				elif command == 'set-trigger':
+					if self.OS_NAME_SHORT == 'mac':
+						# on MacOS, setting some triggers spawns a root child process,
+						# which must only ever be done by the parent
+						self.trigger = argument
+						self.trigger_pipeline = None
+						if trigger_pipeline.is_pipeline( argument ):
+							self.trigger_pipeline = trigger_pipeline.load_pipeline(
+							 self.CONF_FILE, argument, self.SUPPORTED_TRIGGERS
+							)
+					else:
+						self.set_trigger( argument )
+
+				elif command == 'set-trigger-plan':
+					self.trigger_plan = trigger_plan.TriggerPlan.from_dict(
+					 json.loads( argument )
+					)
+
+					# if we inherited a trigger executor from the parent, then it's
+					# for an older plan
+					self.trigger_executor = None
+
+					# we need our own D-Bus connections (to call the plan's methods or
+					# to verify that the screen was locked). Any that we inherited from
+					# the parent are shared with it
+					verify = False
+					if self.VERIFY_LOCK_SCREEN == True:
+						from . import lock_state_lin
+						verify = self.trigger_plan.trigger in lock_state_lin.LOCK_TRIGGERS
+
+					if self.trigger_plan.uses_dbus() or verify:
+						self.reconnect_trigger_bus()
+
+				elif command == 'status':
+					reply = 'ok armed=' +str(int(self.usb_handler_armed))
+					reply+= ' trigger=' +str(self.trigger)
+					reply+= ' backend=' +str(self.hotplug_backend)
+					reply+= ' pid=' +str(os.getpid())
+					for key, value in self.arm_epoch.get_stats().items():
+						reply+= ' ' +str(key)+ '=' +str(value)
+
+				elif command == 'ping':
+					reply = 'ok pong'
+
+				elif command == 'harden':
+					reply = 'ok ' +hardening.format_report( hardening.harden() )
+
+				elif command == 'exit':
+					control_conn.send_bytes( b'ok' )
+					return 0
+
+				else:
+					reply = 'error unknown command'
+
+				control_conn.send_bytes( reply.encode('ascii') )
+
+		except EOFError as e:
+			# the parent closed its end of the pipe (eg because it died)
+			msg = "DEBUG: Persistent usb_handler lost its parent; exiting"
+			print( msg ); logger.debug( msg )
+
+		except (KeyboardInterrupt, SystemExit) as e:
+			msg = "DEBUG: Exiting persistent usb_handler loop: " +str(e)
+			print( msg ); logger.info( msg )
+
+		finally:
+			if sock != None:
+				sock.close()
+			if watcher != None:
+				watcher.close()
+
+		return 0
+
+	# this is a callback function that is registered to be called when a usb
+	# hotplug event occurs using libusb (linux & macos)
+	def hotplugCallbackNix( self, *argv ):
+
+		(context, device, event) = argv
+
+		# NOTE: this is called for every hotplug event that makes it through the
+		#       filters passed to hotplugRegisterCallback(), so don't do anything
+		#       expensive (like logging) until we know the event is relevant
+
+		# is this from a usb device being inserted or removed? 
+		if event != usb1.HOTPLUG_EVENT_DEVICE_LEFT:
+			return
+
+		# was BusKill armed for a specific device? If so, ignore the removal of
+		# all other devices
+		if self.trigger_device:
+			key = self.get_usb_device_key( device )
+			if not self.is_trigger_device( key ):
+				return
+
+			self.usb_removal( self.get_usb_device_id( key ), key )
+
+		else:
+			self.usb_removal()
+
+	# this is a callback function that is called by netlink_lin.listen() (and
+	# sysfs_lin.listen()) with the fields of every uevent for the removal of a
+	# usb device (linux only)
+	def hotplugCallbackNetlink( self, fields ):
+
+		# was BusKill armed for a specific device? If so, ignore the removal of
+		# all other devices
+		if self.trigger_device:
+			key = netlink_lin.get_usb_device_key( fields )
+			if key == None or not self.is_trigger_device( key ):
+				return
+
+			self.usb_removal( self.get_usb_device_id( key ), key )
+
+		else:
+			self.usb_removal( fields.get('DEVPATH') )
+
+	# returns True if the removal of the usb device with the given key (see
+	# get_usb_device_key()) should execute the trigger
+	def is_trigger_device( self, key ):
+
+		if self.usb_device_index != None:
+			return key in self.usb_device_index
+
+		if self.trigger_device:
+			# the chosen device wasn't connected when we armed, so all we can do is
+			# compare its vendor & product ids
+			return key[2:] == self.parse_usb_device_id( self.trigger_device )[2:]
+
+		return True
+
+	# this is called (usually inside the usb_handler child process) as soon as
+	# a hotplug callback has determined that the event was a usb removal.
+	# 'device' optionally describes the device that was removed, and 'key' is
+	# its (bus, port numbers, vendor id, product id) tuple, if known
+	def usb_removal( self, device=None, key=None ):
+
+		# record when the removal was detected so we can log the latency between
+		# the event and the trigger's execution. The monotonic clock is
+		# system-wide so this is still meaningful after being sent to another
+		# process
+		event_time_ns = time.monotonic_ns()
+		event_time = event_time_ns / 1e9
+
+		# only the first removal of each arm epoch fires the trigger. The rest
+		# (eg from unplugging a hub) are just counted, so we don't even log them
+		if not self.arm_epoch.removal( event_time ):
+			return
+
+		if device == None:
+			msg = "INFO: Detected USB removal event"
+		else:
+			msg = "INFO: Detected USB removal event of " +str(device)
+		print( msg ); logger.info( msg )
+
+		if self.trigger_in_usb_handler:
+			# execute the trigger right here, right now. Only after it's done do we
+			# let the parent process know what happened
+			self.execute_trigger( event_time )
+
+			if self.usb_handler_ring != None:
+				self.usb_handler_ring.put(
+				 event_ring.EVENT_TRIGGERED, self.arm_epoch.number, event_time_ns, key
+				)
+
+		else:
+			# tell the parent process to execute the trigger
+			msg = "calling " +str(self.TRIGGER_FUNCTION)
+			print( msg ); logger.debug( msg )
+
+			self.usb_handler_ring.put(
+			 event_ring.EVENT_TRIGGER, self.arm_epoch.number, event_time_ns, key
+			)
+
+	# logs the stats of the current arm epoch (eg when the usb_handler stops
+	# listening), so we know how many removal events were coalesced
+	def log_arm_epoch_stats( self ):
+
+		stats = self.arm_epoch.get_stats()
+		if stats['events'] == 0:
+			return
+
+		msg = "INFO: Received " +str(stats['events'])+ " removal events in arm epoch " +str(stats['epoch'])+ " (" +str(stats['duplicates'])+ " ignored) over " +str(stats['span_ms'])+ " ms. Gaps between events were " +str(stats['min_gap_ms'])+ " to " +str(stats['max_gap_ms'])+ " ms"
+		print( msg ); logger.info( msg )
+
+	# synchronously executes the trigger in the current process and logs how
+	# long it took (and, if we know when the removal event happened, how long it
+	# took to get from the event to the trigger)
+	def execute_trigger( self, event_time=None ):
+
+		start_time = time.monotonic()
+
+		if event_time != None:
+			msg = "INFO: Executing trigger " +str( round((start_time-event_time)*1000, 3) )+ " ms after the removal event"
+			print( msg ); logger.info( msg )
+
+		self.TRIGGER_FUNCTION()
+
+		msg = "INFO: Trigger executed in " +str( round((time.monotonic()-start_time)*1000, 3) )+ " ms"
+		print( msg ); logger.info( msg )
+
+	# checks for messages from the child usb_handler process
+	def check_usb_handler( self, dt ):
+
+		# is there a message from the child? Don't wait if there isn't
+		queue_message = self.get_usb_handler_message( 0 )
+		if queue_message != None:
+			return self.handle_usb_handler_message( queue_message )
+
+	# blocks until the child usb_handler process sends us a message or exits.
+	# Unlike check_usb_handler(), this doesn't poll; the OS wakes us up only
+	# when there's actually something to do. Returns the message, or None if
+	# the timeout was reached or the child exited without sending anything
+	def get_usb_handler_message( self, timeout=None, usb_handler=None ):
+
+		if usb_handler == None:
+			usb_handler = self.usb_handler
+
+		# the lean usb_handler can't use our ring buffer; it has its own pipe
+		if self.usb_handler_events != None:
+			return self.get_usb_handler_event( timeout, usb_handler )
+
+		# sleep until either the ring buffer's wake-up pipe becomes readable or
+		# the child process dies (its sentinel becomes ready). We always read the
+		# ring before looking at why we woke up so that we never drop a message
+		# that the child sent right before it exited
+		#  * https://docs.python.org/3/library/multiprocessing.html#multiprocessing.connection.wait
+		event = self.usb_handler_ring.get( timeout, [ usb_handler.sentinel ] )
+		if event == None:
+			return None
+
+		(event_type, epoch, event_time_ns, bus, ports) = event
+
+		device = None
+		if bus != 0:
+			device = str(bus)+ '-' +'.'.join( [str(port) for port in ports] )
+
+		return (
+		 event_ring.EVENT_NAMES.get( event_type ), event_time_ns / 1e9, epoch,
+		 device
+		)
+
+	# like get_usb_handler_message(), but for the lean usb_handler. Its messages
+	# are formatted like 'trigger <event time> <arm epoch>'
+	def get_usb_handler_event( self, timeout=None, usb_handler=None ):
+
+		events = self.usb_handler_events
+
+		multiprocessing.connection.wait( [ events, usb_handler.sentinel ], timeout )
+
+		try:
+			if not events.poll():
+				return None
+			message = events.recv_bytes().decode('ascii')
+		except (OSError, EOFError) as e:
+			return None
+
+		(message, event_time, epoch) = message.split(' ')
+		return ( message, float(event_time), int(epoch) )
+
+	# blocking alternative to check_usb_handler() that sleeps until the child
+	# usb_handler process sends us a message and then acts on it immediately
+	def wait_usb_handler( self, timeout=None ):
+
+		queue_message = self.get_usb_handler_message( timeout )
+		if queue_message == None:
+			return None
+
+		return self.handle_usb_handler_message( queue_message )
+
+	# acts on a message that we received from the child usb_handler process.
+	# Extra positional arguments are ignored so this can be passed directly to
+	# kivy's Clock.schedule_once()
+	def handle_usb_handler_message( self, queue_message, *args ):
+
+		msg = "DEBUG: Queue message from child usb_handler (" +str(queue_message)+ ")"
+		print( msg ); logger.error( msg )
+
+		# removal events are sent with the time that they were detected, the arm
+		# epoch in which they happened and (optionally) the removed device
+		event_time = None
+		epoch = None
+		if isinstance( queue_message, tuple ):
+			queue_message, event_time, epoch = queue_message[0:3]
+
+		# what did the message from the child say?
+		if queue_message == 'trigger':
+
+			# did we already execute the trigger in this arm epoch?
+			if epoch != None and epoch == self.triggered_epoch:
+				self.duplicate_trigger_count += 1
+				msg = "WARNING: Ignoring duplicate trigger message for arm epoch " +str(epoch)
+				print( msg ); logger.warning( msg )
+				return None
+
+			# the child told us to execute the trigger; do it!
+			self.triggered_epoch = epoch
+			self.execute_trigger( event_time )
+			return queue_message
+
+		elif queue_message == 'triggered':
+			# the child already executed the trigger itself; just log it
+			self.triggered_epoch = epoch
+			msg = "INFO: The usb_handler child process executed the trigger"
+			print( msg ); logger.info( msg )
+			return queue_message
+
+		else:
+			# no idea what the child said; log it as an error
+			msg = "ERROR: Unknown queue message from child usb_handler"
+			print( msg ); logger.error( msg )
+
+	# simulates a fake hotplug removal event. If in_process is True, then no
+	# usb_handler child process is spawned; the removal is handled and the
+	# trigger is executed synchronously in this process before returning
+	def simulate_hotplug_removal( self, in_process=False ):
+
+		# let the child process know that we don't need to wait for a USB removal
+		# event to call the trigger function
+		self.SIMULATE_HOTPLUG_REMOVAL = True
+
+		if in_process:
+			msg = "INFO: Simulating USB Removal Event"
+			print( msg ); logger.info( msg )
+
+			self.trigger_in_usb_handler = True
+			self.arm_epoch.arm()
+			self.usb_removal()
+			return
+
+		msg = "INFO: Arming & Simulating USB Removal Event"
+		print( msg ); logger.info( msg )
+
+		self.toggle()
+
+	####################
+	# ARMING FUNCTIONS #
+	####################
+
+	# resolves the trigger_device against the usb devices that are connected
+	# right now and returns a dict of the only devices whose removal should
+	# execute the trigger, keyed by the tuple from get_usb_device_key(). The
+	# values are the devices' serial numbers (if we can read them). Returns None
+	# if the chosen device isn't connected and we don't know its location, or if
+	# the removal of any device should execute the trigger
+	#
+	# 'devices' is an iterable of (key, serial) tuples for the currently
+	# connected devices. The serial may be a function that returns the serial,
+	# in which case it's only called for the devices that match
+	def build_usb_device_index( self, devices ):
+
+		if not self.trigger_device:
+			return None
+
+		(bus, ports, vid, pid) = self.parse_usb_device_id( self.trigger_device )
+
+		index = dict()
+		for key, serial in devices:
+
+			if key[2:] != (vid, pid):
+				continue
+			if bus != None and key[0:2] != (bus, ports):
+				continue
+
+			if callable( serial ):
+				try:
+					serial = serial()
+				except Exception as e:
+					serial = None
+
+			index[key] = serial
+
+		if index == {}:
+
+			if bus == None:
+				# we don't know where the device will be plugged-in, so we can only
+				# filter by its vendor & product ids
+				msg = "WARNING: USB device '" +str(self.trigger_device)+ "' is not connected. Arming for the removal of any device with this vendor & product id."
+				print( msg ); logger.warning( msg )
+				return None
+
+			# the device isn't connected right now, but we know exactly where it
+			# will be when it is
+			msg = "WARNING: USB device '" +str(self.trigger_device)+ "' is not connected"
+			print( msg ); logger.warning( msg )
+			index[ (bus, ports, vid, pid) ] = None
+
+		msg = "DEBUG: usb_device_index:|" +str(index)+ "|"
+		print( msg ); logger.debug( msg )
+
+		return index
+
+	# this works for both linux and mac. If 'stop_conn' is given, then this
+	# returns cleanly as soon as something is sent to it
+	def armNix( self, stop_conn=None ):
+
+		# are we just simulating this USB removal?
+		if self.SIMULATE_HOTPLUG_REMOVAL:
+			# we're simulating a removal event. There's no real device to pass
+			# through hotplugCallbackNix()'s device filtering, so we skip straight
+			# to handling the removal
+			msg = "INFO: Detected (simulated) USB removal event"
+			print( msg ); logger.info( msg )
+
+			self.usb_removal()
+			return
 
-			# disarm just means to terminate the child process in which the arm
-			# function was spawned. this works on all platforms.
-			try:
-				self.usb_handler.kill()
-				self.usb_handler.join()
-			except:
-				pass
+		# some containers and sandboxes give us a libusb without hotplug
+		# support. On linux, we can still watch sysfs instead
+		if self.OS_NAME_SHORT == 'lin' and not self.libusb_has_hotplug():
+			msg = "WARNING: libusb is missing hotplug support; falling back to the 'sysfs' hotplug backend"
+			print( msg ); logger.warning( msg )
 
-			self.is_armed = False
-			msg = "INFO: BusKill is disarmed."
-			print( msg ); logger.info( msg )
+			return self.armSysfs( stop_conn )
 
-		else:
-			msg = "DEBUG: attempting to arm BusKill via " +str(self.ARM_FUNCTION)+ "() with the '" +str(self.trigger)+ "' trigger"
-			print( msg ); logger.debug( msg )
+		with usb1.USBContext() as context:
 
-			# create a queue so that the child can communicate up to the parent
-			if self.usb_handler_queue == None:
-				self.usb_handler_queue = multiprocessing.Queue()
+			if not context.hasCapability(usb1.CAP_HAS_HOTPLUG):
+				msg = 'ERROR: Hotplug support is missing'
+				print( msg ); logger.error( msg )
+				return msg
 
-			# launch an asynchronous child process that'll loop and listen for
-			# usb events
-			self.usb_handler = self.Process(
-			 target = self.ARM_FUNCTION
+			# if the user chose a specific device, then only its removal should
+			# execute the trigger
+			self.usb_device_index = self.build_usb_device_index(
+			 ( self.get_usb_device_key( device ), device.getSerialNumber )
+			 for device in context.getDeviceIterator( skip_on_error=True )
 			)
-			self.usb_handler.start()
-
-			self.is_armed = True
-			msg = "INFO: BusKill is armed. Listening for removal event.\n"
-			msg+= "INFO: To disarm the CLI, exit with ^C or close this terminal"
-			print( msg ); logger.info( msg )
 
-	# this is a callback function that is registered to be called when a usb
-	# hotplug event occurs using libusb (linux & macos)
-	def hotplugCallbackNix( self, *argv ):
+			opaque = self.register_hotplug_callback( context )
 
-		(context, device, event) = argv
+			try:
+				if stop_conn != None:
+					self.handle_usb_events_until_stopped( context, stop_conn )
 
-		msg = "DEBUG: called hotplugCallbackNix()"
-		print( msg ); logger.debug( msg )
+				else:
+					while True:
+						# this call is blocking (with a default timeout of 60 seconds)
+						# afaik there's no way to tell USBContext.handleEvents() to exit
+						# safely, so instead we just make the whole call to this arming
+						# function in a new child process and kill it on disarm with
+						# kill() this approach isn't very nice and it dumps a
+						# traceback to output, but it *does* immediately disarm without
+						# having wait for the timeout..
+						context.handleEvents()
 
-		msg = "context:|" +str(context)+ "|"
-		print( msg ); logger.debug( msg )
+			except (KeyboardInterrupt, SystemExit) as e:
+				msg = "DEBUG: Exiting armNix() loop: " +str(e)
+				print( msg ); logger.info( msg )
 
-		msg = "device:|" +str(device)+ "|"
-		print( msg ); logger.debug( msg )
+			finally:
+				context.hotplugDeregisterCallback( opaque )
+				self.log_arm_epoch_stats()
 
-		msg = "event:|" +str(event)+ "|"
-		print( msg ); logger.debug( msg )
+		return 0
 
-		msg = "usb1.HOTPLUG_EVENT_DEVICE_ARRIVED:|" +str(usb1.HOTPLUG_EVENT_DEVICE_ARRIVED)+ "|"
-		print( msg ); logger.debug( msg )
+	# returns True if libusb supports hotplug events on this system
+	def libusb_has_hotplug( self ):
 
-		msg = "usb1.HOTPLUG_EVENT_DEVICE_LEFT:|" +str(usb1.HOTPLUG_EVENT_DEVICE_LEFT)+ "|"
-		print( msg ); logger.debug( msg )
+		if self.LIBUSB_HAS_HOTPLUG == None:
+			with usb1.USBContext() as context:
+				self.LIBUSB_HAS_HOTPLUG = bool(
+				 context.hasCapability(usb1.CAP_HAS_HOTPLUG)
+				)
 
-		# is this from a usb device being inserted or removed? 
-		if event == usb1.HOTPLUG_EVENT_DEVICE_LEFT:
-			# this is a usb removal event
+		return self.LIBUSB_HAS_HOTPLUG
+
+	# registers hotplugCallbackNix() with libusb and returns its handle. We ask
+	# libusb to only bother calling us for removal events (and, if we can, only
+	# for removals of devices with the chosen vendor & product ids) so that
+	# unrelated events never make it up to python
+	def register_hotplug_callback( self, context ):
+
+		vendor_id = usb1.HOTPLUG_MATCH_ANY
+		product_id = usb1.HOTPLUG_MATCH_ANY
+		if self.trigger_device:
+			(bus, ports, vendor_id, product_id) = \
+			 self.parse_usb_device_id( self.trigger_device )
+
+		return context.hotplugRegisterCallback(
+		 self.hotplugCallbackNix,
+		 events = usb1.HOTPLUG_EVENT_DEVICE_LEFT,
+		 flags = 0,
+		 vendor_id = vendor_id,
+		 product_id = product_id
+		)
 
-			msg = "INFO: Detected USB removal event"
-			print( msg ); logger.info( msg )
+	# this is a replacement for looping on libusb's handleEvents(), which can't
+	# be interrupted. Instead, we poll() libusb's own file descriptors together
+	# with 'stop_conn' and only ask libusb to handle its events once poll() says
+	# that there are some. This returns as soon as 'stop_conn' becomes readable
+	#  * https://libusb.sourceforge.io/api-1.0/group__libusb__poll.html
+	def handle_usb_events_until_stopped( self, context, stop_conn ):
 
-			msg = "calling " +str(self.TRIGGER_FUNCTION)
-			print( msg ); logger.debug( msg )
+		return usb_listener.handle_usb_events_until_stopped( context, stop_conn )
 
-			self.usb_handler_queue.put( 'trigger' )
+	# this works only on linux. Rather than going through libusb, this reads the
+	# kernel's uevents directly from a netlink socket. It returns cleanly as
+	# soon as something is sent to 'stop_conn'
+	def armNetlink( self, stop_conn=None ):
 
-	# checks the queue from the child usb_handler process
-	def check_usb_handler( self, dt ):
+		# are we just simulating this USB removal?
+		if self.SIMULATE_HOTPLUG_REMOVAL:
+			# we're simulating a removal event
+			msg = "INFO: Detected (simulated) USB removal event"
+			print( msg ); logger.info( msg )
 
-		# is there a message on the queue?
-		if not self.usb_handler_queue.empty():
-			# the child sent us a message; get it
-			queue_message = self.usb_handler_queue.get()
+			self.usb_removal()
+			return
 
-			msg = "DEBUG: Queue message from child usb_handler (" +str(queue_message)+ ")"
-			print( msg ); logger.error( msg )
+		# open the socket *before* we look at what's currently connected so that
+		# we can't miss a removal that happens in-between
+		sock = netlink_lin.open_uevent_socket()
 
-			# what did the message from the child say?
-			if queue_message == 'trigger':
-				# the child told us to execute the trigger; do it!
-				self.TRIGGER_FUNCTION()
-				return queue_message
-			else:
-				# no idea what the child said; log it as an error
-				msg = "ERROR: Unknown queue message from child usb_handler"
-				print( msg ); logger.error( msg )
+		try:
+			# if the user chose a specific device, then only its removal should
+			# execute the trigger. The tracker lets us recover removals that we
+			# lose if the socket overflows
+			tracker = netlink_lin.DeviceTracker()
+			self.usb_device_index = self.build_usb_device_index(
+			 tracker.list_usb_devices()
+			)
 
-	# simulates a fake hotplug removal event
-	def simulate_hotplug_removal( self ):
+			netlink_lin.listen( sock, self.hotplugCallbackNetlink, stop_conn, tracker )
 
-		msg = "INFO: Arming & Simulating USB Removal Event"
-		print( msg ); logger.info( msg )
+		except (KeyboardInterrupt, SystemExit) as e:
+			msg = "DEBUG: Exiting armNetlink() loop: " +str(e)
+			print( msg ); logger.info( msg )
 
-		# let the child process know that we don't need to wait for a USB removal
-		# event to call the trigger function
-		self.SIMULATE_HOTPLUG_REMOVAL = True
-		self.toggle()
+		finally:
+			sock.close()
+			self.log_arm_epoch_stats()
 
-	####################
-	# ARMING FUNCTIONS #
-	####################
+		return 0
 
-	# this works for both linux and mac
-	def armNix( self ):
+	# this works only on linux. It's a fallback for when libusb has no hotplug
+	# support and netlink isn't available (eg in some containers). It watches
+	# /sys/bus/usb/devices for devices that disappear (see sysfs_lin.py) and
+	# returns cleanly as soon as something is sent to 'stop_conn'
+	def armSysfs( self, stop_conn=None ):
 
 		# are we just simulating this USB removal?
 		if self.SIMULATE_HOTPLUG_REMOVAL:
 			# we're simulating a removal event
+			msg = "INFO: Detected (simulated) USB removal event"
+			print( msg ); logger.info( msg )
 
-			# and 'event'. The last argument is the constant signifying that the
-			# hotplug event is specifically a *removal* event
-			self.hotplugCallbackNix( 'simulation', 'simulation', usb1.HOTPLUG_EVENT_DEVICE_LEFT )
+			self.usb_removal()
 			return
 
-		with usb1.USBContext() as context:
+		watcher = sysfs_lin.SysfsWatcher()
 
-			if not context.hasCapability(usb1.CAP_HAS_HOTPLUG):
-				msg = 'ERROR: Hotplug support is missing'
-				print( msg ); logger.error( msg )
-				return msg
+		try:
+			# if the user chose a specific device, then only its removal should
+			# execute the trigger
+			self.usb_device_index = self.build_usb_device_index(
+			 watcher.list_usb_devices()
+			)
 
-			opaque = context.hotplugRegisterCallback( self.hotplugCallbackNix )
+			sysfs_lin.listen( watcher, self.hotplugCallbackNetlink, stop_conn )
 
-			try:
-				while True:
-					# this call is blocking (with a default timeout of 60 seconds)
-					# afaik there's no way to tell USBContext.handleEvents() to exit
-					# safely, so instead we just make the whole call to this arming
-					# function in a new child process and kill it on disarm with
-					# kill() this approach isn't very nice and it dumps a
-					# traceback to output, but it *does* immediately disarm without
-					# having wait for the timeout..
-					context.handleEvents()
+		except (KeyboardInterrupt, SystemExit) as e:
+			msg = "DEBUG: Exiting armSysfs() loop: " +str(e)
+			print( msg ); logger.info( msg )
 
-			except (KeyboardInterrupt, SystemExit) as e:
-				msg = "DEBUG: Exiting armNix() loop: " +str(e)
-				print( msg ); logger.info( msg )
+		finally:
+			watcher.close()
+			self.log_arm_epoch_stats()
 
 		return 0
 
@@ -1102,230 +3406,185 @@ class BusKill:
 
 	def triggerLin(self):
 
-		if self.trigger == 'soft-shutdown':
+		if self.trigger_pipeline != None:
+			self.execute_trigger_pipeline()
+		elif self.is_trigger_plugin( self.trigger ):
+			self.execute_trigger_plugin( self.trigger )
+		elif self.trigger == 'soft-shutdown':
 			self.trigger_softshutdown_lin()
 		else:
 			self.trigger_lockscreen_lin()
 
-	# this function will lock the screen on linux machines
-	def trigger_lockscreen_lin(self):
+	# this function will lock the screen on linux machines. 'plan' is the
+	# compiled plan to use, if it's not the current trigger's
+	def trigger_lockscreen_lin(self, plan=None):
 		msg = "DEBUG: BusKill lock-screen trigger executing now"
 		print( msg ); logger.debug( msg )
 
-		# first we try to lock with xdg-screensaver
-		self.trigger_lockscreen_lin_xdg()
-
-		# in Cinnamon (Linux Mint) `xdg-screensaver` exists, exits zero, doesn't
-		# throw any errors, and doesn't lock the screen.
-		# * https://en.wikipedia.org/wiki/Cinnamon_(desktop_environment)
-		# * https://github.com/BusKill/buskill-app/issues/64
-		self.trigger_lockscreen_lin_cinnamon()
-
-	# this function will gently shutdown a Linux machine
-	def trigger_softshutdown_lin(self):
-		msg = "DEBUG: BusKill soft-shutdown trigger executing now"
-		print( msg ); logger.debug( msg )
-
-		# first we try to shutdown with `shutdown`
-		self.trigger_softshutdown_lin_shutdown()
-
-	def trigger_lockscreen_lin_xdg(self):
-
-		try:
-			# first try to lock the screen with xdg-screensaver command
-			msg = "INFO: Attempting to execute `xdg-screensaver lock`"
-			print( msg ); logger.debug( msg )
-			result = subprocess.run( ['xdg-screensaver', 'lock'], capture_output=True, text=True )
-
-			msg = "DEBUG: subprocess returncode|" +str(result.returncode)+ "|"
-			print( msg ); logger.debug( msg )
-
-			msg = "DEBUG: subprocess stdout|" +str(result.stdout)+ "|"
-			print( msg ); logger.debug( msg )
-
-			msg = "DEBUG: subprocess stderr|" +str(result.stderr)+ "|"
-			print( msg ); logger.debug( msg )
-
-			if result.returncode != 0:
-				# that didn't work; log it and try fallback
-				msg = "WARNING: Failed to execute `xdg-scrensaver lock`!"
-				print( msg ); logger.warning( msg )
-
-				self.trigger_lockscreen_lin_xscreensaver()
-
-		except Exception as e:
-			# that didn't work; log it and try fallback
-			msg = "WARNING: Failed to execute `xdg-scrensaver lock`!" +str(e)
-			print( msg ); logger.warning( msg )
-
-			self.trigger_lockscreen_lin_xscreensaver()
+		# first we try to lock with xdg-screensaver (or xscreensaver), and then
+		# with cinnamon-screensaver-command (see trigger_plan.py)
+		if self.execute_trigger_plan( plan ):
+			return True
 
-	def trigger_lockscreen_lin_xscreensaver(self):
+		return self.escalate_lock_screen()
 
-		try:
-			# try to lock the screen with xscreensaver command
-			msg = "INFO: Attempting to execute `xscreensaver -lock`"
-			print( msg ); logger.debug( msg )
-			result = subprocess.run( ['xscreensaver', '-lock'], capture_output=True, text=True )
+	# executes the trigger that the user wants us to execute when the
+	# lock-screen trigger failed to lock the screen (if any). Returns True if it
+	# succeeded
+	def escalate_lock_screen(self):
 
-			msg = "DEBUG: subprocess returncode|" +str(result.returncode)+ "|"
-			print( msg ); logger.debug( msg )
+		trigger = self.LOCK_ESCALATION_TRIGGER
+		if not trigger:
+			return False
 
-			msg = "DEBUG: subprocess stdout|" +str(result.stdout)+ "|"
-			print( msg ); logger.debug( msg )
+		msg = "WARNING: The screen didn't lock! Escalating to the '" +str(trigger)+ "' trigger."
+		print( msg ); logger.warning( msg )
 
-			msg = "DEBUG: subprocess stderr|" +str(result.stderr)+ "|"
-			print( msg ); logger.debug( msg )
+		if self.is_trigger_plugin( trigger ):
+			return self.execute_trigger_plugin( trigger )
 
-			if result.returncode != 0:
-				# that didn't work; log it and try fallback
-				msg = "ERROR: Failed to execute `xscreensaver -lock`! "
-				print( msg ); logger.error(msg)
+		# soft-shutdown is our only other built-in trigger
+		plan = self.escalation_plan
+		if plan == None or plan.trigger != trigger:
+			plan = trigger_plan.compile_plan( trigger, self.get_trigger_plan_cache_path() )
 
-		except Exception as e:
-			# that didn't work; log it and try fallback
-			msg = "ERROR: Failed to execute `xscreensaver -lock`! " +str(e)
-			print( msg ); logger.error(msg)
+		return self.trigger_softshutdown_lin( plan )
 
-	def trigger_lockscreen_lin_cinnamon(self):
+	# this function will gently shutdown a Linux machine
+	def trigger_softshutdown_lin(self, plan=None):
+		msg = "DEBUG: BusKill soft-shutdown trigger executing now"
+		print( msg ); logger.debug( msg )
 
-		try:
-			# unset PYTHONHOME to fix AppImage fs encoding error
-			#    ModuleNotFoundError: No module named 'encodings'
-			# * https://github.com/BusKill/buskill-app/issues/64#issuecomment-1537221491
-			if 'PYTHONHOME' in os.environ:
-				del os.environ['PYTHONHOME']
-
-			# try to lock the screen with cinnamon-screensaver command
-			msg = "INFO: Attempting to execute `cinnamon-screensaver-command --lock`"
-			print( msg ); logger.debug( msg )
-			result = subprocess.run( ['cinnamon-screensaver-command', '--lock'], capture_output=True, text=True )
+		# if we have a root child, then it can definitely shut down the machine
+		if self.root_child != None:
+			try:
+				msg = "DEBUG: Attempting to send 'soft-shutdown' command to root child"
+				print( msg ); logger.debug( msg )
 
-			msg = "DEBUG: subprocess returncode|" +str(result.returncode)+ "|"
-			print( msg ); logger.debug( msg )
+				result = self.send_root_child_command_lin( 'soft-shutdown' )
 
-			msg = "DEBUG: subprocess stdout|" +str(result.stdout)+ "|"
-			print( msg ); logger.debug( msg )
+				msg = "DEBUG: Response from root-child:|" +str(result)+ "|"
+				print( msg ); logger.debug( msg )
 
-			msg = "DEBUG: subprocess stderr|" +str(result.stderr)+ "|"
-			print( msg ); logger.debug( msg )
+				if result.startswith( 'ok' ):
+					return True
 
-			if result.returncode != 0:
-				# that didn't work; log it and give up :(
-				msg = "ERROR: Failed to execute `cinnamon-screensaver-command --lock`! "
+			except Exception as e:
+				# that didn't work; log it and try without it
+				msg = "ERROR: Failed to send 'soft-shutdown' command to root child \n\t" +str(e)
 				print( msg ); logger.error(msg)
 
-		except Exception as e:
-			# that didn't work; log it and give up :(
-			msg = "ERROR: Failed to execute `cinnamon-screensaver-command --lock`! " +str(e)
-			print( msg ); logger.error(msg)
-
-	def trigger_softshutdown_lin_shutdown(self):
-
-		try:
-			# try to shutdown with the `shutdown` command
-			msg = "INFO: Attempting to execute `shutdown -h now`"
-			print( msg ); logger.debug( msg )
-			result = subprocess.run(
-			 [self.trigger_softshutdown_lin_shutdown_path, '-h', 'now'],
-			 capture_output=True,
-			 text=True
-			)
-
-			msg = "DEBUG: subprocess returncode|" +str(result.returncode)+ "|"
-			print( msg ); logger.debug( msg )
+		# we ask logind to power off over D-Bus, and fall back to `shutdown`,
+		# then `poweroff`, then `systemctl` (see trigger_plan.py)
+		return self.execute_trigger_plan( plan )
 
-			msg = "DEBUG: subprocess stdout|" +str(result.stdout)+ "|"
-			print( msg ); logger.debug( msg )
+	# executes the plan that was compiled for the current trigger when we armed
+	# (or 'plan', if given). Returns True if every step of it succeeded
+	def execute_trigger_plan(self, plan=None):
 
-			msg = "DEBUG: subprocess stderr|" +str(result.stderr)+ "|"
-			print( msg ); logger.debug( msg )
+		if plan == None:
+			plan = self.get_trigger_plan()
 
-			if result.returncode != 0:
-				# that didn't work; log it and try fallback
-				msg = "WARNING: Failed to execute `shutdown -h now`!"
+		# the trigger executor has everything ready to go, so all we have to do
+		# is ask it. If it doesn't respond, we do it ourselves
+		executor = self.trigger_executor
+		if executor != None and executor.plan == plan:
+			try:
+				return executor.execute()
+			except Exception as e:
+				msg = "WARNING: The trigger executor failed (" +str(e)+ "). Executing the trigger plan ourselves."
 				print( msg ); logger.warning( msg )
 
-				self.trigger_softshutdown_lin_poweroff()
-
-		except Exception as e:
-			# that didn't work; log it and try fallback
-			msg = "WARNING: Failed to execute `shutdown -h now`!"
-			print( msg ); logger.warning( msg )
-
-			self.trigger_softshutdown_lin_poweroff()
-
-	def trigger_softshutdown_lin_poweroff(self):
-
-		try:
-			# try to shutdown with the `poweroff` command
-			msg = "INFO: Attempting to execute `poweroff -h`"
-			print( msg ); logger.debug( msg )
-			result = subprocess.run(
-			 [self.trigger_softshutdown_lin_poweroff_path, '-h'],
-			 capture_output=True,
-			 text=True
+		# remember what worked so that it's tried first next time. This is
+		# called after the whole plan was executed
+		def on_success( name ):
+			trigger_plan.record_success( self.get_trigger_plan_cache_path(), name )
+
+		call_dbus = None
+		if self.trigger_bus != None:
+			call_dbus = self.trigger_bus.call
+
+		# check that each lock strategy actually locked the screen (see
+		# lock_state_lin.py)
+		verify = None
+		if self.VERIFY_LOCK_SCREEN == True:
+			from . import lock_state_lin
+			self.lock_verifier = lock_state_lin.get_verifier(
+			 plan, self.trigger_bus, trigger_plan.get_command_env()
 			)
+			if self.lock_verifier != None:
+				verify = self.lock_verifier.verify
 
-			msg = "DEBUG: subprocess returncode|" +str(result.returncode)+ "|"
-			print( msg ); logger.debug( msg )
-
-			msg = "DEBUG: subprocess stdout|" +str(result.stdout)+ "|"
-			print( msg ); logger.debug( msg )
-
-			msg = "DEBUG: subprocess stderr|" +str(result.stderr)+ "|"
-			print( msg ); logger.debug( msg )
+		result = trigger_plan.execute_plan(
+		 plan, on_success, call_dbus, verify=verify
+		)
 
-			if result.returncode != 0:
-				# that didn't work; log it and try fallback
-				msg = "WARNING: Failed to execute `poweroff -h`!"
-				print( msg ); logger.warning( msg )
+		if verify != None:
+			self.lock_verifier.stop()
 
-				self.trigger_softshutdown_lin_systemctl()
+		return result
 
-		except Exception as e:
-			# that didn't work; log it and try fallback
-			msg = "WARNING: Failed to execute `poweroff -h`!"
-			print( msg ); logger.warning( msg )
+	# executes the steps of the current trigger pipeline (see
+	# trigger_pipeline.py), each of which is either one of the other triggers
+	# or a command. Returns True if every step succeeded
+	def execute_trigger_pipeline(self):
 
-			self.trigger_softshutdown_lin_systemctl()
+		pipeline = self.trigger_pipeline
+		env = trigger_plan.get_command_env()
 
-	def trigger_softshutdown_lin_systemctl(self):
+		if self.OS_NAME_SHORT == 'lin':
+			trigger_functions = {
+			 'lock-screen': self.trigger_lockscreen_lin,
+			 'soft-shutdown': self.trigger_softshutdown_lin,
+			}
+		elif self.OS_NAME_SHORT == 'win':
+			trigger_functions = {
+			 'lock-screen': self.trigger_lockscreen_win,
+			 'soft-shutdown': self.trigger_softshutdown_win,
+			}
+		else:
+			trigger_functions = {
+			 'lock-screen': self.trigger_lockscreen_mac,
+			 'soft-shutdown': self.trigger_softshutdown_mac,
+			}
 
-		try:
-			# try to shutdown with the `systemctl` command
-			msg = "INFO: Attempting to execute `systemctl poweroff`"
-			print( msg ); logger.debug( msg )
-			result = subprocess.run(
-			 [self.trigger_softshutdown_lin_systemctl_path, 'poweroff'],
-			 capture_output=True,
-			 text=True
-			)
+		def run_step( step, timeout ):
 
-			msg = "DEBUG: subprocess returncode|" +str(result.returncode)+ "|"
-			print( msg ); logger.debug( msg )
+			if step.action == 'trigger' and self.is_trigger_plugin( step.argument ):
+				return self.execute_trigger_plugin( step.argument )
 
-			msg = "DEBUG: subprocess stdout|" +str(result.stdout)+ "|"
-			print( msg ); logger.debug( msg )
+			if step.action == 'trigger':
+				function = trigger_functions[step.argument]
+				if self.OS_NAME_SHORT == 'lin':
+					plan = self.trigger_pipeline_plans.get( step.argument )
+					if plan == None:
+						plan = trigger_plan.compile_plan(
+						 step.argument, self.get_trigger_plan_cache_path()
+						)
+					return function( plan ) != False
 
-			msg = "DEBUG: subprocess stderr|" +str(result.stderr)+ "|"
-			print( msg ); logger.debug( msg )
+				# the windows & mac triggers don't tell us if they worked
+				return function() != False
 
-			if result.returncode != 0:
-				# that didn't work; log it and give up :(
-				msg = "ERROR: Failed to execute `systemctl poweroff`! "
-				print( msg ); logger.error(msg)
+			dispatched = list()
+			strategy = trigger_plan.Strategy(
+			 os.path.basename( step.argument[0] ), step.argument, False
+			)
+			result = trigger_plan.run_command( strategy, env, timeout, dispatched )
+			trigger_plan.log_dispatched( dispatched )
+			return result
 
-		except Exception as e:
-			# that didn't work; log it and give up :(
-			msg = "ERROR: Failed to execute `systemctl poweroff`! " +str(e)
-			print( msg ); logger.error(msg)
+		return trigger_pipeline.execute_pipeline( pipeline, run_step )['succeeded']
 
 	# WINDOWS
 
 	def triggerWin(self):
 
-		if self.trigger == 'soft-shutdown':
+		if self.trigger_pipeline != None:
+			self.execute_trigger_pipeline()
+		elif self.is_trigger_plugin( self.trigger ):
+			self.execute_trigger_plugin( self.trigger )
+		elif self.trigger == 'soft-shutdown':
 			self.trigger_softshutdown_win()
 		else:
 			self.trigger_lockscreen_win()
@@ -1378,7 +3637,11 @@ class BusKill:
 	# MAC
 	def triggerMac(self):
 
-		if self.trigger == 'soft-shutdown':
+		if self.trigger_pipeline != None:
+			self.execute_trigger_pipeline()
+		elif self.is_trigger_plugin( self.trigger ):
+			self.execute_trigger_plugin( self.trigger )
+		elif self.trigger == 'soft-shutdown':
 			self.trigger_softshutdown_mac()
 		else:
 			self.trigger_lockscreen_mac()
@@ -1563,33 +3826,148 @@ class BusKill:
 	# * https://stackoverflow.com/questions/63758186/how-to-catch-exceptions-thrown-by-functions-executed-using-multiprocessing-proce
 	class Process(multiprocessing.Process):
 
-		def __init__(self, *args, **kwargs):
+		def __init__(self, *args, hardened=False, **kwargs):
 			multiprocessing.Process.__init__(self, *args, **kwargs)
+			self._hardened = hardened
 			self._pconn, self._cconn = multiprocessing.Pipe()
 			self._exception = None
+			self._exit_time = multiprocessing.RawValue( 'd', 0 )
 
 		def run(self):
 
 			try: 
+				if self._hardened:
+					hardening.harden()
 				multiprocessing.Process.run(self)
+				self._exit_time.value = time.monotonic()
 				self._cconn.send(None)
 
 			except Exception as e:
+				self._exit_time.value = time.monotonic()
+
 				msg = "DEBUG: Exception thrown in child process: " +str(e)+ "\n"
 				print( msg ); logger.debug( msg )
 
-				tb = traceback.format_exc()
+				tb = traceback.format_exc()
+
+				msg = "DEBUG: Traceback: " +str(tb)
+				print( msg ); logger.debug( msg )
+
+				self._cconn.send((e, tb))
+
+		@property
+		def exception(self):
+			if self._pconn.poll():
+				self._exception = self._pconn.recv()
+			return self._exception
+
+		# becomes readable as soon as the target returns or raises, which is
+		# a bit sooner than the sentinel
+		@property
+		def exception_pipe(self):
+			return self._pconn
+
+		# the time.monotonic() at which the target returned or raised, or None
+		@property
+		def exit_time(self):
+			if self._exit_time.value == 0:
+				return None
+			return self._exit_time.value
+
+	# a drop-in replacement for our Process class (above) for functions that
+	# should run in a thread in this process instead of in a child process. It
+	# also has a 'sentinel' that becomes ready when the thread exits, so it can
+	# be waited-on with multiprocessing.connection.wait() just like a Process.
+	# Unlike a Process, it can't be killed; its target must return on its own
+	class Thread(threading.Thread):
+
+		def __init__(self, *args, hardened=False, **kwargs):
+			threading.Thread.__init__(self, *args, daemon=True, **kwargs)
+			self._hardened = hardened
+			self._sentinel_reader, self._sentinel_writer = multiprocessing.Pipe( duplex=False )
+			self._exception = None
+			self._exit_time = None
+
+		def run(self):
+
+			try:
+				# we only harden this thread, not the whole app
+				if self._hardened:
+					hardening.harden( thread=True )
+				threading.Thread.run(self)
+
+			except Exception as e:
+				msg = "DEBUG: Exception thrown in thread: " +str(e)+ "\n"
+				print( msg ); logger.debug( msg )
+
+				tb = traceback.format_exc()
+
+				msg = "DEBUG: Traceback: " +str(tb)
+				print( msg ); logger.debug( msg )
+
+				self._exception = (e, tb)
+
+			finally:
+				# we write to the pipe (rather than just closing it) so that it
+				# becomes readable even if a forked child inherited a copy of it
+				self._exit_time = time.monotonic()
+				self._sentinel_writer.send_bytes( b'exited' )
+
+		@property
+		def sentinel(self):
+			return self._sentinel_reader
+
+		@property
+		def exception(self):
+			return self._exception
+
+		@property
+		def exit_time(self):
+			return self._exit_time
+
+	# a drop-in replacement for our Process class (above) for a child process
+	# that's a separate program (eg usb_listener.py). Its 'sentinel' becomes
+	# ready when the program exits because that closes the only other copy of
+	# its pipe
+	class Subprocess:
+
+		def __init__(self, args, pass_fds=()):
+			sentinel_reader, sentinel_writer = os.pipe()
+			self.popen = subprocess.Popen(
+			 args, pass_fds = tuple(pass_fds) + (sentinel_writer,)
+			)
+			os.close( sentinel_writer )
+			self._sentinel = multiprocessing.connection.Connection(
+			 sentinel_reader, writable=False
+			)
 
-				msg = "DEBUG: Traceback: " +str(tb)
-				print( msg ); logger.debug( msg )
+		@property
+		def pid(self):
+			return self.popen.pid
 
-				self._cconn.send((e, tb))
+		@property
+		def sentinel(self):
+			return self._sentinel
 
 		@property
 		def exception(self):
-			if self._pconn.poll():
-				self._exception = self._pconn.recv()
-			return self._exception
+			return None
+
+		@property
+		def exitcode(self):
+			return self.popen.returncode
+
+		def is_alive(self):
+			return self.popen.poll() == None
+
+		def kill(self):
+			self.popen.kill()
+
+		def join(self, timeout=None):
+			try:
+				self.popen.wait( timeout )
+			except subprocess.TimeoutExpired:
+				pass
 
 	def wipeCache(self):
 
@@ -1680,6 +4058,10 @@ class BusKill:
 			# it's shared memory; read from it correctly
 			self.upgrade_status_msg.value = bytes(new_msg, 'utf-8')
 
+			# wake-up anyone blocked in wait_upgrade()
+			if self.upgrade_status_writer != None:
+				self.upgrade_status_writer.send_bytes( b'\0' )
+
 	# helper function that executes upgrade() in the background because kivy
 	# apps cannot https://github.com/kivy/kivy/issues/1116
 	#
@@ -1698,6 +4080,7 @@ class BusKill:
 		# change the strings to shared memory using ctypes arrays
 		self.upgrade_status_msg = multiprocessing.Array( 'c', 256 )
 		self.upgrade_result = multiprocessing.Array( 'c', 256 )
+		self.upgrade_status_reader, self.upgrade_status_writer = multiprocessing.Pipe( duplex=False )
 
 		#upgrade_pool = multiprocessing.Pool( processes=1 )
 		#upgrade_process = upgrade_pool.apply_async( upgrade )
@@ -1721,6 +4104,7 @@ class BusKill:
 		self.upgrade_process = None
 		self.upgrade_status_msg = None
 		self.upgrade_result = None
+		self.close_upgrade_status_pipe()
 
 	def upgrade_is_finished(self):
 
@@ -1729,6 +4113,49 @@ class BusKill:
 
 		return True
 
+	# blocks until the background upgrade() process updates its status, exits,
+	# or 'timeout' seconds pass. Returns True if the upgrade is finished (or was
+	# cancelled). This lets a UI show the upgrade's progress without polling it
+	def wait_upgrade( self, timeout=None ):
+
+		# keep our own references; upgrade_bg_terminate() may clear the instance
+		# fields (from another thread) while we're waiting
+		upgrade_process = self.upgrade_process
+		reader = self.upgrade_status_reader
+		if upgrade_process == None or reader == None:
+			return True
+
+		try:
+			ready = multiprocessing.connection.wait(
+			 [ reader, upgrade_process.sentinel ], timeout
+			)
+
+			# we only care that the status changed, not how many times
+			while reader.poll():
+				reader.recv_bytes()
+
+		except (OSError, EOFError, ValueError):
+			# the pipe was closed because the upgrade was cancelled or cleaned-up
+			return True
+
+		if upgrade_process.sentinel in ready:
+			# the sentinel becomes ready a moment before the child can be reaped,
+			# so wait for that moment. Otherwise upgrade_is_finished() could still
+			# return False
+			upgrade_process.join()
+			return True
+
+		return False
+
+	def close_upgrade_status_pipe(self):
+
+		for connection in [ self.upgrade_status_reader, self.upgrade_status_writer ]:
+			if connection != None:
+				connection.close()
+
+		self.upgrade_status_reader = None
+		self.upgrade_status_writer = None
+
 	# this function should be called at the end of upgrade() with its return
 	# this is a hack that effectively allows us to get a value returned from
 	# a function that's executed in a child process using the multiprocessing
@@ -1770,6 +4197,7 @@ class BusKill:
 			self.upgrade_process = None
 			self.upgrade_status_msg = None
 			self.upgrade_result = None
+			self.close_upgrade_status_pipe()
 			self.wipeCache()
 
 			raise exception
@@ -1786,72 +4214,15 @@ class BusKill:
 		self.upgrade_process = None
 		self.upgrade_status_msg = None
 		self.upgrade_result = None
+		self.close_upgrade_status_pipe()
 		self.wipeCache()
 	
 		self.UPGRADED_TO = { 'EXE_PATH': upgrade_result }
 		return upgrade_result
 
-	def upgrade(self):
-
-		self.set_upgrade_status( "Starting Upgrade.." )
-		msg = "DEBUG: Called upgrade()"
-		print( msg ); logger.debug( msg )
-
-		# Note: While this upgrade solution does cryptographically verify the
-		# authenticity and integrity of new versions, it is still vulnerable to
-		# at least the following attacks:
-		# 
-		#  1. Freeze attacks
-		#  2. Slow retrieval attacks
-		#
-		# The fix to this is to upgrade to TUF, once it's safe to do so. In the
-		# meantime, these attacks are not worth mitigating because [a] this app
-		# never auto-updates; it's always requires user input, [b] our app  in
-		# general is low-risk; it doesn't even access the internet outside of the
-		# update process, and [c] these attacks aren't especially severe
-
-		# TODO: switch to using TUF once TUF no longer requires us to install
-		#       untrusted software onto our cold-storage machine holding our
-		#       release private keys. For more info, see:
-		# 
-		#  * https://github.com/BusKill/buskill-app/issues/6
-		#  * https://github.com/theupdateframework/tuf/issues/1109
-
-		#########################
-		# UPGRADE SANITY CHECKS #
-		#########################
-
-		# only upgrade on linux, windows, and mac
-		if self.OS_NAME_SHORT == '':
-			msg = 'Upgrades not supported on this platform (' +CURRENT_PLATFORM+ ')'
-			print( "DEBUG: " + msg ); logger.debug( msg )
-			raise RuntimeWarning( msg )
-
-		# skip upgrade if we can't write to disk
-		if self.DATA_DIR == '':
-			msg = 'Unable to upgrade. No DATA_DIR.'
-			print( "DEBUG: " + msg ); logger.debug( msg )
-			raise RuntimeWarning( msg )
-
-		# make sure we can write to the dir where the new versions will be
-		# extracted
-		if not os.access(self.APPS_DIR, os.W_OK):
-			msg = 'Unable to upgrade. APPS_DIR not writeable (' +str(self.APPS_DIR)+ ')'
-			print( "DEBUG: " + msg ); logger.debug( msg )
-			raise RuntimeWarning( msg )
-
-		# make sure we can delete the executable itself
-		if not os.access( os.path.join(self.EXE_DIR, self.EXE_FILE), os.W_OK):
-			msg = 'Unable to upgrade. EXE_FILE not writeable (' +str( os.path.join(self.EXE_DIR, self.EXE_FILE) )+ ')'
-			print( "DEBUG: " + msg ); logger.debug( msg )
-			raise RuntimeWarning( msg )
-
-		#############
-		# SETUP GPG #
-		#############
-
-		# first, start with a clean cache
-		self.wipeCache()
+	# creates our ephemeral gnupg home dir with the release keys shipped with
+	# the app imported, and returns a gnupg.GPG object that uses it
+	def setup_gpg( self ):
 
 		# prepare our ephemeral gnupg home dir so we can verify the signature of our
 		# checksum file after download and before "install"
@@ -1872,13 +4243,70 @@ class BusKill:
 		gpg = gnupg.GPG( gnupghome=self.GNUPGHOME )
 		gpg.import_keys( KEYS )
 
-		############################
-		# DETERMINE LATEST VERSION #
-		############################
+		return gpg
+
+	# raises a RuntimeError unless 'signature_filepath' is a valid detached
+	# signature of 'metadata_filepath' made with our release signing key
+	def verify_metadata_signature( self, gpg, metadata_filepath, signature_filepath ):
+
+		# open the detached signature and check it with gpg
+		with open( signature_filepath, 'rb' ) as fd:
+			verified = gpg.verify_file( fd, metadata_filepath )
+
+		# check that this main signature fingerprint meets our expectations
+		# bail if it a key was used other than the one we require
+		if verified.fingerprint != RELEASE_KEY_SUB_FINGERPRINT:
+			self.wipeCache()
+			msg = 'ERROR: Invalid signature fingerprint (expected '+str(RELEASE_KEY_SUB_FINGERPRINT)+' but got '+str(verified.fingerprint)+')! Please report this as a bug.'
+			print( msg ); logger.debug( msg )
+			raise RuntimeError( msg )
+
+		# extract from our list of signatures any signatures made with exactly the
+		# keys we'd expect (check the master key and the subkey fingerprints)
+		sig_info = [ verified.sig_info[key] for key in verified.sig_info if verified.sig_info[key]['fingerprint'] == RELEASE_KEY_SUB_FINGERPRINT and verified.sig_info[key]['pubkey_fingerprint'] == RELEASE_KEY_FINGERPRINT ]
+
+		# if we couldn't find a signature that matched our requirements, bail
+		if sig_info == list():
+			self.wipeCache()
+			msg = 'ERROR: No valid signature found! Please report this as a bug.'
+			print( msg ); logger.debug( msg )
+			raise RuntimeError( msg )
+
+		else:
+			sig_info = sig_info.pop()
+
+		# check both the list of signatures and this other one. why not?
+		# bail if either is an invalid signature
+		if verified.status != 'signature valid':
+			self.wipeCache()
+			msg = 'ERROR: No valid signature found! Please report this as a bug (' +str(sig_info)+ ').'
+			print( msg ); logger.debug( msg )
+			raise RuntimeError( msg )
+
+		if sig_info['status'] != 'signature valid':
+			self.wipeCache()
+			msg = 'ERROR: No valid sig_info signature found! Please report this as a bug (' +str(sig_info)+ ').'
+			print( msg ); logger.debug( msg )
+			raise RuntimeError( msg )
+
+		msg = "\tDEBUG: Signature is valid (" +str(sig_info)+ ")."
+		print( msg ); logger.debug( msg )
+
+	# downloads the update metadata (and its detached signature) from the first
+	# of our mirrors that's online, verifies its signature with 'gpg' (see
+	# setup_gpg()), and returns the parsed metadata. This is used both by
+	# upgrade() and by aio.AsyncBusKill.check_for_update()
+	def download_update_metadata( self, gpg ):
 
 		metadata_filepath = os.path.join( self.CACHE_DIR, 'meta.json' )
 		signature_filepath = os.path.join( self.CACHE_DIR, 'meta.json.asc' )
 
+		# the loop below skips any mirror once these files exist, so make sure
+		# that they're not left over from an earlier check
+		for filepath in [ metadata_filepath, signature_filepath ]:
+			if os.path.exists( filepath ):
+				os.remove( filepath )
+
 		# loop through each of our mirrors until we get one that's online
 		metadata = ''
 		random.shuffle(UPGRADE_MIRRORS)
@@ -1925,49 +4353,8 @@ class BusKill:
 		self.set_upgrade_status( "Verifying metadata signature" )
 		msg = "\tDEBUG: Finished downloading update metadata. Checking signature."
 		print( msg ); logger.debug( msg )
-			
-		# open the detached signature and check it with gpg
-		with open( signature_filepath, 'rb' ) as fd:
-			verified = gpg.verify_file( fd, metadata_filepath )
-
-		# check that this main signature fingerprint meets our expectations
-		# bail if it a key was used other than the one we require
-		if verified.fingerprint != RELEASE_KEY_SUB_FINGERPRINT:
-			self.wipeCache()
-			msg = 'ERROR: Invalid signature fingerprint (expected '+str(RELEASE_KEY_SUB_FINGERPRINT)+' but got '+str(verified.fingerprint)+')! Please report this as a bug.'
-			print( msg ); logger.debug( msg )
-			raise RuntimeError( msg )
-
-		# extract from our list of signatures any signatures made with exactly the
-		# keys we'd expect (check the master key and the subkey fingerprints)
-		sig_info = [ verified.sig_info[key] for key in verified.sig_info if verified.sig_info[key]['fingerprint'] == RELEASE_KEY_SUB_FINGERPRINT and verified.sig_info[key]['pubkey_fingerprint'] == RELEASE_KEY_FINGERPRINT ]
-
-		# if we couldn't find a signature that matched our requirements, bail
-		if sig_info == list():
-			self.wipeCache()
-			msg = 'ERROR: No valid signature found! Please report this as a bug.'
-			print( msg ); logger.debug( msg )
-			raise RuntimeError( msg )
-
-		else:
-			sig_info = sig_info.pop()
-
-		# check both the list of signatures and this other one. why not?
-		# bail if either is an invalid signature
-		if verified.status != 'signature valid':
-			self.wipeCache()
-			msg = 'ERROR: No valid signature found! Please report this as a bug (' +str(sig_info)+ ').'
-			print( msg ); logger.debug( msg )
-			raise RuntimeError( msg )
-
-		if sig_info['status'] != 'signature valid':
-			self.wipeCache()
-			msg = 'ERROR: No valid sig_info signature found! Please report this as a bug (' +str(sig_info)+ ').'
-			print( msg ); logger.debug( msg )
-			raise RuntimeError( msg )
 
-		msg = "\tDEBUG: Signature is valid (" +str(sig_info)+ ")."
-		print( msg ); logger.debug( msg )
+		self.verify_metadata_signature( gpg, metadata_filepath, signature_filepath )
 
 		# try to load the metadata (this is done after signature so we don't load
 		# something malicious that may attack the json.loads() parser)
@@ -1985,6 +4372,78 @@ class BusKill:
 			print( "DEBUG: " + msg ); logger.debug( msg )
 			raise RuntimeWarning( msg )
 
+		return metadata
+
+	def upgrade(self):
+
+		self.set_upgrade_status( "Starting Upgrade.." )
+		msg = "DEBUG: Called upgrade()"
+		print( msg ); logger.debug( msg )
+
+		# Note: While this upgrade solution does cryptographically verify the
+		# authenticity and integrity of new versions, it is still vulnerable to
+		# at least the following attacks:
+		# 
+		#  1. Freeze attacks
+		#  2. Slow retrieval attacks
+		#
+		# The fix to this is to upgrade to TUF, once it's safe to do so. In the
+		# meantime, these attacks are not worth mitigating because [a] this app
+		# never auto-updates; it's always requires user input, [b] our app  in
+		# general is low-risk; it doesn't even access the internet outside of the
+		# update process, and [c] these attacks aren't especially severe
+
+		# TODO: switch to using TUF once TUF no longer requires us to install
+		#       untrusted software onto our cold-storage machine holding our
+		#       release private keys. For more info, see:
+		# 
+		#  * https://github.com/BusKill/buskill-app/issues/6
+		#  * https://github.com/theupdateframework/tuf/issues/1109
+
+		#########################
+		# UPGRADE SANITY CHECKS #
+		#########################
+
+		# only upgrade on linux, windows, and mac
+		if self.OS_NAME_SHORT == '':
+			msg = 'Upgrades not supported on this platform (' +CURRENT_PLATFORM+ ')'
+			print( "DEBUG: " + msg ); logger.debug( msg )
+			raise RuntimeWarning( msg )
+
+		# skip upgrade if we can't write to disk
+		if self.DATA_DIR == '':
+			msg = 'Unable to upgrade. No DATA_DIR.'
+			print( "DEBUG: " + msg ); logger.debug( msg )
+			raise RuntimeWarning( msg )
+
+		# make sure we can write to the dir where the new versions will be
+		# extracted
+		if not os.access(self.APPS_DIR, os.W_OK):
+			msg = 'Unable to upgrade. APPS_DIR not writeable (' +str(self.APPS_DIR)+ ')'
+			print( "DEBUG: " + msg ); logger.debug( msg )
+			raise RuntimeWarning( msg )
+
+		# make sure we can delete the executable itself
+		if not os.access( os.path.join(self.EXE_DIR, self.EXE_FILE), os.W_OK):
+			msg = 'Unable to upgrade. EXE_FILE not writeable (' +str( os.path.join(self.EXE_DIR, self.EXE_FILE) )+ ')'
+			print( "DEBUG: " + msg ); logger.debug( msg )
+			raise RuntimeWarning( msg )
+
+		#############
+		# SETUP GPG #
+		#############
+
+		# first, start with a clean cache
+		self.wipeCache()
+
+		gpg = self.setup_gpg()
+
+		############################
+		# DETERMINE LATEST VERSION #
+		############################
+
+		metadata = self.download_update_metadata( gpg )
+
 		###########################
 		# DOWNLOAD LATEST VERSION #
 		###########################
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/aio.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is an asyncio interface to the BusKill app (Linux & MacOS only). Instead of arming in a usb_handler child process, it registers the hotplug backend's file descriptors (libusb's pollfds, the netlink socket, or the sysfs inotify fd) directly with the running event loop. That lets hotplug handling share the caller's loop, without a usb_handler child process or a thread blocked in libusb. Executing the trigger and checking for updates are blocking, so they're run in the loop's default executor, with the same code that BusKill.toggle() and BusKill.upgrade() use::
+
+  abk = AsyncBusKill( bk )
+  await abk.arm()
+  async for event in abk.events():
+    print( event )
+  await abk.disarm()
+
+It re-uses the BusKill object's settings, hotplug callbacks, device filtering and arm epochs, so it behaves just like arming with BusKill.toggle(). Don't arm the same BusKill object both ways at once.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import platform, asyncio, select
+from distutils.version import LooseVersion
+
+from buskill_version import BUSKILL_VERSION
+from . import event_ring
+
+import logging
+logger = logging.getLogger( __name__ )
+
+# platform-specific modules
+CURRENT_PLATFORM = platform.system().upper()
+if CURRENT_PLATFORM.startswith( 'LINUX' ):
+	import usb1
+	from . import netlink_lin, sysfs_lin
+
+if CURRENT_PLATFORM.startswith( 'DARWIN' ):
+	import usb1
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+class AsyncBusKill:
+
+	def __init__( self, bk ):
+
+		self.bk = bk
+		self.loop = None
+		self.armed = False
+
+		# removal events are put on this queue for events(). None means that we
+		# were disarmed
+		self.events_queue = None
+
+		# if True, we execute the trigger ourselves as soon as a removal arrives
+		self.execute_triggers = True
+		self.trigger_tasks = set()
+
+		# the ring buffer that the BusKill object was using before we armed
+		self.saved_usb_handler_ring = None
+
+		# per-backend state
+		self.context = None
+		self.hotplug_handle = None
+		self.reader_fds = set()
+		self.writer_fds = set()
+		self.timeout_handle = None
+		self.sock = None
+		self.uevent_buffer = None
+		self.tracker = None
+		self.watcher = None
+
+	# arms BusKill in the running event loop. If 'execute_trigger' is False,
+	# then removals are only reported by events(); it's up to the caller to
+	# call execute_trigger()
+	async def arm( self, execute_trigger=True ):
+
+		if self.armed or self.bk.is_armed:
+			msg = "ERROR: BusKill is already armed"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		if self.bk.OS_NAME_SHORT not in ['lin', 'mac']:
+			msg = "ERROR: Arming in an asyncio event loop is not supported on your platform"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		self.bk.load_arm_settings()
+		self.bk.prepare_trigger()
+
+		self.loop = asyncio.get_running_loop()
+		self.events_queue = asyncio.Queue()
+		self.execute_triggers = execute_trigger
+
+		# bk.usb_removal() reports removals by writing to bk.usb_handler_ring.
+		# We stand-in for the ring so that they come straight to us instead
+		self.saved_usb_handler_ring = self.bk.usb_handler_ring
+		self.bk.usb_handler_ring = self
+		self.bk.trigger_in_usb_handler = False
+
+		self.bk.arm_epoch.arm()
+
+		hotplug_backend = self.bk.hotplug_backend
+		if hotplug_backend == 'libusb' and self.bk.OS_NAME_SHORT == 'lin' \
+		 and not self.bk.libusb_has_hotplug():
+			msg = "WARNING: libusb is missing hotplug support; falling back to the 'sysfs' hotplug backend"
+			print( msg ); logger.warning( msg )
+			hotplug_backend = 'sysfs'
+
+		try:
+			if hotplug_backend == 'libusb':
+				self.arm_libusb()
+			elif hotplug_backend == 'netlink':
+				self.arm_netlink()
+			elif hotplug_backend == 'sysfs':
+				self.arm_sysfs()
+			else:
+				msg = "ERROR: Unsupported hotplug backend (" +str(hotplug_backend)+ ")"
+				print( msg ); logger.error( msg )
+				raise Exception( msg )
+
+		except:
+			self.disarm_backends()
+			self.bk.usb_handler_ring = self.saved_usb_handler_ring
+			self.bk.stop_trigger_executor()
+			self.bk.unpin_trigger_path()
+			self.bk.arm_epoch.disarm()
+			raise
+
+		self.armed = True
+		self.bk.is_armed = True
+
+		msg = "INFO: BusKill is armed (asyncio). Listening for removal event."
+		print( msg ); logger.info( msg )
+
+	# stops listening for removal events and ends any events() iterators. Any
+	# trigger that's already executing is left to finish
+	async def disarm( self ):
+
+		if not self.armed:
+			return
+
+		self.disarm_backends()
+
+		self.bk.log_arm_epoch_stats()
+		self.bk.stop_trigger_executor()
+		self.bk.unpin_trigger_path()
+		self.bk.arm_epoch.disarm()
+		self.bk.usb_handler_ring = self.saved_usb_handler_ring
+		self.bk.is_armed = False
+		self.armed = False
+
+		self.events_queue.put_nowait( None )
+
+		msg = "INFO: BusKill is disarmed."
+		print( msg ); logger.info( msg )
+
+	# yields a tuple of (message, event time, arm epoch, device) for every
+	# removal event, just like BusKill.get_usb_handler_message(). Ends when
+	# we're disarmed
+	async def events( self ):
+
+		while True:
+			event = await self.events_queue.get()
+			if event == None:
+				return
+			yield event
+
+	# executes the trigger with BusKill.execute_trigger(), in the loop's default
+	# executor so that the loop keeps running while it does. That's the same
+	# code that executes the trigger when arming with BusKill.toggle() (the
+	# trigger plan with its D-Bus fast paths, lock verification & escalation,
+	# the trigger executor and the root child), so both behave the same
+	async def execute_trigger( self, event_time=None ):
+
+		await self.loop.run_in_executor(
+		 None, self.bk.execute_trigger, event_time
+		)
+
+	# downloads the update metadata from the first mirror that responds and
+	# verifies its signature. Returns the latest version if it's newer than
+	# this one, or None if we're already running the latest version. The
+	# download is done by BusKill.download_update_metadata() (the same code that
+	# upgrade() uses) in the loop's default executor
+	async def check_for_update( self ):
+
+		loop = asyncio.get_running_loop()
+		metadata = await loop.run_in_executor( None, self.download_update_metadata )
+
+		latest_release = metadata['latest']['buskill-app']['stable']
+		current_release = BUSKILL_VERSION['VERSION']
+
+		msg = "DEBUG: Current version: " +str(current_release)+ ". Latest version: " +str(latest_release)+ "."
+		print( msg ); logger.debug( msg )
+
+		if LooseVersion(latest_release) <= LooseVersion(current_release):
+			return None
+
+		return latest_release
+
+	# the blocking part of check_for_update()
+	def download_update_metadata( self ):
+
+		gpg = self.bk.setup_gpg()
+		return self.bk.download_update_metadata( gpg )
+
+	############
+	# BACKENDS #
+	############
+
+	def arm_libusb( self ):
+
+		bk = self.bk
+
+		self.context = usb1.USBContext()
+		self.context.open()
+
+		# if the user chose a specific device, then only its removal should
+		# execute the trigger
+		bk.usb_device_index = bk.build_usb_device_index(
+		 ( bk.get_usb_device_key( device ), device.getSerialNumber )
+		 for device in self.context.getDeviceIterator( skip_on_error=True )
+		)
+
+		self.hotplug_handle = bk.register_hotplug_callback( self.context )
+
+		# libusb may add or remove file descriptors at any time
+		for fd, events in self.context.getPollFDList():
+			self.libusb_pollfd_added( fd, events )
+		self.context.setPollFDNotifiers(
+		 self.libusb_pollfd_added, self.libusb_pollfd_removed
+		)
+
+		# handle anything that's already pending and schedule libusb's timeout
+		self.handle_libusb_events()
+
+	def libusb_pollfd_added( self, fd, events, user_data=None ):
+
+		if events & select.POLLIN:
+			self.loop.add_reader( fd, self.handle_libusb_events )
+			self.reader_fds.add( fd )
+		if events & select.POLLOUT:
+			self.loop.add_writer( fd, self.handle_libusb_events )
+			self.writer_fds.add( fd )
+
+	def libusb_pollfd_removed( self, fd, user_data=None ):
+
+		if fd in self.reader_fds:
+			self.loop.remove_reader( fd )
+			self.reader_fds.discard( fd )
+		if fd in self.writer_fds:
+			self.loop.remove_writer( fd )
+			self.writer_fds.discard( fd )
+
+	# called by the loop when one of libusb's file descriptors is ready (or
+	# libusb's timeout expired). This calls our hotplug callback for each event
+	def handle_libusb_events( self ):
+
+		if self.context == None:
+			return
+
+		# this won't block; it just processes what's already pending
+		self.context.handleEventsTimeout( 0 )
+
+		# libusb tells us if it needs to be called again by some deadline, even
+		# if none of its file descriptors become ready
+		if self.timeout_handle != None:
+			self.timeout_handle.cancel()
+			self.timeout_handle = None
+
+		timeout = self.context.getNextTimeout()
+		if timeout != None:
+			self.timeout_handle = self.loop.call_later(
+			 timeout, self.handle_libusb_events
+			)
+
+	def arm_netlink( self ):
+
+		# open the socket *before* we look at what's currently connected so that
+		# we can't miss a removal that happens in-between
+		self.sock = netlink_lin.open_uevent_socket()
+		self.sock.setblocking( False )
+		self.uevent_buffer = bytearray( netlink_lin.UEVENT_BUFFER_SIZE )
+
+		self.tracker = netlink_lin.DeviceTracker()
+		self.bk.usb_device_index = self.bk.build_usb_device_index(
+		 self.tracker.list_usb_devices()
+		)
+
+		self.loop.add_reader( self.sock, self.handle_uevents )
+
+	def handle_uevents( self ):
+
+		while self.sock != None:
+			try:
+				netlink_lin.receive_uevent(
+				 self.sock, self.uevent_buffer, self.bk.hotplugCallbackNetlink,
+				 self.tracker
+				)
+			except BlockingIOError:
+				return
+
+	def arm_sysfs( self ):
+
+		self.watcher = sysfs_lin.SysfsWatcher()
+
+		self.bk.usb_device_index = self.bk.build_usb_device_index(
+		 self.watcher.list_usb_devices()
+		)
+
+		if self.watcher.fileno() != None:
+			self.loop.add_reader( self.watcher.fileno(), self.handle_sysfs_events )
+
+		# sysfs doesn't always generate inotify events, so we re-scan it
+		# periodically too
+		self.timeout_handle = self.loop.call_later(
+		 sysfs_lin.RESCAN_INTERVAL, self.handle_sysfs_events
+		)
+
+	def handle_sysfs_events( self ):
+
+		if self.watcher == None:
+			return
+
+		self.watcher.drain()
+		for fields in self.watcher.scan():
+			self.bk.hotplugCallbackNetlink( fields )
+
+		if self.timeout_handle != None:
+			self.timeout_handle.cancel()
+		self.timeout_handle = self.loop.call_later(
+		 sysfs_lin.RESCAN_INTERVAL, self.handle_sysfs_events
+		)
+
+	# unregisters everything from the loop and closes whatever the backend
+	# opened
+	def disarm_backends( self ):
+
+		for fd in list( self.reader_fds ):
+			self.loop.remove_reader( fd )
+		for fd in list( self.writer_fds ):
+			self.loop.remove_writer( fd )
+		self.reader_fds = set()
+		self.writer_fds = set()
+
+		if self.timeout_handle != None:
+			self.timeout_handle.cancel()
+			self.timeout_handle = None
+
+		if self.context != None:
+			self.context.setPollFDNotifiers( None, None )
+			if self.hotplug_handle != None:
+				self.context.hotplugDeregisterCallback( self.hotplug_handle )
+				self.hotplug_handle = None
+			self.context.close()
+			self.context = None
+
+		if self.sock != None:
+			self.loop.remove_reader( self.sock )
+			self.sock.close()
+			self.sock = None
+			self.tracker = None
+
+		if self.watcher != None:
+			if self.watcher.fileno() != None:
+				self.loop.remove_reader( self.watcher.fileno() )
+			self.watcher.close()
+			self.watcher = None
+
+	# this stands-in for EventRing.put() (see arm()). It's called by
+	# bk.usb_removal() from inside our hotplug callbacks, in the loop's thread
+	def put( self, event_type, epoch, timestamp_ns, key=None ):
+
+		device = None
+		if key != None:
+			device = str(key[0])+ '-' +'.'.join( [str(port) for port in key[1]] )
+
+		event = (
+		 event_ring.EVENT_NAMES.get( event_type ), timestamp_ns / 1e9, epoch,
+		 device
+		)
+
+		if self.execute_triggers and event_type == event_ring.EVENT_TRIGGER:
+			# keep a reference to the task so it isn't garbage collected before
+			# it's done
+			task = self.loop.create_task( self.execute_trigger( event[1] ) )
+			self.trigger_tasks.add( task )
+			task.add_done_callback( self.trigger_tasks.discard )
+
+			self.bk.triggered_epoch = epoch
+
+		self.events_queue.put_nowait( event )
+
+		return True
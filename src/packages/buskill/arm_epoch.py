@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/arm_epoch.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is a tiny state machine that makes sure the trigger fires only once each time BusKill is armed (an "arm epoch"), no matter how many removal events arrive. For example, unplugging a hub or dock makes libusb deliver a burst of removal events, one per device.
+
+Duplicate events are just counted (along with how far apart they were), so that handling even thousands of them per second costs next to nothing.
+
+It's used both by the buskill package and by the standalone usb_listener.py script, so it must not import anything from the rest of the buskill package.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+DISARMED = 'disarmed'
+ARMED = 'armed'
+TRIGGERED = 'triggered'
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+class ArmEpoch:
+
+	def __init__( self ):
+
+		# every time we arm, we start a new epoch with a new (higher) number
+		self.number = 0
+		self.state = DISARMED
+		self.reset_stats()
+
+	def reset_stats( self ):
+
+		self.fired = False
+		self.event_count = 0
+		self.first_event_time = None
+		self.last_event_time = None
+		self.min_gap = None
+		self.max_gap = None
+
+	# starts a new epoch. If 'number' is given (eg by a parent process, so that
+	# the numbers match across processes), then it's used as the new epoch's
+	# number. Otherwise the number is just incremented
+	def arm( self, number=None ):
+
+		if number == None:
+			number = self.number + 1
+
+		self.number = number
+		self.state = ARMED
+		self.reset_stats()
+
+	def disarm( self ):
+
+		self.state = DISARMED
+
+	# records a removal event that happened at 'event_time' (from
+	# time.monotonic()). Returns True if this event should fire the trigger,
+	# which is only the case for the first event of an armed epoch
+	def removal( self, event_time ):
+
+		self.event_count += 1
+
+		if self.last_event_time == None:
+			self.first_event_time = event_time
+		else:
+			gap = event_time - self.last_event_time
+			if self.min_gap == None or gap < self.min_gap:
+				self.min_gap = gap
+			if self.max_gap == None or gap > self.max_gap:
+				self.max_gap = gap
+
+		self.last_event_time = event_time
+
+		if self.state != ARMED:
+			return False
+
+		self.state = TRIGGERED
+		self.fired = True
+		return True
+
+	# returns the number of events that didn't fire the trigger
+	def get_duplicate_count( self ):
+
+		if self.fired:
+			return self.event_count - 1
+
+		return self.event_count
+
+	# returns a dict of this epoch's stats, with times in ms
+	def get_stats( self ):
+
+		stats = {
+		 'epoch': self.number,
+		 'state': self.state,
+		 'events': self.event_count,
+		 'duplicates': self.get_duplicate_count(),
+		 'span_ms': None,
+		 'min_gap_ms': None,
+		 'max_gap_ms': None,
+		}
+
+		if self.first_event_time != None:
+			stats['span_ms'] = round( (self.last_event_time - self.first_event_time)*1000, 3 )
+		if self.min_gap != None:
+			stats['min_gap_ms'] = round( self.min_gap*1000, 3 )
+			stats['max_gap_ms'] = round( self.max_gap*1000, 3 )
+
+		return stats
@@ -0,0 +1,917 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/dbus_lin.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is a small, dependency-free D-Bus client for Linux. It lets the triggers ask the desktop environment to lock the screen (or logind to power off the machine) with a single message on an already-open connection, instead of forking `xdg-screensaver` (a large shell script that probes for the desktop environment and forks even more processes before the screen actually locks) or `shutdown`.
+
+It only implements what we need: connecting to the session or system bus over a unix socket, authenticating with EXTERNAL, calling methods with simple arguments, and subscribing to the signals that say whether the session is locked (and, so that it can be tested against a private dbus-daemon, owning a name, replying to method calls and emitting signals).
+
+Like netlink_lin.py, it's deliberately independent from the rest of the buskill package.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import os, socket, select, struct, threading, time
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+SYSTEM_BUS_ADDRESS = 'unix:path=/var/run/dbus/system_bus_socket'
+
+# how long (in seconds) we wait for the reply to a method call by default
+CALL_TIMEOUT = 2
+
+# message types
+METHOD_CALL = 1
+METHOD_RETURN = 2
+ERROR = 3
+SIGNAL = 4
+
+# message flags
+NO_REPLY_EXPECTED = 0x1
+
+# header fields and the types of their values
+HEADER_FIELDS = {
+ 1: ( 'path', 'o' ),
+ 2: ( 'interface', 's' ),
+ 3: ( 'member', 's' ),
+ 4: ( 'error_name', 's' ),
+ 5: ( 'reply_serial', 'u' ),
+ 6: ( 'destination', 's' ),
+ 7: ( 'sender', 's' ),
+ 8: ( 'signature', 'g' ),
+}
+HEADER_FIELD_CODES = { name: ( code, signature ) for code, (name, signature) in HEADER_FIELDS.items() }
+
+# the struct formats and alignments of the fixed-size types (little endian)
+FIXED_TYPES = {
+ 'y': ( '<B', 1 ),
+ 'b': ( '<I', 4 ),
+ 'n': ( '<h', 2 ),
+ 'q': ( '<H', 2 ),
+ 'i': ( '<i', 4 ),
+ 'u': ( '<I', 4 ),
+ 'x': ( '<q', 8 ),
+ 't': ( '<Q', 8 ),
+ 'd': ( '<d', 8 ),
+ 'h': ( '<I', 4 ),
+}
+
+ALIGNMENTS = { 's': 4, 'o': 4, 'g': 1, 'a': 4, '(': 8, '{': 8, 'v': 1 }
+
+# the methods that the triggers can call, by the name (interface.member) by
+# which the trigger plans refer to them (see trigger_plan.py). A method with a
+# 'check' is only usable if calling the 'check' method (on the same object)
+# when we arm returns 'yes'
+TRIGGER_METHODS = {
+ 'org.gnome.ScreenSaver.Lock': {
+  'bus': 'session', 'destination': 'org.gnome.ScreenSaver',
+  'path': '/org/gnome/ScreenSaver', 'interface': 'org.gnome.ScreenSaver',
+  'member': 'Lock', 'signature': '', 'args': ()
+ },
+ 'org.cinnamon.ScreenSaver.Lock': {
+  'bus': 'session', 'destination': 'org.cinnamon.ScreenSaver',
+  'path': '/org/cinnamon/ScreenSaver', 'interface': 'org.cinnamon.ScreenSaver',
+  'member': 'Lock', 'signature': 's', 'args': ('',)
+ },
+ 'org.freedesktop.ScreenSaver.Lock': {
+  'bus': 'session', 'destination': 'org.freedesktop.ScreenSaver',
+  'path': '/org/freedesktop/ScreenSaver', 'interface': 'org.freedesktop.ScreenSaver',
+  'member': 'Lock', 'signature': '', 'args': ()
+ },
+
+ # this asks logind to tell whatever is listening in our session to lock the
+ # screen. 'auto' is the session of the caller (or the user's display session)
+ 'org.freedesktop.login1.Session.Lock': {
+  'bus': 'system', 'destination': 'org.freedesktop.login1',
+  'path': '/org/freedesktop/login1/session/auto', 'interface': 'org.freedesktop.login1.Session',
+  'member': 'Lock', 'signature': '', 'args': ()
+ },
+
+ # the argument is 'interactive'. We can't answer a password prompt when the
+ # cable is removed, so we only use this if CanPowerOff() says that we're
+ # allowed to power off without one
+ 'org.freedesktop.login1.Manager.PowerOff': {
+  'bus': 'system', 'destination': 'org.freedesktop.login1',
+  'path': '/org/freedesktop/login1', 'interface': 'org.freedesktop.login1.Manager',
+  'member': 'PowerOff', 'signature': 'b', 'args': (False,),
+  'check': 'CanPowerOff'
+ },
+}
+
+# the methods that tell us whether the session is locked (see
+# lock_state_lin.py), by the name by which we refer to them. Each returns a
+# boolean that's True if the session is locked
+LOCK_STATE_METHODS = {
+ # this is set by the screen lockers that tell logind about it (eg GNOME's
+ # and KDE's)
+ 'org.freedesktop.login1.Session.LockedHint': {
+  'bus': 'system', 'destination': 'org.freedesktop.login1',
+  'path': '/org/freedesktop/login1/session/auto', 'interface': 'org.freedesktop.DBus.Properties',
+  'member': 'Get', 'signature': 'ss', 'args': ('org.freedesktop.login1.Session', 'LockedHint')
+ },
+ 'org.gnome.ScreenSaver.GetActive': {
+  'bus': 'session', 'destination': 'org.gnome.ScreenSaver',
+  'path': '/org/gnome/ScreenSaver', 'interface': 'org.gnome.ScreenSaver',
+  'member': 'GetActive', 'signature': '', 'args': ()
+ },
+ 'org.cinnamon.ScreenSaver.GetActive': {
+  'bus': 'session', 'destination': 'org.cinnamon.ScreenSaver',
+  'path': '/org/cinnamon/ScreenSaver', 'interface': 'org.cinnamon.ScreenSaver',
+  'member': 'GetActive', 'signature': '', 'args': ()
+ },
+ 'org.freedesktop.ScreenSaver.GetActive': {
+  'bus': 'session', 'destination': 'org.freedesktop.ScreenSaver',
+  'path': '/org/freedesktop/ScreenSaver', 'interface': 'org.freedesktop.ScreenSaver',
+  'member': 'GetActive', 'signature': '', 'args': ()
+ },
+}
+
+# the signals that tell us as soon as the session is locked (or unlocked), by
+# the name of the LOCK_STATE_METHODS that they go with. A 'path' of None is
+# our logind session's object path (see LockStateBus.get_session_path())
+LOCK_STATE_SIGNALS = {
+ 'org.freedesktop.login1.Session.LockedHint': {
+  'bus': 'system', 'sender': 'org.freedesktop.login1', 'path': None,
+  'interface': 'org.freedesktop.DBus.Properties', 'member': 'PropertiesChanged',
+  'arg0': 'org.freedesktop.login1.Session'
+ },
+ 'org.gnome.ScreenSaver.GetActive': {
+  'bus': 'session', 'sender': 'org.gnome.ScreenSaver', 'path': '/org/gnome/ScreenSaver',
+  'interface': 'org.gnome.ScreenSaver', 'member': 'ActiveChanged'
+ },
+ 'org.cinnamon.ScreenSaver.GetActive': {
+  'bus': 'session', 'sender': 'org.cinnamon.ScreenSaver', 'path': '/org/cinnamon/ScreenSaver',
+  'interface': 'org.cinnamon.ScreenSaver', 'member': 'ActiveChanged'
+ },
+ 'org.freedesktop.ScreenSaver.GetActive': {
+  'bus': 'session', 'sender': 'org.freedesktop.ScreenSaver', 'path': '/org/freedesktop/ScreenSaver',
+  'interface': 'org.freedesktop.ScreenSaver', 'member': 'ActiveChanged'
+ },
+}
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# raised when a method call is answered with an error. 'name' is the D-Bus
+# error name (eg 'org.freedesktop.DBus.Error.ServiceUnknown')
+class DBusError( Exception ):
+
+	def __init__( self, name, message='' ):
+		Exception.__init__( self, str(name)+ ": " +str(message) )
+		self.name = name
+
+# one D-Bus message. 'fields' is a dict of its header fields by name (eg
+# 'member') and 'body' is a tuple of its arguments
+class Message:
+
+	def __init__( self, message_type, fields, body=(), flags=0, serial=0 ):
+
+		self.type = message_type
+		self.fields = fields
+		self.body = body
+		self.flags = flags
+		self.serial = serial
+
+	def __repr__( self ):
+		return 'Message(' +str(self.type)+ ', ' +str(self.fields)+ ', ' +str(self.body)+ ')'
+
+# a connection to a message bus
+class Connection:
+
+	def __init__( self, address ):
+
+		self.sock = connect( address )
+		self.buffer = b''
+		self.serial = 0
+
+		# the steps of a trigger pipeline may call methods from several threads
+		# at once, so only one of them may wait for its reply at a time
+		self.lock = threading.RLock()
+
+		# messages that arrived while we were waiting for a reply to something
+		# else (eg method calls to a name that we own)
+		self.pending = list()
+
+		# the match rules that we added (see add_match()). Signals are only kept
+		# if there are any
+		self.rules = set()
+
+		try:
+			authenticate( self.sock )
+			self.unique_name = self.call(
+			 'org.freedesktop.DBus', '/org/freedesktop/DBus',
+			 'org.freedesktop.DBus', 'Hello'
+			)[0]
+		except Exception:
+			self.close()
+			raise
+
+	def fileno( self ):
+		return self.sock.fileno()
+
+	def close( self ):
+
+		if self.sock != None:
+			self.sock.close()
+			self.sock = None
+
+	# sends a message and returns its serial
+	def send( self, message ):
+
+		self.serial += 1
+		message.serial = self.serial
+		self.sock.sendall( marshal_message( message ) )
+		return message.serial
+
+	# returns the next message from the bus, waiting up to 'timeout' seconds
+	# for it. Returns None if the timeout was reached
+	def receive( self, timeout=None ):
+
+		if len(self.pending) > 0:
+			return self.pending.pop(0)
+
+		return self.read_message( timeout )
+
+	# returns True if receive() would return a message without reading more
+	def has_message( self ):
+
+		if len(self.pending) > 0:
+			return True
+
+		length = get_message_length( self.buffer )
+		return length != None and len(self.buffer) >= length
+
+	# like receive(), but ignores the messages that call() set aside. A
+	# 'timeout' of 0 just reads what has already arrived
+	def read_message( self, timeout=None ):
+
+		deadline = None
+		if timeout != None:
+			deadline = time.monotonic() + timeout
+
+		while True:
+
+			length = get_message_length( self.buffer )
+			if length != None and len(self.buffer) >= length:
+				message = unmarshal_message( self.buffer[0:length] )
+				self.buffer = self.buffer[length:]
+				return message
+
+			if deadline != None:
+				remaining = max( 0, deadline - time.monotonic() )
+				if not select.select( [ self.sock ], [], [], remaining )[0]:
+					return None
+
+			data = self.sock.recv( 65536 )
+			if not data:
+				msg = "ERROR: The D-Bus connection was closed"
+				print( msg ); logger.error( msg )
+				raise Exception( msg )
+
+			self.buffer += data
+
+	# calls a method and returns the body of its reply as a tuple. Raises a
+	# DBusError if the reply is an error
+	def call( self, destination, path, interface, member, signature='', args=(), timeout=CALL_TIMEOUT ):
+
+		with self.lock:
+			return self.call_locked(
+			 destination, path, interface, member, signature, args, timeout
+			)
+
+	def call_locked( self, destination, path, interface, member, signature, args, timeout ):
+
+		fields = {
+		 'destination': destination, 'path': path,
+		 'interface': interface, 'member': member
+		}
+		if signature != '':
+			fields['signature'] = signature
+
+		serial = self.send( Message( METHOD_CALL, fields, tuple(args) ) )
+
+		deadline = time.monotonic() + timeout
+		while True:
+
+			reply = self.read_message( max( 0, deadline - time.monotonic() ) )
+			if reply == None:
+				msg = "ERROR: Timed-out waiting for the reply to " +str(interface)+ "." +str(member)+ "()"
+				print( msg ); logger.error( msg )
+				raise TimeoutError( msg )
+
+			if reply.fields.get( 'reply_serial' ) != serial:
+				# not for us; keep it for whoever wants it (signals are dropped,
+				# unless we subscribed to some)
+				if reply.type == METHOD_CALL \
+				 or ( reply.type == SIGNAL and len(self.rules) > 0 ):
+					self.pending.append( reply )
+				continue
+
+			if reply.type == ERROR:
+				raise DBusError( reply.fields.get( 'error_name' ), ' '.join( str(arg) for arg in reply.body ) )
+
+			return reply.body
+
+	# returns the list of names on the bus
+	def list_names( self ):
+
+		return self.call(
+		 'org.freedesktop.DBus', '/org/freedesktop/DBus',
+		 'org.freedesktop.DBus', 'ListNames'
+		)[0]
+
+	# asks the bus to give us 'name'. Returns True if we got it
+	def request_name( self, name ):
+
+		# 0x4 = DBUS_NAME_FLAG_DO_NOT_QUEUE; 1 = DBUS_REQUEST_NAME_REPLY_PRIMARY_OWNER
+		result = self.call(
+		 'org.freedesktop.DBus', '/org/freedesktop/DBus',
+		 'org.freedesktop.DBus', 'RequestName', 'su', (name, 0x4)
+		)[0]
+		return result == 1
+
+	# asks the bus to send us the signals that match 'rule' (eg
+	# "type='signal',interface='org.gnome.ScreenSaver'")
+	def add_match( self, rule ):
+
+		if rule in self.rules:
+			return
+
+		self.call(
+		 'org.freedesktop.DBus', '/org/freedesktop/DBus',
+		 'org.freedesktop.DBus', 'AddMatch', 's', (rule,)
+		)
+		self.rules.add( rule )
+
+	# emits a signal from the object at 'path'
+	def emit( self, path, interface, member, signature='', args=() ):
+
+		fields = { 'path': path, 'interface': interface, 'member': member }
+		if signature != '':
+			fields['signature'] = signature
+
+		self.send( Message( SIGNAL, fields, tuple(args), flags=NO_REPLY_EXPECTED ) )
+
+	# replies to the method call 'message'
+	def reply( self, message, signature='', args=() ):
+
+		fields = { 'reply_serial': message.serial }
+		if 'sender' in message.fields:
+			fields['destination'] = message.fields['sender']
+		if signature != '':
+			fields['signature'] = signature
+
+		self.send( Message( METHOD_RETURN, fields, tuple(args), flags=NO_REPLY_EXPECTED ) )
+
+	# replies to the method call 'message' with an error
+	def reply_error( self, message, error_name, text='' ):
+
+		fields = {
+		 'reply_serial': message.serial, 'error_name': error_name,
+		 'signature': 's'
+		}
+		if 'sender' in message.fields:
+			fields['destination'] = message.fields['sender']
+
+		self.send( Message( ERROR, fields, (text,), flags=NO_REPLY_EXPECTED ) )
+
+# calls the D-Bus methods that execute (part of) a trigger. The connections
+# are opened (and the usable methods are found) by prepare(), which should be
+# called when arming, so that call() is just one round trip on an already-open
+# connection
+class TriggerBus:
+
+	def __init__( self ):
+
+		self.connections = dict()
+
+		# the names on the buses and of the usable TRIGGER_METHODS and
+		# LOCK_STATE_METHODS when prepare() was last called
+		self.names = set()
+
+		# see get_lock_state_bus()
+		self.lock_state_bus = None
+
+	# (re-)opens the connections to the session & system buses (if they aren't
+	# already open and working) and returns the set of the names on them and of
+	# the TRIGGER_METHODS and LOCK_STATE_METHODS that we can use
+	def prepare( self ):
+
+		self.names = set()
+
+		for (bus, address) in [ ('session', get_session_bus_address()), ('system', get_system_bus_address()) ]:
+
+			connection = self.connections.get( bus )
+			try:
+				if connection == None:
+					if address == None:
+						continue
+					connection = Connection( address )
+					self.connections[bus] = connection
+
+				self.names.update( connection.list_names() )
+
+			except Exception as e:
+				msg = "DEBUG: Unable to use the D-Bus " +str(bus)+ " bus (" +str(e)+ ")"
+				print( msg ); logger.debug( msg )
+
+				if connection != None:
+					connection.close()
+				self.connections.pop( bus, None )
+
+		for (name, method) in list( TRIGGER_METHODS.items() ) + list( LOCK_STATE_METHODS.items() ):
+			if method['destination'] in self.names and self.is_usable( method ):
+				self.names.add( name )
+
+		if self.lock_state_bus != None:
+			self.lock_state_bus.prepare()
+
+		return self.names
+
+	# returns a LockStateBus, opening (and preparing) it the first time. It has
+	# its own connections, so that watching whether the session is locked
+	# can't hold-up the methods that we call on ours
+	def get_lock_state_bus( self ):
+
+		if self.lock_state_bus == None:
+			lock_state_bus = LockStateBus()
+			lock_state_bus.prepare()
+			self.lock_state_bus = lock_state_bus
+
+		return self.lock_state_bus
+
+	# returns True if the 'check' of 'method' (if any) says that we may call it
+	def is_usable( self, method ):
+
+		if 'check' not in method:
+			return True
+
+		try:
+			result = self.connections[ method['bus'] ].call(
+			 method['destination'], method['path'], method['interface'],
+			 method['check']
+			)[0]
+
+		except Exception as e:
+			msg = "DEBUG: Unable to call " +str(method['interface'])+ "." +str(method['check'])+ "() (" +str(e)+ ")"
+			print( msg ); logger.debug( msg )
+			return False
+
+		msg = "DEBUG: " +str(method['interface'])+ "." +str(method['check'])+ "() returned '" +str(result)+ "'"
+		print( msg ); logger.debug( msg )
+
+		return result == 'yes'
+
+	def close( self ):
+
+		for connection in self.connections.values():
+			connection.close()
+		self.connections = dict()
+
+		if self.lock_state_bus != None:
+			self.lock_state_bus.close()
+			self.lock_state_bus = None
+
+	# calls the trigger method 'name' (see TRIGGER_METHODS). Raises an exception
+	# if that didn't work
+	def call( self, name, timeout=CALL_TIMEOUT ):
+
+		self.call_method( TRIGGER_METHODS[name], timeout )
+
+	# calls the lock state method 'name' (see LOCK_STATE_METHODS) and returns
+	# True if it says that the session is locked. Raises an exception if that
+	# didn't work
+	def is_locked( self, name, timeout=CALL_TIMEOUT ):
+
+		return bool( self.call_method( LOCK_STATE_METHODS[name], timeout )[0] )
+
+	def call_method( self, method, timeout ):
+
+		if method['bus'] not in self.connections:
+			msg = "ERROR: Not connected to the D-Bus " +str(method['bus'])+ " bus"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		return self.connections[ method['bus'] ].call(
+		 method['destination'], method['path'], method['interface'],
+		 method['member'], method['signature'], method['args'], timeout
+		)
+
+# asks whether the session is locked (see TriggerBus.is_locked()), and
+# subscribes to the LOCK_STATE_SIGNALS, so that we find out as soon as it is
+# (see receive_lock_state())
+class LockStateBus( TriggerBus ):
+
+	def __init__( self ):
+
+		TriggerBus.__init__( self )
+
+		# the names of the LOCK_STATE_METHODS whose signals we subscribed to
+		self.signals = set()
+
+	def prepare( self ):
+
+		TriggerBus.prepare( self )
+
+		self.signals = set()
+		for (name, signal) in LOCK_STATE_SIGNALS.items():
+			if name not in self.names:
+				continue
+
+			try:
+				path = signal['path']
+				if path == None:
+					path = self.get_session_path()
+
+				rule = "type='signal',sender='" +signal['sender']+ "',path='" +path+ "',interface='" +signal['interface']+ "',member='" +signal['member']+ "'"
+				if 'arg0' in signal:
+					rule+= ",arg0='" +signal['arg0']+ "'"
+
+				self.connections[ signal['bus'] ].add_match( rule )
+				self.signals.add( name )
+
+			except Exception as e:
+				msg = "DEBUG: Unable to subscribe to the signal of '" +str(name)+ "' (" +str(e)+ ")"
+				print( msg ); logger.debug( msg )
+
+		return self.names
+
+	# returns the object path of our logind session. Its signals come from
+	# there, not from '/org/freedesktop/login1/session/auto'
+	def get_session_path( self ):
+
+		connection = self.connections['system']
+		session_id = connection.call(
+		 'org.freedesktop.login1', '/org/freedesktop/login1/session/auto',
+		 'org.freedesktop.DBus.Properties', 'Get', 'ss',
+		 ('org.freedesktop.login1.Session', 'Id')
+		)[0]
+
+		return connection.call(
+		 'org.freedesktop.login1', '/org/freedesktop/login1',
+		 'org.freedesktop.login1.Manager', 'GetSession', 's', (session_id,)
+		)[0]
+
+	# waits up to 'timeout' seconds for one of the signals that we subscribed
+	# to, and returns True if it says that the session was locked or False if
+	# it says that it was unlocked. Returns None if the timeout was reached. A
+	# 'timeout' of 0 just reads the signals that have already arrived
+	def receive_lock_state( self, timeout ):
+
+		deadline = time.monotonic() + timeout
+		connections = [ connection for connection in self.connections.values() if len(connection.rules) > 0 ]
+		if len(connections) == 0:
+			time.sleep( max( 0, timeout ) )
+			return None
+
+		while True:
+
+			ready = [ connection for connection in connections if connection.has_message() ]
+			if len(ready) == 0:
+				ready = select.select(
+				 connections, [], [], max( 0, deadline - time.monotonic() )
+				)[0]
+				if len(ready) == 0:
+					return None
+
+			for connection in ready:
+				message = connection.receive( 0 )
+				if message == None:
+					continue
+
+				locked = get_lock_state( message )
+				if locked != None:
+					return locked
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns True if 'message' is one of the LOCK_STATE_SIGNALS and says that
+# the session was locked, False if it says that it was unlocked, or None
+def get_lock_state( message ):
+
+	if message.type != SIGNAL or len(message.body) == 0:
+		return None
+
+	interface = message.fields.get( 'interface' )
+	member = message.fields.get( 'member' )
+
+	if member == 'ActiveChanged' and interface in [
+	 signal['interface'] for signal in LOCK_STATE_SIGNALS.values()
+	]:
+		return bool( message.body[0] )
+
+	# the body is the interface, a dict of the changed properties, and a list
+	# of the properties that changed but whose values weren't sent
+	if member == 'PropertiesChanged' and len(message.body) == 3 \
+	 and message.body[0] == 'org.freedesktop.login1.Session' \
+	 and 'LockedHint' in message.body[1]:
+		return bool( message.body[1]['LockedHint'] )
+
+	return None
+
+# returns the address of the session bus, or None if we can't find one
+def get_session_bus_address():
+
+	address = os.environ.get( 'DBUS_SESSION_BUS_ADDRESS' )
+	if address:
+		return address
+
+	# systemd puts the user's session bus here, even if it's not in our env
+	path = os.path.join( os.sep + 'run', 'user', str( os.getuid() ), 'bus' )
+	if os.path.exists( path ):
+		return 'unix:path=' +path
+
+	return None
+
+def get_system_bus_address():
+
+	return os.environ.get( 'DBUS_SYSTEM_BUS_ADDRESS', SYSTEM_BUS_ADDRESS )
+
+# returns a connected unix socket for the first address in 'address' (a
+# semicolon-separated list of D-Bus addresses) that we can connect to
+def connect( address ):
+
+	errors = list()
+	for entry in address.split( ';' ):
+
+		(transport, _, options) = entry.partition( ':' )
+		options = dict( option.split( '=', 1 ) for option in options.split( ',' ) if '=' in option )
+
+		if transport != 'unix':
+			errors.append( "unsupported transport '" +str(transport)+ "'" )
+			continue
+
+		if 'path' in options:
+			path = unescape_address_value( options['path'] )
+		elif 'abstract' in options:
+			path = '\0' + unescape_address_value( options['abstract'] )
+		else:
+			errors.append( "no path in '" +str(entry)+ "'" )
+			continue
+
+		sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC )
+		try:
+			sock.connect( path )
+			return sock
+		except OSError as e:
+			sock.close()
+			errors.append( str(e) )
+
+	# this isn't necessarily an error; eg there's often no session bus when
+	# we're running as root
+	msg = "DEBUG: Unable to connect to the D-Bus at '" +str(address)+ "' (" +'; '.join(errors)+ ")"
+	print( msg ); logger.debug( msg )
+	raise Exception( msg )
+
+# decodes the %-escapes in the value of a D-Bus address option
+def unescape_address_value( value ):
+
+	if '%' not in value:
+		return value
+
+	decoded = bytearray()
+	index = 0
+	while index < len(value):
+		if value[index] == '%':
+			decoded.append( int( value[index+1:index+3], 16 ) )
+			index += 3
+		else:
+			decoded += value[index].encode( 'utf-8' )
+			index += 1
+
+	return decoded.decode( 'utf-8' )
+
+# authenticates the (just connected) socket as our uid with the EXTERNAL
+# mechanism
+def authenticate( sock ):
+
+	uid = str( os.getuid() ).encode( 'ascii' ).hex().encode( 'ascii' )
+	sock.sendall( b'\0AUTH EXTERNAL ' + uid + b'\r\n' )
+
+	response = b''
+	while not response.endswith( b'\r\n' ):
+		data = sock.recv( 1 )
+		if not data:
+			break
+		response += data
+
+	if not response.startswith( b'OK ' ):
+		msg = "ERROR: D-Bus authentication failed (" +str(response.strip())+ ")"
+		print( msg ); logger.error( msg )
+		raise Exception( msg )
+
+	sock.sendall( b'BEGIN\r\n' )
+
+# splits a signature into a list of its complete types (eg 'sa{sv}u' into
+# ['s', 'a{sv}', 'u'])
+def split_signature( signature ):
+
+	types = list()
+	index = 0
+	while index < len(signature):
+		end = get_type_end( signature, index )
+		types.append( signature[index:end] )
+		index = end
+
+	return types
+
+# returns the index just after the complete type that starts at 'index'
+def get_type_end( signature, index ):
+
+	code = signature[index]
+
+	if code == 'a':
+		return get_type_end( signature, index+1 )
+
+	if code in '({':
+		closing = ')' if code == '(' else '}'
+		index += 1
+		while signature[index] != closing:
+			index = get_type_end( signature, index )
+		return index + 1
+
+	return index + 1
+
+def get_alignment( signature ):
+
+	code = signature[0]
+	if code in FIXED_TYPES:
+		return FIXED_TYPES[code][1]
+	return ALIGNMENTS[code]
+
+def pad( buffer, alignment ):
+
+	buffer += b'\0' * ( -len(buffer) % alignment )
+
+# appends 'value' (of the single complete type 'signature') to 'buffer'
+def marshal( buffer, signature, value ):
+
+	code = signature[0]
+	pad( buffer, get_alignment( signature ) )
+
+	if code in FIXED_TYPES:
+		buffer += struct.pack( FIXED_TYPES[code][0], value )
+
+	elif code in 'so':
+		data = value.encode( 'utf-8' )
+		buffer += struct.pack( '<I', len(data) ) + data + b'\0'
+
+	elif code == 'g':
+		data = value.encode( 'ascii' )
+		buffer += struct.pack( '<B', len(data) ) + data + b'\0'
+
+	elif code == 'v':
+		(variant_signature, variant_value) = value
+		marshal( buffer, 'g', variant_signature )
+		marshal( buffer, variant_signature, variant_value )
+
+	elif code == 'a':
+		element_signature = signature[1:]
+		length_offset = len(buffer)
+		buffer += b'\0\0\0\0'
+
+		# the length doesn't include the padding before the first element
+		pad( buffer, get_alignment( element_signature ) )
+		start = len(buffer)
+
+		if element_signature[0] == '{':
+			value = value.items()
+		for element in value:
+			marshal( buffer, element_signature, element )
+
+		buffer[length_offset:length_offset+4] = struct.pack( '<I', len(buffer)-start )
+
+	elif code in '({':
+		for (member_signature, member) in zip( split_signature( signature[1:-1] ), value ):
+			marshal( buffer, member_signature, member )
+
+	else:
+		raise ValueError( "unsupported D-Bus type '" +str(signature)+ "'" )
+
+# returns the value (of the single complete type 'signature') at 'offset' in
+# 'data', and the offset just after it
+def unmarshal( data, offset, signature ):
+
+	code = signature[0]
+	offset += -offset % get_alignment( signature )
+
+	if code in FIXED_TYPES:
+		(struct_format, size) = FIXED_TYPES[code]
+		value = struct.unpack_from( struct_format, data, offset )[0]
+		if code == 'b':
+			value = bool(value)
+		return value, offset + struct.calcsize( struct_format )
+
+	if code in 'so':
+		length = struct.unpack_from( '<I', data, offset )[0]
+		offset += 4
+		return bytes( data[offset:offset+length] ).decode( 'utf-8' ), offset + length + 1
+
+	if code == 'g':
+		length = data[offset]
+		offset += 1
+		return bytes( data[offset:offset+length] ).decode( 'ascii' ), offset + length + 1
+
+	if code == 'v':
+		(variant_signature, offset) = unmarshal( data, offset, 'g' )
+		return unmarshal( data, offset, variant_signature )
+
+	if code == 'a':
+		element_signature = signature[1:]
+		length = struct.unpack_from( '<I', data, offset )[0]
+		offset += 4
+		offset += -offset % get_alignment( element_signature )
+		end = offset + length
+
+		elements = list()
+		while offset < end:
+			(element, offset) = unmarshal( data, offset, element_signature )
+			elements.append( element )
+
+		if element_signature[0] == '{':
+			return dict( elements ), offset
+		return elements, offset
+
+	if code in '({':
+		members = list()
+		for member_signature in split_signature( signature[1:-1] ):
+			(member, offset) = unmarshal( data, offset, member_signature )
+			members.append( member )
+		return tuple(members), offset
+
+	raise ValueError( "unsupported D-Bus type '" +str(signature)+ "'" )
+
+def marshal_message( message ):
+
+	body = bytearray()
+	for (signature, value) in zip( split_signature( message.fields.get( 'signature', '' ) ), message.body ):
+		marshal( body, signature, value )
+
+	fields = [
+	 ( HEADER_FIELD_CODES[name][0], ( HEADER_FIELD_CODES[name][1], value ) )
+	 for name, value in message.fields.items()
+	]
+
+	header = bytearray()
+	for (signature, value) in zip(
+	 [ 'y', 'y', 'y', 'y', 'u', 'u', 'a(yv)' ],
+	 [ ord('l'), message.type, message.flags, 1, len(body), message.serial, fields ]
+	):
+		marshal( header, signature, value )
+	pad( header, 8 )
+
+	return bytes( header + body )
+
+# returns the length of the message at the start of 'data', or None if we
+# haven't received enough of it to know yet
+def get_message_length( data ):
+
+	if len(data) < 16:
+		return None
+
+	if data[0:1] != b'l':
+		msg = "ERROR: Received a big-endian D-Bus message, which isn't supported"
+		print( msg ); logger.error( msg )
+		raise Exception( msg )
+
+	(body_length, serial, fields_length) = struct.unpack_from( '<III', data, 4 )
+	header_length = 16 + fields_length
+	header_length += -header_length % 8
+
+	return header_length + body_length
+
+def unmarshal_message( data ):
+
+	(endian, message_type, flags, version, body_length, serial) = struct.unpack_from( '<BBBBII', data, 0 )
+	(fields, offset) = unmarshal( data, 12, 'a(yv)' )
+	offset += -offset % 8
+
+	fields = {
+	 HEADER_FIELDS[code][0]: value for (code, value) in fields
+	 if code in HEADER_FIELDS
+	}
+
+	body = list()
+	for signature in split_signature( fields.get( 'signature', '' ) ):
+		(value, offset) = unmarshal( data, offset, signature )
+		body.append( value )
+
+	return Message( message_type, fields, tuple(body), flags, serial )
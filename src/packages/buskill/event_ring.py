@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/event_ring.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is a small ring buffer in shared memory that the usb_handler uses to tell the app about removal events. It replaces a multiprocessing.Queue, which pickles every message and sends it through a feeder thread and a lock before the app can read it.
+
+There's exactly one writer (the usb_handler) and one reader (the app), so it needs no locks: the writer fills in a fixed-size record and only then advances 'tail'; the reader reads the record and only then advances 'head'. After advancing 'tail', the writer also sends a byte down a pipe so that the reader can sleep (eg in multiprocessing.connection.wait()) until there's something to read.
+
+Each record carries the time.monotonic_ns() at which the removal was detected, so that the app can measure the latency all the way from the hotplug callback to the trigger.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import ctypes, multiprocessing, multiprocessing.connection
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# usb_removal() sends at most one event per arm epoch, so this only needs to
+# be big enough for the events sent while the app is busy (eg executing the
+# trigger)
+EVENT_RING_CAPACITY = 64
+
+# the event types. The names are the same as the messages that the
+# usb_handler used to put on its queue
+EVENT_TRIGGER = 1
+EVENT_TRIGGERED = 2
+EVENT_NAMES = { EVENT_TRIGGER: 'trigger', EVENT_TRIGGERED: 'triggered' }
+EVENT_TYPES = { name: event_type for event_type, name in EVENT_NAMES.items() }
+
+# the USB spec allows at most 7 tiers of ports
+MAX_PORTS = 7
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+class EventRecord( ctypes.Structure ):
+
+	_fields_ = [
+	 ('event_type', ctypes.c_uint32),
+	 ('epoch', ctypes.c_uint32),
+	 ('timestamp_ns', ctypes.c_uint64),
+
+	 # the bus & port numbers of the removed device. 'bus' is 0 if unknown
+	 ('bus', ctypes.c_uint8),
+	 ('port_count', ctypes.c_uint8),
+	 ('ports', ctypes.c_uint8 * MAX_PORTS),
+	]
+
+# a single-producer, single-consumer ring buffer of EventRecords. It must be
+# created before the usb_handler child process is started so that the child
+# inherits it
+class EventRing:
+
+	def __init__( self, capacity=EVENT_RING_CAPACITY ):
+
+		self.capacity = capacity
+		self.records = multiprocessing.RawArray( EventRecord, capacity )
+
+		# 'head' is only ever written by the reader and 'tail' only by the
+		# writer. They only ever increase; the slot is the value modulo capacity
+		self.head = multiprocessing.RawValue( ctypes.c_uint64, 0 )
+		self.tail = multiprocessing.RawValue( ctypes.c_uint64, 0 )
+
+		# the number of events that the writer had to drop because the reader
+		# didn't keep up
+		self.dropped = multiprocessing.RawValue( ctypes.c_uint64, 0 )
+
+		self.reader, self.writer = multiprocessing.Pipe( duplex=False )
+
+	# writes an event to the ring (called by the usb_handler). 'key' is the
+	# optional (bus, port numbers, ...) tuple of the removed device. Returns
+	# False if the ring was full and the event was dropped
+	def put( self, event_type, epoch, timestamp_ns, key=None ):
+
+		tail = self.tail.value
+		if tail - self.head.value >= self.capacity:
+			self.dropped.value += 1
+			return False
+
+		record = self.records[ tail % self.capacity ]
+		record.event_type = event_type
+		record.epoch = epoch
+		record.timestamp_ns = timestamp_ns
+
+		record.bus = 0
+		record.port_count = 0
+		if key != None:
+			ports = key[1][0:MAX_PORTS]
+			record.bus = key[0]
+			record.port_count = len(ports)
+			record.ports[0:len(ports)] = ports
+
+		# publish the record, and only then wake-up the reader
+		self.tail.value = tail + 1
+		self.writer.send_bytes( b'\0' )
+
+		return True
+
+	# returns the oldest unread event as a tuple of (event type, epoch,
+	# timestamp_ns, bus, port numbers), or None if there isn't one. This never
+	# blocks
+	def get_nowait( self ):
+
+		head = self.head.value
+		if head == self.tail.value:
+			return None
+
+		record = self.records[ head % self.capacity ]
+		event = (
+		 record.event_type,
+		 record.epoch,
+		 record.timestamp_ns,
+		 record.bus,
+		 tuple( record.ports[0:record.port_count] )
+		)
+
+		# only now may the writer re-use this slot
+		self.head.value = head + 1
+
+		return event
+
+	# like get_nowait(), but sleeps until there's an event, 'timeout' seconds
+	# pass, or one of the (multiprocessing.connection.wait()-able) 'waitables'
+	# becomes ready
+	def get( self, timeout=None, waitables=() ):
+
+		event = self.get_nowait()
+		if event != None:
+			return event
+
+		multiprocessing.connection.wait( [ self.reader ] + list(waitables), timeout )
+
+		# clear the wake-ups before reading so that we can't miss the wake-up of
+		# an event that's written after we read
+		while self.reader.poll():
+			self.reader.recv_bytes()
+
+		return self.get_nowait()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/hardening.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is BusKill's (optional) "hardened mode". It makes the processes that have to react quickly when the cable is pulled (the usb_handler and the trigger executor) keep doing so even when the machine is swapping or its CPU is pinned at 100%, which is exactly when a slow trigger is most dangerous. In hardened mode, a process
+
+ 1. locks its memory with mlockall(), so that it's never swapped out,
+ 2. lowers its nice value and, on Linux, switches to the SCHED_RR real-time scheduling policy (with SCHED_RESET_ON_FORK, so that the commands that it executes don't inherit it), and
+ 3. on Linux, lowers its oom_score_adj, so that the OOM killer picks other processes first.
+
+Each of these needs privileges that the process may not have (eg CAP_IPC_LOCK or a big enough RLIMIT_MEMLOCK, CAP_SYS_NICE or RLIMIT_NICE/RLIMIT_RTPRIO, and CAP_SYS_RESOURCE). We apply whatever we're permitted to, and report what we actually got.
+
+When the usb_handler is a thread of the app (see 'arm_in_thread'), only the parts that apply to just that thread (2, on Linux) are applied. Locking the memory of (and protecting from the OOM killer) the whole app, with its GUI, isn't what the user asked for.
+
+Like arm_epoch.py, it must not import anything from the rest of the buskill package (the usb_listener.py script uses it too), and it's deliberately small.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import os, sys
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# the nice value that we ask for
+NICE = -10
+
+# the real-time priority that we ask for with SCHED_RR. The processes that we
+# harden sleep nearly all the time, so the lowest one is enough to preempt
+# every normal process when they wake up
+SCHED_PRIORITY = 1
+
+# the oom_score_adj that we ask for. -1000 would make us unkillable, which we
+# leave to the admin
+OOM_SCORE_ADJ = -900
+
+# the parts of hardened mode, in the order of the bits of to_flags()
+FEATURES = [ 'mlockall', 'nice', 'sched', 'oom_score_adj' ]
+
+# the parts of hardened mode that (on linux) only apply to the calling thread.
+# The others apply to the whole process
+THREAD_FEATURES = [ 'nice', 'sched' ]
+
+# from <sys/mman.h>
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+MCL_ONFAULT = 4
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns a short reason for why 'e' stopped us from getting something
+def get_reason( e ):
+
+	if isinstance( e, PermissionError ):
+		return 'denied'
+
+	if isinstance( e, OSError ) and e.errno != None:
+		return 'error-' +str(e.errno)
+
+	return 'error'
+
+# locks our memory. We only lock the pages that we touch (MCL_ONFAULT), so
+# that a big process (like the forked app) doesn't have to fault-in everything
+# that it has mapped. Future mappings are only locked if there's no limit to
+# how much we may lock, because otherwise allocations fail once we hit it
+def lock_memory():
+
+	import ctypes, resource
+
+	flags = MCL_CURRENT
+	(soft, hard) = resource.getrlimit( resource.RLIMIT_MEMLOCK )
+	if soft == resource.RLIM_INFINITY or os.geteuid() == 0:
+		flags |= MCL_FUTURE
+
+	libc = ctypes.CDLL( None, use_errno=True )
+	for extra_flags in [ MCL_ONFAULT, 0 ]:
+		if libc.mlockall( flags | extra_flags ) == 0:
+			return True
+
+		# MCL_ONFAULT is linux >= 4.4 only
+		errno = ctypes.get_errno()
+		if errno != 22:
+			break
+
+	raise OSError( errno, os.strerror( errno ) )
+
+def lower_nice():
+
+	os.setpriority( os.PRIO_PROCESS, 0, NICE )
+	if os.getpriority( os.PRIO_PROCESS, 0 ) != NICE:
+		raise PermissionError()
+
+	return True
+
+def set_realtime():
+
+	if not hasattr( os, 'sched_setscheduler' ):
+		return 'unsupported'
+
+	os.sched_setscheduler(
+	 0, os.SCHED_RR | os.SCHED_RESET_ON_FORK, os.sched_param( SCHED_PRIORITY )
+	)
+	return True
+
+def lower_oom_score_adj():
+
+	path = '/proc/self/oom_score_adj'
+	if not os.path.exists( path ):
+		return 'unsupported'
+
+	with open( path, 'w' ) as fd:
+		fd.write( str(OOM_SCORE_ADJ) )
+
+	return True
+
+# applies as much of hardened mode to this process (or, for nice and sched on
+# linux, this thread) as we're permitted to. If 'thread' is True, then we're
+# just one thread of a bigger process, so we only apply the THREAD_FEATURES.
+# Returns a dict keyed by FEATURES whose values are True if we got that part,
+# or a short reason why not
+def harden( thread=False ):
+
+	per_thread = sys.platform.startswith( 'linux' )
+
+	report = dict()
+	for (feature, function) in [
+	 ( 'mlockall', lock_memory ),
+	 ( 'nice', lower_nice ),
+	 ( 'sched', set_realtime ),
+	 ( 'oom_score_adj', lower_oom_score_adj ),
+	]:
+		if thread and ( feature not in THREAD_FEATURES or not per_thread ):
+			report[feature] = 'process-wide'
+			continue
+
+		try:
+			report[feature] = function()
+		except Exception as e:
+			report[feature] = get_reason( e )
+
+	msg = "INFO: Hardened mode for pid " +str(os.getpid())+ ": " +format_report( report )
+	if thread:
+		msg = "INFO: Hardened mode for a thread of pid " +str(os.getpid())+ ": " +format_report( report )
+	print( msg ); logger.info( msg )
+
+	return report
+
+# returns 'report' as space-separated key=value pairs (eg to send in a reply)
+def format_report( report ):
+
+	return ' '.join( [
+	 feature+ '=' +( 'ok' if report.get( feature ) == True else str( report.get( feature ) ) )
+	 for feature in FEATURES
+	] )
+
+# returns 'report' as an integer with one bit for every part that we got
+def to_flags( report ):
+
+	flags = 0
+	for (bit, feature) in enumerate( FEATURES ):
+		if report.get( feature ) == True:
+			flags |= 1 << bit
+
+	return flags
+
+# returns the report for the integer returned by to_flags()
+def from_flags( flags ):
+
+	return {
+	 feature: ( True if flags & ( 1 << bit ) else 'no' )
+	 for (bit, feature) in enumerate( FEATURES )
+	}
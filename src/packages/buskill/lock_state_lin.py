@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/lock_state_lin.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+A screen locker's exit status (or D-Bus reply) doesn't tell us whether the screen is locked. For example, in Cinnamon `xdg-screensaver lock` exits zero without locking anything, and logind's Lock() succeeds even if nothing in the session listens for it.
+
+This module verifies that the session is actually locked after each strategy of the lock-screen trigger plan (see trigger_plan.execute_plan()). It subscribes to the signals that say that the session was locked (logind's LockedHint of our session, and the ActiveChanged of the desktop's ScreenSaver service: GNOME's, Cinnamon's, or the freedesktop one that KDE implements), so it finds out as soon as the screen locks. It also asks
+
+ * logind's LockedHint,
+ * the GetActive() of the ScreenSaver services, and
+ * `xscreensaver-command -time`,
+
+for the lockers that don't send signals (or in case the screen was already locked). The session counts as locked as soon as any of them says so.
+
+If it isn't locked within VERIFY_TIMEOUT seconds, the strategy is treated like one that failed, so the next one is tried right away. But we keep watching while it's executed, because the strategy may have worked after all (eg GNOME and KDE fade the screen out before their screensaver says that it's active). And before the plan is given up on (eg to escalate to another trigger), the last strategy that we couldn't verify gets up to SETTLE_TIMEOUT seconds. How long each verification took is logged, and kept in the verifier's 'results'.
+
+Linux only. Like trigger_plan.py, it must not import anything from the rest of the buskill package; the D-Bus connections are passed in (see dbus_lin.TriggerBus and dbus_lin.LockStateBus).
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import shutil, subprocess, threading, time
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# the triggers whose strategies are verified
+LOCK_TRIGGERS = [ 'lock-screen' ]
+
+# the D-Bus methods that tell us whether the session is locked (see
+# dbus_lin.LOCK_STATE_METHODS), in the order in which we ask them
+DBUS_PROBES = [
+ 'org.gnome.ScreenSaver.GetActive',
+ 'org.cinnamon.ScreenSaver.GetActive',
+ 'org.freedesktop.ScreenSaver.GetActive',
+ 'org.freedesktop.login1.Session.LockedHint',
+]
+
+# the command that tells us whether xscreensaver has locked the screen. It
+# prints (eg) 'XScreenSaver 5.45: screen locked since Sat Oct 18 12:34:56 2026'
+XSCREENSAVER_PROBE = [ 'xscreensaver-command', '-time' ]
+
+# how long (in seconds) we wait for the session to be locked after a strategy
+# succeeded before we try the next one. We keep watching while it's executed
+VERIFY_TIMEOUT = 0.3
+
+# how long (in seconds) we wait for the session to be locked before we give up
+# on the plan. GNOME and KDE fade the screen out before their screensaver says
+# that it's active, which can take over a second
+SETTLE_TIMEOUT = 2
+
+# the most time (in seconds) between asking the probes
+POLL_INTERVAL = 0.05
+
+# the most time (in seconds) that asking one probe may take
+PROBE_TIMEOUT = 0.25
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# verifies that the session is locked. 'trigger_bus' is a dbus_lin.TriggerBus
+# that has been prepared (or None), and 'env' is the environment in which the
+# probe commands are executed. It's used for one execution of a plan; stop()
+# must be called once it's done
+class LockVerifier:
+
+	def __init__( self, trigger_bus=None, env=None, timeout=VERIFY_TIMEOUT ):
+
+		self.env = env
+		self.timeout = timeout
+
+		# we watch on connections of our own, so that we don't hold-up the
+		# strategies' method calls on the trigger_bus'
+		self.lock_state_bus = None
+		if trigger_bus != None:
+			self.lock_state_bus = trigger_bus.get_lock_state_bus()
+
+		# the probes that we can ask. These are the names of D-Bus methods and
+		# the absolute path to xscreensaver-command
+		self.probes = list()
+		self.signals = set()
+		if self.lock_state_bus != None:
+			self.probes = [ name for name in DBUS_PROBES if name in self.lock_state_bus.names ]
+			self.signals = self.lock_state_bus.signals
+
+		self.xscreensaver_command = shutil.which( XSCREENSAVER_PROBE[0] )
+		if self.xscreensaver_command != None:
+			self.probes.append( self.xscreensaver_command )
+
+		# a list of tuples of the name of each strategy that we verified, how
+		# long (in ms) it took until the session was locked (or until we gave
+		# up), and whether it was locked
+		self.results = list()
+
+		# the thread that watches whether the session gets locked (see watch()).
+		# It's started by the first verify()
+		self.watcher = None
+		self.stopping = False
+
+		# set when the watcher finished, and whether the session was locked (or
+		# None if it can't tell because every probe failed)
+		self.finished = threading.Event()
+		self.locked = False
+
+	def is_available( self ):
+
+		return len(self.probes) > 0 or len(self.signals) > 0
+
+	# asks each of 'probes' whether the session is locked, giving up at
+	# 'deadline'. Probes that fail are removed from 'probes'. Returns True if any
+	# of them says that the session is locked
+	def is_locked( self, probes, deadline ):
+
+		for probe in list( probes ):
+
+			timeout = min( PROBE_TIMEOUT, deadline - time.monotonic() )
+			if timeout <= 0:
+				break
+
+			try:
+				if probe == self.xscreensaver_command:
+					locked = is_xscreensaver_locked( probe, self.env, timeout )
+				else:
+					locked = self.lock_state_bus.is_locked( probe, timeout )
+
+			except Exception as e:
+				msg = "DEBUG: Unable to ask '" +str(probe)+ "' whether the session is locked (" +str(e)+ ")"
+				print( msg ); logger.debug( msg )
+				probes.remove( probe )
+				continue
+
+			if locked:
+				return True
+
+		return False
+
+	# the target of the watcher thread. It waits for the signals that say that
+	# the session was locked and, in-between, asks the probes (at most every
+	# POLL_INTERVAL seconds) until the session is locked, 'deadline' passes, or
+	# stop() is called
+	def watch( self, deadline ):
+
+		probes = list( self.probes )
+		signals = len(self.signals) > 0
+
+		try:
+			# forget the signals that arrived since the last time we watched. The
+			# probes tell us whether the session is locked now
+			if signals:
+				while self.lock_state_bus.receive_lock_state( 0 ) != None:
+					pass
+
+			delay = 0.005
+			while not self.stopping:
+
+				if self.is_locked( probes, deadline ):
+					self.locked = True
+					return
+
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					return
+
+				if signals:
+					if self.lock_state_bus.receive_lock_state( min( delay, remaining ) ) == True:
+						self.locked = True
+						return
+				elif len(probes) == 0:
+					self.locked = None
+					return
+				else:
+					time.sleep( min( delay, remaining ) )
+
+				delay = min( delay*2, POLL_INTERVAL )
+
+		except Exception as e:
+			msg = "WARNING: Unable to watch whether the session gets locked (" +str(e)+ ")"
+			print( msg ); logger.warning( msg )
+			self.locked = None
+
+		finally:
+			self.finished.set()
+
+	# waits up to VERIFY_TIMEOUT seconds (or SETTLE_TIMEOUT, if 'settle' is
+	# True, but no more than 'timeout') for the session to be locked after
+	# 'strategy' (a trigger_plan.Strategy) succeeded. Returns True if it's
+	# locked, False if it isn't, or None if we can't tell (because every probe
+	# failed). The session may be locked by an earlier strategy; we keep
+	# watching until stop() is called. This is the 'verify' of
+	# trigger_plan.execute_plan()
+	def verify( self, strategy, timeout, settle=False ):
+
+		start_time = time.monotonic()
+		timeout = max( timeout, 0 )
+
+		if self.watcher == None:
+			self.watcher = threading.Thread(
+			 target = self.watch, args = ( start_time + timeout, ), daemon = True
+			)
+			self.watcher.start()
+
+		if settle:
+			self.finished.wait( min( SETTLE_TIMEOUT, timeout ) )
+		else:
+			self.finished.wait( min( self.timeout, timeout ) )
+
+		latency = round( (time.monotonic()-start_time)*1000, 3 )
+
+		if self.finished.is_set() and self.locked == True:
+			self.results.append( (strategy.name, latency, True) )
+
+			msg = "INFO: Verified that the session is locked " +str(latency)+ " ms after '" +str(strategy.name)+ "' succeeded"
+			print( msg ); logger.info( msg )
+			return True
+
+		if self.finished.is_set() and self.locked == None:
+			self.results.append( (strategy.name, latency, None) )
+			msg = "WARNING: Unable to verify that the session is locked after '" +str(strategy.name)+ "' succeeded"
+			print( msg ); logger.warning( msg )
+			return None
+
+		self.results.append( (strategy.name, latency, False) )
+		msg = "WARNING: The session still isn't locked " +str(latency)+ " ms after '" +str(strategy.name)+ "' succeeded!"
+		if not settle:
+			msg+= " Trying the next one."
+		print( msg ); logger.warning( msg )
+		return False
+
+	# stops the watcher thread (if it's running), so that it doesn't use our
+	# connections after the plan was executed
+	def stop( self ):
+
+		if self.watcher == None:
+			return
+
+		self.stopping = True
+		self.watcher.join( PROBE_TIMEOUT + POLL_INTERVAL )
+		self.watcher = None
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns True if xscreensaver says that it has locked the screen. Raises an
+# exception if xscreensaver-command (at 'command') failed (eg because
+# xscreensaver isn't running)
+def is_xscreensaver_locked( command, env, timeout ):
+
+	result = subprocess.run(
+	 [ command ] + XSCREENSAVER_PROBE[1:], stdin=subprocess.DEVNULL,
+	 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env, timeout=timeout
+	)
+	if result.returncode != 0:
+		raise Exception( "returncode " +str(result.returncode) )
+
+	return b'screen locked' in result.stdout
+
+# returns a LockVerifier for 'plan' (a trigger_plan.TriggerPlan), or None if
+# its trigger isn't verified or we have no way to tell if the session is locked
+def get_verifier( plan, trigger_bus=None, env=None ):
+
+	if plan == None or plan.trigger not in LOCK_TRIGGERS:
+		return None
+
+	verifier = LockVerifier( trigger_bus, env )
+	if not verifier.is_available():
+		msg = "DEBUG: Unable to verify that the session gets locked; there's nothing to ask"
+		print( msg ); logger.debug( msg )
+		return None
+
+	msg = "DEBUG: Verifying that the session gets locked with:|" +str(verifier.probes)+ "| and the signals of:|" +str( sorted(verifier.signals) )+ "|"
+	print( msg ); logger.debug( msg )
+
+	return verifier
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/netlink_lin.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is a small, dependency-free listener for USB hotplug events on Linux. Instead of going through libusb, it reads the kernel's uevents directly from a NETLINK_KOBJECT_UEVENT socket, so we learn about a removal as soon as the kernel broadcasts it.
+
+It's deliberately independent from the rest of the buskill package so that it can be tested by feeding recorded uevent datagrams through a socketpair.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import os, socket, select, errno
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# from linux/netlink.h
+NETLINK_KOBJECT_UEVENT = getattr( socket, 'NETLINK_KOBJECT_UEVENT', 15 )
+
+# the multicast group to which the kernel itself broadcasts uevents (udev
+# re-broadcasts them to group 2, but we don't want to wait for udev)
+UEVENT_GROUP_KERNEL = 1
+
+# uevents are limited to 2048 bytes of environment by the kernel, but we leave
+# plenty of room in case that changes
+UEVENT_BUFFER_SIZE = 8192
+
+# ask the kernel for a large receive buffer so we don't drop events during an
+# event storm (eg when a USB hub with many devices is unplugged). Like udev, we
+# try SO_RCVBUFFORCE first, because SO_RCVBUF is capped by net.core.rmem_max
+UEVENT_SOCKET_RCVBUF = 16 * 1024 * 1024
+
+# from asm-generic/socket.h; python doesn't define it
+SO_RCVBUFFORCE = getattr( socket, 'SO_RCVBUFFORCE', 33 )
+
+SYSFS_USB_DEVICES = '/sys/bus/usb/devices'
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# keeps track of the usb devices that are connected: from sysfs when it's
+# created, and then from the uevents of their addition and removal (see
+# receive_uevent()). If the kernel drops some of our uevents, then rescan()
+# tells us which devices were removed in the meantime, so a removal that we
+# never received can't keep the trigger from firing
+class DeviceTracker:
+
+	def __init__( self, sysfs_path=None ):
+
+		# we look this up now (rather than in the default argument) so that it can
+		# be pointed somewhere else for testing
+		if sysfs_path == None:
+			sysfs_path = SYSFS_USB_DEVICES
+		self.sysfs_path = sysfs_path
+
+		# the (key, serial) tuples of the devices, keyed by their name in sysfs
+		self.devices = dict()
+
+		try:
+			names = os.listdir( sysfs_path )
+		except OSError as e:
+			msg = "WARNING: Unable to list usb devices in '" +str(sysfs_path)+ "' (" +str(e)+ ")"
+			print( msg ); logger.warning( msg )
+			names = list()
+
+		for name in names:
+			device = read_usb_device( name, sysfs_path )
+			if device != None:
+				self.devices[name] = device
+
+	# returns a list of (key, serial) tuples for the devices that are currently
+	# connected, like list_usb_devices()
+	def list_usb_devices( self ):
+
+		return list( self.devices.values() )
+
+	# updates the devices from the parsed fields of the uevent of the addition
+	# or removal of a usb device
+	def update( self, fields ):
+
+		name = fields.get( 'DEVPATH', '' ).split('/')[-1]
+
+		if fields.get( 'ACTION' ) == 'remove':
+			self.devices.pop( name, None )
+			return
+
+		# we can't read the serial number from the uevent, but we don't need it
+		key = get_usb_device_key( fields )
+		if key != None:
+			self.devices[name] = (key, None)
+
+	# re-lists sysfs after uevents were lost and returns a list of the
+	# uevent-like fields (see parse_uevent()) of every device that was removed
+	# in the meantime. If we can't list sysfs, then we fail closed: every
+	# device that we knew about counts as removed
+	def rescan( self ):
+
+		try:
+			names = set( os.listdir( self.sysfs_path ) )
+		except OSError as e:
+			msg = "ERROR: Unable to list usb devices in '" +str(self.sysfs_path)+ "' (" +str(e)+ "). Assuming that every usb device was removed!"
+			print( msg ); logger.error( msg )
+			names = set()
+
+		removals = list()
+		for name in set( self.devices.keys() ) - names:
+			(key, serial) = self.devices.pop( name )
+			removals.append( get_removal_fields( name, key ) )
+
+		for name in names - set( self.devices.keys() ):
+			device = read_usb_device( name, self.sysfs_path )
+			if device != None:
+				self.devices[name] = device
+
+		return removals
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# opens a socket that receives the kernel's uevent broadcasts. This doesn't
+# require root
+def open_uevent_socket():
+
+	sock = socket.socket(
+	 socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT
+	)
+
+	# SO_RCVBUFFORCE ignores rmem_max, but it needs CAP_NET_ADMIN
+	try:
+		sock.setsockopt( socket.SOL_SOCKET, SO_RCVBUFFORCE, UEVENT_SOCKET_RCVBUF )
+	except OSError as e:
+		try:
+			sock.setsockopt( socket.SOL_SOCKET, socket.SO_RCVBUF, UEVENT_SOCKET_RCVBUF )
+		except OSError as e:
+			msg = "DEBUG: Unable to increase uevent socket's receive buffer (" +str(e)+ ")"
+			print( msg ); logger.debug( msg )
+
+	# port id 0 tells the kernel to assign us one
+	sock.bind( (0, UEVENT_GROUP_KERNEL) )
+
+	return sock
+
+# returns True if the given uevent datagram is the removal of a usb device
+# (rather than, for example, the removal of one of its interfaces). This just
+# searches the raw bytes in-place, so it's cheap enough to run on every event
+def is_usb_device_removal( datagram, length=None ):
+
+	return is_usb_device_event( datagram, b'remove@', length )
+
+# returns True if the given uevent datagram is the addition of a usb device
+def is_usb_device_addition( datagram, length=None ):
+
+	return is_usb_device_event( datagram, b'add@', length )
+
+# returns True if the given uevent datagram's header starts with 'action' (eg
+# b'remove@') and it's about a usb device
+def is_usb_device_event( datagram, action, length=None ):
+
+	if length == None:
+		length = len(datagram)
+
+	# every field (including the last one) is terminated by a null byte
+	return length >= len(action) \
+	 and datagram.startswith( action ) \
+	 and datagram.find( b'\0SUBSYSTEM=usb\0', 0, length ) != -1 \
+	 and datagram.find( b'\0DEVTYPE=usb_device\0', 0, length ) != -1
+
+# extracts the value of one 'KEY=value' field from a uevent datagram without
+# splitting (copying) the rest of the datagram. Returns None if it's missing
+def get_uevent_value( datagram, key, length=None ):
+
+	if length == None:
+		length = len(datagram)
+
+	needle = b'\0' +key+ b'='
+	start = datagram.find( needle, 0, length )
+	if start == -1:
+		return None
+	start += len(needle)
+
+	end = datagram.find( b'\0', start, length )
+	if end == -1:
+		end = length
+
+	return bytes( datagram[start:end] ).decode( 'utf-8', 'replace' )
+
+# returns a dict of the fields that we care about from a uevent datagram
+def parse_uevent( datagram, length=None ):
+
+	fields = dict()
+	for key in [
+	 b'ACTION', b'SUBSYSTEM', b'DEVTYPE', b'DEVPATH', b'PRODUCT', b'BUSNUM',
+	 b'DEVNUM'
+	]:
+		value = get_uevent_value( datagram, key, length )
+		if value != None:
+			fields[ key.decode('ascii') ] = value
+
+	return fields
+
+# returns the same fields that parse_uevent() would return for the uevent of
+# the removal of the device with the given sysfs 'name' and key (see
+# get_usb_device_key())
+def get_removal_fields( name, key ):
+
+	(bus, ports, vid, pid) = key
+	return {
+	 'ACTION': 'remove',
+	 'SUBSYSTEM': 'usb',
+	 'DEVTYPE': 'usb_device',
+	 'DEVPATH': '/bus/usb/devices/' +str(name),
+	 'PRODUCT': format(vid, 'x')+ '/' +format(pid, 'x')+ '/0',
+	 'BUSNUM': format(bus, '03d'),
+	}
+
+# converts the name of a usb device in sysfs (eg '1-2.3', which is the last
+# component of its DEVPATH) into a tuple of (bus, port numbers). Returns None
+# for root hubs (eg 'usb1') and interfaces (eg '1-2.3:1.0')
+def parse_usb_device_name( name ):
+
+	if ':' in name or '-' not in name:
+		return None
+
+	try:
+		(bus, ports) = name.split( '-', 1 )
+		return ( int(bus), tuple( [int(port) for port in ports.split('.')] ) )
+	except ValueError:
+		return None
+
+# returns the same (bus, port numbers, vendor id, product id) tuple that
+# BusKill.get_usb_device_key() returns for libusb devices, but from the
+# fields of a parsed uevent. Returns None if the uevent isn't for a usb device
+def get_usb_device_key( fields ):
+
+	if 'DEVPATH' not in fields or 'PRODUCT' not in fields:
+		return None
+
+	location = parse_usb_device_name( fields['DEVPATH'].split('/')[-1] )
+	if location == None:
+		return None
+
+	# PRODUCT is formatted as 'vid/pid/bcdDevice' in hex without leading zeros
+	try:
+		(vid, pid) = fields['PRODUCT'].split('/')[0:2]
+		return location + ( int(vid, 16), int(pid, 16) )
+	except ValueError:
+		return None
+
+# returns a list of (key, serial) tuples for every usb device that's currently
+# connected according to sysfs, where key is the same tuple returned by
+# get_usb_device_key() and serial is the serial number (or None)
+def list_usb_devices( sysfs_path=SYSFS_USB_DEVICES ):
+
+	devices = list()
+
+	try:
+		names = os.listdir( sysfs_path )
+	except OSError as e:
+		msg = "WARNING: Unable to list usb devices in '" +str(sysfs_path)+ "' (" +str(e)+ ")"
+		print( msg ); logger.warning( msg )
+		return devices
+
+	for name in names:
+
+		device = read_usb_device( name, sysfs_path )
+		if device != None:
+			devices.append( device )
+
+	return devices
+
+# returns the (key, serial) tuple of the usb device whose dir in sysfs is
+# named 'name', or None if it's not a usb device (eg it's a root hub or an
+# interface) or it's gone
+def read_usb_device( name, sysfs_path=SYSFS_USB_DEVICES ):
+
+	location = parse_usb_device_name( name )
+	if location == None:
+		return None
+
+	values = dict()
+	for attribute in ['idVendor', 'idProduct', 'serial']:
+		try:
+			with open( os.path.join( sysfs_path, name, attribute ) ) as fd:
+				values[attribute] = fd.read().strip()
+		except OSError:
+			values[attribute] = None
+
+	try:
+		key = location + (
+		 int(values['idVendor'], 16), int(values['idProduct'], 16)
+		)
+	except (TypeError, ValueError):
+		return None
+
+	return (key, values['serial'])
+
+# blocks reading uevents from 'sock' and calls 'callback' with the parsed
+# fields of every usb device removal. Returns as soon as 'stop' (anything that
+# select() accepts, eg the read end of a pipe or a multiprocessing Connection)
+# becomes readable. 'tracker' is the DeviceTracker that was created right after
+# 'sock' was opened (see receive_uevent())
+def listen( sock, callback, stop=None, tracker=None ):
+
+	# we receive every datagram into the same buffer so that there's no
+	# allocation for the (many) uevents that we don't care about
+	buffer = bytearray( UEVENT_BUFFER_SIZE )
+
+	readers = [sock]
+	if stop != None:
+		readers.append( stop )
+
+	while True:
+
+		readable = select.select( readers, [], [] )[0]
+
+		if stop != None and stop in readable:
+			msg = "DEBUG: Stopping uevent listener"
+			print( msg ); logger.debug( msg )
+			return
+
+		receive_uevent( sock, buffer, callback, tracker )
+
+# receives one uevent datagram from 'sock' into 'buffer' and, if it's the
+# removal of a usb device, calls 'callback' with its parsed fields. If 'sock'
+# is non-blocking, this raises BlockingIOError when there's nothing to receive.
+#
+# If the kernel dropped some of our uevents (because we didn't read them fast
+# enough), then one of them may have been the removal that should execute the
+# trigger. So if we have a 'tracker' (a DeviceTracker), we ask it which devices
+# are gone and call 'callback' for each of them, as if we'd received their
+# removals. The tracker is also kept up-to-date with every usb device that's
+# added or removed
+def receive_uevent( sock, buffer, callback, tracker=None ):
+
+	try:
+		length = sock.recv_into( buffer )
+	except OSError as e:
+		if e.errno != errno.ENOBUFS:
+			raise
+
+		if tracker == None:
+			msg = "ERROR: uevent socket overflowed; some events were lost, and we can't tell whether a usb device was removed!"
+			print( msg ); logger.error( msg )
+			return
+
+		msg = "WARNING: uevent socket overflowed; some events were lost. Re-scanning the usb devices"
+		print( msg ); logger.warning( msg )
+
+		for fields in tracker.rescan():
+			msg = "WARNING: usb device '" +str(fields['DEVPATH'])+ "' was removed while uevents were lost"
+			print( msg ); logger.warning( msg )
+			callback( fields )
+		return
+
+	if tracker != None and is_usb_device_addition( buffer, length ):
+		tracker.update( parse_uevent( buffer, length ) )
+		return
+
+	if not is_usb_device_removal( buffer, length ):
+		return
+
+	fields = parse_uevent( buffer, length )
+	if tracker != None:
+		tracker.update( fields )
+
+	callback( fields )
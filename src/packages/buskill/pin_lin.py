@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/pin_lin.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+The BusKill app often runs from a USB drive (sometimes the very one that's attached to the cable). If that drive is removed or stalls, then any page of the trigger's code that has to be read from it (eg a binary that the trigger executes, a shared library, or the python interpreter in the AppImage's squashfs) can stall or fail the trigger.
+
+This module finds the files that executing the trigger needs, and "pins" them in RAM (like `vmtouch -l`): it maps each file and mlock()s the mapping, which reads the whole file into the page cache and keeps it there until we unpin it. It also finds out which of those files are on removable media, so the app can warn about (or refuse) a trigger that still depends on them.
+
+Linux only. Like arm_epoch.py, it must not import anything from the rest of the buskill package.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import ctypes, glob, mmap, os, shutil, subprocess, sys
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# we don't pin files that are bigger than this
+MAX_FILE_BYTES = 256*1024*1024
+
+# how long (in seconds) we wait for `ldd` to list the libraries of a binary
+LDD_TIMEOUT = 5
+
+# from <sys/mman.h>
+MADV_WILLNEED = 3
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# keeps files pinned in RAM until release() is called
+class Pinner:
+
+	def __init__( self ):
+
+		self.libc = ctypes.CDLL( None, use_errno=True )
+		self.libc.mmap.restype = ctypes.c_void_p
+		self.libc.mmap.argtypes = [
+		 ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int,
+		 ctypes.c_int, ctypes.c_long
+		]
+		for function in [ self.libc.munmap, self.libc.mlock ]:
+			function.argtypes = [ ctypes.c_void_p, ctypes.c_size_t ]
+		self.libc.madvise.argtypes = [ ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int ]
+
+		# tuples of the address and length of each of our mappings
+		self.mappings = list()
+
+		self.mapped_bytes = 0
+		self.locked_bytes = 0
+
+	# pins every file in 'paths'. Returns a dict keyed by path whose values are
+	# True if the file is locked in RAM, or a short reason why it isn't. Files
+	# that we mapped but couldn't lock (eg because RLIMIT_MEMLOCK is too small)
+	# are still read into the page cache
+	def pin( self, paths ):
+
+		result = dict()
+		for path in paths:
+			try:
+				result[path] = self.pin_file( path )
+			except OSError as e:
+				result[path] = 'error-' +str(e.errno)
+
+		return result
+
+	def pin_file( self, path ):
+
+		fd = os.open( path, os.O_RDONLY | os.O_CLOEXEC )
+		try:
+			size = os.fstat( fd ).st_size
+			if size == 0:
+				return 'empty'
+			if size > MAX_FILE_BYTES:
+				return 'too-big'
+
+			address = self.libc.mmap(
+			 None, size, mmap.PROT_READ, mmap.MAP_SHARED, fd, 0
+			)
+			if address in [ None, ctypes.c_void_p( -1 ).value ]:
+				errno = ctypes.get_errno()
+				raise OSError( errno, os.strerror( errno ) )
+
+		finally:
+			# the mapping keeps the file open
+			os.close( fd )
+
+		self.mappings.append( (address, size) )
+		self.mapped_bytes += size
+
+		if self.libc.mlock( address, size ) == 0:
+			self.locked_bytes += size
+			return True
+
+		errno = ctypes.get_errno()
+		self.libc.madvise( address, size, MADV_WILLNEED )
+		return 'unlocked-' +str(errno)
+
+	# unpins everything
+	def release( self ):
+
+		for (address, size) in self.mappings:
+			self.libc.munmap( address, size )
+
+		self.mappings = list()
+		self.mapped_bytes = 0
+		self.locked_bytes = 0
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns the path to the interpreter of the script at 'path', or None if it
+# isn't a script (or can't be read)
+def get_interpreter( path ):
+
+	try:
+		with open( path, 'rb' ) as fd:
+			line = fd.readline( 1024 )
+	except OSError:
+		return None
+
+	if not line.startswith( b'#!' ):
+		return None
+
+	words = line[2:].split()
+	if len(words) == 0:
+		return None
+
+	return os.fsdecode( words[0] )
+
+# returns a list of the absolute paths of the shared libraries that the binary
+# at 'path' is linked against (including the dynamic linker), or an empty list
+# if it isn't a dynamically-linked ELF binary
+def get_libraries( path ):
+
+	try:
+		with open( path, 'rb' ) as fd:
+			if fd.read( 4 ) != b'\x7fELF':
+				return list()
+	except OSError:
+		return list()
+
+	ldd = shutil.which( 'ldd' )
+	if ldd == None:
+		return list()
+
+	try:
+		result = subprocess.run(
+		 [ ldd, path ], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+		 stderr=subprocess.DEVNULL, timeout=LDD_TIMEOUT
+		)
+	except (OSError, subprocess.TimeoutExpired) as e:
+		msg = "DEBUG: Unable to list the libraries of '" +str(path)+ "' (" +str(e)+ ")"
+		print( msg ); logger.debug( msg )
+		return list()
+
+	# eg 'libc.so.6 => /lib/x86_64-linux-gnu/libc.so.6 (0x00007f...)' or
+	# '/lib64/ld-linux-x86-64.so.2 (0x00007f...)'
+	libraries = list()
+	for line in os.fsdecode( result.stdout ).splitlines():
+		for word in line.split():
+			if word.startswith( '/' ):
+				libraries.append( word )
+				break
+
+	return libraries
+
+# returns a list of the regular files that are mapped into this process (eg
+# the python interpreter, its shared libraries, and its extension modules)
+def get_mapped_files():
+
+	paths = list()
+	try:
+		with open( '/proc/self/maps' ) as fd:
+			for line in fd:
+				fields = line.split( None, 5 )
+				if len(fields) < 6:
+					continue
+				path = fields[5].strip()
+				if path.startswith( '/' ) and not path.endswith( ' (deleted)' ) \
+				 and not path.startswith( '/dev/' ) and path not in paths:
+					paths.append( path )
+	except OSError:
+		pass
+
+	return [ path for path in paths if os.path.isfile( path ) ]
+
+# returns True if 'path' is inside one of 'dirs'
+def is_in_dirs( path, dirs ):
+
+	return any( [ path.startswith( os.path.join( d, '' ) ) for d in dirs ] )
+
+# returns a list of the absolute paths of every file that executing the trigger
+# needs. That's the binaries of 'commands' (a list of steps, each of which is a
+# list of argvs; see TriggerPlan.get_commands()), their interpreters & shared
+# libraries, and the python interpreter with the extension modules that it has
+# loaded. Also included are the source files of the python modules that we've
+# loaded from 'app_dirs' (which we need to log a traceback)
+def get_trigger_path_files( commands, app_dirs ):
+
+	app_dirs = [ os.path.realpath( d ) for d in app_dirs if d ]
+	python_dirs = app_dirs + [
+	 os.path.realpath( d ) for d in
+	 set( [ sys.prefix, sys.base_prefix, sys.exec_prefix ] )
+	]
+	if os.environ.get( 'APPDIR' ):
+		python_dirs.append( os.path.realpath( os.environ['APPDIR'] ) )
+
+	files = list()
+	def add( path ):
+		path = os.path.realpath( path )
+		if path in files or not os.path.isfile( path ):
+			return False
+		files.append( path )
+		return True
+
+	binaries = [ argv[0] for step in commands for argv in step ]
+	binaries.append( sys.executable )
+	while len(binaries) > 0:
+		binary = binaries.pop( 0 )
+		if not add( binary ):
+			continue
+
+		interpreter = get_interpreter( binary )
+		if interpreter != None:
+			binaries.append( interpreter )
+
+		for library in get_libraries( binary ):
+			add( library )
+
+	for path in get_mapped_files():
+		if is_in_dirs( os.path.realpath( path ), python_dirs ):
+			add( path )
+
+	for module in list( sys.modules.values() ):
+		for path in [ getattr( module, '__file__', None ), getattr( module, '__cached__', None ) ]:
+			if path and is_in_dirs( os.path.realpath( path ), app_dirs ):
+				add( path )
+
+	return files
+
+# returns why the block device whose sysfs dir is 'device_dir' is removable
+# (eg 'usb'), or None if it isn't
+def get_device_reason( device_dir, depth=0 ):
+
+	# don't follow a loop of loop devices forever
+	if depth > 8:
+		return None
+
+	device_dir = os.path.realpath( device_dir )
+	if '/usb' in device_dir:
+		return 'usb'
+
+	# the attributes that we need are on the whole disk, not the partition
+	if os.path.exists( os.path.join( device_dir, 'partition' ) ):
+		device_dir = os.path.dirname( device_dir )
+
+	try:
+		with open( os.path.join( device_dir, 'removable' ) ) as fd:
+			if fd.read().strip() == '1':
+				return 'removable'
+	except OSError:
+		pass
+
+	# a loop device is as removable as the file that backs it
+	try:
+		with open( os.path.join( device_dir, 'loop', 'backing_file' ) ) as fd:
+			backing_file = fd.read().strip()
+		reason = get_removable_reason( backing_file, depth+1 )
+		if reason != None:
+			return 'loop-' +reason
+	except OSError:
+		pass
+
+	# so is a device-mapper (eg LUKS) or md device with any removable slave
+	for slave in glob.glob( os.path.join( device_dir, 'slaves', '*' ) ):
+		reason = get_device_reason( slave, depth+1 )
+		if reason != None:
+			return reason
+
+	return None
+
+# returns the source (eg '/dev/sdb1') of the mount whose device is 'device', or
+# None
+def get_mount_source( device ):
+
+	wanted = str(os.major( device ))+ ':' +str(os.minor( device ))
+	try:
+		with open( '/proc/self/mountinfo' ) as fd:
+			for line in fd:
+				fields = line.split()
+				if len(fields) > 3 and fields[2] == wanted and ' - ' in line:
+					source = line.split( ' - ', 1 )[1].split()
+					if len(source) > 1:
+						return source[1]
+	except OSError:
+		pass
+
+	return None
+
+# returns why the file at 'path' is on removable media (eg 'usb'), or None if
+# it isn't (or we can't tell)
+def get_removable_reason( path, depth=0 ):
+
+	try:
+		device = os.stat( path ).st_dev
+	except OSError:
+		return None
+
+	# virtual filesystems (eg fuse, overlayfs, tmpfs) have no block device. The
+	# AppImage's squashfs is as removable as the AppImage, and other fuse
+	# filesystems (eg exfat or ntfs-3g) are as removable as their source
+	if os.major( device ) == 0:
+		appdir = os.environ.get( 'APPDIR' )
+		appimage = os.environ.get( 'APPIMAGE' )
+		if appdir and appimage and depth == 0 \
+		 and is_in_dirs( os.path.realpath( path ), [ os.path.realpath( appdir ) ] ):
+			return get_removable_reason( appimage, depth+1 )
+
+		source = get_mount_source( device )
+		if source == None or not source.startswith( '/dev/' ):
+			return None
+		try:
+			device = os.stat( source ).st_rdev
+		except OSError:
+			return None
+
+		if os.major( device ) == 0:
+			return None
+
+	return get_device_reason(
+	 '/sys/dev/block/' +str(os.major( device ))+ ':' +str(os.minor( device )),
+	 depth
+	)
+
+# returns a dict of the paths in 'paths' that are on removable media, with why
+def get_removable_files( paths ):
+
+	removable = dict()
+	for path in paths:
+		reason = get_removable_reason( path )
+		if reason != None:
+			removable[path] = reason
+
+	return removable
@@ -0,0 +1,270 @@
+#!/usr/bin/python3 -I
+"""
+::
+
+  File:    packages/buskill/root_child_lin.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is a very small python script that is intended to be run with root privileges on Linux platforms (eg with `pkexec`, for which a polkit rule can be pre-installed so that it doesn't ask for a password, or with `sudo`). It should be as small and paranoid as possible, and only contain logic that cannot run as the normal user due to insufficient permissions (eg shutting down the machine)
+
+Because it runs as root, it must not be executed from anywhere that the user can write to (such as the app's own dir) or that root may not be able to read (such as the AppImage's FUSE mount). It's installed root:root 0500 to ROOT_CHILD_LIN_PATH (see packages/buskill/__init__.py) by build/linux/install_root_child.sh, and BusKill refuses to execute it otherwise. For the same reason, it's executed with the system's python (see the shebang), and it writes its log to a fixed path (LOG_FILE_PATH) rather than to one chosen by the user.
+
+It's started when BusKill is armed, so the cost of escalating privileges is paid then instead of when the trigger is executed. Before it says that it's ready, it resolves the absolute paths of the binaries that it might execute (only from the system's sbin and bin dirs; never from the PATH).
+
+Commands are read from stdin, and the replies are written to stdout. Both are "frames": a 4-byte big-endian length followed by that many bytes of ascii. The commands are
+
+ * ping          - replies 'ok pong'
+ * soft-shutdown - shuts down the machine, and replies 'ok <command>' or 'error <reason>'
+
+and any other command is replied to with 'error'. When stdin is closed, it exits.
+
+With --dry-run, it doesn't execute anything (so the protocol can be tested without root); it just replies with what it would have executed, and it logs to stderr.
+
+Usage::
+
+  root_child_lin.py [--dry-run]
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import logging, os, re, struct, sys, subprocess, time
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# we only execute binaries from these dirs
+SBIN_PATHS = [ '/sbin', '/usr/sbin', '/bin', '/usr/bin' ]
+
+# the commands that we try (in order) to shutdown the machine
+SOFT_SHUTDOWN_COMMANDS = [
+ [ 'shutdown', '-h', 'now' ],
+ [ 'poweroff', '-h' ],
+ [ 'systemctl', 'poweroff' ],
+]
+
+# we refuse frames that are longer than this
+MAX_FRAME_LENGTH = 1024
+
+# how long (in seconds) we give all the soft-shutdown commands together. This
+# must be less than the parent's trigger_plan.STRATEGY_TIMEOUT, so that we reply
+# before it gives up on us and falls back to its own plan
+COMMAND_TIMEOUT = 1.5
+
+# where we write our log. This is never chosen by the (unprivileged) parent
+LOG_FILE_PATH = '/var/log/buskill/root_child.log'
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns the absolute path to the binary 'name' in SBIN_PATHS, or None
+def resolve_binary( name ):
+
+	for path in SBIN_PATHS:
+		binary = os.path.join( path, name )
+		if os.path.isfile( binary ) and os.access( binary, os.X_OK ):
+			return binary
+
+	return None
+
+# returns the frame read from 'fd', or None if it was closed
+def read_frame( fd ):
+
+	header = fd.read( 4 )
+	if len(header) != 4:
+		return None
+
+	length = struct.unpack( '>I', header )[0]
+	if length > MAX_FRAME_LENGTH:
+		msg = "Frame too long (" +str(length)+ " bytes). Exiting"
+		logging.error(msg)
+		return None
+
+	payload = fd.read( length )
+	if len(payload) != length:
+		return None
+
+	return payload
+
+def write_frame( fd, payload ):
+
+	fd.write( struct.pack( '>I', len(payload) ) + payload )
+	fd.flush()
+
+# this function will gently shutdown a Linux machine. It returns the reply to
+# the 'soft-shutdown' command
+def trigger_softshutdown_lin( commands, dry_run ):
+	msg = "BusKill soft-shutdown trigger executing now"
+	logging.debug( msg )
+
+	deadline = time.monotonic() + COMMAND_TIMEOUT
+	for command in commands:
+
+		timeout = deadline - time.monotonic()
+		if timeout <= 0:
+			msg = "Ran out of time (" +str(COMMAND_TIMEOUT)+ " s) before `" +' '.join(command)+ "`"
+			logging.warning(msg)
+			return "error timeout"
+
+		if dry_run:
+			msg = "Dry run; not executing `" +' '.join(command)+ "`"
+			logging.info(msg)
+			return "ok dry-run " +' '.join(command)
+
+		try:
+			msg = "Attempting to execute `" +' '.join(command)+ "`"
+			logging.info(msg)
+
+			result = subprocess.run(
+			 command,
+			 capture_output=True,
+			 text=True,
+			 timeout=timeout
+			)
+
+			msg = "subprocess returncode|" +str(result.returncode)+ "|"
+			logging.debug(msg)
+
+			msg = "subprocess stdout|" +str(result.stdout)+ "|"
+			logging.debug(msg)
+
+			msg = "subprocess stderr|" +str(result.stderr)+ "|"
+			logging.debug(msg)
+
+			if result.returncode == 0:
+				return "ok " +' '.join(command)
+
+			# that didn't work; log it and try the next one
+			msg = "Failed to execute `" +' '.join(command)+ "`!"
+			logging.warning(msg)
+
+		except Exception as e:
+			# that didn't work; log it and try the next one
+			msg = "Failed to execute `" +' '.join(command)+ "`! " +str(e)
+			logging.warning(msg)
+
+	return "error every soft-shutdown command failed"
+
+################################################################################
+#                                  MAIN BODY                                   #
+################################################################################
+
+####################
+# HANDLE ARGUMENTS #
+####################
+
+dry_run = False
+arguments = sys.argv[1:]
+if len(arguments) > 0 and arguments[0] == '--dry-run':
+	dry_run = True
+	arguments = arguments[1:]
+
+if len(arguments) != 0:
+	print( "Usage: root_child_lin.py [--dry-run]" )
+	sys.exit(1)
+
+#################
+# SETUP LOGGING #
+#################
+
+log_format = '%(asctime)s,%(msecs)d root_child %(levelname)s %(message)s'
+if dry_run:
+	# we're probably not root, so we can't write to LOG_FILE_PATH
+	log_file_path = None
+	logging.basicConfig(
+	 format = log_format, datefmt = '%H:%M:%S', level = logging.DEBUG
+	)
+else:
+	log_file_path = LOG_FILE_PATH
+	os.makedirs( os.path.dirname( log_file_path ), mode=0o700, exist_ok=True )
+	logging.basicConfig(
+	 filename = log_file_path,
+	 filemode = 'a',
+	 format = log_format,
+	 datefmt = '%H:%M:%S',
+	 level = logging.DEBUG
+	)
+
+msg = "==============================================================================="
+logging.info(msg)
+msg = "root_child_lin is writing to log file '" +str(log_file_path)+ "' (dry_run:" +str(dry_run)+ ")"
+logging.info(msg)
+
+###########
+# PREWARM #
+###########
+
+# resolve everything now, so that executing a command is just a fork & exec
+soft_shutdown_commands = list()
+for command in SOFT_SHUTDOWN_COMMANDS:
+	binary = resolve_binary( command[0] )
+	if binary != None:
+		soft_shutdown_commands.append( [ binary ] + command[1:] )
+
+msg = "soft_shutdown_commands:|" +str(soft_shutdown_commands)+ "|"
+logging.debug(msg)
+
+stdin = sys.stdin.buffer
+stdout = sys.stdout.buffer
+
+# tell the parent that we're ready (and whether we're really root)
+write_frame( stdout, ( "ready uid=" +str(os.geteuid())+ " dry_run=" +str(int(dry_run)) ).encode('ascii') )
+
+#############
+# MAIN LOOP #
+#############
+
+# loop and listen for commands from the parent process
+while True:
+
+	# block until we recieve a command from stdin
+	frame = read_frame( stdin )
+	if frame == None:
+		msg = "No more commands (stdin was closed or sent a bad frame). Exiting"
+		logging.info(msg)
+		break
+
+	# check sanity of recieved command. Be very suspicious
+	try:
+		command = frame.decode('ascii')
+	except UnicodeDecodeError:
+		command = ''
+	if not re.match( "^[A-Za-z_-]+$", command ):
+		msg = "Bad Command Ignored"
+		logging.error(msg)
+		write_frame( stdout, b'error bad command' )
+		continue
+
+	msg = "Command received:|" +str(command)+ "|"
+	logging.info(msg)
+
+	# what was the command they sent us?
+	if command == 'ping':
+		reply = 'ok pong'
+
+	elif command == 'soft-shutdown':
+		# they want us to shutdown the machine; do it!
+		try:
+			reply = trigger_softshutdown_lin( soft_shutdown_commands, dry_run )
+		except Exception as e:
+			msg = "Failed to execute trigger_softshutdown_lin()\n" +str(e)
+			logging.error(msg)
+			reply = 'error ' +str(e)
+
+	else:
+		# I have no idea what they want; tell them we ignored the request
+		msg = "Unknown Command Ignored"
+		logging.warning(msg)
+		reply = 'error unknown command'
+
+	msg = "Replying:|" +str(reply)+ "|"
+	logging.info(msg)
+	write_frame( stdout, reply.encode('ascii', errors='replace') )
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/sysfs_lin.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is a fallback listener for USB removals on Linux for when neither libusb's hotplug support nor netlink uevents are available (eg in some containers and sandboxes). It keeps an in-memory set of the usb devices in /sys/bus/usb/devices and emits a removal event for every device that disappears from it.
+
+This backend polls. It wakes-up on inotify events for that dir when it can, but sysfs doesn't generate inotify events when devices come and go (at least on the kernels we've tried), so in practice it finds removals by re-listing the dir every RESCAN_INTERVAL seconds (4 times a second). That means a removal can take up to RESCAN_INTERVAL seconds to be noticed, and the listener wakes-up 4 times a second even while idle. Listing a dir of a few dozen entries is cheap, so it still uses little CPU, but the 'libusb' and 'netlink' backends should be used wherever they're available. We log a warning whenever this backend is used.
+
+Like netlink_lin.py, it's deliberately independent from the rest of the buskill package. It can be tested by pointing it at a temporary dir tree that looks like /sys/bus/usb/devices (ie with dirs named like '1-2.3' containing 'idVendor' and 'idProduct' files).
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import os, select
+
+import logging
+logger = logging.getLogger( __name__ )
+
+# this file is used both by the buskill package and the standalone
+# usb_listener.py script
+try:
+	from . import netlink_lin
+except ImportError:
+	import netlink_lin
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+SYSFS_USB_DEVICES = netlink_lin.SYSFS_USB_DEVICES
+
+# how often (in seconds) we re-list the dir, even if inotify didn't wake us up.
+# This is also the longest it can take us to notice a removal
+RESCAN_INTERVAL = 0.25
+
+# from linux/inotify.h
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# keeps track of the usb devices in 'sysfs_path'. Call scan() to get the
+# devices that were removed since it was last called
+class SysfsWatcher:
+
+	def __init__( self, sysfs_path=None, use_inotify=True ):
+
+		# we look this up now (rather than in the default argument) so that it can
+		# be pointed somewhere else for testing
+		if sysfs_path == None:
+			sysfs_path = SYSFS_USB_DEVICES
+		self.sysfs_path = sysfs_path
+
+		msg = "WARNING: Using the 'sysfs' hotplug backend, which polls '" +str(sysfs_path)+ "' every " +str(RESCAN_INTERVAL)+ " seconds (" +str( round(1/RESCAN_INTERVAL, 1) )+ " Hz) because sysfs doesn't generate inotify events"
+		print( msg ); logger.warning( msg )
+
+		# we read a device's vendor & product ids when it first appears because
+		# they can't be read after it's gone
+		self.devices = dict()
+		self.scan_failed = False
+
+		# open inotify *before* we list what's currently connected so that we
+		# can't miss a removal that happens in-between
+		self.inotify_fd = None
+		if use_inotify:
+			self.inotify_fd = open_inotify( sysfs_path )
+
+		self.scan()
+
+	# so that we can be passed to select()
+	def fileno( self ):
+		return self.inotify_fd
+
+	def close( self ):
+
+		if self.inotify_fd != None:
+			os.close( self.inotify_fd )
+			self.inotify_fd = None
+
+	# returns a list of (key, serial) tuples for the devices that are currently
+	# connected, like netlink_lin.list_usb_devices()
+	def list_usb_devices( self ):
+
+		return list( self.devices.values() )
+
+	# discards any pending inotify events. We don't need to parse them because
+	# every wake-up just triggers a re-scan of the whole dir
+	def drain( self ):
+
+		if self.inotify_fd == None:
+			return
+
+		while True:
+			try:
+				if not os.read( self.inotify_fd, 4096 ):
+					return
+			except BlockingIOError:
+				return
+
+	# re-lists the dir and returns a list of the uevent-like fields (see
+	# netlink_lin.parse_uevent()) of every device that was removed since the
+	# last scan
+	def scan( self ):
+
+		try:
+			names = set( os.listdir( self.sysfs_path ) )
+		except OSError as e:
+			# we'd rather miss a removal than execute the trigger because of
+			# something like a transient permissions issue. We only log the first
+			# failure so we don't fill the log every RESCAN_INTERVAL
+			if not self.scan_failed:
+				msg = "WARNING: Unable to list usb devices in '" +str(self.sysfs_path)+ "' (" +str(e)+ ")"
+				print( msg ); logger.warning( msg )
+			self.scan_failed = True
+			return list()
+
+		self.scan_failed = False
+
+		removals = list()
+		for name in set( self.devices.keys() ) - names:
+			(key, serial) = self.devices.pop( name )
+			removals.append( netlink_lin.get_removal_fields( name, key ) )
+
+		for name in names - set( self.devices.keys() ):
+			device = netlink_lin.read_usb_device( name, self.sysfs_path )
+			if device != None:
+				self.devices[name] = device
+
+		return removals
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns an inotify file descriptor that becomes readable when an entry is
+# added to or removed from 'path', or None if inotify isn't available
+def open_inotify( path ):
+
+	try:
+		import ctypes, ctypes.util
+		libc = ctypes.CDLL( ctypes.util.find_library('c'), use_errno=True )
+
+		fd = libc.inotify_init1( IN_NONBLOCK | IN_CLOEXEC )
+		if fd < 0:
+			raise OSError( ctypes.get_errno(), os.strerror( ctypes.get_errno() ) )
+
+		mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF
+		if libc.inotify_add_watch( fd, os.fsencode(path), mask ) < 0:
+			error = ctypes.get_errno()
+			os.close( fd )
+			raise OSError( error, os.strerror( error ) )
+
+	except (OSError, AttributeError) as e:
+		msg = "DEBUG: inotify is unavailable; falling back to re-listing '" +str(path)+ "' (" +str(e)+ ")"
+		print( msg ); logger.debug( msg )
+		return None
+
+	return fd
+
+# blocks watching 'watcher' (a SysfsWatcher) and calls 'callback' with the
+# fields of every usb device removal. Returns as soon as 'stop' (anything that
+# select() accepts) becomes readable
+def listen( watcher, callback, stop=None ):
+
+	readers = list()
+	if watcher.fileno() != None:
+		readers.append( watcher )
+	if stop != None:
+		readers.append( stop )
+
+	while True:
+
+		readable = select.select( readers, [], [], RESCAN_INTERVAL )[0]
+
+		if stop != None and stop in readable:
+			msg = "DEBUG: Stopping sysfs listener"
+			print( msg ); logger.debug( msg )
+			return
+
+		watcher.drain()
+
+		for fields in watcher.scan():
+			callback( fields )
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/trigger_executor.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is an optional "trigger executor" for Linux: a small process that's started when BusKill is armed and that has already done everything that it can to execute the trigger (see trigger_plan.py) before the cable is pulled, so that executing the trigger is a single write to a pipe.
+
+When it's started, the executor
+
+ 1. opens its own D-Bus connections (if the plan uses any D-Bus methods),
+ 2. reads the binaries of the plan's commands (and the interpreters of the ones that are scripts) so that they're in the page cache, and
+ 3. forks a child for the first command of every step, which blocks on a pipe until it's released, and then just has to exec() the command.
+
+In hardened mode (see hardening.py), the executor also hardens itself before it does any of that, and tells us what it got in its 'ready' message. If it's asked to verify the trigger, then it also opens its own D-Bus connections to find out whether each lock strategy actually locked the session (see lock_state_lin.py).
+
+To execute the trigger, we write the (monotonic) time at which we asked for it to the executor's pipe. The executor releases the pre-forked children (or calls the D-Bus methods) in the order of the plan, and it reports back how long it took from our write until the first action was started. Any fallback commands that are needed are forked normally.
+
+The dynamic linking of the commands still happens when they're exec()'d, but their libraries are usually already in the page cache because the desktop uses them too.
+
+Like trigger_plan.py, it doesn't import anything from the rest of the buskill package other than the standalone modules that it builds on.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import multiprocessing, multiprocessing.connection, os, struct, time
+from . import hardening, trigger_plan
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# how long (in seconds) we wait for the executor to be ready when starting it
+START_TIMEOUT = 5
+
+# how long (in seconds) we wait for the executor to start executing the trigger
+# before we give up on it and execute the trigger ourselves
+ACK_TIMEOUT = 1
+
+# how long (in seconds) we wait for the executor to finish executing the
+# trigger, which it does within trigger_plan.PLAN_TIMEOUT seconds
+EXECUTE_TIMEOUT = trigger_plan.PLAN_TIMEOUT + 1
+
+# we don't read more than this many bytes of any one binary into the page cache
+WARM_MAX_BYTES = 64*1024*1024
+
+# the messages that the executor sends back to us. Each is one byte followed
+# by an unsigned 64-bit integer
+MESSAGE_FORMAT = '<cQ'
+MESSAGE_LENGTH = struct.calcsize( MESSAGE_FORMAT )
+READY = b'r'
+STARTED = b's'
+FINISHED = b'f'
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+class TriggerExecutor:
+
+	def __init__( self, plan, cache_path=None, hardened=False, verify=False ):
+
+		self.plan = plan
+		self.cache_path = cache_path
+		self.hardened = hardened
+		self.verify = verify
+
+		self.process = None
+		self.request_writer = None
+		self.result_reader = None
+
+		# how long (in seconds) it took the executor to start the trigger after
+		# we asked it to, the last time that we did
+		self.start_latency = None
+
+		# in hardened mode, what the executor got (see hardening.harden())
+		self.hardening = None
+
+	# starts the executor process and waits until it's ready to execute the
+	# plan. Raises an Exception if it isn't ready within START_TIMEOUT seconds
+	def start( self ):
+
+		start_time = time.monotonic()
+
+		# the executor is only useful if it's forked from a process that already
+		# has everything loaded, so we always fork it
+		(request_reader, self.request_writer) = os.pipe()
+		(self.result_reader, result_writer) = os.pipe()
+
+		self.process = multiprocessing.get_context( 'fork' ).Process(
+		 target = run_executor,
+		 args = (
+		  self.plan, self.cache_path, self.hardened, self.verify,
+		  request_reader, self.request_writer, result_writer
+		 ),
+		 daemon = True
+		)
+		self.process.start()
+
+		os.close( request_reader )
+		os.close( result_writer )
+
+		(message, value) = self.read_message( START_TIMEOUT )
+		if message != READY:
+			self.stop()
+			msg = "ERROR: The trigger executor didn't start"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		if self.hardened:
+			self.hardening = hardening.from_flags( value )
+			msg = "INFO: The trigger executor is hardened: " +hardening.format_report( self.hardening )
+			print( msg ); logger.info( msg )
+
+		msg = "DEBUG: Started the trigger executor (pid " +str(self.process.pid)+ ") in " +str( round((time.monotonic()-start_time)*1000, 3) )+ " ms"
+		print( msg ); logger.debug( msg )
+
+	# returns the next message from the executor as a tuple of its type and
+	# value, or (None, None) if there isn't one within 'timeout' seconds or
+	# the executor exited
+	def read_message( self, timeout ):
+
+		ready = multiprocessing.connection.wait(
+		 [ self.result_reader ], timeout
+		)
+		if len(ready) == 0:
+			return (None, None)
+
+		data = os.read( self.result_reader, MESSAGE_LENGTH )
+		if len(data) != MESSAGE_LENGTH:
+			return (None, None)
+
+		return struct.unpack( MESSAGE_FORMAT, data )
+
+	# asks the executor to execute the plan and returns True if every step of
+	# it succeeded. Raises an Exception if the executor didn't start executing
+	# it within ACK_TIMEOUT seconds, so that the caller can execute the plan
+	# itself instead
+	def execute( self ):
+
+		if self.request_writer == None:
+			msg = "ERROR: The trigger executor isn't running"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		# this single write is the whole trigger
+		os.write( self.request_writer, struct.pack( '<Q', time.monotonic_ns() ) )
+
+		(message, value) = self.read_message( ACK_TIMEOUT )
+		if message != STARTED:
+			msg = "ERROR: The trigger executor didn't start executing the trigger"
+			print( msg ); logger.error( msg )
+			raise Exception( msg )
+
+		self.start_latency = value / 1000000000
+		msg = "INFO: The trigger executor started the trigger " +str( round(self.start_latency*1000, 3) )+ " ms after it was asked to"
+		print( msg ); logger.info( msg )
+
+		(message, value) = self.read_message( EXECUTE_TIMEOUT )
+		if message != FINISHED:
+			msg = "WARNING: The trigger executor didn't finish executing the trigger"
+			print( msg ); logger.warning( msg )
+			return False
+
+		return bool(value)
+
+	# stops the executor (and its pre-forked children, which exit when their
+	# pipes are closed)
+	def stop( self ):
+
+		for fd in [ self.request_writer, self.result_reader ]:
+			if fd != None:
+				try:
+					os.close( fd )
+				except OSError:
+					pass
+		self.request_writer = None
+		self.result_reader = None
+
+		if self.process == None:
+			return
+
+		# processes that were forked after the executor (eg the usb_handler)
+		# have a copy of our end of the pipe, so it may not see EOF
+		try:
+			self.process.terminate()
+			self.process.join( 1 )
+			if self.process.is_alive():
+				self.process.kill()
+				self.process.join()
+		except Exception as e:
+			msg = "DEBUG: Unable to stop the trigger executor (" +str(e)+ ")"
+			print( msg ); logger.debug( msg )
+
+		self.process = None
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# reads the file at 'path' (up to WARM_MAX_BYTES) so that it's in the page
+# cache, and returns the path to its interpreter if it's a script
+def warm_file( path ):
+
+	interpreter = None
+	try:
+		with open( path, 'rb' ) as fd:
+			data = fd.read( 1024*1024 )
+			if data.startswith( b'#!' ):
+				interpreter = data[2:].split( b'\n', 1 )[0].split()
+				if len(interpreter) > 0:
+					interpreter = os.fsdecode( interpreter[0] )
+				else:
+					interpreter = None
+
+			total = len(data)
+			while len(data) > 0 and total < WARM_MAX_BYTES:
+				data = fd.read( 1024*1024 )
+				total += len(data)
+
+	except OSError as e:
+		msg = "DEBUG: Unable to read '" +str(path)+ "' into the page cache (" +str(e)+ ")"
+		print( msg ); logger.debug( msg )
+
+	return interpreter
+
+# reads the binaries of every command of 'plan' (and their interpreters) into
+# the page cache
+def warm_plan( plan ):
+
+	paths = [ command[0] for step in plan.get_commands() for command in step ]
+	warmed = set()
+	while len(paths) > 0:
+		path = paths.pop()
+		if path in warmed:
+			continue
+		warmed.add( path )
+
+		interpreter = warm_file( path )
+		if interpreter != None:
+			paths.append( interpreter )
+
+# forks a child that blocks until a byte is written to the returned fd, and then
+# executes 'argv' with the environment 'env'. If the fd is closed instead, the
+# child just exits. 'close_fds' are closed in the child (they're the fds of
+# its pre-forked siblings). Returns a tuple of the child's pid and the fd
+def prefork_command( argv, env, close_fds ):
+
+	(reader, writer) = os.pipe()
+	pid = os.fork()
+	if pid == 0:
+		try:
+			os.close( writer )
+			for fd in close_fds:
+				os.close( fd )
+
+			if os.read( reader, 1 ) != b'':
+				os.close( reader )
+				os.execve( argv[0], argv, env )
+		except BaseException:
+			pass
+		os._exit( 127 )
+
+	os.close( reader )
+	return (pid, writer)
+
+# this runs in the executor process. It prepares everything needed to execute
+# 'plan', tells us that it's ready on 'result_writer', and then executes the
+# plan every time that a request is written to 'request_reader'
+def run_executor( plan, cache_path, hardened, verify, request_reader, request_writer, result_writer ):
+
+	# we only read requests
+	os.close( request_writer )
+
+	# harden first, so that everything below is locked into memory too
+	hardening_flags = 0
+	if hardened:
+		hardening_flags = hardening.to_flags( hardening.harden() )
+
+	env = trigger_plan.get_command_env()
+
+	call_dbus = None
+	trigger_bus = None
+	if plan.uses_dbus() or verify:
+		from . import dbus_lin
+		trigger_bus = dbus_lin.TriggerBus()
+		trigger_bus.prepare()
+		call_dbus = trigger_bus.call
+
+	verifier = None
+	if verify:
+		from . import lock_state_lin
+		verifier = lock_state_lin.get_verifier( plan, trigger_bus, env )
+
+	warm_plan( plan )
+
+	# the pre-forked children for the first command of each step, by name
+	children = dict()
+
+	def send( message, value ):
+		os.write( result_writer, struct.pack( MESSAGE_FORMAT, message, value ) )
+
+	# (re)forks the children that were used the last time the plan was executed
+	def prefork_children():
+		for step in plan.steps:
+			for strategy in step:
+				if strategy.dbus:
+					continue
+				if strategy.name not in children:
+					close_fds = [ writer for (pid, writer) in children.values() ]
+					children[strategy.name] = prefork_command(
+					 strategy.argv, env, close_fds
+					)
+				break
+
+	prefork_children()
+	send( READY, hardening_flags )
+
+	# if the plan starts with a command, then we release it as soon as we're
+	# asked to execute the plan
+	first = None
+	if len(plan.steps) > 0 and not plan.steps[0][0].dbus:
+		first = plan.steps[0][0].name
+
+	while True:
+
+		try:
+			request = os.read( request_reader, 8 )
+		except InterruptedError:
+			continue
+		if len(request) != 8:
+			# we were stopped
+			break
+		request_time = struct.unpack( '<Q', request )[0]
+
+		# the pids of the pre-forked children that we released, by name
+		released = dict()
+		def release( name ):
+			(pid, writer) = children.pop( name )
+
+			# the woken child may run (and exec) before the write returns, so
+			# the action started just before it
+			now = time.monotonic_ns()
+			os.write( writer, b'\0' )
+			os.close( writer )
+			released[name] = pid
+			mark_started( now )
+
+		# tells the parent when the first action of the trigger was started
+		started = list()
+		def mark_started( now=None ):
+			if len(started) == 0:
+				if now == None:
+					now = time.monotonic_ns()
+				started.append( now )
+				send( STARTED, now - request_time )
+
+		if first in children:
+			release( first )
+
+		call_dbus_started = None
+		if call_dbus != None:
+			def call_dbus_started( name, timeout ):
+				mark_started()
+				call_dbus( name, timeout )
+
+		def run_command( strategy, env, timeout, dispatched ):
+
+			if strategy.name in children:
+				release( strategy.name )
+
+			pid = released.pop( strategy.name, None )
+			if pid == None:
+				mark_started()
+				return trigger_plan.run_command( strategy, env, timeout, dispatched )
+
+			msg = "INFO: Released the pre-forked `" +' '.join( strategy.argv )+ "`"
+			print( msg ); logger.debug( msg )
+
+			# its output goes wherever ours does, so there's nothing to collect
+			return trigger_plan.wait_for_dispatched(
+			 trigger_plan.Dispatched( strategy.argv, pid ), timeout, dispatched
+			)
+
+		on_success = None
+		if cache_path != None:
+			def on_success( name ):
+				trigger_plan.record_success( cache_path, name )
+
+		verify = None
+		if verifier != None:
+			verify = verifier.verify
+
+		result = trigger_plan.execute_plan(
+		 plan, on_success, call_dbus_started, run_command, env, verify
+		)
+
+		mark_started()
+		send( FINISHED, int(result) )
+
+		# the next execution gets a verifier of its own. Its connections were
+		# opened when we started, and stay open
+		if verifier != None:
+			verifier.stop()
+			verifier = lock_state_lin.get_verifier( plan, trigger_bus, env )
+
+		# let whoever is waiting for us have the CPU before we fork again
+		os.sched_yield()
+
+		prefork_children()
+
+	# our children exit when we close their pipes
+	for (pid, writer) in children.values():
+		os.close( writer )
+		os.waitpid( pid, 0 )
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/trigger_pipeline.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+A "trigger pipeline" is a trigger that's made of several steps, some of which depend on others. For example, "lock the screen, unmount the encrypted volumes, and drop the ssh-agent's keys, then power off". The steps that don't depend on each other are executed at the same time, so the time that it takes to secure the machine is the time of the slowest chain of steps instead of the time of all of them added up.
+
+Pipelines are defined in the config file, in a section named 'pipeline:<name>', and they're chosen by setting the trigger to 'pipeline:<name>'. Every option of the section without a dot defines a step, whose value is either
+
+ * 'trigger <name>' to execute one of the other triggers (eg 'lock-screen' or a plugin; see trigger_registry.py), or
+ * 'command <command line>' to execute a command (its binary is looked-up in the PATH and in the sbin dirs when the pipeline is loaded),
+
+and '<step>.after' is a space-separated list of the steps that have to finish (or run out of time) before it's started, and '<step>.timeout' is how long (in seconds) we wait for it. For example::
+
+  [buskill]
+  trigger = pipeline:secure
+
+  [pipeline:secure]
+  lock = trigger lock-screen
+  unmount = command udisksctl unmount --block-device /dev/mapper/secret
+  drop-keys = command ssh-add -D
+  poweroff = trigger soft-shutdown
+  poweroff.after = lock unmount drop-keys
+  unmount.timeout = 5
+
+A step is started after every step that it depends on has finished, whether or not it succeeded, so that a failure to (eg) unmount a volume never stops the machine from being powered off. A step that runs out of time is left running in the background.
+
+Like trigger_plan.py, it doesn't import anything from the rest of the buskill package other than the standalone modules that it builds on.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import collections, configparser, os, queue, re, shlex, shutil, threading
+import time
+from . import trigger_plan
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# triggers whose name starts with this are pipelines, and their definition is
+# in the config file section of the same name
+PREFIX = 'pipeline:'
+
+# how long (in seconds) we wait for a step whose timeout isn't set
+STEP_TIMEOUT = trigger_plan.PLAN_TIMEOUT
+
+# the most steps that we execute at the same time
+MAX_WORKERS = 4
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# one step of a pipeline. 'action' is either 'trigger' (and 'argument' is the
+# name of a trigger) or 'command' (and 'argument' is the argv, with the
+# absolute path to its binary). 'after' is a tuple of the names of the steps
+# that it depends on
+Step = collections.namedtuple( 'Step', [ 'name', 'action', 'argument', 'after', 'timeout' ] )
+
+# a pipeline. 'steps' is a tuple of Steps, in the order in which they're
+# defined
+class Pipeline( collections.namedtuple( 'Pipeline', [ 'name', 'steps' ] ) ):
+
+	__slots__ = ()
+
+	def get_trigger( self ):
+
+		return PREFIX + self.name
+
+	# returns the set of the triggers that this pipeline executes
+	def get_triggers( self ):
+
+		return set( [ step.argument for step in self.steps if step.action == 'trigger' ] )
+
+	# returns the commands of this pipeline in the format of
+	# TriggerPlan.get_commands()
+	def get_commands( self ):
+
+		return [ [ list( step.argument ) ] for step in self.steps if step.action == 'command' ]
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+def is_pipeline( trigger ):
+
+	return trigger != None and trigger.startswith( PREFIX )
+
+def read_config( conf_file ):
+
+	# commands may contain '%', so there's no interpolation
+	config = configparser.ConfigParser( interpolation=None )
+	config.read( conf_file )
+	return config
+
+# returns the names of the pipelines defined in the config file 'conf_file'
+def list_pipelines( conf_file ):
+
+	return [
+	 section[ len(PREFIX): ] for section in read_config( conf_file ).sections()
+	 if section.startswith( PREFIX )
+	]
+
+# returns the absolute path to the binary 'name', or None if it isn't installed
+def resolve_binary( name ):
+
+	if os.path.isabs( name ):
+		if os.path.isfile( name ) and os.access( name, os.X_OK ):
+			return name
+		return None
+
+	path = os.environ.get( 'PATH', os.defpath ).split( os.pathsep ) + trigger_plan.SBIN_PATHS
+	path = shutil.which( name, path=os.pathsep.join( path ) )
+	if path == None:
+		return None
+
+	return os.path.abspath( path )
+
+# loads the pipeline 'trigger' (eg 'pipeline:secure') from the config file
+# 'conf_file'. 'triggers' are the triggers that its steps may execute.
+# Raises an exception if the pipeline isn't defined or is invalid
+def load_pipeline( conf_file, trigger, triggers ):
+
+	name = trigger[ len(PREFIX): ]
+	config = read_config( conf_file )
+
+	def fail( reason ):
+		msg = "ERROR: Invalid trigger pipeline '" +str(name)+ "': " +str(reason)
+		print( msg ); logger.error( msg )
+		raise Exception( msg )
+
+	if not config.has_section( PREFIX + name ):
+		fail( "there's no [" +PREFIX+name+ "] section in '" +str(conf_file)+ "'" )
+
+	# we don't want the options of the DEFAULT section
+	options = dict( [
+	 (key, value) for (key, value) in config.items( PREFIX + name )
+	 if key not in config.defaults()
+	] )
+
+	steps = list()
+	for (key, value) in options.items():
+		if '.' in key:
+			continue
+
+		if not re.match( "^[A-Za-z0-9_-]+$", key ):
+			fail( "bad step name '" +str(key)+ "'" )
+
+		words = value.split( None, 1 )
+		if len(words) != 2:
+			fail( "step '" +str(key)+ "' has no action" )
+		(action, argument) = words
+
+		if action == 'trigger':
+			argument = argument.strip()
+			if argument not in triggers:
+				fail( "step '" +str(key)+ "' executes unknown trigger '" +str(argument)+ "'" )
+
+		elif action == 'command':
+			argv = shlex.split( argument )
+			binary = resolve_binary( argv[0] )
+			if binary == None:
+				fail( "step '" +str(key)+ "' executes `" +str(argv[0])+ "`, which isn't installed" )
+			argument = tuple( [ binary ] + argv[1:] )
+
+		else:
+			fail( "step '" +str(key)+ "' has unknown action '" +str(action)+ "'" )
+
+		after = tuple( options.get( key+ '.after', '' ).replace( ',', ' ' ).split() )
+
+		try:
+			timeout = float( options.get( key+ '.timeout', STEP_TIMEOUT ) )
+		except ValueError:
+			timeout = 0
+		if timeout <= 0:
+			fail( "step '" +str(key)+ "' has a bad timeout" )
+
+		steps.append( Step( key, action, argument, after, timeout ) )
+
+	names = [ step.name for step in steps ]
+	if len(steps) == 0:
+		fail( "it has no steps" )
+
+	for key in options.keys():
+		if '.' in key:
+			(step, attribute) = key.split( '.', 1 )
+			if step not in names or attribute not in [ 'after', 'timeout' ]:
+				fail( "unknown option '" +str(key)+ "'" )
+
+	for step in steps:
+		for dependency in step.after:
+			if dependency not in names:
+				fail( "step '" +str(step.name)+ "' is after unknown step '" +str(dependency)+ "'" )
+
+	# make sure that the steps can be ordered (ie there are no cycles)
+	ordered = set()
+	remaining = list( steps )
+	while len(remaining) > 0:
+		ready = [ step for step in remaining if set( step.after ) <= ordered ]
+		if len(ready) == 0:
+			fail( "its steps depend on each other in a cycle (" +' '.join( [ step.name for step in remaining ] )+ ")" )
+		for step in ready:
+			ordered.add( step.name )
+			remaining.remove( step )
+
+	return Pipeline( name, tuple(steps) )
+
+# returns the critical path of a pipeline (the chain of steps that ended last)
+# as a list of step names. 'finished' is a dict of when each step finished,
+# keyed by name
+def get_critical_path( pipeline, finished ):
+
+	steps = { step.name: step for step in pipeline.steps }
+
+	path = list()
+	name = max( finished, key=finished.get, default=None )
+	while name != None:
+		path.insert( 0, name )
+		dependencies = [ d for d in steps[name].after if d in finished ]
+		name = max( dependencies, key=finished.get, default=None )
+
+	return path
+
+# executes 'pipeline'. Every step is executed (in a thread) by calling
+# 'run_step' with the Step and its timeout, which should return True if the
+# step succeeded. At most MAX_WORKERS steps are executed at once. Returns a dict
+# describing what happened, whose 'succeeded' is True if every step succeeded
+def execute_pipeline( pipeline, run_step ):
+
+	start_time = time.monotonic()
+
+	# the steps that haven't been started yet, and the deadlines of the ones
+	# that are running, keyed by name
+	pending = list( pipeline.steps )
+	running = dict()
+
+	# the steps that are finished (or ran out of time), and the times (in
+	# seconds since start_time) at which they started and finished
+	results = dict()
+	started = dict()
+	finished = dict()
+
+	completions = queue.Queue()
+	def work( step ):
+		try:
+			result = bool( run_step( step, step.timeout ) )
+		except Exception as e:
+			msg = "ERROR: Step '" +str(step.name)+ "' of the '" +str(pipeline.name)+ "' trigger pipeline failed! " +str(e)
+			print( msg ); logger.error( msg )
+			result = False
+		completions.put( (step.name, result, time.monotonic()) )
+
+	while len(pending) > 0 or len(running) > 0:
+
+		# start every step whose dependencies are all done
+		for step in list( pending ):
+			if len(running) >= MAX_WORKERS:
+				break
+			if not set( step.after ) <= set( results ):
+				continue
+
+			pending.remove( step )
+			now = time.monotonic()
+			started[step.name] = now - start_time
+			running[step.name] = now + step.timeout
+
+			msg = "DEBUG: Starting step '" +str(step.name)+ "' of the '" +str(pipeline.name)+ "' trigger pipeline"
+			print( msg ); logger.debug( msg )
+
+			threading.Thread( target=work, args=(step,), daemon=True ).start()
+
+		# wait for a step to finish or run out of time
+		try:
+			(name, result, end_time) = completions.get(
+			 timeout = max( 0, min( running.values() ) - time.monotonic() )
+			)
+			if name not in running:
+				msg = "DEBUG: Step '" +str(name)+ "' of the '" +str(pipeline.name)+ "' trigger pipeline finished after it ran out of time (succeeded:" +str(result)+ ")"
+				print( msg ); logger.debug( msg )
+				continue
+
+			del running[name]
+			results[name] = 'ok' if result else 'failed'
+			finished[name] = end_time - start_time
+
+		except queue.Empty:
+			now = time.monotonic()
+			for (name, deadline) in list( running.items() ):
+				if deadline <= now:
+					del running[name]
+					results[name] = 'timeout'
+					finished[name] = now - start_time
+
+					msg = "WARNING: Step '" +str(name)+ "' of the '" +str(pipeline.name)+ "' trigger pipeline ran out of time! Starting the steps after it."
+					print( msg ); logger.warning( msg )
+
+	duration = time.monotonic() - start_time
+	report = {
+	 'succeeded': all( [ result == 'ok' for result in results.values() ] ),
+	 'total_ms': round( duration*1000, 3 ),
+	 'sum_ms': round( sum( [ finished[name] - started[name] for name in finished ] )*1000, 3 ),
+	 'critical_path': get_critical_path( pipeline, finished ),
+	 'steps': {
+	  name: {
+	   'result': results[name],
+	   'start_ms': round( started[name]*1000, 3 ),
+	   'duration_ms': round( (finished[name]-started[name])*1000, 3 ),
+	  } for name in results
+	 },
+	}
+
+	for step in pipeline.steps:
+		result = report['steps'][step.name]
+		msg = "INFO: Step '" +str(step.name)+ "' of the '" +str(pipeline.name)+ "' trigger pipeline: " +str(result['result'])+ " in " +str(result['duration_ms'])+ " ms (started at +" +str(result['start_ms'])+ " ms)"
+		print( msg ); logger.info( msg )
+
+	msg = "INFO: Executed the '" +str(pipeline.name)+ "' trigger pipeline in " +str(report['total_ms'])+ " ms (its steps took " +str(report['sum_ms'])+ " ms in total). The critical path was " +' -> '.join( report['critical_path'] )+ ". " +str( list( results.values() ).count( 'ok' ) )+ " of " +str(len(pipeline.steps))+ " steps succeeded"
+	print( msg ); logger.info( msg )
+
+	return report
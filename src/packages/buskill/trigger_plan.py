@@ -0,0 +1,672 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/trigger_plan.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This compiles a trigger (eg 'lock-screen') into a "trigger plan" when BusKill is armed, so that executing the trigger doesn't have to discover anything. The plan is an immutable list of steps, and each step is a list of alternative commands (with absolute paths to their binaries) or D-Bus methods that are tried in order until one of them succeeds.
+
+To compile a plan, we:
+
+ 1. resolve the absolute path of every binary that could implement the trigger, dropping the ones that aren't installed (and likewise drop the D-Bus methods whose service isn't on the bus),
+ 2. drop the commands that are only for a desktop environment that we're not running in (eg Cinnamon), and
+ 3. order the alternatives of each step by how often they've worked on this machine before.
+
+Plans are cached on disk (in the app's DATA_DIR), along with a fingerprint of the session (eg the desktop environment and PATH) and of the mtimes of the binaries and of the dirs where they're looked-up. A cached plan is only used if its fingerprint still matches, so installing, removing, or upgrading a binary or logging into a different desktop environment compiles a new plan.
+
+Like arm_epoch.py, it must not import anything from the rest of the buskill package.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import collections, json, os, select, shutil, subprocess, tempfile, threading
+import time
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# bump this when the format of the cache file changes
+CACHE_VERSION = 3
+CACHE_FILENAME = 'trigger_plan.json'
+
+# where binaries like 'shutdown' could be, since they're often not in the PATH
+# of non-root users
+SBIN_PATHS = [
+ os.sep+'sbin',
+ os.sep+'usr'+os.sep+'sbin',
+ os.sep+'bin',
+ os.sep+'usr'+os.sep+'bin'
+]
+
+# these are objects, but they're defined here because the settings below use
+# them
+
+# a command that can implement (one step of) a trigger. A 'search_paths' of
+# None means the user's PATH
+Command = collections.namedtuple( 'Command', [ 'name', 'arguments', 'search_paths' ] )
+
+# a D-Bus method that can implement (one step of) a trigger. 'name' is the
+# key of the method in dbus_lin.TRIGGER_METHODS, which the caller of
+# execute_plan() uses to call it
+DBusMethod = collections.namedtuple( 'DBusMethod', [ 'name' ] )
+
+# one way to execute (one step of) a compiled trigger. 'name' is the name of
+# the binary or D-Bus method, which is how we keep track of what has worked
+# before. 'argv' is empty for D-Bus methods
+Strategy = collections.namedtuple( 'Strategy', [ 'name', 'argv', 'dbus' ] )
+
+# the Linux triggers. Each trigger is a list of steps, and each step is a list
+# of alternative Commands and DBusMethods
+LINUX_TRIGGERS = {
+ 'lock-screen': [
+  [
+   # asking the desktop environment to lock the screen over an already-open
+   # D-Bus connection is much faster than forking `xdg-screensaver`
+   DBusMethod( 'org.gnome.ScreenSaver.Lock' ),
+   DBusMethod( 'org.cinnamon.ScreenSaver.Lock' ),
+   DBusMethod( 'org.freedesktop.ScreenSaver.Lock' ),
+
+   Command( 'xdg-screensaver', ['lock'], None ),
+   Command( 'xscreensaver', ['-lock'], None ),
+
+   # logind "succeeds" even if nothing in our session listens for its Lock
+   # signal, so this goes last
+   DBusMethod( 'org.freedesktop.login1.Session.Lock' ),
+  ],
+
+  # in Cinnamon (Linux Mint) `xdg-screensaver` exists, exits zero, doesn't
+  # throw any errors, and doesn't lock the screen. So this is its own step
+  # * https://en.wikipedia.org/wiki/Cinnamon_(desktop_environment)
+  # * https://github.com/BusKill/buskill-app/issues/64
+  [
+   Command( 'cinnamon-screensaver-command', ['--lock'], None ),
+  ],
+ ],
+
+ 'soft-shutdown': [
+  [
+   # asking logind directly saves forking `shutdown` (which just asks logind
+   # anyway on systemd machines)
+   DBusMethod( 'org.freedesktop.login1.Manager.PowerOff' ),
+
+   Command( 'shutdown', ['-h', 'now'], SBIN_PATHS ),
+   Command( 'poweroff', ['-h'], SBIN_PATHS ),
+   Command( 'systemctl', ['poweroff'], SBIN_PATHS ),
+  ],
+ ],
+}
+
+# binaries that only work in a specific desktop environment. They're kept in the
+# plan if XDG_CURRENT_DESKTOP contains one of the given desktops or if the given
+# D-Bus name is on the session bus. They're also kept if we can't tell which
+# desktop environment we're in, because we'd rather execute a command that
+# fails than skip one that would've worked
+DESKTOP_BINARIES = {
+ 'cinnamon-screensaver-command': {
+  'desktops': [ 'X-CINNAMON', 'CINNAMON' ],
+  'bus_name': 'org.cinnamon.ScreenSaver',
+ },
+}
+
+# the environment variables that describe the session we're in. If any of them
+# change, the cached plan is stale
+SESSION_VARIABLES = [
+ 'XDG_CURRENT_DESKTOP', 'XDG_SESSION_DESKTOP', 'DESKTOP_SESSION',
+ 'XDG_SESSION_TYPE', 'DISPLAY', 'WAYLAND_DISPLAY', 'PATH'
+]
+
+# how long (in seconds) we wait for one strategy (eg `xdg-screensaver lock`) to
+# succeed before we move on to the next one. A strategy that's still running
+# when its time is up is left running; its output is logged when it exits
+STRATEGY_TIMEOUT = 2
+
+# the most time (in seconds) that executing a whole plan may take. Any steps
+# that haven't been started by then are skipped
+PLAN_TIMEOUT = 10
+
+# how long (in seconds) we wait in the background for the commands that were
+# still running when we moved on, so that we can log their output
+OUTPUT_TIMEOUT = 60
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# a compiled trigger. 'steps' is a tuple of steps, each of which is a tuple of
+# alternative Strategies. 'fingerprint' is what get_fingerprint() returned when
+# the plan was compiled
+class TriggerPlan( collections.namedtuple( 'TriggerPlan', [ 'trigger', 'steps', 'fingerprint' ] ) ):
+
+	__slots__ = ()
+
+	# returns the plan as the list of steps of alternative commands that
+	# BusKill.get_trigger_commands() returns. D-Bus methods are left out, since
+	# they need a connection that only we have
+	def get_commands( self ):
+
+		commands = list()
+		for step in self.steps:
+			step_commands = [ list(strategy.argv) for strategy in step if not strategy.dbus ]
+			if len(step_commands) > 0:
+				commands.append( step_commands )
+
+		return commands
+
+	# returns the paths of all the binaries that this plan executes
+	def get_binaries( self ):
+
+		return [ strategy.argv[0] for step in self.steps for strategy in step if not strategy.dbus ]
+
+	# returns True if any step of this plan uses a D-Bus method
+	def uses_dbus( self ):
+
+		return any( strategy.dbus for step in self.steps for strategy in step )
+
+	def to_dict( self ):
+
+		return {
+		 'trigger': self.trigger,
+		 'steps': [ [ list(strategy) for strategy in step ] for step in self.steps ],
+		 'fingerprint': self.fingerprint,
+		}
+
+	@classmethod
+	def from_dict( cls, plan ):
+
+		steps = tuple(
+		 tuple( Strategy( name, tuple(argv), dbus ) for (name, argv, dbus) in step )
+		 for step in plan['steps']
+		)
+		return cls( plan['trigger'], steps, plan['fingerprint'] )
+
+	# returns a plan for the list of steps of alternative commands that
+	# get_commands() returns
+	@classmethod
+	def from_commands( cls, trigger, commands ):
+
+		steps = tuple(
+		 tuple( Strategy( os.path.basename( argv[0] ), tuple(argv), False ) for argv in step )
+		 for step in commands
+		)
+		return cls( trigger, steps, None )
+
+# a command that was started while executing a plan. It's kept so that its
+# output can be logged (and the process reaped) after the whole plan has been
+# dispatched, instead of slowing down the trigger. 'process' is either a
+# subprocess.Popen or the pid of a process that we forked ourselves
+class Dispatched:
+
+	def __init__( self, argv, process, stdout=None, stderr=None ):
+
+		self.argv = argv
+		self.process = process
+		self.stdout = stdout
+		self.stderr = stderr
+		self.returncode = None
+
+	def get_pid( self ):
+
+		if isinstance( self.process, int ):
+			return self.process
+		return self.process.pid
+
+	# waits up to 'timeout' seconds for the command to exit, and returns its
+	# returncode (or None if it's still running)
+	def wait( self, timeout ):
+
+		if self.returncode != None or not wait_for_exit( self.get_pid(), timeout ):
+			return self.returncode
+
+		if isinstance( self.process, int ):
+			status = os.waitpid( self.process, 0 )[1]
+			if os.WIFSIGNALED( status ):
+				self.returncode = -os.WTERMSIG( status )
+			else:
+				self.returncode = os.WEXITSTATUS( status )
+		else:
+			self.returncode = self.process.wait()
+
+		return self.returncode
+
+	# waits (up to OUTPUT_TIMEOUT seconds) for the command to exit and logs its
+	# returncode and output
+	def log( self ):
+
+		self.wait( OUTPUT_TIMEOUT )
+		command = ' '.join( self.argv )
+
+		msg = "DEBUG: `" +command+ "` returncode|" +str(self.returncode)+ "|"
+		print( msg ); logger.debug( msg )
+
+		for (name, output) in [ ('stdout', self.stdout), ('stderr', self.stderr) ]:
+			if output == None:
+				continue
+
+			try:
+				output.seek( 0 )
+				text = output.read().decode( 'utf-8', errors='replace' )
+				output.close()
+			except Exception as e:
+				text = "(unable to read it: " +str(e)+ ")"
+
+			msg = "DEBUG: `" +command+ "` " +name+ "|" +str(text)+ "|"
+			print( msg ); logger.debug( msg )
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns the dirs in which binaries are looked-up with the given search paths
+def get_search_dirs( search_paths ):
+
+	if search_paths == None:
+		return os.environ.get( 'PATH', os.defpath ).split( os.pathsep )
+
+	return search_paths
+
+# returns the mtime (in ns) of 'path' or None if it doesn't exist
+def get_mtime( path ):
+
+	try:
+		return os.stat( path ).st_mtime_ns
+	except OSError:
+		return None
+
+# returns a dict that changes whenever a plan for the given binaries would
+# need to be re-compiled. 'bus_names' is the set of the names on the D-Bus
+# buses and of the D-Bus methods that we can use (see
+# dbus_lin.TriggerBus.prepare()), or None if we don't know them
+def get_fingerprint( trigger, binaries, bus_names=None ):
+
+	session = { name: os.environ.get( name ) for name in SESSION_VARIABLES }
+	session['uid'] = os.getuid()
+
+	# we only care about the bus names that can change the plan
+	relevant = set( desktop['bus_name'] for desktop in DESKTOP_BINARIES.values() )
+	dirs = set()
+	for step in LINUX_TRIGGERS.get( trigger, [] ):
+		for method in step:
+			if type(method) == DBusMethod:
+				relevant.add( method.name )
+			else:
+				# a binary that's added to (or removed from) one of these dirs
+				# changes the dir's mtime
+				dirs.update( get_search_dirs( method.search_paths ) )
+
+	if bus_names != None:
+		session['bus_names'] = sorted( relevant & set( bus_names ) )
+
+	return {
+	 'session': session,
+	 'dirs': { path: get_mtime( path ) for path in sorted( dirs ) },
+	 'binaries': { path: get_mtime( path ) for path in sorted( set( binaries ) ) },
+	}
+
+# returns True if the binary 'name' should be used in the current desktop
+# environment
+def is_for_this_desktop( name, bus_names=None ):
+
+	if name not in DESKTOP_BINARIES:
+		return True
+
+	desktop = DESKTOP_BINARIES[name]
+	current_desktops = os.environ.get( 'XDG_CURRENT_DESKTOP', '' ).upper()
+
+	if bus_names != None and desktop['bus_name'] in bus_names:
+		return True
+
+	# we can't tell which desktop environment we're in
+	if current_desktops == '':
+		return True
+
+	return any( desktop_name in current_desktops.split(':') for desktop_name in desktop['desktops'] )
+
+# builds a new plan for 'trigger' (without looking at the cache). 'history' is
+# a dict of how many times each strategy has worked on this machine
+def build_plan( trigger, history=None, bus_names=None ):
+
+	if history == None:
+		history = dict()
+
+	steps = list()
+	for step in LINUX_TRIGGERS[trigger]:
+
+		strategies = list()
+		for method in step:
+
+			name = method.name
+			if type(method) == DBusMethod:
+
+				# we only use D-Bus methods whose service is running now (and that
+				# we're allowed to call)
+				if bus_names == None or name not in bus_names:
+					msg = "DEBUG: Skipping D-Bus method '" +str(name)+ "' because it's not usable"
+					print( msg ); logger.debug( msg )
+					continue
+
+				strategies.append( Strategy( name, (), True ) )
+				continue
+
+			if not is_for_this_desktop( name, bus_names ):
+				msg = "DEBUG: Skipping `" +str(name)+ "` because it's not for this desktop environment"
+				print( msg ); logger.debug( msg )
+				continue
+
+			path = shutil.which( name, path=os.pathsep.join( get_search_dirs( method.search_paths ) ) )
+			if path == None:
+				msg = "DEBUG: Skipping `" +str(name)+ "` because it's not installed"
+				print( msg ); logger.debug( msg )
+				continue
+
+			strategies.append( Strategy( name, tuple( [ os.path.abspath(path) ] + method.arguments ), False ) )
+
+		# the strategies that worked most often go first. sorted() is stable, so
+		# otherwise they stay in the order in which they're listed above
+		strategies = sorted( strategies, key=lambda strategy: -history.get( strategy.name, 0 ) )
+
+		if len(strategies) > 0:
+			steps.append( tuple(strategies) )
+
+	plan = TriggerPlan( trigger, tuple(steps), None )
+	return plan._replace(
+	 fingerprint = get_fingerprint( trigger, plan.get_binaries(), bus_names )
+	)
+
+# returns the contents of the cache file, or an empty cache if it can't be read
+def load_cache( cache_path ):
+
+	empty = { 'version': CACHE_VERSION, 'history': dict(), 'plans': dict() }
+	if cache_path == None:
+		return empty
+
+	try:
+		with open( cache_path, 'r' ) as fd:
+			cache = json.load( fd )
+
+		if cache.get( 'version' ) != CACHE_VERSION:
+			return empty
+
+		return cache
+
+	except (OSError, ValueError) as e:
+		return empty
+
+# atomically writes 'cache' to the cache file. Failing to write it is not an
+# error; it just means that the next arm will compile the plan again
+def save_cache( cache_path, cache ):
+
+	if cache_path == None:
+		return
+
+	try:
+		fd, temp_path = tempfile.mkstemp(
+		 dir = os.path.dirname( cache_path ), prefix = '.' + CACHE_FILENAME
+		)
+		with os.fdopen( fd, 'w' ) as temp_file:
+			json.dump( cache, temp_file )
+		os.replace( temp_path, cache_path )
+
+	except OSError as e:
+		msg = "WARNING: Unable to write the trigger plan cache to '" +str(cache_path)+ "' (" +str(e)+ ")"
+		print( msg ); logger.warning( msg )
+
+# returns the plan for 'trigger', from the cache file at 'cache_path' if it's
+# still current, or else by compiling (and caching) a new one
+def compile_plan( trigger, cache_path=None, bus_names=None ):
+
+	if trigger not in LINUX_TRIGGERS:
+		msg = "ERROR: Unable to compile a plan for unknown trigger '" +str(trigger)+ "'"
+		print( msg ); logger.error( msg )
+		raise Exception( msg )
+
+	cache = load_cache( cache_path )
+
+	if trigger in cache['plans']:
+		try:
+			plan = TriggerPlan.from_dict( cache['plans'][trigger] )
+
+			# has anything that the plan depends on changed since it was compiled?
+			if plan.fingerprint == get_fingerprint( trigger, plan.get_binaries(), bus_names ):
+				msg = "DEBUG: Using the cached '" +str(trigger)+ "' trigger plan"
+				print( msg ); logger.debug( msg )
+				return plan
+
+		except (KeyError, TypeError, ValueError) as e:
+			pass
+
+	msg = "DEBUG: Compiling the '" +str(trigger)+ "' trigger plan"
+	print( msg ); logger.debug( msg )
+
+	plan = build_plan( trigger, cache['history'], bus_names )
+
+	cache['plans'][trigger] = plan.to_dict()
+	save_cache( cache_path, cache )
+
+	return plan
+
+# records that the strategy 'name' worked, so that future plans try it first.
+# This drops all the cached plans, since they may now be ordered differently
+def record_success( cache_path, name ):
+
+	if cache_path == None:
+		return
+
+	cache = load_cache( cache_path )
+	cache['history'][name] = cache['history'].get( name, 0 ) + 1
+	cache['plans'] = dict()
+	save_cache( cache_path, cache )
+
+# waits up to 'timeout' seconds for our child process 'pid' to exit without
+# reaping it, and returns True if it exited
+def wait_for_exit( pid, timeout ):
+
+	# a pidfd becomes readable when the process exits (linux >= 5.3)
+	if hasattr( os, 'pidfd_open' ):
+		try:
+			fd = os.pidfd_open( pid )
+		except OSError:
+			fd = None
+
+		if fd != None:
+			try:
+				return len( select.select( [fd], [], [], max( timeout, 0 ) )[0] ) > 0
+			finally:
+				os.close( fd )
+
+	# otherwise we poll, backing off like subprocess.Popen.wait() does
+	deadline = time.monotonic() + timeout
+	delay = 0.0005
+	while True:
+		if os.waitid( os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT ) != None:
+			return True
+
+		remaining = deadline - time.monotonic()
+		if remaining <= 0:
+			return False
+
+		time.sleep( min( delay, remaining ) )
+		delay = min( delay*2, 0.05 )
+
+# starts the command of 'strategy' with the environment 'env' and waits up to
+# 'timeout' seconds for it. Returns True if it exited successfully. The command
+# is appended to 'dispatched' so that its output is logged later
+def run_command( strategy, env, timeout, dispatched ):
+
+	command = ' '.join( strategy.argv )
+	try:
+		msg = "INFO: Attempting to execute `" +command+ "`"
+		print( msg ); logger.debug( msg )
+
+		# the output goes to files instead of pipes so that a chatty command
+		# can't block on a full pipe while we're not reading it
+		stdout = tempfile.TemporaryFile()
+		stderr = tempfile.TemporaryFile()
+		process = subprocess.Popen(
+		 strategy.argv, stdin=subprocess.DEVNULL, stdout=stdout, stderr=stderr,
+		 env=env
+		)
+
+	except Exception as e:
+		# that didn't work; log it so the caller can try the next one
+		msg = "WARNING: Failed to execute `" +command+ "`! " +str(e)
+		print( msg ); logger.warning( msg )
+		return False
+
+	return wait_for_dispatched(
+	 Dispatched( strategy.argv, process, stdout, stderr ), timeout, dispatched
+	)
+
+# waits up to 'timeout' seconds for the command 'command' (a Dispatched) to
+# exit, appends it to 'dispatched', and returns True if it exited successfully
+def wait_for_dispatched( command, timeout, dispatched ):
+
+	returncode = command.wait( timeout )
+	dispatched.append( command )
+
+	if returncode == 0:
+		return True
+
+	# that didn't work; log it so the caller can try the next one
+	if returncode == None:
+		msg = "WARNING: `" +' '.join( command.argv )+ "` didn't finish within " +str( round(timeout*1000) )+ " ms! Trying the next one."
+	else:
+		msg = "WARNING: Failed to execute `" +' '.join( command.argv )+ "`! (returncode " +str(returncode)+ ")"
+	print( msg ); logger.warning( msg )
+
+	return False
+
+# logs the output of the 'dispatched' commands in a background thread
+def log_dispatched( dispatched ):
+
+	if len(dispatched) == 0:
+		return
+
+	def log():
+		for command in dispatched:
+			command.log()
+
+	threading.Thread( target=log, daemon=True ).start()
+
+# returns the environment in which the commands of a plan are executed
+def get_command_env():
+
+	# unset PYTHONHOME to fix AppImage fs encoding error
+	#    ModuleNotFoundError: No module named 'encodings'
+	# * https://github.com/BusKill/buskill-app/issues/64#issuecomment-1537221491
+	env = dict( os.environ )
+	env.pop( 'PYTHONHOME', None )
+
+	return env
+
+# executes the first strategy that works of every step of 'plan'. Each
+# strategy gets at most STRATEGY_TIMEOUT seconds, and the whole plan at most
+# PLAN_TIMEOUT seconds. D-Bus methods are called with 'call_dbus' (or skipped
+# if it's None), and commands are executed with 'run_command' (see
+# trigger_executor.py for why it's replaceable) in the environment 'env' (or
+# get_command_env() if it's None).
+#
+# If 'verify' is set, then it's called with every strategy that succeeded and
+# the time (in seconds) that's left, and it returns True if the strategy
+# actually took effect (eg the session is locked; see lock_state_lin.py), False
+# if it didn't, or None if it can't tell. A strategy that didn't take effect is
+# treated like one that failed, and once one did, the rest of the plan is
+# skipped, since its steps are only there in case the earlier ones didn't work.
+# A strategy can take effect after verify gave up on it, so before the plan
+# fails, verify is called once more (with 'settle=True') for the last strategy
+# that didn't
+def execute_plan( plan, on_success=None, call_dbus=None, run_command=run_command, env=None, verify=None ):
+
+	start_time = time.monotonic()
+	deadline = start_time + PLAN_TIMEOUT
+
+	if env == None:
+		env = get_command_env()
+
+	if len(plan.steps) == 0:
+		msg = "ERROR: None of the commands for the '" +str(plan.trigger)+ "' trigger are installed!"
+		print( msg ); logger.error( msg )
+		return False
+
+	succeeded = list()
+	dispatched = list()
+	out_of_time = False
+	verified = False
+	unverified = None
+	for step in plan.steps:
+		for strategy in step:
+
+			timeout = min( STRATEGY_TIMEOUT, deadline - time.monotonic() )
+			if timeout <= 0:
+				out_of_time = True
+				break
+
+			if strategy.dbus:
+				if call_dbus == None:
+					continue
+
+				try:
+					msg = "INFO: Attempting to call the D-Bus method of '" +str(strategy.name)+ "'"
+					print( msg ); logger.debug( msg )
+					call_dbus( strategy.name, timeout )
+
+				except Exception as e:
+					# that didn't work; log it and try the next one
+					msg = "WARNING: Failed to call the D-Bus method of '" +str(strategy.name)+ "'! " +str(e)
+					print( msg ); logger.warning( msg )
+					continue
+
+			elif not run_command( strategy, env, timeout, dispatched ):
+				continue
+
+			if verify != None:
+				result = verify( strategy, deadline - time.monotonic() )
+				if result == False:
+					unverified = strategy
+					continue
+				if result == True:
+					verified = True
+
+			succeeded.append( strategy.name )
+			break
+
+		else:
+			msg = "ERROR: Every command of this step of the '" +str(plan.trigger)+ "' trigger failed!"
+			print( msg ); logger.error( msg )
+
+		if out_of_time:
+			msg = "ERROR: The '" +str(plan.trigger)+ "' trigger ran out of time (" +str(PLAN_TIMEOUT)+ " s). Skipping the rest of it!"
+			print( msg ); logger.error( msg )
+			break
+
+		if verified:
+			break
+
+	if unverified != None and not verified and len(succeeded) < len(plan.steps):
+		if verify( unverified, deadline - time.monotonic(), settle=True ) == True:
+			verified = True
+			succeeded.append( unverified.name )
+
+	msg = "INFO: Dispatched the '" +str(plan.trigger)+ "' trigger in " +str( round((time.monotonic()-start_time)*1000, 3) )+ " ms (the limit is " +str(PLAN_TIMEOUT*1000)+ " ms). " +str(len(succeeded))+ " of " +str(len(plan.steps))+ " steps succeeded"
+	if verified:
+		msg+= ", and it took effect"
+	print( msg ); logger.info( msg )
+
+	# these are done last so that they can't slow-down the trigger
+	log_dispatched( dispatched )
+	if on_success != None:
+		for name in succeeded:
+			on_success( name )
+
+	return verified or len(succeeded) == len(plan.steps)
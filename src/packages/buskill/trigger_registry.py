@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/trigger_registry.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This module discovers the triggers that BusKill can execute. The built-in triggers (eg 'lock-screen') are implemented by BusKill itself, and every other trigger is a plugin. Triggers are described by a lightweight manifest, which is all that's read to list them (eg in the GUI's settings or with `--list-triggers`). A plugin's code is only imported when it's loaded, which the app does when it arms with that trigger, so the app never pays (eg in startup time or memory) for the triggers that aren't used or for their dependencies.
+
+Triggers are discovered from
+
+ * the 'manifest.json' file of each triggers dir (the one in this package and the 'triggers' dir in the user's data dir), and
+ * the 'buskill.triggers' entry points of the installed python packages.
+
+A manifest is a JSON object whose 'triggers' is a list of triggers, each of which is an object like::
+
+  {
+   "name": "wipe-keys",
+   "module": "wipe_keys.py",
+   "description": "BusKill will wipe the disk encryption keys from RAM",
+   "confirmation": "Are you sure?",
+   "icon": "\\ue62a",
+   "aliases": ["w"],
+   "platforms": ["lin"]
+  }
+
+where 'module' is the plugin's python file (in the same dir as the manifest), and everything but 'name' and 'module' is optional. Only the manifest in this package may describe built-in triggers, which have no 'module'. An entry point's name is the name of the trigger, and its value is the plugin's module (eg 'buskill_wipe_keys' or 'buskill_wipe_keys:plugin'). Its description is the summary of its package. When two triggers have the same name, the one that was discovered first wins.
+
+A plugin is a module (or any other object) with an 'execute( bk )' function, which executes the trigger and may return False if it failed. It may also have a 'prepare( bk )' function, which is called when the app arms with the trigger and should raise an exception if the trigger can't be executed on this machine. 'bk' is the app's BusKill object.
+
+Like trigger_plan.py, it must not import anything from the rest of the buskill package.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import collections, importlib, importlib.util, json, os, re
+
+import logging
+logger = logging.getLogger( __name__ )
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+MANIFEST_FILENAME = 'manifest.json'
+
+# the group of the entry points that python packages use to register triggers
+ENTRY_POINT_GROUP = 'buskill.triggers'
+
+# the platforms that a trigger supports if its manifest doesn't say
+PLATFORMS = [ 'lin', 'win', 'mac' ]
+
+# the icon of a trigger whose manifest doesn't set one
+DEFAULT_ICON = ''
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# a trigger, as described by its manifest. A built-in trigger has neither a
+# 'module' nor a 'path'. A plugin is imported from the python file at 'path' if
+# it's set, or else from 'module' (eg 'package.module:attribute')
+class Trigger( collections.namedtuple( 'Trigger', [
+ 'name', 'description', 'confirmation', 'icon', 'aliases', 'platforms',
+ 'module', 'path'
+] ) ):
+
+	__slots__ = ()
+
+	def is_plugin( self ):
+
+		return self.module != None or self.path != None
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# returns a Trigger from the manifest entry 'entry' of the triggers dir
+# 'triggers_dir'. Built-in triggers are only allowed if 'builtin' is True.
+# Raises an exception if the entry is invalid
+def parse_entry( entry, triggers_dir, builtin ):
+
+	name = entry.get( 'name' )
+	if not isinstance( name, str ) or not re.match( "^[A-Za-z0-9_.-]+$", name ):
+		raise Exception( "bad name '" +str(name)+ "'" )
+
+	path = None
+	module = entry.get( 'module' )
+	if module != None:
+		path = os.path.join( triggers_dir, module )
+		if os.path.basename( module ) != module or not os.path.isfile( path ):
+			raise Exception( "trigger '" +name+ "' has no module '" +str(module)+ "'" )
+	elif not builtin:
+		raise Exception( "trigger '" +name+ "' has no module" )
+
+	platforms = entry.get( 'platforms', PLATFORMS )
+	aliases = entry.get( 'aliases', list() )
+	if not isinstance( platforms, list ) or not isinstance( aliases, list ):
+		raise Exception( "trigger '" +name+ "' has a bad 'platforms' or 'aliases'" )
+
+	return Trigger(
+	 name, str( entry.get( 'description', name ) ),
+	 str( entry.get( 'confirmation', '' ) ), str( entry.get( 'icon', DEFAULT_ICON ) ),
+	 tuple( [ str(alias) for alias in aliases ] ),
+	 tuple( [ str(platform) for platform in platforms ] ),
+	 None, path
+	)
+
+# returns a list of the Triggers in the manifest of the triggers dir
+# 'triggers_dir', skipping (and logging) any that are invalid
+def read_manifest( triggers_dir, builtin=False ):
+
+	manifest_path = os.path.join( triggers_dir, MANIFEST_FILENAME )
+	if not os.path.exists( manifest_path ):
+		return list()
+
+	try:
+		with open( manifest_path ) as fd:
+			entries = json.load( fd )['triggers']
+	except Exception as e:
+		msg = "WARNING: Unable to read the trigger manifest '" +str(manifest_path)+ "' (" +str(e)+ ")"
+		print( msg ); logger.warning( msg )
+		return list()
+
+	triggers = list()
+	for entry in entries:
+		try:
+			triggers.append( parse_entry( entry, triggers_dir, builtin ) )
+		except Exception as e:
+			msg = "WARNING: Skipping an invalid trigger in '" +str(manifest_path)+ "' (" +str(e)+ ")"
+			print( msg ); logger.warning( msg )
+
+	return triggers
+
+# returns a list of the Triggers of the entry points in the 'group' group of the
+# installed python packages. This only reads their metadata
+def read_entry_points( group ):
+
+	# importlib.metadata is new in python 3.8, but python 3.7 may have the
+	# importlib_metadata backport installed
+	try:
+		import importlib.metadata as metadata
+	except ImportError:
+		try:
+			import importlib_metadata as metadata
+		except ImportError:
+			return list()
+
+	try:
+		entry_points = metadata.entry_points()
+		if hasattr( entry_points, 'select' ):
+			entry_points = entry_points.select( group=group )
+		else:
+			entry_points = entry_points.get( group, list() )
+	except Exception as e:
+		msg = "WARNING: Unable to read the '" +str(group)+ "' entry points (" +str(e)+ ")"
+		print( msg ); logger.warning( msg )
+		return list()
+
+	triggers = list()
+	for entry_point in entry_points:
+
+		description = entry_point.name
+		dist = getattr( entry_point, 'dist', None )
+		if dist != None and dist.metadata.get( 'Summary' ):
+			description = dist.metadata['Summary']
+
+		triggers.append( Trigger(
+		 entry_point.name, description, '', DEFAULT_ICON, tuple(),
+		 tuple(PLATFORMS), entry_point.value, None
+		) )
+
+	return triggers
+
+# returns an OrderedDict of the Triggers that are discovered from the triggers
+# dir of this package 'builtin_dir', the other triggers dirs 'triggers_dirs',
+# and the entry point group 'group' (in that order), keyed by name
+def discover( builtin_dir, triggers_dirs, group=ENTRY_POINT_GROUP ):
+
+	discovered = read_manifest( builtin_dir, builtin=True )
+	for triggers_dir in triggers_dirs:
+		discovered += read_manifest( triggers_dir )
+	discovered += read_entry_points( group )
+
+	triggers = collections.OrderedDict()
+	for trigger in discovered:
+		if trigger.name in triggers:
+			msg = "WARNING: Ignoring the duplicate trigger '" +str(trigger.name)+ "' (" +str(trigger.path or trigger.module)+ ")"
+			print( msg ); logger.warning( msg )
+			continue
+
+		triggers[trigger.name] = trigger
+
+	msg = "DEBUG: Discovered triggers:|" +str( list( triggers.keys() ) )+ "|"
+	print( msg ); logger.debug( msg )
+
+	return triggers
+
+# returns the name of the trigger in 'triggers' whose name or alias is 'name',
+# or 'name' if there isn't one
+def resolve( triggers, name ):
+
+	for trigger in triggers.values():
+		if name in trigger.aliases:
+			return trigger.name
+
+	return name
+
+# imports the plugin of 'trigger' and returns it. Raises an exception if it
+# can't be imported or has no execute() function
+def load_plugin( trigger ):
+
+	if trigger.path != None:
+		module_name = 'buskill_trigger_' +re.sub( '[^A-Za-z0-9_]', '_', trigger.name )
+		spec = importlib.util.spec_from_file_location( module_name, trigger.path )
+		plugin = importlib.util.module_from_spec( spec )
+		spec.loader.exec_module( plugin )
+
+	else:
+		(module_name, separator, attributes) = trigger.module.partition( ':' )
+		plugin = importlib.import_module( module_name.strip() )
+		for attribute in attributes.strip().split( '.' ):
+			if attribute != '':
+				plugin = getattr( plugin, attribute )
+
+	if not callable( getattr( plugin, 'execute', None ) ):
+		raise Exception( "The plugin of the '" +str(trigger.name)+ "' trigger has no execute() function" )
+
+	msg = "DEBUG: Loaded the plugin of the '" +str(trigger.name)+ "' trigger"
+	print( msg ); logger.debug( msg )
+
+	return plugin
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+::
+
+  File:    packages/buskill/usb_listener.py
+  Authors: Michael Altfield <michael@buskill.in>
+  Created: 2026-10-18
+  Updated: 2026-10-18
+  Version: 0.1
+
+This is a very small python script that listens for USB hotplug events on behalf of the BusKill app (Linux & MacOS only). The app starts it as a fresh process (rather than forking itself) so that the process that sits armed all day doesn't carry around a copy of everything that the app has loaded (kivy, SDL, fonts, gnupg, etc). It should be as small as possible, and it must never import the rest of the buskill package.
+
+It's controlled by the app with the same commands as the app's persistent usb_handler, sent over a socket. It reports removal events to the app over a pipe. Both use the same framing as multiprocessing's send_bytes() & recv_bytes(), so the app can wrap them in a multiprocessing Connection.
+
+For more info, see: https://buskill.in/
+"""
+
+################################################################################
+#                                   IMPORTS                                    #
+################################################################################
+
+import time
+IMPORT_START_TIME = time.monotonic()
+
+import os, sys, json, math, select, socket, struct
+
+import logging
+logger = logging.getLogger( __name__ )
+
+# this file is both a script and a module of the buskill package
+try:
+	from . import netlink_lin, sysfs_lin, arm_epoch, hardening, trigger_plan
+except ImportError:
+	import netlink_lin, sysfs_lin, arm_epoch, hardening, trigger_plan
+
+################################################################################
+#                                  SETTINGS                                    #
+################################################################################
+
+# the app logs a warning (and benchmarks/lean_usb_handler.py fails) if the
+# listener uses more than this much memory (in KiB) or takes longer than this
+# to import its dependencies (in ms)
+RSS_BUDGET_KIB = 32 * 1024
+IMPORT_TIME_BUDGET_MS = 250
+
+################################################################################
+#                                   OBJECTS                                    #
+################################################################################
+
+# everything that the listener knows. This is deliberately small; the app
+# sends us only what we need to listen for the removal of the right device and
+# (optionally) execute the trigger
+class ListenerState:
+
+	def __init__( self, hotplug_backend, events_fd ):
+
+		# either 'libusb', 'netlink' or 'sysfs'
+		self.hotplug_backend = hotplug_backend
+
+		# the pipe to which we write removal events for the app
+		self.events_fd = events_fd
+
+		# the name of the trigger and, if we can execute it ourselves, the list
+		# of commands that implement it (see BusKill.get_trigger_commands())
+		self.trigger = None
+		self.trigger_commands = None
+		self.trigger_in_listener = False
+
+		# if the user chose a specific device, then these are the keys of the
+		# matching devices that were connected when we armed and its vendor &
+		# product ids
+		self.device_keys = None
+		self.device_vid_pid = None
+
+		self.armed = False
+		self.arm_epoch = arm_epoch.ArmEpoch()
+		self.import_time = None
+
+################################################################################
+#                                  FUNCTIONS                                   #
+################################################################################
+
+# writes one message to 'fd', prefixed with its length
+def send_frame( fd, data ):
+
+	data = struct.pack( '!i', len(data) ) + data
+	while data:
+		data = data[ os.write( fd, data ): ]
+
+# reads exactly 'length' bytes from 'fd'. Raises EOFError if it's closed
+def read_exactly( fd, length ):
+
+	data = b''
+	while len(data) < length:
+		chunk = os.read( fd, length - len(data) )
+		if chunk == b'':
+			raise EOFError
+		data += chunk
+
+	return data
+
+# reads one message (as written by send_frame()) from 'fd'
+def recv_frame( fd ):
+
+	(length,) = struct.unpack( '!i', read_exactly( fd, 4 ) )
+	return read_exactly( fd, length )
+
+# returns this process' resident set size in KiB
+def get_rss_kib():
+
+	try:
+		with open( '/proc/self/status' ) as fd:
+			for line in fd:
+				if line.startswith( 'VmRSS:' ):
+					return int( line.split()[1] )
+	except OSError:
+		pass
+
+	# there's no /proc on MacOS, but the peak RSS (in bytes) is close enough
+	import resource
+	return int( resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss / 1024 )
+
+# this is a replacement for looping on libusb's handleEvents(), which can't
+# be interrupted. It waits on libusb's file descriptors and on 'stop' (anything
+# with a fileno()) at the same time, so it returns as soon as 'stop' becomes
+# readable
+def handle_usb_events_until_stopped( context, stop ):
+
+	poller = select.poll()
+	for fd, events in context.getPollFDList():
+		poller.register( fd, events )
+
+	stop_fd = stop.fileno()
+	poller.register( stop_fd, select.POLLIN )
+
+	# libusb may add or remove file descriptors at any time
+	def pollfd_added( fd, events, user_data=None ):
+		poller.register( fd, events )
+	def pollfd_removed( fd, user_data=None ):
+		poller.unregister( fd )
+	context.setPollFDNotifiers( pollfd_added, pollfd_removed )
+
+	try:
+		while True:
+
+			# libusb tells us if it needs to be called again by some deadline,
+			# even if none of its file descriptors become ready. Usually it
+			# doesn't, and we sleep until there's an event
+			timeout = context.getNextTimeout()
+			if timeout != None:
+				timeout = math.ceil( timeout * 1000 )
+
+			ready = poller.poll( timeout )
+
+			if any( fd == stop_fd for fd, events in ready ):
+				msg = "DEBUG: Stopping libusb event loop"
+				print( msg ); logger.debug( msg )
+				return
+
+			# this won't block; it just processes what's already pending
+			context.handleEventsTimeout( 0 )
+
+	finally:
+		context.setPollFDNotifiers( None, None )
+
+# returns True if the removal of the usb device identified by 'key' (a tuple
+# of (bus, port numbers, vendor id, product id)) should execute the trigger
+def is_trigger_device( state, key ):
+
+	if state.device_keys != None:
+		return key in state.device_keys
+
+	if state.device_vid_pid != None:
+		return key[2:] == state.device_vid_pid
+
+	return True
+
+# executes the trigger's commands. Each step is a list of alternative commands
+# that we try in order until one of them succeeds, within the time limits of
+# trigger_plan.execute_plan()
+def run_trigger_commands( trigger, commands ):
+
+	trigger_plan.execute_plan( trigger_plan.TriggerPlan.from_commands( trigger, commands ) )
+
+# called as soon as we've determined that the chosen device was removed
+def usb_removal( state, key ):
+
+	event_time = time.monotonic()
+
+	# only the first removal of each arm epoch fires the trigger
+	if not state.arm_epoch.removal( event_time ):
+		return
+
+	msg = "INFO: Detected removal of USB device " +str(key)
+	print( msg ); logger.info( msg )
+
+	if state.trigger_in_listener and state.trigger_commands != None:
+
+		msg = "INFO: Executing trigger '" +str(state.trigger)+ "'"
+		print( msg ); logger.info( msg )
+
+		run_trigger_commands( state.trigger, state.trigger_commands )
+		message = 'triggered '
+
+	else:
+		message = 'trigger '
+
+	message += repr(event_time)+ ' ' +str(state.arm_epoch.number)
+
+	send_frame( state.events_fd, message.encode('ascii') )
+
+# libusb's hotplug callback
+def hotplug_callback_libusb( state, context, device, event ):
+
+	key = (
+	 device.getBusNumber(),
+	 tuple( device.getPortNumberList() ),
+	 device.getVendorID(),
+	 device.getProductID()
+	)
+
+	if not is_trigger_device( state, key ):
+		return
+
+	usb_removal( state, key )
+
+# netlink_lin.listen()'s callback
+def hotplug_callback_netlink( state, fields ):
+
+	key = netlink_lin.get_usb_device_key( fields )
+
+	if key == None or not is_trigger_device( state, key ):
+		return
+
+	usb_removal( state, key )
+
+# acts on one command from the app and returns the reply. See the comments
+# above BusKill.start_persistent_usb_handler() for the list of commands
+def handle_command( state, command, argument, backend ):
+
+	if command == 'arm':
+		(in_listener, epoch) = argument.split(' ')
+		state.trigger_in_listener = (in_listener == '1')
+		if not state.armed:
+			state.arm_epoch.arm( int(epoch) )
+			backend.arm()
+			state.armed = True
+
+	elif command == 'disarm':
+		if state.armed:
+			backend.disarm()
+			state.arm_epoch.disarm()
+			state.armed = False
+
+			stats = state.arm_epoch.get_stats()
+			msg = "INFO: Arm epoch stats: " +str(stats)
+			print( msg ); logger.info( msg )
+
+	elif command == 'set-trigger':
+		state.trigger = argument
+		state.trigger_commands = None
+
+	elif command == 'set-trigger-commands':
+		state.trigger_commands = json.loads( argument )
+
+	elif command == 'set-device':
+		device = json.loads( argument )
+		state.device_keys = None
+		state.device_vid_pid = None
+		if device['keys'] != None:
+			state.device_keys = set(
+			 [ (bus, tuple(ports), vid, pid) for bus, ports, vid, pid in device['keys'] ]
+			)
+		if device['vid_pid'] != None:
+			state.device_vid_pid = tuple( device['vid_pid'] )
+
+	elif command == 'status':
+		return 'ok armed=' +str(int(state.armed)) \
+		 + ' trigger=' +str(state.trigger) \
+		 + ' backend=' +str(state.hotplug_backend) \
+		 + ' pid=' +str(os.getpid()) \
+		 + ' rss_kib=' +str(get_rss_kib()) \
+		 + ' import_ms=' +str(round(state.import_time*1000, 3)) \
+		 + ''.join( [
+		  ' ' +str(key)+ '=' +str(value)
+		  for key, value in state.arm_epoch.get_stats().items()
+		 ] )
+
+	elif command == 'ping':
+		return 'ok pong'
+
+	elif command == 'harden':
+		return 'ok ' +hardening.format_report( hardening.harden() )
+
+	else:
+		return 'error unknown command'
+
+	return 'ok'
+
+# the libusb hotplug backend. The context stays open for as long as we run;
+# arming and disarming just (de)registers our callback
+class LibusbBackend:
+
+	def __init__( self, state, context ):
+		self.state = state
+		self.context = context
+		self.handle = None
+
+	def arm( self ):
+
+		import usb1
+
+		vendor_id = usb1.HOTPLUG_MATCH_ANY
+		product_id = usb1.HOTPLUG_MATCH_ANY
+		if self.state.device_vid_pid != None:
+			(vendor_id, product_id) = self.state.device_vid_pid
+
+		self.handle = self.context.hotplugRegisterCallback(
+		 lambda *args: hotplug_callback_libusb( self.state, *args ),
+		 events = usb1.HOTPLUG_EVENT_DEVICE_LEFT,
+		 flags = 0,
+		 vendor_id = vendor_id,
+		 product_id = product_id
+		)
+
+	def disarm( self ):
+		self.context.hotplugDeregisterCallback( self.handle )
+
+	def wait( self, stop ):
+		handle_usb_events_until_stopped( self.context, stop )
+
+# the netlink hotplug backend. We close the socket when disarmed so that stale
+# events don't pile-up in it
+class NetlinkBackend:
+
+	def __init__( self, state ):
+		self.state = state
+		self.sock = None
+		self.tracker = None
+
+	def arm( self ):
+		self.sock = netlink_lin.open_uevent_socket()
+		self.tracker = netlink_lin.DeviceTracker()
+
+	def disarm( self ):
+		self.sock.close()
+		self.sock = None
+		self.tracker = None
+
+	def wait( self, stop ):
+		netlink_lin.listen(
+		 self.sock,
+		 lambda fields: hotplug_callback_netlink( self.state, fields ),
+		 stop, self.tracker
+		)
+
+# the sysfs hotplug backend, for when libusb has no hotplug support and
+# netlink isn't available (see sysfs_lin.py)
+class SysfsBackend:
+
+	def __init__( self, state ):
+		self.state = state
+		self.watcher = None
+
+	def arm( self ):
+		self.watcher = sysfs_lin.SysfsWatcher()
+
+	def disarm( self ):
+		self.watcher.close()
+		self.watcher = None
+
+	def wait( self, stop ):
+		sysfs_lin.listen(
+		 self.watcher,
+		 lambda fields: hotplug_callback_netlink( self.state, fields ),
+		 stop
+		)
+
+# the main loop. Sleeps until either a usb event or a command arrives
+def listen( state, control, backend ):
+
+	while True:
+
+		if state.armed:
+			backend.wait( control )
+
+		try:
+			command = recv_frame( control.fileno() ).decode('ascii')
+		except EOFError:
+			msg = "DEBUG: The app closed the control socket; exiting"
+			print( msg ); logger.debug( msg )
+			return
+
+		(command, _, argument) = command.partition(' ')
+
+		if command == 'exit':
+			send_frame( control.fileno(), b'ok' )
+			return
+
+		try:
+			reply = handle_command( state, command, argument, backend )
+		except Exception as e:
+			reply = 'error ' +str(e).replace( '\n', ' ' )
+
+		send_frame( control.fileno(), reply.encode('ascii', 'replace') )
+
+def main( argv ):
+
+	# the arguments are the hotplug backend, the file descriptor numbers of the
+	# control socket and the events pipe, and the file path to where we write
+	# logs
+	(hotplug_backend, control_fd, events_fd, log_file_path) = argv[1:5]
+
+	logging.basicConfig(
+	 filename = log_file_path,
+	 filemode = 'a',
+	 format = '%(asctime)s,%(msecs)d usb_listener %(levelname)s %(message)s',
+	 datefmt = '%H:%M:%S',
+	 level = logging.DEBUG
+	)
+
+	state = ListenerState( hotplug_backend, int(events_fd) )
+	control = socket.socket( fileno=int(control_fd) )
+
+	if hotplug_backend == 'libusb':
+
+		import usb1
+		state.import_time = time.monotonic() - IMPORT_START_TIME
+
+		with usb1.USBContext() as context:
+
+			if context.hasCapability(usb1.CAP_HAS_HOTPLUG):
+				listen( state, control, LibusbBackend( state, context ) )
+				return 0
+
+		if not sys.platform.startswith( 'linux' ):
+			msg = 'ERROR: Hotplug support is missing'
+			print( msg ); logger.error( msg )
+			return 1
+
+		msg = "WARNING: libusb is missing hotplug support; falling back to the 'sysfs' hotplug backend"
+		print( msg ); logger.warning( msg )
+
+		state.hotplug_backend = 'sysfs'
+		listen( state, control, SysfsBackend( state ) )
+
+	elif hotplug_backend == 'sysfs':
+
+		state.import_time = time.monotonic() - IMPORT_START_TIME
+		listen( state, control, SysfsBackend( state ) )
+
+	elif hotplug_backend == 'netlink':
+
+		state.import_time = time.monotonic() - IMPORT_START_TIME
+		listen( state, control, NetlinkBackend( state ) )
+
+	else:
+		msg = "ERROR: Unsupported hotplug backend (" +str(hotplug_backend)+ ")"
+		print( msg ); logger.error( msg )
+		return 1
+
+	return 0
+
+if __name__ == '__main__':
+	sys.exit( main( sys.argv ) )